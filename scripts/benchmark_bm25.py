@@ -0,0 +1,237 @@
+"""
+Compare BM25 keyword ranking with Postgres full-text ranking.
+
+The corpus is the lease texts from tests/test_complex_leases_all_asset_classes.py,
+split into one chunk per section, plus --boilerplate long standard-clause
+chunks that mention the same terms (the case ts_rank handles poorly because it
+does not normalise by length). Queries are the "Label:" field names used in
+the leases; a chunk is relevant when it contains that "Label:" line.
+
+Offline (default), BM25Index is compared with a ts_rank-style ranking (all
+query terms required, frequency-weighted, no length normalisation):
+    python scripts/benchmark_bm25.py --boilerplate 200
+
+With --rpc, the same queries run against match_document_chunks_keyword for the
+tenant of TEST_AUTH_TOKEN, and BM25 is built from that tenant's chunks, so
+both rank the same corpus (ingest the fixture leases first for meaningful
+relevance labels):
+    TEST_AUTH_TOKEN=<token> python scripts/benchmark_bm25.py --rpc
+"""
+
+import argparse
+import ast
+import math
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, List, Tuple
+from uuid import uuid4
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.search.bm25 import BM25Index, analyze
+
+FIXTURE_PATH = Path(__file__).resolve().parent.parent / "tests" / "test_complex_leases_all_asset_classes.py"
+
+BOILERPLATE_CLAUSES = [
+    "Tenant shall pay to Landlord all Base Rent and Additional Rent without deduction or offset.",
+    "Any Late Fee assessed under this Lease shall be deemed Additional Rent.",
+    "The Security Deposit shall be held by Landlord as security for the performance of Tenant.",
+    "Landlord may apply any Letter of Credit to cure any default by Tenant under this Lease.",
+    "Tenant shall maintain the Premises, including HVAC systems, in good order and repair.",
+    "Operating Expenses, Real Estate Taxes and Insurance shall be allocated to Tenant pro rata.",
+    "The Term may be extended by Tenant pursuant to any Renewal Option granted herein.",
+    "Landlord shall deliver the Premises with any TI Allowance applied to approved improvements.",
+]
+
+Ranker = Callable[[str, int], List[int]]
+
+
+def load_fixture_leases() -> List[str]:
+    """Extract the lease_text string literals from the fixture test module."""
+    tree = ast.parse(FIXTURE_PATH.read_text())
+    leases: List[str] = []
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Assign)
+            and any(isinstance(target, ast.Name) and target.id == "lease_text" for target in node.targets)
+            and isinstance(node.value, ast.Constant)
+            and isinstance(node.value.value, str)
+        ):
+            leases.append(node.value.value)
+    return leases
+
+
+def split_sections(lease: str) -> List[str]:
+    """Split a lease into blank-line separated sections."""
+    lines = [line.strip() for line in lease.splitlines()]
+    sections = "\n".join(lines).split("\n\n")
+    return [section.strip() for section in sections if section.strip()]
+
+
+def make_boilerplate(count: int, seed: int) -> List[str]:
+    """Long chunks of shuffled standard clauses."""
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(BOILERPLATE_CLAUSES, k=rng.randint(20, 40))) for _ in range(count)]
+
+
+def labelled_queries(chunks: List[str], max_relevant: int) -> List[Tuple[str, str]]:
+    """Field labels ("Label:") present in 1..max_relevant chunks, as (query, label line)."""
+    counts: Counter = Counter()
+    for chunk in chunks:
+        counts.update(set(re.findall(r"^([A-Z][A-Za-z /&]+):", chunk, flags=re.MULTILINE)))
+    return [
+        (label, f"{label}:")
+        for label, count in sorted(counts.items())
+        if count <= max_relevant and analyze(label)
+    ]
+
+
+def tf_rank(chunks: List[str]) -> Ranker:
+    """ts_rank-style ranking: all terms required, log frequency, no length normalisation."""
+    term_counts = [Counter(analyze(chunk)) for chunk in chunks]
+
+    def rank(query: str, k: int) -> List[int]:
+        terms = set(analyze(query))
+        scored = [
+            (sum(math.log1p(counts[term]) for term in terms), row)
+            for row, counts in enumerate(term_counts)
+            if terms and all(counts[term] for term in terms)
+        ]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [row for _, row in scored[:k]]
+
+    return rank
+
+
+def bm25_rank(chunks: List[str]) -> Ranker:
+    """BM25Index ranking over the chunks (row number as chunk id)."""
+    index = BM25Index()
+    ids = [uuid4() for _ in chunks]
+    row_of = {str(chunk_id): row for row, chunk_id in enumerate(ids)}
+    index.add_document(uuid4(), [{"id": chunk_id, "content": chunk} for chunk_id, chunk in zip(ids, chunks)])
+
+    def rank(query: str, k: int) -> List[int]:
+        return [row_of[chunk.chunk_id] for chunk, _ in index.search(query, k)]
+
+    return rank
+
+
+def reciprocal_rank(ranked: List[bool]) -> float:
+    """1 / position of the first relevant result (0 if none)."""
+    for position, relevant in enumerate(ranked, start=1):
+        if relevant:
+            return 1.0 / position
+    return 0.0
+
+
+def ndcg(ranked: List[bool], total_relevant: int, k: int) -> float:
+    """Binary-relevance nDCG@k."""
+    dcg = sum(1.0 / math.log2(position + 1) for position, relevant in enumerate(ranked[:k], start=1) if relevant)
+    ideal = sum(1.0 / math.log2(position + 1) for position in range(1, min(total_relevant, k) + 1))
+    return dcg / ideal if ideal else 0.0
+
+
+def evaluate(
+    label: str,
+    ranker: Ranker,
+    chunks: List[str],
+    queries: List[Tuple[str, str]],
+    k: int,
+) -> None:
+    """Run every query and print ranking quality and latency."""
+    latencies: List[float] = []
+    mrr: List[float] = []
+    ndcgs: List[float] = []
+    empty = 0
+    for query, needle in queries:
+        relevant_rows = {row for row, chunk in enumerate(chunks) if needle in chunk}
+        start_time = time.perf_counter()
+        rows = ranker(query, k)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        ranked = [row in relevant_rows for row in rows]
+        empty += not rows
+        mrr.append(reciprocal_rank(ranked))
+        ndcgs.append(ndcg(ranked, len(relevant_rows), k))
+
+    print(f"\n{label}")
+    print(f"  MRR@{k}:     {statistics.mean(mrr):.4f}")
+    print(f"  nDCG@{k}:    {statistics.mean(ndcgs):.4f}")
+    print(f"  No results: {empty}/{len(queries)}")
+    print(f"  p50:        {statistics.median(latencies):.2f}ms")
+    if len(latencies) >= 20:
+        print(f"  p95:        {statistics.quantiles(latencies, n=20)[-1]:.2f}ms")
+    print(f"  Max:        {max(latencies):.2f}ms")
+
+
+def rpc_corpus() -> Tuple[List[str], Ranker]:
+    """Fetch the caller tenant's chunks and a ranker backed by the FTS RPC."""
+    from src.auth.client import create_user_client
+
+    token = os.getenv("TEST_AUTH_TOKEN")
+    if not token:
+        print("ERROR: TEST_AUTH_TOKEN environment variable not set")
+        sys.exit(1)
+    supabase = create_user_client(token)
+
+    rows = []
+    start = 0
+    while True:
+        page = supabase.table("document_chunks").select("id, content").order("id").range(start, start + 999).execute()
+        rows.extend(page.data or [])
+        if len(page.data or []) < 1000:
+            break
+        start += 1000
+
+    chunks = [row["content"] for row in rows]
+    row_of = {row["id"]: i for i, row in enumerate(rows)}
+
+    def rank(query: str, k: int) -> List[int]:
+        result = supabase.rpc(
+            "match_document_chunks_keyword",
+            {"query_text": query, "match_count": k, "filter_document_ids": None},
+        ).execute()
+        return [row_of[row["id"]] for row in result.data or [] if row["id"] in row_of]
+
+    return chunks, rank
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--boilerplate", type=int, default=200, help="Long boilerplate chunks to add (offline)")
+    parser.add_argument("--max-relevant", type=int, default=5, help="Skip labels found in more chunks than this")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument("--rpc", action="store_true", help="Compare against the FTS RPC for TEST_AUTH_TOKEN")
+    args = parser.parse_args()
+
+    if args.rpc:
+        chunks, fts_ranker = rpc_corpus()
+        baseline_label = "Postgres FTS (match_document_chunks_keyword)"
+    else:
+        sections = [section for lease in load_fixture_leases() for section in split_sections(lease)]
+        chunks = sections + make_boilerplate(args.boilerplate, seed=42)
+        fts_ranker = tf_rank(chunks)
+        baseline_label = "ts_rank-style (no length normalisation)"
+
+    queries = labelled_queries(chunks, args.max_relevant)
+    if not queries:
+        print("ERROR: No labelled queries found in the corpus")
+        sys.exit(1)
+
+    print("=" * 60)
+    print(f"BM25 Benchmark ({len(chunks)} chunks, {len(queries)} queries)")
+    print("=" * 60)
+
+    evaluate(baseline_label, fts_ranker, chunks, queries, args.k)
+    evaluate("BM25 (BM25Index)", bm25_rank(chunks), chunks, queries, args.k)
+
+
+if __name__ == "__main__":
+    main()
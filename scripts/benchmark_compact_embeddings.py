@@ -0,0 +1,132 @@
+"""
+Benchmark compact (768-dim halfvec) vector search against the full index.
+
+Compares recall and latency of:
+  - match_document_chunks            (full float32 HNSW index, the baseline)
+  - match_document_chunks_compact    (halfvec index, compact scores only)
+  - match_document_chunks_compact    (halfvec index + full-precision re-scoring)
+
+Recall@k is measured against the full-index results. Query vectors are sampled
+from the tenant's stored chunk embeddings, so no OpenAI calls are made.
+
+Requires supabase/migrations/053_compact_embeddings.sql and a user JWT:
+    TEST_AUTH_TOKEN=<token> python scripts/benchmark_compact_embeddings.py --queries 50 --k 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Set, Tuple
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.auth.client import create_user_client
+from supabase import Client
+
+
+def sample_query_embeddings(supabase: Client, num_queries: int) -> List[List[float]]:
+    """Sample stored chunk embeddings to use as query vectors."""
+    result = (
+        supabase.table("document_chunks")
+        .select("embedding")
+        .not_.is_("embedding", "null")
+        .limit(num_queries)
+        .execute()
+    )
+    embeddings: List[List[float]] = []
+    for row in result.data or []:
+        value = row["embedding"]
+        # PostgREST returns pgvector values as "[0.1,0.2,...]" strings
+        embeddings.append(json.loads(value) if isinstance(value, str) else list(value))
+    return embeddings
+
+
+def run_query(
+    supabase: Client,
+    function_name: str,
+    params: Dict[str, Any],
+) -> Tuple[List[str], float]:
+    """Run one vector search RPC and return (chunk ids, latency ms)."""
+    start_time = time.perf_counter()
+    result = supabase.rpc(function_name, params).execute()
+    latency_ms = (time.perf_counter() - start_time) * 1000
+    return [row["id"] for row in result.data or []], latency_ms
+
+
+def recall(expected: List[str], actual: List[str]) -> float:
+    """Fraction of expected ids present in actual."""
+    if not expected:
+        return 1.0
+    expected_set: Set[str] = set(expected)
+    return len(expected_set.intersection(actual)) / len(expected_set)
+
+
+def print_stats(label: str, latencies: List[float], recalls: List[float]) -> None:
+    """Print latency and recall summary for one variant."""
+    print(f"\n{label}")
+    print(f"  Recall@k:  {statistics.mean(recalls):.4f} (min {min(recalls):.4f})")
+    print(f"  p50:       {statistics.median(latencies):.2f}ms")
+    if len(latencies) >= 20:
+        print(f"  p95:       {statistics.quantiles(latencies, n=20)[-1]:.2f}ms")
+    print(f"  Max:       {max(latencies):.2f}ms")
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=50, help="Number of sampled query vectors")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument("--rescore-factor", type=int, default=4, help="Candidates per result when re-scoring")
+    args = parser.parse_args()
+
+    token = os.getenv("TEST_AUTH_TOKEN")
+    if not token:
+        print("ERROR: TEST_AUTH_TOKEN environment variable is required (user JWT for tenant scoping)")
+        sys.exit(1)
+
+    supabase = create_user_client(token)
+    queries = sample_query_embeddings(supabase, args.queries)
+    if not queries:
+        print("ERROR: No chunk embeddings found for this tenant")
+        sys.exit(1)
+
+    print("=" * 60)
+    print(f"Compact Embedding Benchmark ({len(queries)} queries, k={args.k})")
+    print("=" * 60)
+
+    variants = {
+        "full": ("match_document_chunks", {}),
+        "compact": ("match_document_chunks_compact", {"rescore_count": 0}),
+        "compact+rescore": (
+            "match_document_chunks_compact",
+            {"rescore_count": args.k * args.rescore_factor},
+        ),
+    }
+    latencies: Dict[str, List[float]] = {name: [] for name in variants}
+    recalls: Dict[str, List[float]] = {name: [] for name in variants}
+
+    for query_embedding in queries:
+        baseline: List[str] = []
+        for name, (function_name, extra) in variants.items():
+            params = {
+                "query_embedding": query_embedding,
+                "match_count": args.k,
+                "filter_document_ids": None,
+                **extra,
+            }
+            ids, latency_ms = run_query(supabase, function_name, params)
+            if name == "full":
+                baseline = ids
+            latencies[name].append(latency_ms)
+            recalls[name].append(recall(baseline, ids))
+
+    for name in variants:
+        print_stats(name, latencies[name], recalls[name])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Micro-benchmark for search snippet highlighting.
+
+Highlights one search page (20 results x ~4KB chunks, the /search default)
+and compares:
+  - per-term: one regex compiled and scanned per query term per result
+    (the previous SearchHighlighter._find_matches)
+  - compiled: SearchHighlighter with one cached alternation pattern per query
+    and a single pass per result
+
+No database or API access is required:
+    python scripts/benchmark_highlighter.py --iterations 200
+"""
+
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from typing import Callable, List, Tuple
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.search.highlighter import SearchHighlighter, compile_query
+
+VOCABULARY = (
+    "tenant landlord lease leases leased premises base rent rents rental annual "
+    "escalation operating expenses common area maintenance property properties "
+    "square feet term renewal option security deposit assignment sublease "
+    "insurance indemnification default notice payment monthly installment"
+).split()
+
+QUERIES = [
+    "base rent escalation",
+    "renewal option term",
+    "security deposit",
+    "operating expenses common area maintenance",
+    "tenant insurance indemnification",
+]
+
+_LEGACY_STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "he", "in",
+    "is", "it", "its", "of", "on", "that", "the", "to", "was", "will", "with",
+}
+
+
+def make_chunks(count: int, chunk_bytes: int, seed: int) -> List[str]:
+    """Generate lease-like chunks of roughly chunk_bytes characters."""
+    rng = random.Random(seed)
+    chunks = []
+    for _ in range(count):
+        words: List[str] = []
+        length = 0
+        while length < chunk_bytes:
+            word = rng.choice(VOCABULARY) if rng.random() < 0.3 else "the"
+            words.append(word)
+            length += len(word) + 1
+        chunks.append(" ".join(words))
+    return chunks
+
+
+def legacy_find_matches(content: str, query: str) -> List[Tuple[int, int, str]]:
+    """Previous matcher: rebuild stop words, compile and scan once per term."""
+    terms = [
+        term
+        for term in re.findall(r"\b\w+\b", query.lower())
+        if term not in set(_LEGACY_STOP_WORDS) and len(term) >= 2
+    ]
+    matches = []
+    for term in terms:
+        pattern = re.compile(r"\b" + re.escape(term) + r"\b", re.IGNORECASE)
+        for match in pattern.finditer(content):
+            matches.append((match.start(), match.end(), match.group()))
+    matches.sort(key=lambda x: x[0])
+    return matches
+
+
+def time_page(run: Callable[[str, str], object], chunks: List[str], query: str) -> float:
+    """Time one search page (all chunks for one query) in milliseconds."""
+    start_time = time.perf_counter()
+    for chunk in chunks:
+        run(chunk, query)
+    return (time.perf_counter() - start_time) * 1000
+
+
+def print_stats(label: str, latencies: List[float]) -> None:
+    """Print latency summary for one variant."""
+    print(f"\n{label}")
+    print(f"  p50:       {statistics.median(latencies):.3f}ms per page")
+    print(f"  p95:       {statistics.quantiles(latencies, n=20)[-1]:.3f}ms per page")
+    print(f"  Mean:      {statistics.mean(latencies):.3f}ms per page")
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=20, help="Results per search page")
+    parser.add_argument("--chunk-bytes", type=int, default=4096, help="Approximate chunk size")
+    parser.add_argument("--iterations", type=int, default=200, help="Pages per variant")
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.results, args.chunk_bytes, seed=42)
+    highlighter = SearchHighlighter()
+
+    print("=" * 60)
+    print(f"Highlighter Benchmark ({args.results} results x {args.chunk_bytes} bytes)")
+    print("=" * 60)
+
+    variants = {
+        "per-term (find matches)": legacy_find_matches,
+        "compiled (find matches)": lambda content, query: compile_query(query).find_matches(content),
+        "compiled (full highlight)": highlighter.highlight,
+    }
+    for label, run in variants.items():
+        # Warm caches (compiled patterns, stems) as a steady-state server would
+        for query in QUERIES:
+            time_page(run, chunks, query)
+        latencies = [
+            time_page(run, chunks, QUERIES[i % len(QUERIES)])
+            for i in range(args.iterations)
+        ]
+        print_stats(label, latencies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Offline benchmark for the columnar rent analytics engine.
+
+Builds a synthetic portfolio of --leases rent_facts rows (tenants with
+several leases, --properties properties, some leases without square
+footage) and times:
+  - columns:    RentColumns.from_facts (dict rows to NumPy arrays)
+  - aggregates: property and tenant group-bys, top-N shares, HHI, rent per SF
+                distribution and percentiles over the columns
+  - dashboard:  EffectiveRentService.get_dashboard on a loaded snapshot
+                (analytics plus the Pydantic response models)
+
+The columns plus aggregates target is 100ms for 50k leases. No database or
+API access is required:
+    python scripts/benchmark_rent_analytics.py --leases 50000 --runs 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List
+from unittest.mock import patch
+from uuid import uuid4
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.services.effective_rent import EffectiveRentService, PortfolioSnapshot
+from src.services.rent_analytics import (
+    RentColumns,
+    herfindahl_index,
+    percentiles,
+    portfolio_shares,
+    property_totals,
+    rent_per_sf_annual,
+    tenant_totals,
+    top_n_share,
+)
+
+TARGET_MS = 100.0
+
+
+def make_facts(leases: int, properties: int, seed: int) -> List[Dict[str, Any]]:
+    """Synthetic rent_facts rows (log-normal rents, 1 in 5 leases without SF)."""
+    rng = np.random.default_rng(seed)
+    base_rent = np.round(rng.lognormal(mean=8.5, sigma=0.8, size=leases), 2)
+    cam = np.round(base_rent * rng.uniform(0.05, 0.2, size=leases), 2)
+    square_footage = np.where(rng.random(leases) < 0.2, 0.0, np.round(rng.uniform(500, 20000, size=leases)))
+    tenant = rng.integers(0, max(leases // 3, 1), size=leases)
+    building = rng.integers(0, properties, size=leases)
+    field_count = rng.integers(1, 4, size=leases)
+
+    return [
+        {
+            "extraction_id": str(uuid4()),
+            "document_id": str(uuid4()),
+            "document_name": f"Lease {row}.pdf",
+            "document_type": "lease",
+            "extracted_at": None,
+            "tenant_name": f"Tenant {tenant[row]}",
+            "property_name": f"Property {building[row]}" if building[row] else None,
+            "property_address": None,
+            "base_rent": float(base_rent[row]),
+            "cam_charges": float(cam[row]),
+            "tax_reimbursement": 0.0,
+            "insurance_reimbursement": 0.0,
+            "parking_fee": 0.0,
+            "storage_rent": 0.0,
+            "effective_monthly_rent": float(base_rent[row] + cam[row]),
+            "square_footage": float(square_footage[row]) or None,
+            "confidence": 0.9,
+            "field_confidence_sum": float(field_count[row]) * 0.9,
+            "field_confidence_count": int(field_count[row]),
+        }
+        for row in range(leases)
+    ]
+
+
+def aggregates(columns: RentColumns) -> Dict[str, Any]:
+    """Every vectorized aggregate the analytics report."""
+    _, per_sf = rent_per_sf_annual(columns)
+    return {
+        "properties": property_totals(columns),
+        "tenants": tenant_totals(columns),
+        "shares": portfolio_shares(columns),
+        "top_shares": [top_n_share(columns, n) for n in (1, 5, 10)],
+        "hhi": herfindahl_index(columns),
+        "rent_percentiles": percentiles(columns.effective_monthly_rent),
+        "rent_per_sf_percentiles": percentiles(per_sf),
+    }
+
+
+def time_runs(runs: int, func: Callable[[], Any]) -> List[float]:
+    """Latencies of `runs` calls in milliseconds (after one warm-up call)."""
+    func()
+    latencies: List[float] = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - start_time) * 1000)
+    return latencies
+
+
+def print_stats(label: str, latencies: List[float]) -> None:
+    """Print latency summary for one stage."""
+    print(f"\n{label}")
+    print(f"  p50:       {statistics.median(latencies):.2f}ms")
+    print(f"  Max:       {max(latencies):.2f}ms")
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leases", type=int, default=50000, help="Leases in the synthetic portfolio")
+    parser.add_argument("--properties", type=int, default=500, help="Properties in the synthetic portfolio")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per stage")
+    parser.add_argument("--skip-dashboard", action="store_true", help="Only time the columnar engine")
+    args = parser.parse_args()
+
+    facts = make_facts(args.leases, args.properties, seed=42)
+
+    print("=" * 60)
+    print(f"Rent Analytics Benchmark ({args.leases} leases, {args.properties} properties)")
+    print("=" * 60)
+
+    build = time_runs(args.runs, lambda: RentColumns.from_facts(facts))
+    columns = RentColumns.from_facts(facts)
+    compute = time_runs(args.runs, lambda: aggregates(columns))
+    print_stats("columns (RentColumns.from_facts)", build)
+    print_stats("aggregates (group-bys, shares, HHI, percentiles)", compute)
+
+    total = statistics.median(build) + statistics.median(compute)
+    verdict = "within" if total < TARGET_MS else "over"
+    print(f"\ncolumns + aggregates p50: {total:.2f}ms ({verdict} the {TARGET_MS:.0f}ms target)")
+
+    if args.skip_dashboard:
+        return
+
+    # Tenants built once (no database); each run gets a fresh snapshot, so the
+    # columns are rebuilt like in a request
+    service = EffectiveRentService(supabase_client=None)  # type: ignore[arg-type]
+    tenants = sorted(
+        (service._tenant_rent(fact) for fact in facts),
+        key=lambda t: t.effective_monthly_rent,
+        reverse=True,
+    )
+    by_id = {fact["extraction_id"]: fact for fact in facts}
+
+    async def load_snapshot() -> PortfolioSnapshot:
+        return PortfolioSnapshot(tenants=tenants, facts=by_id)
+
+    async def time_dashboard() -> List[float]:
+        latencies: List[float] = []
+        for _ in range(args.runs):
+            start_time = time.perf_counter()
+            await service.get_dashboard()
+            latencies.append((time.perf_counter() - start_time) * 1000)
+        return latencies
+
+    with patch.object(service, "load_snapshot", load_snapshot):
+        dashboard = asyncio.run(time_dashboard())
+    print_stats("dashboard (analytics + response models)", dashboard)
+
+
+if __name__ == "__main__":
+    main()
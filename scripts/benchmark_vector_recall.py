@@ -0,0 +1,152 @@
+"""
+Benchmark vector search recall@k against exact search.
+
+For each ef_search value, compares match_document_chunks results with exact
+(brute-force) results from the same function (exact => true), for:
+  - unfiltered searches over the whole tenant
+  - searches filtered to one document (iterative scans, or the exact path
+    when the document has at most --exact-max-chunks chunks)
+
+Reports recall@k, fill rate (rows returned / k) and latency. Query vectors are
+sampled from the tenant's stored chunk embeddings, so no OpenAI calls are made.
+
+Requires supabase/migrations/057_vector_search_tuning.sql and a user JWT:
+    TEST_AUTH_TOKEN=<token> python scripts/benchmark_vector_recall.py --queries 50 --k 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.auth.client import create_user_client
+from supabase import Client
+
+DEFAULT_EF_SEARCH_VALUES = "40,80,160,320"
+
+
+def sample_queries(supabase: Client, num_queries: int) -> List[Tuple[List[float], str]]:
+    """Sample stored chunk embeddings (and their document ids) as queries."""
+    result = (
+        supabase.table("document_chunks")
+        .select("embedding, document_id")
+        .not_.is_("embedding", "null")
+        .limit(num_queries)
+        .execute()
+    )
+    queries: List[Tuple[List[float], str]] = []
+    for row in result.data or []:
+        value = row["embedding"]
+        # PostgREST returns pgvector values as "[0.1,0.2,...]" strings
+        embedding = json.loads(value) if isinstance(value, str) else list(value)
+        queries.append((embedding, row["document_id"]))
+    return queries
+
+
+def run_query(supabase: Client, params: Dict[str, Any]) -> Tuple[List[str], float]:
+    """Run one match_document_chunks call and return (chunk ids, latency ms)."""
+    start_time = time.perf_counter()
+    result = supabase.rpc("match_document_chunks", params).execute()
+    latency_ms = (time.perf_counter() - start_time) * 1000
+    return [row["id"] for row in result.data or []], latency_ms
+
+
+def recall(expected: List[str], actual: List[str]) -> float:
+    """Fraction of expected ids present in actual."""
+    if not expected:
+        return 1.0
+    return len(set(expected).intersection(actual)) / len(expected)
+
+
+def print_stats(label: str, latencies: List[float], recalls: List[float], fill: List[float]) -> None:
+    """Print recall, fill rate and latency summary for one variant."""
+    print(f"\n{label}")
+    print(f"  Recall@k:  {statistics.mean(recalls):.4f} (min {min(recalls):.4f})")
+    print(f"  Fill rate: {statistics.mean(fill):.4f}")
+    print(f"  p50:       {statistics.median(latencies):.2f}ms")
+    if len(latencies) >= 20:
+        print(f"  p95:       {statistics.quantiles(latencies, n=20)[-1]:.2f}ms")
+    print(f"  Max:       {max(latencies):.2f}ms")
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=50, help="Number of sampled query vectors")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument(
+        "--ef-search",
+        default=DEFAULT_EF_SEARCH_VALUES,
+        help="Comma-separated hnsw.ef_search values",
+    )
+    parser.add_argument(
+        "--exact-max-chunks",
+        type=int,
+        default=1000,
+        help="Filtered searches over at most this many chunks run exact (0 forces the index)",
+    )
+    args = parser.parse_args()
+
+    token = os.getenv("TEST_AUTH_TOKEN")
+    if not token:
+        print("ERROR: TEST_AUTH_TOKEN environment variable is required (user JWT for tenant scoping)")
+        sys.exit(1)
+
+    supabase = create_user_client(token)
+    queries = sample_queries(supabase, args.queries)
+    if not queries:
+        print("ERROR: No chunk embeddings found for this tenant")
+        sys.exit(1)
+
+    ef_values = [int(value) for value in args.ef_search.split(",") if value.strip()]
+
+    print("=" * 60)
+    print(f"Vector Recall Benchmark ({len(queries)} queries, k={args.k})")
+    print("=" * 60)
+
+    for scope in ("unfiltered", "filtered"):
+        # Ground truth per query
+        expected: List[List[str]] = []
+        for embedding, document_id in queries:
+            doc_filter: Optional[List[str]] = [document_id] if scope == "filtered" else None
+            ids, _ = run_query(
+                supabase,
+                {
+                    "query_embedding": embedding,
+                    "match_count": args.k,
+                    "filter_document_ids": doc_filter,
+                    "exact": True,
+                },
+            )
+            expected.append(ids)
+
+        for ef_search in ef_values:
+            latencies: List[float] = []
+            recalls: List[float] = []
+            fill: List[float] = []
+            for (embedding, document_id), exact_ids in zip(queries, expected):
+                doc_filter = [document_id] if scope == "filtered" else None
+                ids, latency_ms = run_query(
+                    supabase,
+                    {
+                        "query_embedding": embedding,
+                        "match_count": args.k,
+                        "filter_document_ids": doc_filter,
+                        "ef_search": ef_search,
+                        "exact_max_chunks": args.exact_max_chunks,
+                    },
+                )
+                latencies.append(latency_ms)
+                recalls.append(recall(exact_ids, ids))
+                fill.append(len(ids) / len(exact_ids) if exact_ids else 1.0)
+            print_stats(f"{scope}, ef_search={ef_search}", latencies, recalls, fill)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Offline benchmark for the local vector stores.
+
+Builds a synthetic tenant segment (clustered vectors, documents of
+--chunks-per-document chunks) in a temporary directory and compares:
+  - numpy: exact brute force over the memory-mapped float16 matrix
+  - hnsw:  HNSWVectorStore per ef_search value (requires hnswlib)
+
+for unfiltered searches and searches filtered to one document. Recall@k is
+measured against exact float32 search. No database or API access is required:
+    python scripts/benchmark_vector_store.py --chunks 50000 --queries 200
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from uuid import UUID, uuid4
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.search.local_vector_store import (
+    HNSWLIB_AVAILABLE,
+    HNSWVectorStore,
+    NumpyVectorStore,
+    TenantVectorCache,
+    normalize_rows,
+    write_tenant_segment,
+)
+from src.search.vector_store import VectorStore
+
+
+def make_corpus(chunks: int, dimension: int, per_document: int, seed: int) -> np.ndarray:
+    """Clustered unit vectors (one cluster per document, like real chunks)."""
+    rng = np.random.default_rng(seed)
+    documents = max(chunks // per_document, 1)
+    centers = rng.standard_normal((documents, dimension)).astype(np.float32)
+    assignment = np.arange(chunks) // per_document % documents
+    noise = rng.standard_normal((chunks, dimension)).astype(np.float32) * 0.6
+    return normalize_rows(centers[assignment] + noise)
+
+
+def recall(expected: List[int], actual: List[int]) -> float:
+    """Fraction of expected rows present in actual."""
+    if not expected:
+        return 1.0
+    return len(set(expected).intersection(actual)) / len(expected)
+
+
+def print_stats(label: str, latencies: List[float], recalls: List[float]) -> None:
+    """Print latency and recall summary for one variant."""
+    print(f"\n{label}")
+    print(f"  Recall@k:  {statistics.mean(recalls):.4f} (min {min(recalls):.4f})")
+    print(f"  p50:       {statistics.median(latencies):.2f}ms")
+    if len(latencies) >= 20:
+        print(f"  p95:       {statistics.quantiles(latencies, n=20)[-1]:.2f}ms")
+    print(f"  Max:       {max(latencies):.2f}ms")
+
+
+async def run_variant(
+    label: str,
+    store: VectorStore,
+    tenant_id: UUID,
+    queries: np.ndarray,
+    truth: List[List[int]],
+    row_of: Dict[UUID, int],
+    k: int,
+    filters: Optional[List[List[UUID]]],
+) -> None:
+    """Time one store over all queries and report recall against truth."""
+    # Load the segment (and build the graph) outside the timed loop
+    await store.search(tenant_id, queries[0].tolist(), k)
+
+    latencies: List[float] = []
+    recalls: List[float] = []
+    for i, query in enumerate(queries):
+        document_filter = filters[i] if filters else None
+        start_time = time.perf_counter()
+        matches = await store.search(tenant_id, query.tolist(), k, document_filter)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        recalls.append(recall(truth[i], [row_of[match.chunk_id] for match in matches]))
+    print_stats(label, latencies, recalls)
+
+
+async def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=50000, help="Chunks in the synthetic tenant")
+    parser.add_argument("--dimension", type=int, default=1536, help="Embedding dimensions")
+    parser.add_argument("--chunks-per-document", type=int, default=40, help="Chunks per document")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument("--ef-search", default="40,100,200", help="Comma-separated HNSW ef_search values")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.chunks, args.dimension, args.chunks_per_document, seed=42)
+    rng = np.random.default_rng(7)
+    query_rows = rng.choice(args.chunks, size=args.queries, replace=False)
+    queries = normalize_rows(corpus[query_rows] + rng.standard_normal((args.queries, args.dimension)).astype(np.float32) * 0.3)
+
+    tenant_id = uuid4()
+    chunk_ids = [uuid4() for _ in range(args.chunks)]
+    document_ids = [uuid4() for _ in range((args.chunks - 1) // args.chunks_per_document + 1)]
+    chunks = [
+        {"id": chunk_ids[row], "document_id": document_ids[row // args.chunks_per_document], "content": f"chunk {row}"}
+        for row in range(args.chunks)
+    ]
+    row_of = {chunk_id: row for row, chunk_id in enumerate(chunk_ids)}
+
+    # Exact float32 ground truth, unfiltered and filtered to the query's document
+    scores = queries @ corpus.T
+    truth = [list(np.argsort(-row_scores)[: args.k]) for row_scores in scores]
+    filters = [[document_ids[int(row) // args.chunks_per_document]] for row in query_rows]
+    filtered_truth = []
+    for i, row in enumerate(query_rows):
+        start = int(row) // args.chunks_per_document * args.chunks_per_document
+        rows = np.arange(start, min(start + args.chunks_per_document, args.chunks))
+        filtered_truth.append(list(rows[np.argsort(-scores[i, rows])[: args.k]]))
+
+    with tempfile.TemporaryDirectory() as root:
+        write_tenant_segment(Path(root), tenant_id, chunks, corpus)
+        size_mb = args.chunks * args.dimension * 2 / (1024 * 1024)
+
+        print("=" * 60)
+        print(f"Vector Store Benchmark ({args.chunks} chunks x {args.dimension} dims, {size_mb:.0f}MB float16)")
+        print("=" * 60)
+
+        stores: Dict[str, VectorStore] = {"numpy": NumpyVectorStore(Path(root), TenantVectorCache())}
+        if HNSWLIB_AVAILABLE:
+            for ef_search in (int(value) for value in args.ef_search.split(",") if value.strip()):
+                stores[f"hnsw ef_search={ef_search}"] = HNSWVectorStore(
+                    Path(root), TenantVectorCache(), ef_search=ef_search
+                )
+        else:
+            print("\nhnswlib not installed; skipping HNSW variants (pip install hnswlib)")
+
+        for label, store in stores.items():
+            await run_variant(f"{label} (unfiltered)", store, tenant_id, queries, truth, row_of, args.k, None)
+            await run_variant(
+                f"{label} (one document)", store, tenant_id, queries, filtered_truth, row_of, args.k, filters
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
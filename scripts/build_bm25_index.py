@@ -0,0 +1,113 @@
+"""
+Build or update a tenant's BM25 keyword index segment.
+
+Without --document-id, rebuilds <root>/<tenant_id>/bm25.seg from all of the
+tenant's chunks. With --document-id (repeatable), re-indexes only those
+documents in the existing segment: current chunks replace the indexed
+version, and documents with no chunks left (deleted or superseded) are
+removed. The segment is stamped with the tenant's corpus version and only
+served until the tenant's next chunk write, so --document-id must list every
+document changed since the segment was built (otherwise rebuild). Running API
+processes reload the new segment on next use.
+
+Requires SUPABASE_URL and SUPABASE_SERVICE_KEY:
+    python scripts/build_bm25_index.py --tenant-id <uuid> --root data/keyword_segments
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from supabase import Client
+
+from src.auth.client import create_service_client
+from src.search.bm25 import BM25Index, BM25KeywordStore
+from src.search.result_cache import read_corpus_version
+
+PAGE_SIZE = 1000
+
+
+def fetch_chunks(
+    supabase: Client,
+    tenant_id: UUID,
+    document_ids: Optional[List[UUID]] = None,
+) -> List[Dict[str, Any]]:
+    """Page through the tenant's chunks (optionally for some documents)."""
+    rows: List[Dict[str, Any]] = []
+    start = 0
+    while True:
+        query = (
+            supabase.table("document_chunks")
+            .select("id, document_id, content, page_numbers, chunk_index")
+            .eq("tenant_id", str(tenant_id))
+        )
+        if document_ids:
+            query = query.in_("document_id", [str(doc_id) for doc_id in document_ids])
+        result = query.order("id").range(start, start + PAGE_SIZE - 1).execute()
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+def group_by_document(rows: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group chunk rows by document, in chunk order."""
+    documents: Dict[str, List[Dict[str, Any]]] = {}
+    for row in sorted(rows, key=lambda r: (r["document_id"], r.get("chunk_index") or 0)):
+        documents.setdefault(row["document_id"], []).append(row)
+    return documents
+
+
+def main() -> None:
+    """Build or update one tenant's segment."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenant-id", type=UUID, required=True, help="Tenant to index")
+    parser.add_argument("--root", default="data/keyword_segments", help="Keyword store root directory")
+    parser.add_argument(
+        "--document-id", type=UUID, action="append", help="Re-index only this document (repeatable)"
+    )
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    store = BM25KeywordStore(args.root)
+    supabase = create_service_client()
+    # Read before the chunks: a write during the build leaves the segment stale
+    corpus_version = read_corpus_version(supabase, args.tenant_id)
+    documents = group_by_document(fetch_chunks(supabase, args.tenant_id, args.document_id))
+
+    if args.document_id:
+        index = store.index(args.tenant_id)
+        for document_id in args.document_id:
+            chunks = documents.get(str(document_id))
+            if chunks:
+                count = index.add_document(document_id, chunks)
+                print(f"Indexed {count} chunks for document {document_id}")
+            else:
+                removed = index.delete_document(document_id)
+                print(f"Removed {removed} chunks for document {document_id}")
+    else:
+        if not documents:
+            print(f"ERROR: No chunks found for tenant {args.tenant_id}")
+            sys.exit(1)
+        index = BM25Index()
+        for document_id, chunks in documents.items():
+            index.add_document(UUID(document_id), chunks)
+
+    path = store.segment_path(args.tenant_id)
+    index.corpus_version = corpus_version
+    index.save(path)
+
+    elapsed = time.perf_counter() - start_time
+    size_kb = path.stat().st_size / 1024
+    print(f"Wrote {len(index)} chunks to {path} ({size_kb:.0f}KB) in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
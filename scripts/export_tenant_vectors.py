@@ -0,0 +1,87 @@
+"""
+Export a tenant's chunk embeddings to a local vector store segment.
+
+Writes <root>/<tenant_id>/ in the format read by NumpyVectorStore and
+HNSWVectorStore (src/search/local_vector_store.py), stamped with the tenant's
+corpus version. The segment is only served until the tenant's next chunk
+write; re-run after ingestion to refresh it (running API processes reload it
+on next use).
+
+Requires SUPABASE_URL and SUPABASE_SERVICE_KEY:
+    python scripts/export_tenant_vectors.py --tenant-id <uuid> --root data/vector_segments
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List
+from uuid import UUID
+
+import numpy as np
+from supabase import Client
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.auth.client import create_service_client
+from src.search.local_vector_store import write_tenant_segment
+from src.search.result_cache import read_corpus_version
+
+PAGE_SIZE = 1000
+
+
+def fetch_chunks(supabase: Client, tenant_id: UUID) -> List[Dict[str, Any]]:
+    """Page through the tenant's embedded chunks."""
+    rows: List[Dict[str, Any]] = []
+    start = 0
+    while True:
+        result = (
+            supabase.table("document_chunks")
+            .select("id, document_id, content, page_numbers, section_header, token_count, embedding")
+            .eq("tenant_id", str(tenant_id))
+            .not_.is_("embedding", "null")
+            .order("id")
+            .range(start, start + PAGE_SIZE - 1)
+            .execute()
+        )
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+def main() -> None:
+    """Export one tenant."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenant-id", type=UUID, required=True, help="Tenant to export")
+    parser.add_argument("--root", default="data/vector_segments", help="Vector store root directory")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    supabase = create_service_client()
+    # Read before the chunks: a write during the export leaves the segment stale
+    corpus_version = read_corpus_version(supabase, args.tenant_id)
+    rows = fetch_chunks(supabase, args.tenant_id)
+    if not rows:
+        print(f"ERROR: No embedded chunks found for tenant {args.tenant_id}")
+        sys.exit(1)
+
+    # PostgREST returns pgvector values as "[0.1,0.2,...]" strings
+    embeddings = np.array(
+        [json.loads(row["embedding"]) if isinstance(row["embedding"], str) else row["embedding"] for row in rows],
+        dtype=np.float32,
+    )
+    path = write_tenant_segment(args.root, args.tenant_id, rows, embeddings, corpus_version)
+
+    elapsed = time.perf_counter() - start_time
+    print(
+        f"Exported {len(rows)} chunks ({embeddings.shape[1]} dims, corpus version {corpus_version}) "
+        f"to {path} in {elapsed:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
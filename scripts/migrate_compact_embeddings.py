@@ -0,0 +1,115 @@
+"""
+Migration tooling for the compact (768-dim halfvec) vector index.
+
+Steps:
+  1. Apply supabase/migrations/053_compact_embeddings.sql
+  2. python scripts/migrate_compact_embeddings.py check
+       Verifies match_document_chunks_compact exists and estimates index sizes
+  3. TEST_AUTH_TOKEN=<token> python scripts/benchmark_compact_embeddings.py
+       Confirms recall/latency is acceptable with re-scoring
+  4. Switch callers to HybridSearchService(vector_index="compact")
+  5. python scripts/migrate_compact_embeddings.py drop-full-index
+       Drops the float32 HNSW index (idx_chunks_embedding) to reclaim memory
+
+Requires SUPABASE_URL and SUPABASE_SERVICE_KEY.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.auth.client import create_service_client
+from src.search.embeddings import COMPACT_EMBEDDING_DIMENSIONS, FULL_EMBEDDING_DIMENSIONS
+from supabase import Client
+
+# Approximate HNSW per-row overhead: m=16 -> up to 2*m neighbour ids on layer 0
+HNSW_GRAPH_BYTES_PER_ROW = 2 * 16 * 8
+
+DROP_FULL_INDEX_SQL = "DROP INDEX CONCURRENTLY IF EXISTS public.idx_chunks_embedding;"
+
+
+def count_embedded_chunks(supabase: Client) -> int:
+    """Count chunks that have an embedding (service role, all tenants)."""
+    result = (
+        supabase.table("document_chunks")
+        .select("id", count="exact")
+        .not_.is_("embedding", "null")
+        .limit(1)
+        .execute()
+    )
+    return result.count or 0
+
+
+def check(supabase: Client) -> bool:
+    """Verify the compact search function exists and report index size estimates."""
+    print("Checking match_document_chunks_compact...")
+    try:
+        supabase.rpc(
+            "match_document_chunks_compact",
+            {
+                "query_embedding": [1.0] + [0.0] * (FULL_EMBEDDING_DIMENSIONS - 1),
+                "match_count": 1,
+                "filter_document_ids": None,
+                "rescore_count": 0,
+            },
+        ).execute()
+        print("  [OK] Function available")
+    except Exception as e:
+        print(f"  [ERROR] Function not available: {e}")
+        print("  [INFO] Apply supabase/migrations/053_compact_embeddings.sql first")
+        return False
+
+    rows = count_embedded_chunks(supabase)
+    full_bytes = rows * (FULL_EMBEDDING_DIMENSIONS * 4 + HNSW_GRAPH_BYTES_PER_ROW)
+    compact_bytes = rows * (COMPACT_EMBEDDING_DIMENSIONS * 2 + HNSW_GRAPH_BYTES_PER_ROW)
+
+    print(f"\nEmbedded chunks: {rows:,}")
+    print(f"  Full index (vector({FULL_EMBEDDING_DIMENSIONS}))     ~{full_bytes / 1024 ** 2:,.1f} MB")
+    print(f"  Compact index (halfvec({COMPACT_EMBEDDING_DIMENSIONS})) ~{compact_bytes / 1024 ** 2:,.1f} MB")
+    return True
+
+
+def drop_full_index(supabase: Client, execute: bool) -> bool:
+    """Drop the full-precision HNSW index once all callers use the compact path."""
+    print("WARNING: match_document_chunks (rag.Retriever and HybridSearchService with")
+    print("vector_index='full') falls back to sequential scans without this index.")
+    print(f"\nSQL:\n  {DROP_FULL_INDEX_SQL}")
+
+    if not execute:
+        print("\n[DRY RUN] Re-run with --execute, or run the SQL in the Supabase SQL Editor.")
+        print("DROP INDEX CONCURRENTLY cannot run inside a transaction block.")
+        return True
+
+    try:
+        supabase.rpc("exec_sql", {"sql": DROP_FULL_INDEX_SQL}).execute()
+        print("\n[OK] Full-precision index dropped")
+        return True
+    except Exception as e:
+        print(f"\n[ERROR] Failed to execute SQL: {e}")
+        print("[INFO] Run the SQL manually in Supabase Dashboard → SQL Editor")
+        return False
+
+
+def main() -> None:
+    """Parse arguments and run the requested step."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("check", help="Verify migration and estimate index sizes")
+    drop_parser = subparsers.add_parser("drop-full-index", help="Drop the float32 HNSW index")
+    drop_parser.add_argument("--execute", action="store_true", help="Execute instead of printing SQL")
+    args = parser.parse_args()
+
+    supabase = create_service_client()
+    if args.command == "check":
+        success = check(supabase)
+    else:
+        success = drop_full_index(supabase, args.execute)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
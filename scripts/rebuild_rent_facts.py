@@ -0,0 +1,51 @@
+"""
+Rebuild the rent_facts projection used by the effective rent analytics.
+
+Triggers keep rent_facts current as extractions are saved and fields are
+overridden (supabase/migrations/062_rent_facts.sql). Rebuild after changing
+the projection rules, or to repair facts after bulk data fixes. Without
+--tenant-id every tenant is rebuilt.
+
+Requires SUPABASE_URL and SUPABASE_SERVICE_KEY:
+    python scripts/rebuild_rent_facts.py --tenant-id <uuid>
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Optional
+from uuid import UUID
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.auth.client import create_service_client
+
+
+def rebuild(tenant_id: Optional[UUID]) -> int:
+    """Recompute the rent facts of one tenant (or all); returns the fact count."""
+    supabase = create_service_client()
+    result = supabase.rpc(
+        "rebuild_rent_facts",
+        {"target_tenant_id": str(tenant_id) if tenant_id else None},
+    ).execute()
+    return int(result.data or 0)
+
+
+def main() -> None:
+    """Rebuild rent facts."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenant-id", type=UUID, help="Rebuild only this tenant")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    count = rebuild(args.tenant_id)
+    elapsed = time.perf_counter() - start_time
+
+    scope = f"tenant {args.tenant_id}" if args.tenant_id else "all tenants"
+    print(f"Rebuilt {count} rent facts for {scope} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,27 @@ Handles question answering with mandatory citations.
 """
 
 import inspect
+import json
 import logging
-from typing import Any, Callable, cast
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Union, cast
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from supabase import Client
 
 from src.auth.models import AuthContext
 from src.auth.decorators import require_permission
-from src.dependencies import get_current_user, get_supabase_client
-from src.search.embeddings import EmbeddingService
-from src.rag.pipeline import RAGPipeline
-from src.rag.generator import Generator
+from src.dependencies import get_current_user, get_services, get_supabase_client
+from src.search.bm25 import get_tenant_keyword_store
+from src.search.local_vector_store import get_tenant_vector_store
+from src.rag.answer_cache import get_answer_cache
+from src.rag.pipeline import AskStreamEvent, RAGPipeline
 from src.rag.models import AskRequest, AskResponse
+from src.services.service_container import ServiceContainer
+from src.services.field_query import (
+    FieldQueryService,
+    build_field_answer,
+    parse_field_question,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +62,46 @@ def _supabase_dependency(request: Request) -> Client:
     return get_supabase_client(request)
 
 
+async def _answer_from_fields(
+    supabase: Client,
+    auth: AuthContext,
+    ask_request: AskRequest,
+    request_id: str,
+) -> Optional[AskResponse]:
+    """
+    Answer a list-style question from extracted fields (None to use RAG).
+
+    A question that parses as a field query is answered from the fields even
+    when nothing matches. Map-reduce requests always use RAG.
+    """
+    if ask_request.mode == "map_reduce":
+        return None
+    field_query = parse_field_question(ask_request.question)
+    if field_query is None:
+        return None
+
+    field_query.document_ids = ask_request.document_ids
+    try:
+        field_result = await FieldQueryService(supabase, auth.tenant_id).query(field_query)
+    except Exception as e:
+        logger.warning(
+            "Field query failed, using RAG pipeline",
+            extra={"request_id": request_id, "tenant_id": str(auth.tenant_id), "error": str(e)},
+        )
+        return None
+
+    logger.info(
+        "Question answered from extracted fields",
+        extra={
+            "request_id": request_id,
+            "tenant_id": str(auth.tenant_id),
+            "filter_count": len(field_query.filters),
+            "total_count": field_result.total_count,
+        },
+    )
+    return build_field_answer(field_query, field_result)
+
+
 @router.post(
     "/ask",
     response_model=AskResponse,
@@ -66,10 +115,17 @@ def _supabase_dependency(request: Request) -> Client:
     - Tenant isolation enforced via RLS
     - Only searches documents within your tenant
 
+    Structured questions:
+    - List-style questions on dates, rent thresholds or building type
+      ("Which leases expire before 2027?") are answered from extracted fields
+      without retrieval or the LLM (chunks_used is 0), including when nothing
+      matches; mode "map_reduce" always uses the RAG pipeline
+
     RAG Pipeline:
     1. Embeds your question
-    2. Retrieves top-20 relevant chunks
-    3. Re-ranks to top-max_chunks most relevant (default 5, range 1-20)
+    2. Retrieves 20 candidate chunks (vector and keyword search, fused)
+    3. Re-ranks them with the cross-encoder (when installed) and keeps the
+       max_chunks most relevant, skipping near-duplicates (default 5, range 1-20)
     4. Builds context for LLM
     5. Generates answer with citations
     6. Validates all citations
@@ -82,6 +138,33 @@ def _supabase_dependency(request: Request) -> Client:
     Filters:
     - Optionally filter to specific documents via document_ids
     - Control number of chunks used via max_chunks (1-20)
+
+    Answer cache:
+    - Answers are cached per tenant; a later question with a near-identical
+      embedding (same numbers, same document_ids and max_chunks) gets the cached
+      answer and citations (`cached: true`) until the tenant's documents change
+    - Set `bypass_cache: true` to always generate a fresh answer (it replaces
+      the cached one)
+
+    Streaming:
+    - With `stream: true` the response is server-sent events (text/event-stream):
+      `token` ({"text"}) as the LLM produces it, `citation`
+      ({"document_id", "page", "valid"}) as each citation completes, and a
+      final `done` event with the AskResponse (or `error` with {"detail"})
+    - The `done` answer is authoritative: if a citation is invalid, generation
+      stops and `done` carries the no-information response instead
+
+    Map-reduce mode (`mode: "map_reduce"`), for portfolio-wide questions
+    ("which leases have a co-tenancy clause?"):
+    - Retrieves the max_chunks best chunks of each of the max_documents
+      (default 10, up to 50) best-matching documents, answers each document
+      separately (a few at a time), then combines the cited answers
+    - LLM calls stay within token_budget and cost_budget_usd (defaults 60,000
+      tokens and $0.05); documents that do not fit are skipped, and the
+      response's `usage` reports tokens, estimated cost and skipped documents
+    - When streaming, a `document` event ({"document_id", "document_name",
+      "answer", "relevant"}) is sent as each document is answered, before `done`
+    - Answers are not cached in this mode
     """,
 )
 async def ask_question(
@@ -89,7 +172,8 @@ async def ask_question(
     ask_request: AskRequest,
     auth: AuthContext = Depends(_permission_dependency("documents:read")),
     supabase: Client = Depends(_supabase_dependency),
-) -> AskResponse:
+    services: ServiceContainer = Depends(get_services),
+) -> Union[AskResponse, StreamingResponse]:
     """
     Answer question about documents with citations.
 
@@ -98,9 +182,11 @@ async def ask_question(
         ask_request: Question request with filters
         auth: Authenticated user context
         supabase: Supabase client with user JWT
+        services: Shared application services (OpenAI clients, reranker)
 
     Returns:
         AskResponse with answer and citations
+        (StreamingResponse with server-sent events if stream is set)
 
     Raises:
         HTTPException 400: Invalid request
@@ -121,14 +207,35 @@ async def ask_question(
             "question_length": len(ask_request.question),
             "document_filter": bool(ask_request.document_ids),
             "max_chunks": ask_request.max_chunks,
+            "mode": ask_request.mode,
         },
     )
 
     try:
-        # Initialize RAG pipeline components
-        embedding_service = EmbeddingService()
-        generator = Generator()
-        pipeline = RAGPipeline(supabase, embedding_service, generator)
+        field_answer = await _answer_from_fields(supabase, auth, ask_request, request_id)
+        if field_answer is not None:
+            if ask_request.stream:
+                return _event_stream(_single_event("done", field_answer.model_dump(mode="json")))
+            return field_answer
+
+        # Per-request pipeline over the shared OpenAI clients and reranker
+        pipeline = RAGPipeline(
+            supabase,
+            services.embedding_service,
+            services.generator,
+            vector_store=await get_tenant_vector_store(auth.tenant_id),
+            tenant_id=auth.tenant_id,
+            answer_cache=get_answer_cache(),
+            search_mode="hybrid",
+            keyword_store=await get_tenant_keyword_store(auth.tenant_id),
+            fuzzy_keyword=True,
+            reranker=services.reranker,
+        )
+
+        if ask_request.stream:
+            return _event_stream(
+                _stream_answer(pipeline.ask_stream(ask_request), request_id, tenant_id)
+            )
 
         # Process question
         response = await pipeline.ask(ask_request)
@@ -172,3 +279,66 @@ async def ask_question(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to process question",
         )
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Serialize one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def _event_stream(events: AsyncIterator[str]) -> StreamingResponse:
+    """Wrap serialized events in an unbuffered text/event-stream response."""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _single_event(event: str, data: Dict[str, Any]) -> AsyncIterator[str]:
+    yield _sse_event(event, data)
+
+
+async def _stream_answer(
+    events: AsyncIterator[AskStreamEvent],
+    request_id: str,
+    tenant_id: str,
+) -> AsyncIterator[str]:
+    """
+    Forward pipeline events as server-sent events.
+
+    Failures after the response has started cannot change the status code, so
+    they are reported as a final "error" event.
+
+    Args:
+        events: RAGPipeline.ask_stream() events
+        request_id: Request ID for logging
+        tenant_id: Tenant ID for logging
+
+    Yields:
+        Serialized server-sent events
+    """
+    try:
+        async for event, data in events:
+            if event == "done":
+                logger.info(
+                    "Question answered (streamed)",
+                    extra={
+                        "request_id": request_id,
+                        "tenant_id": tenant_id,
+                        "chunks_used": data.get("chunks_used"),
+                        "citations_count": len(data.get("citations", [])),
+                        "confidence": data.get("confidence"),
+                    },
+                )
+            yield _sse_event(event, data)
+    except Exception as e:
+        logger.error(
+            "Failed to stream answer",
+            extra={
+                "request_id": request_id,
+                "tenant_id": tenant_id,
+                "error": str(e),
+            },
+        )
+        yield _sse_event("error", {"detail": "Failed to process question"})
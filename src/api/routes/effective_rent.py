@@ -15,6 +15,7 @@ from src.auth.decorators import require_permission
 from src.dependencies import get_current_user, get_supabase_client
 from src.services.effective_rent import EffectiveRentService
 from src.db.models.effective_rent import (
+    EffectiveRentDashboard,
     EffectiveRentListResponse,
     EffectiveRentSummary,
     TenantEffectiveRent,
@@ -118,7 +119,7 @@ async def list_effective_rents(
     )
 
     try:
-        service = EffectiveRentService(supabase)
+        service = EffectiveRentService(supabase, auth.tenant_id)
         result = await service.calculate_all_effective_rents(
             limit=limit,
             sort_desc=(sort == "desc"),
@@ -204,7 +205,7 @@ async def get_highest_effective_rent(
     )
 
     try:
-        service = EffectiveRentService(supabase)
+        service = EffectiveRentService(supabase, auth.tenant_id)
         result = await service.get_highest_effective_rent()
 
         if not result:
@@ -304,7 +305,7 @@ async def get_effective_rent_summary(
     )
 
     try:
-        service = EffectiveRentService(supabase)
+        service = EffectiveRentService(supabase, auth.tenant_id)
         summary = await service.get_summary()
 
         logger.info(
@@ -390,7 +391,7 @@ async def get_rent_by_property(
     )
 
     try:
-        service = EffectiveRentService(supabase)
+        service = EffectiveRentService(supabase, auth.tenant_id)
         result = await service.calculate_rent_by_property()
 
         logger.info(
@@ -477,7 +478,7 @@ async def get_rent_concentration(
     )
 
     try:
-        service = EffectiveRentService(supabase)
+        service = EffectiveRentService(supabase, auth.tenant_id)
         result = await service.calculate_rent_concentration(top_n=top_n)
 
         logger.info(
@@ -561,7 +562,7 @@ async def get_rent_per_sf(
     )
 
     try:
-        service = EffectiveRentService(supabase)
+        service = EffectiveRentService(supabase, auth.tenant_id)
         result = await service.calculate_rent_per_sf()
 
         logger.info(
@@ -648,7 +649,7 @@ async def get_portfolio_metrics(
     )
 
     try:
-        service = EffectiveRentService(supabase)
+        service = EffectiveRentService(supabase, auth.tenant_id)
         metrics = await service.calculate_portfolio_metrics()
 
         logger.info(
@@ -677,3 +678,94 @@ async def get_portfolio_metrics(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to calculate portfolio metrics",
         )
+
+
+@router.get(
+    "/effective-rent/dashboard",
+    response_model=EffectiveRentDashboard,
+    status_code=status.HTTP_200_OK,
+    summary="Get all effective rent analytics",
+    description="""
+    Get every portfolio rent analytic in one response.
+
+    Returns:
+    - Effective rent summary
+    - Portfolio health metrics
+    - Rent by property
+    - Rent concentration (top N tenants)
+    - Rent per square foot
+
+    The portfolio is loaded once and shared by all analytics, so a dashboard
+    costs one portfolio read instead of one per endpoint.
+
+    Security:
+    - Requires authentication and 'documents:read' permission
+    - Tenant isolation enforced via RLS
+    """,
+)
+async def get_effective_rent_dashboard(
+    request: Request,
+    top_n: int = Query(20, ge=1, le=100, description="Number of top tenants in the concentration analysis"),
+    auth: AuthContext = Depends(_permission_dependency("documents:read")),
+    supabase: Client = Depends(_supabase_dependency),
+) -> EffectiveRentDashboard:
+    """
+    Get all effective rent analytics from one portfolio snapshot.
+
+    Args:
+        request: FastAPI request object
+        top_n: Number of top tenants in the concentration analysis
+        auth: Authenticated user context
+        supabase: Supabase client with user JWT
+
+    Returns:
+        EffectiveRentDashboard with all portfolio analytics
+
+    Raises:
+        HTTPException 401: User not authenticated
+        HTTPException 403: Insufficient permissions
+        HTTPException 500: Server error
+    """
+    request_id = getattr(request.state, "request_id", "unknown")
+    tenant_id = str(auth.tenant_id)
+    user_id = str(auth.user_id)
+
+    logger.info(
+        "Getting effective rent dashboard",
+        extra={
+            "request_id": request_id,
+            "tenant_id": tenant_id,
+            "user_id": user_id,
+            "top_n": top_n,
+        },
+    )
+
+    try:
+        service = EffectiveRentService(supabase, auth.tenant_id)
+        dashboard = await service.get_dashboard(top_n=top_n)
+
+        logger.info(
+            "Retrieved effective rent dashboard",
+            extra={
+                "request_id": request_id,
+                "tenant_id": tenant_id,
+                "total_tenants": dashboard.portfolio_metrics.total_tenants,
+                "total_monthly": dashboard.portfolio_metrics.total_monthly_rent,
+            },
+        )
+
+        return dashboard
+
+    except Exception as e:
+        logger.error(
+            "Failed to get effective rent dashboard",
+            extra={
+                "request_id": request_id,
+                "tenant_id": tenant_id,
+                "error": str(e),
+            },
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to calculate effective rent dashboard",
+        )
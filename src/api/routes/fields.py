@@ -0,0 +1,134 @@
+"""
+Field Query Routes - Structured Extraction Queries
+
+Filters and sorts documents by typed extraction field values.
+"""
+
+import inspect
+import logging
+from typing import Any, Callable, cast
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from supabase import Client
+
+from src.auth.models import AuthContext
+from src.auth.decorators import require_permission
+from src.dependencies import get_current_user, get_supabase_client
+from src.services.field_query import FieldQueryService
+from src.db.models.field_query import FieldQueryRequest, FieldQueryResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/v1/fields",
+    tags=["fields"],
+)
+
+
+def _permission_dependency(permission: str) -> Callable[[Request], Any]:
+    async def dependency(request: Request) -> AuthContext:
+        checker: Any = require_permission(permission)
+        parameters = inspect.signature(checker).parameters
+        if parameters and all(
+            param.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD)
+            for param in parameters.values()
+        ):
+            result = checker()
+        elif len(parameters) >= 2:
+            auth = get_current_user(request)
+            result = checker(request, auth)
+        elif len(parameters) == 1:
+            result = checker(request)
+        else:
+            result = checker()
+        if inspect.isawaitable(result):
+            return cast(AuthContext, await result)
+        return cast(AuthContext, result)
+
+    return dependency
+
+
+def _supabase_dependency(request: Request) -> Client:
+    return get_supabase_client(request)
+
+
+@router.post(
+    "/query",
+    response_model=FieldQueryResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Query documents by extracted field values",
+    description="""
+    Filter, sort and project current extractions by typed field values.
+
+    Security:
+    - Requires authentication and 'documents:read' permission
+    - Tenant isolation enforced via RLS
+    - Only queries documents within your tenant
+
+    Filters (all must match):
+    - Operators: eq, ne, lt, lte, gt, gte, in, between
+    - Date fields compare as dates (YYYY-MM-DD), currency and numeric fields
+      as numbers, enum and text fields as text
+
+    Example: leases expiring in 2027 with base rent above $10,000, latest first
+    {"filters": [{"field": "lease_end_date", "op": "between", "values": ["2027-01-01", "2027-12-31"]},
+                 {"field": "base_rent", "op": "gt", "value": 10000}],
+     "sort": {"field": "lease_end_date", "descending": true}}
+    """,
+)
+async def query_fields(
+    request: Request,
+    query_request: FieldQueryRequest,
+    auth: AuthContext = Depends(_permission_dependency("documents:read")),
+    supabase: Client = Depends(_supabase_dependency),
+) -> FieldQueryResponse:
+    """
+    Query documents by extracted field values.
+
+    Args:
+        request: FastAPI request object
+        query_request: Filters, sort, projected fields and limit
+        auth: Authenticated user context
+        supabase: Supabase client with user JWT
+
+    Returns:
+        FieldQueryResponse with matching documents
+
+    Raises:
+        HTTPException 400: Unknown field or value of the wrong type
+        HTTPException 401: User not authenticated
+        HTTPException 403: Insufficient permissions
+        HTTPException 500: Server error
+    """
+    request_id = getattr(request.state, "request_id", "unknown")
+    tenant_id = str(auth.tenant_id)
+
+    try:
+        service = FieldQueryService(supabase, auth.tenant_id)
+        return await service.query(query_request)
+
+    except ValueError as e:
+        logger.warning(
+            "Invalid field query",
+            extra={
+                "request_id": request_id,
+                "tenant_id": tenant_id,
+                "error": str(e),
+            },
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error(
+            "Field query failed",
+            extra={
+                "request_id": request_id,
+                "tenant_id": tenant_id,
+                "error": str(e),
+            },
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to query fields",
+        )
@@ -5,20 +5,28 @@ Provides hybrid, semantic, and keyword search over document chunks.
 Combines vector and keyword search using Reciprocal Rank Fusion (RRF).
 """
 
+import asyncio
+import json
 import logging
-from typing import Annotated, Dict, List, Optional
+from typing import Annotated, Any, AsyncIterator, Dict, List, Optional, Union
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from supabase import Client
 
 from src.auth.models import AuthContext
-from src.dependencies import get_current_user, get_supabase_client
-from src.search.hybrid import HybridSearchService, SearchMode
-from src.search.embeddings import EmbeddingService
+from src.dependencies import get_current_user, get_services, get_supabase_client
+from src.exceptions import ValidationError
+from src.search.hybrid import BatchSearchResult, HybridSearchService, SearchMode, SearchResult
+from src.search.bm25 import get_tenant_keyword_store
 from src.search.highlighter import SearchHighlighter
-from src.search.reranker import SearchReranker
+from src.search.local_vector_store import get_tenant_vector_store
+from src.search.pagination import get_search_paginator
+from src.search.reranker import get_search_reranker
+from src.search.result_cache import get_search_result_cache
+from src.services.service_container import ServiceContainer
 
 logger = logging.getLogger(__name__)
 
@@ -56,7 +64,10 @@ class SearchRequest(BaseModel):
     )
     mode: SearchMode = Field(
         "hybrid",
-        description="Search mode: 'hybrid' (vector + keyword), 'semantic' (vector only), or 'keyword' (text only)",
+        description=(
+            "Search mode: 'hybrid' (vector + keyword), 'semantic' (vector only), "
+            "'keyword' (text only), or 'fuzzy' (prefix and typo-tolerant text)"
+        ),
     )
     filters: Optional[SearchFilters] = Field(
         None,
@@ -68,10 +79,23 @@ class SearchRequest(BaseModel):
         ge=1,
         le=100,
     )
+    fuzzy: bool = Field(
+        False,
+        description="Add prefix and typo-tolerant keyword matching to hybrid search",
+    )
     enable_reranking: bool = Field(
         False,
         description="Enable cross-encoder reranking for improved relevance (slower)",
     )
+    cursor: Optional[str] = Field(
+        None,
+        description="Cursor from a previous response's next_cursor to fetch the next page",
+        max_length=1000,
+    )
+    stream: bool = Field(
+        False,
+        description="Stream results as NDJSON (application/x-ndjson) as they are ready",
+    )
 
 
 class SearchResultItem(BaseModel):
@@ -92,6 +116,52 @@ class SearchResponse(BaseModel):
     results: List[SearchResultItem]
     total_count: int
     search_mode: str
+    next_cursor: Optional[str] = None
+
+
+class BatchSearchRequest(BaseModel):
+    """Batch search request: several queries with shared settings."""
+
+    queries: List[Annotated[str, Field(min_length=1, max_length=1000)]] = Field(
+        ...,
+        description="Search query texts (results are returned in the same order)",
+        min_length=1,
+        max_length=50,
+    )
+    mode: SearchMode = Field(
+        "hybrid",
+        description="Search mode for every query",
+    )
+    filters: Optional[SearchFilters] = Field(
+        None,
+        description="Optional filters applied to every query",
+    )
+    limit: int = Field(
+        10,
+        description="Maximum number of results per query",
+        ge=1,
+        le=50,
+    )
+    fuzzy: bool = Field(
+        False,
+        description="Add prefix and typo-tolerant keyword matching to hybrid search",
+    )
+
+
+class BatchSearchItem(BaseModel):
+    """Results for one query of a batch."""
+
+    query: str
+    results: List[SearchResultItem]
+    total_count: int
+    error: Optional[str] = None
+
+
+class BatchSearchResponse(BaseModel):
+    """Batch search response, one item per query in request order."""
+
+    results: List[BatchSearchItem]
+    search_mode: str
 
 
 @router.post(
@@ -116,10 +186,24 @@ class SearchResponse(BaseModel):
     - Hybrid search provides best results but is slower than single methods
     - Reranking improves relevance but adds latency (use for critical queries)
     - Results are limited to 100 per request for performance
+    - Repeated searches are served from a per-tenant cache until the tenant's chunks change
 
     **Highlighting:**
     - Query terms are wrapped in `<mark>` tags for UI rendering
     - Snippets are generated around matches for better context
+
+    **Pagination:**
+    - Pass `next_cursor` from a response as `cursor` (with the same query, mode,
+      filters, limit, fuzzy and enable_reranking) to get the next page;
+      `next_cursor` is null on the last page
+    - Pages are served from a snapshot of the ranking taken by the first page
+
+    **Streaming:**
+    - With `stream: true` the response is NDJSON, one object per line:
+      `{"type": "result", "result": {...}}` for each result in ranked order,
+      `{"type": "reranked", "results": [{"chunk_id", "score"}, ...]}` when
+      reranking finishes (new order), and a final
+      `{"type": "done", "total_count", "search_mode", "next_cursor"}`
     """,
 )
 async def search_documents(
@@ -127,28 +211,33 @@ async def search_documents(
     search_request: SearchRequest,
     auth: Annotated[AuthContext, Depends(get_current_user)],
     supabase: Annotated[Client, Depends(get_supabase_client)],
-) -> SearchResponse:
+    services: Annotated[ServiceContainer, Depends(get_services)],
+) -> Union[SearchResponse, StreamingResponse]:
     """
     Search document chunks using hybrid, semantic, or keyword search.
 
     This endpoint:
     1. Validates search request and user authentication
-    2. Executes search using specified mode (hybrid/semantic/keyword)
+    2. Executes search using specified mode (hybrid/semantic/keyword),
+       or serves the next page of a previous search from its cursor
     3. Optionally reranks results using cross-encoder
     4. Generates highlighted snippets around matches
     5. Enriches results with document metadata
-    6. Returns ranked results
+    6. Returns ranked results (as JSON or an NDJSON stream)
 
     Args:
         request: FastAPI request object
         search_request: Search parameters (query, mode, filters, limit)
         auth: Authenticated user context
         supabase: Supabase client with user JWT (for tenant isolation)
+        services: Shared application services (embedding client)
 
     Returns:
         SearchResponse with results, count, and metadata
+        (StreamingResponse with NDJSON lines if stream is set)
 
     Raises:
+        ValidationError: If the cursor is invalid or belongs to a different search
         Exception: If search fails or query is invalid, including errors from
             embedding, search, or database services.
     """
@@ -163,11 +252,15 @@ async def search_documents(
         },
     )
 
-    # Initialize services
-    embedding_service = EmbeddingService()
+    # Per-request search service over the shared embedding client
     hybrid_service = HybridSearchService(
         supabase_client=supabase,
-        embedding_service=embedding_service,
+        embedding_service=services.embedding_service,
+        tenant_id=auth.tenant_id,
+        result_cache=get_search_result_cache(),
+        vector_store=await get_tenant_vector_store(auth.tenant_id),
+        keyword_store=await get_tenant_keyword_store(auth.tenant_id),
+        fuzzy_keyword=search_request.fuzzy,
     )
     highlighter = SearchHighlighter()
 
@@ -179,19 +272,43 @@ async def search_documents(
     # TODO: Implement document_types and date_range filters
     # These require additional database queries to map types/dates to document IDs
 
-    # Execute search
-    results = await hybrid_service.search(
-        query=search_request.query,
-        mode=search_request.mode,
-        limit=search_request.limit,
-        filter_document_ids=filter_doc_ids,
-    )
+    # Execute search (first page) or continue from the cursor snapshot
+    try:
+        page = await get_search_paginator().search_page(
+            hybrid_service,
+            tenant_id=auth.tenant_id,
+            query=search_request.query,
+            mode=search_request.mode,
+            limit=search_request.limit,
+            filter_document_ids=filter_doc_ids,
+            cursor=search_request.cursor,
+            rerank=search_request.enable_reranking,
+        )
+    except ValueError as e:
+        field = "cursor" if search_request.cursor else "query"
+        raise ValidationError(str(e), details=[{"field": field, "issue": str(e)}]) from e
+    results = page.results
+
+    # Batch-fetch document metadata to avoid N+1 query pattern
+    documents_by_id = _fetch_document_names(supabase, results)
+
+    if search_request.stream:
+        return StreamingResponse(
+            _stream_results(
+                search_request,
+                results,
+                documents_by_id,
+                highlighter,
+                page.next_cursor,
+            ),
+            media_type="application/x-ndjson",
+        )
 
     # Optional: Rerank results using cross-encoder
     if search_request.enable_reranking:
-        reranker = SearchReranker()
+        reranker = get_search_reranker()
         if reranker.is_available():
-            results = reranker.rerank(search_request.query, results)
+            results = await reranker.rerank_async(search_request.query, results)
             logger.debug(
                 "Results reranked using cross-encoder",
                 extra={"results_count": len(results)},
@@ -200,45 +317,10 @@ async def search_documents(
             logger.warning("Reranking requested but cross-encoder unavailable")
 
     # Enrich results with document metadata and highlights
-    # Batch-fetch document metadata to avoid N+1 query pattern
-    enriched_results = []
-
-    # Collect unique document IDs from search results
-    document_ids = list({str(result.document_id) for result in results})
-
-    documents_by_id = {}
-    if document_ids:
-        doc_response = (
-            supabase.table("documents")
-            .select("id, original_filename")
-            .in_("id", document_ids)
-            .execute()
-        )
-        if doc_response.data:
-            documents_by_id = {
-                doc["id"]: doc.get("original_filename", "Unknown")
-                for doc in doc_response.data
-            }
-
-    for result in results:
-        # Resolve document name from pre-fetched metadata
-        document_name = documents_by_id.get(str(result.document_id), "Unknown")
-
-        # Generate highlights
-        highlights = highlighter.highlight(result.content, search_request.query)
-
-        # Build result item
-        enriched_results.append(
-            SearchResultItem(
-                chunk_id=str(result.chunk_id),
-                document_id=str(result.document_id),
-                document_name=document_name,
-                content=result.content,
-                page_numbers=result.page_numbers,
-                score=round(result.score, 4),
-                highlights=highlights if highlights else [result.content[:200] + "..."],
-            )
-        )
+    enriched_results = [
+        _build_result_item(result, documents_by_id, highlighter, search_request.query)
+        for result in results
+    ]
 
     logger.info(
         "Search completed successfully",
@@ -246,6 +328,7 @@ async def search_documents(
             "tenant_id": str(auth.tenant_id),
             "results_count": len(enriched_results),
             "mode": search_request.mode,
+            "paginated": search_request.cursor is not None,
         },
     )
 
@@ -253,4 +336,243 @@ async def search_documents(
         results=enriched_results,
         total_count=len(enriched_results),
         search_mode=search_request.mode,
+        next_cursor=page.next_cursor,
     )
+
+
+@router.post(
+    "/batch",
+    response_model=BatchSearchResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Search document chunks for several queries",
+    description="""
+    Run up to 50 searches in one request.
+
+    All query embeddings are generated in one embedding API call, and the
+    queries run concurrently under one deadline. Each item has the results for
+    one query, in request order; a query that failed or missed the deadline
+    has an empty result list and an `error` message.
+
+    Pagination, streaming and reranking are not available for batches.
+    """,
+)
+async def search_documents_batch(
+    batch_request: BatchSearchRequest,
+    auth: Annotated[AuthContext, Depends(get_current_user)],
+    supabase: Annotated[Client, Depends(get_supabase_client)],
+    services: Annotated[ServiceContainer, Depends(get_services)],
+) -> BatchSearchResponse:
+    """
+    Search document chunks for several queries at once.
+
+    Args:
+        batch_request: Queries and shared search parameters
+        auth: Authenticated user context
+        supabase: Supabase client with user JWT (for tenant isolation)
+        services: Shared application services (embedding client)
+
+    Returns:
+        BatchSearchResponse with per-query results
+    """
+    logger.info(
+        "Batch search request received",
+        extra={
+            "tenant_id": str(auth.tenant_id),
+            "user_id": str(auth.user_id),
+            "query_count": len(batch_request.queries),
+            "mode": batch_request.mode,
+            "limit": batch_request.limit,
+        },
+    )
+
+    hybrid_service = HybridSearchService(
+        supabase_client=supabase,
+        embedding_service=services.embedding_service,
+        tenant_id=auth.tenant_id,
+        result_cache=get_search_result_cache(),
+        vector_store=await get_tenant_vector_store(auth.tenant_id),
+        keyword_store=await get_tenant_keyword_store(auth.tenant_id),
+        fuzzy_keyword=batch_request.fuzzy,
+    )
+
+    filter_doc_ids = None
+    if batch_request.filters and batch_request.filters.document_ids:
+        filter_doc_ids = batch_request.filters.document_ids
+
+    try:
+        outcomes = await hybrid_service.search_many(
+            batch_request.queries,
+            mode=batch_request.mode,
+            limit=batch_request.limit,
+            filter_document_ids=filter_doc_ids,
+        )
+    except ValueError as e:
+        raise ValidationError(str(e), details=[{"field": "queries", "issue": str(e)}]) from e
+
+    # One document name lookup for the whole batch
+    documents_by_id = _fetch_document_names(
+        supabase, [result for outcome in outcomes for result in outcome.results]
+    )
+    highlighter = SearchHighlighter()
+
+    items = [_build_batch_item(outcome, documents_by_id, highlighter) for outcome in outcomes]
+
+    logger.info(
+        "Batch search completed successfully",
+        extra={
+            "tenant_id": str(auth.tenant_id),
+            "query_count": len(items),
+            "failed_count": sum(1 for item in items if item.error),
+            "mode": batch_request.mode,
+        },
+    )
+
+    return BatchSearchResponse(results=items, search_mode=batch_request.mode)
+
+
+def _build_batch_item(
+    outcome: BatchSearchResult,
+    documents_by_id: Dict[str, str],
+    highlighter: SearchHighlighter,
+) -> BatchSearchItem:
+    """Build the API item for one query of a batch."""
+    results = [
+        _build_result_item(result, documents_by_id, highlighter, outcome.query)
+        for result in outcome.results
+    ]
+    return BatchSearchItem(
+        query=outcome.query,
+        results=results,
+        total_count=len(results),
+        error=outcome.error,
+    )
+
+
+def _fetch_document_names(supabase: Client, results: List[SearchResult]) -> Dict[str, str]:
+    """
+    Batch-fetch original filenames for the documents in results.
+
+    Args:
+        supabase: Supabase client with user JWT
+        results: Search results
+
+    Returns:
+        Mapping of document ID to original filename
+    """
+    # Collect unique document IDs from search results
+    document_ids = list({str(result.document_id) for result in results})
+    if not document_ids:
+        return {}
+
+    doc_response = (
+        supabase.table("documents")
+        .select("id, original_filename")
+        .in_("id", document_ids)
+        .execute()
+    )
+    if not doc_response.data:
+        return {}
+
+    return {
+        doc["id"]: doc.get("original_filename", "Unknown")
+        for doc in doc_response.data
+    }
+
+
+def _build_result_item(
+    result: SearchResult,
+    documents_by_id: Dict[str, str],
+    highlighter: SearchHighlighter,
+    query: str,
+) -> SearchResultItem:
+    """
+    Build an API result item with document name and highlights.
+
+    Args:
+        result: Search result
+        documents_by_id: Pre-fetched document names
+        highlighter: Highlighter (patterns are compiled once per query)
+        query: Search query text
+
+    Returns:
+        SearchResultItem
+    """
+    # Resolve document name from pre-fetched metadata
+    document_name = documents_by_id.get(str(result.document_id), "Unknown")
+
+    # Generate highlights
+    highlights = highlighter.highlight(result.content, query)
+
+    return SearchResultItem(
+        chunk_id=str(result.chunk_id),
+        document_id=str(result.document_id),
+        document_name=document_name,
+        content=result.content,
+        page_numbers=result.page_numbers,
+        score=round(result.score, 4),
+        highlights=highlights if highlights else [result.content[:200] + "..."],
+    )
+
+
+def _ndjson_line(payload: Dict[str, Any]) -> str:
+    """Serialize one NDJSON line."""
+    return json.dumps(payload, separators=(",", ":")) + "\n"
+
+
+async def _stream_results(
+    search_request: SearchRequest,
+    results: List[SearchResult],
+    documents_by_id: Dict[str, str],
+    highlighter: SearchHighlighter,
+    next_cursor: Optional[str],
+) -> AsyncIterator[str]:
+    """
+    Stream results as NDJSON while reranking runs in the background.
+
+    Results are emitted in fused order as soon as each is highlighted. If
+    reranking was requested, a "reranked" line with the new order and scores
+    follows once scoring finishes.
+
+    Args:
+        search_request: Original search request
+        results: Page of search results in fused order
+        documents_by_id: Pre-fetched document names
+        highlighter: Highlighter for snippets
+        next_cursor: Cursor for the next page
+
+    Yields:
+        NDJSON lines
+    """
+    rerank_task: Optional["asyncio.Task[List[SearchResult]]"] = None
+    if search_request.enable_reranking:
+        reranker = get_search_reranker()
+        if reranker.is_available():
+            rerank_task = asyncio.create_task(reranker.rerank_async(search_request.query, results))
+        else:
+            logger.warning("Reranking requested but cross-encoder unavailable")
+
+    try:
+        for result in results:
+            item = _build_result_item(result, documents_by_id, highlighter, search_request.query)
+            yield _ndjson_line({"type": "result", "result": item.model_dump()})
+
+        if rerank_task is not None:
+            reranked = await rerank_task
+            yield _ndjson_line({
+                "type": "reranked",
+                "results": [
+                    {"chunk_id": str(result.chunk_id), "score": round(result.score, 4)}
+                    for result in reranked
+                ],
+            })
+    finally:
+        # Client disconnected mid-stream: stop scoring for this request
+        if rerank_task is not None and not rerank_task.done():
+            rerank_task.cancel()
+
+    yield _ndjson_line({
+        "type": "done",
+        "total_count": len(results),
+        "search_mode": search_request.mode,
+        "next_cursor": next_cursor,
+    })
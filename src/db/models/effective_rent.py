@@ -1,6 +1,6 @@
 """Pydantic models for effective rent calculations."""
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from uuid import UUID
 from datetime import datetime
 
@@ -110,6 +110,10 @@ class RentConcentrationResponse(BaseModel):
     top_10_concentration: float = Field(
         ..., ge=0.0, le=100.0, description="% of rent from top 10 tenants"
     )
+    herfindahl_index: float = Field(
+        0.0, ge=0.0, le=10000.0,
+        description="Herfindahl-Hirschman index of rent shares per tenant (0-10,000)",
+    )
     total_portfolio_monthly: float = Field(..., ge=0.0, description="Total portfolio monthly rent")
 
 
@@ -136,6 +140,9 @@ class RentPerSFResponse(BaseModel):
         ..., ge=0.0, description="Portfolio average annual rent per SF"
     )
     total_square_footage: float = Field(..., ge=0.0, description="Total portfolio square footage")
+    rent_per_sf_annual_percentiles: Dict[str, float] = Field(
+        default_factory=dict, description="Annual rent per SF percentiles (p10, p25, p50, p75, p90)"
+    )
 
 
 class PortfolioMetrics(BaseModel):
@@ -169,3 +176,12 @@ class PortfolioMetrics(BaseModel):
     average_extraction_confidence: float = Field(
         ..., ge=0.0, le=1.0, description="Average confidence of extractions"
     )
+
+
+class EffectiveRentDashboard(BaseModel):
+    """All portfolio rent analytics, computed from one portfolio snapshot."""
+    summary: EffectiveRentSummary = Field(..., description="Portfolio summary")
+    portfolio_metrics: PortfolioMetrics = Field(..., description="Portfolio health metrics")
+    rent_by_property: RentByPropertyResponse = Field(..., description="Rent grouped by property")
+    rent_concentration: RentConcentrationResponse = Field(..., description="Top tenant concentration")
+    rent_per_sf: RentPerSFResponse = Field(..., description="Rent per square foot")
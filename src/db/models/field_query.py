@@ -0,0 +1,69 @@
+"""Pydantic models for structured extraction field queries."""
+from datetime import date
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional, Union
+from uuid import UUID
+
+FieldOperator = Literal["eq", "ne", "lt", "lte", "gt", "gte", "in", "between"]
+FieldScalar = Union[float, str]
+
+
+class FieldFilter(BaseModel):
+    """Condition on one extracted field."""
+    field: str = Field(..., min_length=1, description="Field name (e.g. lease_end_date, base_rent)")
+    op: FieldOperator = Field(default="eq", description="Comparison operator")
+    value: Optional[FieldScalar] = Field(
+        default=None, description="Comparison value (dates as YYYY-MM-DD); unused for 'in' and 'between'"
+    )
+    values: Optional[List[FieldScalar]] = Field(
+        default=None, min_length=1, max_length=100,
+        description="Values for 'in', or [low, high] (inclusive) for 'between'",
+    )
+
+
+class FieldSort(BaseModel):
+    """Sort order on one extracted field."""
+    field: str = Field(..., min_length=1, description="Field name to sort by")
+    descending: bool = Field(default=False, description="Sort highest/latest first")
+
+
+class FieldQueryRequest(BaseModel):
+    """Filter, sort and project current extractions by typed field values."""
+    filters: List[FieldFilter] = Field(
+        default_factory=list, max_length=10, description="Conditions (all must match)"
+    )
+    sort: Optional[FieldSort] = Field(default=None, description="Optional sort order")
+    fields: List[str] = Field(
+        default_factory=list, max_length=50,
+        description="Extra fields to return (filter and sort fields are always returned)",
+    )
+    document_ids: Optional[List[UUID]] = Field(
+        default=None, description="Optional filter to specific documents"
+    )
+    limit: int = Field(default=50, ge=1, le=500, description="Maximum documents to return")
+
+
+class FieldQueryValue(BaseModel):
+    """Typed value of one field for one document."""
+    value_text: Optional[str] = Field(default=None, description="Value as text")
+    value_number: Optional[float] = Field(default=None, description="First number in the value")
+    value_date: Optional[date] = Field(default=None, description="Value as a date (ISO or MM/DD/YYYY)")
+    confidence: Optional[float] = Field(default=None, ge=0.0, le=1.0, description="Extraction confidence")
+    page_number: Optional[int] = Field(default=None, description="Source page number")
+    is_override: bool = Field(default=False, description="Whether the value was manually overridden")
+
+
+class FieldQueryRow(BaseModel):
+    """One matching document with its requested field values."""
+    document_id: UUID = Field(..., description="Source document UUID")
+    document_name: str = Field(..., description="Source document filename")
+    extraction_id: UUID = Field(..., description="Current extraction UUID")
+    fields: Dict[str, FieldQueryValue] = Field(
+        default_factory=dict, description="Field values keyed by field name"
+    )
+
+
+class FieldQueryResponse(BaseModel):
+    """Documents matching a structured field query."""
+    rows: List[FieldQueryRow] = Field(default_factory=list, description="Matching documents")
+    total_count: int = Field(..., ge=0, description="Matching documents before the limit")
@@ -2,12 +2,15 @@
 from __future__ import annotations
 
 from fastapi import Request, HTTPException, status, Depends
-from typing import Annotated, Callable, Union
+from typing import TYPE_CHECKING, Annotated, Callable, Union
 from src.auth.models import AuthContext
 from src.audit.logger import AuditLogger
 from src.features.service import FeatureFlagService
 from supabase import Client
 
+if TYPE_CHECKING:
+    from src.services.service_container import ServiceContainer
+
 
 def get_current_user(request: Request) -> AuthContext:
     """
@@ -120,6 +123,23 @@ def get_feature_flags(
     return FeatureFlagService(supabase, auth.tenant_id)
 
 
+def get_services() -> ServiceContainer:
+    """
+    Dependency to get the application's shared services.
+
+    The container owns long-lived OpenAI clients and models (see
+    src/services/service_container.py); build per-request objects such as
+    RAGPipeline from it instead of creating new clients per request.
+
+    Usage:
+        @app.post("/ask")
+        async def ask(services: ServiceContainer = Depends(get_services)):
+            generator = services.generator
+    """
+    from src.services.service_container import get_service_container
+    return get_service_container()
+
+
 def get_service_client() -> Client:
     """
     Get Supabase client with service_role key (bypasses RLS).
@@ -15,6 +15,7 @@ from pydantic import BaseModel, Field
 from src.extraction.cre_fields import get_field_config, get_field_definitions_for_prompt
 from src.extraction.prompts import build_extraction_prompt, build_document_type_detection_prompt
 from src.extraction.normalizers import normalize_field_value
+from src.rag.context_builder import fit_document_text
 from src.services.redaction import presidio_redact
 
 AsyncOpenAI: type[Any] | None
@@ -31,6 +32,10 @@ logger = logging.getLogger(__name__)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 DEFAULT_LLM_MODEL = "gpt-4o-mini"
 
+# Document text budget for the extraction prompt (gpt-4o-mini context is 128K
+# tokens; the rest is left for field definitions and the JSON response)
+DEFAULT_MAX_DOCUMENT_TOKENS = 100_000
+
 
 class ExtractedField(BaseModel):
     """Single extracted field with metadata."""
@@ -58,13 +63,21 @@ class FieldExtractor:
     - Confidence calculation
     """
     
-    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_LLM_MODEL):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = DEFAULT_LLM_MODEL,
+        max_document_tokens: int = DEFAULT_MAX_DOCUMENT_TOKENS,
+    ):
         """
         Initialize field extractor.
         
         Args:
             api_key: OpenAI API key (defaults to OPENAI_API_KEY env var)
             model: LLM model to use (default: gpt-4o-mini)
+            max_document_tokens: Token budget for document text in the
+                extraction prompt; longer documents keep the paragraphs that
+                mention the requested fields
         """
         if AsyncOpenAI is None:
             raise ImportError("openai package is required for extraction. Please install openai>=1.0.0.")
@@ -74,6 +87,11 @@ class FieldExtractor:
         
         self.client = AsyncOpenAI(api_key=api_key)
         self.model = model
+        self.max_document_tokens = max_document_tokens
+    
+    async def close(self) -> None:
+        """Close the OpenAI client and its connection pool."""
+        await self.client.close()
     
     async def detect_document_type(
         self,
@@ -153,6 +171,12 @@ class FieldExtractor:
         
         # SECURITY: Redact before sending to LLM
         redacted_text = presidio_redact(document_text)
+
+        # Fit the token budget, keeping paragraphs that mention the fields
+        keywords = list(field_defs) + [
+            alias for field_def in field_defs.values() for alias in field_def.aliases or []
+        ]
+        redacted_text = fit_document_text(redacted_text, self.max_document_tokens, keywords)
         
         # Build prompt
         prompt = build_extraction_prompt(
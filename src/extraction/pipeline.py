@@ -246,6 +246,7 @@ async def redact_pii(text: str, enabled: bool = True) -> str:
 async def extract_cre_fields(
     document_text: str,
     document_type: Optional[str] = None,
+    extractor: Optional[FieldExtractor] = None,
 ) -> ExtractionResult:
     """
     Extract CRE fields from document using LLM.
@@ -253,6 +254,7 @@ async def extract_cre_fields(
     Args:
         document_text: Document text (should be redacted)
         document_type: Optional document type hint
+        extractor: Shared field extractor (default: a new one for this call)
 
     Returns:
         ExtractionResult with extracted fields and confidence
@@ -261,7 +263,7 @@ async def extract_cre_fields(
         Exception: If extraction fails
     """
     try:
-        extractor = FieldExtractor()
+        extractor = extractor or FieldExtractor()
 
         # Detect document type if not provided
         if document_type is None:
@@ -479,6 +481,7 @@ async def _extract_and_persist(
     tenant_id: UUID,
     redacted_text: str,
     parser_used: str,
+    extractor: Optional[FieldExtractor] = None,
 ) -> tuple[UUID, float]:
     """
     Extract fields and persist to database.
@@ -489,6 +492,7 @@ async def _extract_and_persist(
         tenant_id: Tenant UUID
         redacted_text: Redacted document text
         parser_used: Parser name (ragflow, tika, etc.)
+        extractor: Shared field extractor (default: a new one for this call)
 
     Returns:
         Tuple of (extraction_id, overall_confidence)
@@ -496,7 +500,7 @@ async def _extract_and_persist(
     Raises:
         ExtractionPipelineError: If extraction or save fails
     """
-    extraction_result = await extract_cre_fields(redacted_text)
+    extraction_result = await extract_cre_fields(redacted_text, extractor=extractor)
 
     extraction_id = await save_extraction(
         supabase,
@@ -635,7 +639,11 @@ async def _finalize_failure(
     }
 
 
-async def process_document(document_id: UUID, supabase: Client) -> Dict[str, Any]:
+async def process_document(
+    document_id: UUID,
+    supabase: Client,
+    extractor: Optional[FieldExtractor] = None,
+) -> Dict[str, Any]:
     """
     Process a single document through the extraction pipeline.
 
@@ -653,6 +661,8 @@ async def process_document(document_id: UUID, supabase: Client) -> Dict[str, Any
     Args:
         document_id: Document UUID to process
         supabase: Supabase client (service role)
+        extractor: Shared field extractor (e.g. from the worker's service
+            container); default: a new one for this document
 
     Returns:
         Dictionary with processing results
@@ -683,6 +693,7 @@ async def process_document(document_id: UUID, supabase: Client) -> Dict[str, Any
             tenant_id,
             redacted_text,
             parser_used,
+            extractor,
         )
 
         # Step 8: Finalize success
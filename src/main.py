@@ -18,6 +18,7 @@ from src.api.routes import upload as upload_routes
 from src.api.routes import connectors as connector_routes
 from src.api.routes import ask as ask_routes
 from src.api.routes import effective_rent as effective_rent_routes
+from src.api.routes import fields as field_routes
 from src.api.routes.webhooks import email as webhook_email_routes
 from src.api.routes.connectors import oauth_callback_public
 from src.middleware.audit import AuditMiddleware
@@ -25,6 +26,7 @@ from src.middleware.request_id import RequestIDMiddleware
 from src.middleware.error_handler import ErrorHandlerMiddleware
 from src.exceptions import CARException
 from src.audit.logger import shutdown_all_audit_loggers
+from src.services.service_container import get_service_container, shutdown_service_container
 
 logger = logging.getLogger(__name__)
 
@@ -68,11 +70,12 @@ signal.signal(signal.SIGINT, _shutdown_handler)
 @app.on_event("startup")
 async def startup_event() -> None:
     """
-    Validate environment variables and pre-warm Presidio models on application startup.
+    Validate environment variables and pre-warm Presidio models and shared services on application startup.
     
     This ensures all required credentials are configured before accepting requests
-    and reduces latency on first redaction request by loading models during
-    application initialization rather than on first use.
+    and reduces latency on first redaction, search and ask requests by loading
+    models and opening OpenAI clients during application initialization rather
+    than on first use.
     """
     import logging
     from src.auth.config import get_auth_config
@@ -157,6 +160,16 @@ async def startup_event() -> None:
         # Don't fail startup - models will load on first use
         # This allows application to start even if Presidio has issues
 
+    # Step 3: Build shared OpenAI clients, tokenizer and cross-encoder reranker
+    try:
+        await get_service_container().warmup()
+    except Exception as e:
+        logger.error(
+            f"Failed to warm up shared services: {e}",
+            exc_info=True,
+        )
+        # Don't fail startup - services are built on first use
+
 
 @app.on_event("shutdown")
 async def shutdown_event() -> None:
@@ -164,7 +177,8 @@ async def shutdown_event() -> None:
     FastAPI shutdown event handler.
     
     Flushes all audit log buffers before application exit.
-    Ensures no audit events are lost during graceful shutdown.
+    Ensures no audit events are lost during graceful shutdown, then closes
+    the shared OpenAI clients and reranker.
     """
     logger.info("Application shutdown initiated, flushing audit logs")
     
@@ -177,6 +191,8 @@ async def shutdown_event() -> None:
             exc_info=True,
         )
 
+    await shutdown_service_container()
+
 
 # Register exception handlers for route handlers
 # (Middleware also catches exceptions, but handlers are more idiomatic for FastAPI)
@@ -254,6 +270,7 @@ app.include_router(upload_routes.router)
 app.include_router(connector_routes.router)
 app.include_router(ask_routes.router)
 app.include_router(effective_rent_routes.router)
+app.include_router(field_routes.router)
 app.include_router(webhook_email_routes.router)
 
 # Public OAuth callback route (outside router prefix)
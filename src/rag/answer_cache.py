@@ -0,0 +1,250 @@
+"""
+Semantic Answer Cache - Understanding Plane
+
+Per-tenant cache of /ask answers keyed by question embedding. A question hits
+when a cached question for the same tenant, corpus version, document filter
+and max_chunks has cosine similarity >= threshold and mentions the same
+numbers ("Suite 200" never reuses the answer for "Suite 300").
+
+The corpus version is the search result cache's per-tenant version
+(src/search/result_cache.py), which triggers on document_chunks bump on every
+chunk insert, update and delete, so answers are dropped as soon as the
+documents change. Without a readable version nothing is cached. The short TTL
+bounds staleness from changes outside the chunks (document names, prompts).
+
+SECURITY: Entries are partitioned by tenant_id, which must come from the
+authenticated request context, never from user input.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Hashable, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from cachetools import TTLCache
+
+from src.search.result_cache import SearchResultCache, get_search_result_cache
+from .models import AskResponse
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+CACHE_TTL_SECONDS = 600  # 10 minutes
+CACHE_MAX_BUCKETS = 1024
+MAX_ENTRIES_PER_BUCKET = 256
+
+BucketKey = Tuple[Hashable, ...]
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+def question_numbers(question: str) -> FrozenSet[str]:
+    """Numbers mentioned in a question (suite numbers, years, amounts)."""
+    return frozenset(_NUMBER.findall(question))
+
+
+@dataclass
+class _Entry:
+    question: str
+    numbers: FrozenSet[str]
+    response: AskResponse
+
+
+class _Bucket:
+    """Answers for one tenant, corpus version, document filter and max_chunks."""
+
+    def __init__(self) -> None:
+        self.entries: List[_Entry] = []
+        self.matrix: Optional[np.ndarray] = None  # unit-norm question embeddings, one row per entry
+
+    def add(self, embedding: np.ndarray, entry: _Entry) -> None:
+        row = embedding[np.newaxis, :]
+        self.matrix = row if self.matrix is None else np.vstack([self.matrix, row])
+        self.entries.append(entry)
+        if len(self.entries) > MAX_ENTRIES_PER_BUCKET:
+            # Drop the oldest
+            self.entries.pop(0)
+            self.matrix = self.matrix[1:]
+
+    def best(self, embedding: np.ndarray, numbers: FrozenSet[str]) -> Tuple[Optional[_Entry], float]:
+        if self.matrix is None or self.matrix.shape[1] != embedding.shape[0]:
+            return None, 0.0
+        similarities = self.matrix @ embedding
+        for row in np.argsort(-similarities):
+            if self.entries[row].numbers == numbers:
+                return self.entries[row], float(similarities[row])
+        return None, 0.0
+
+
+def _unit(embedding: List[float]) -> Optional[np.ndarray]:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    if vector.ndim != 1 or norm == 0.0:
+        return None
+    return vector / norm
+
+
+class SemanticAnswerCache:
+    """
+    Per-tenant answer cache matched by question similarity.
+
+    In-process only; entries expire after ttl and buckets are evicted least
+    recently used.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        maxsize: int = CACHE_MAX_BUCKETS,
+        ttl: float = CACHE_TTL_SECONDS,
+        version_source: Optional[SearchResultCache] = None,
+    ):
+        """
+        Initialize semantic answer cache.
+
+        Args:
+            threshold: Minimum cosine similarity between questions for a hit
+            maxsize: Maximum number of (tenant, version, filter) buckets
+            ttl: Time-to-live for each bucket in seconds
+            version_source: Corpus version source (default: shared search result cache)
+
+        Raises:
+            ValueError: If threshold is not in (0, 1]
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("Similarity threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.version_source = version_source or get_search_result_cache()
+        self._buckets: TTLCache[BucketKey, _Bucket] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _bucket_key(
+        tenant_id: UUID,
+        version: int,
+        document_ids: Optional[List[UUID]],
+        max_chunks: int,
+    ) -> BucketKey:
+        filters = tuple(sorted(str(doc_id) for doc_id in document_ids)) if document_ids else None
+        return (str(tenant_id), version, filters, max_chunks)
+
+    async def get_version(self, tenant_id: UUID) -> Optional[int]:
+        """
+        Get the tenant's corpus version.
+
+        Read it once per question and pass it to both get() and set(), so an
+        answer computed before a concurrent write is never stored under the
+        newer version.
+
+        Returns:
+            Corpus version, or None if unavailable (skip the cache)
+        """
+        return await self.version_source.get_version(tenant_id)
+
+    def get(
+        self,
+        tenant_id: UUID,
+        version: int,
+        question: str,
+        embedding: List[float],
+        document_ids: Optional[List[UUID]] = None,
+        max_chunks: int = 5,
+    ) -> Optional[AskResponse]:
+        """
+        Find a cached answer for a similar question.
+
+        Args:
+            tenant_id: Tenant identifier
+            version: Tenant corpus version
+            question: Question text
+            embedding: Question embedding
+            document_ids: Document filter of the request (order-insensitive)
+            max_chunks: max_chunks of the request
+
+        Returns:
+            Copy of the cached response, or None on miss
+        """
+        bucket = self._buckets.get(self._bucket_key(tenant_id, version, document_ids, max_chunks))
+        vector = _unit(embedding)
+        entry, similarity = (None, 0.0)
+        if bucket is not None and vector is not None:
+            entry, similarity = bucket.best(vector, question_numbers(question))
+
+        if entry is None or similarity < self.threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.info(
+            "Answer cache hit",
+            extra={"tenant_id": str(tenant_id), "similarity": round(similarity, 4)},
+        )
+        return entry.response.model_copy(update={"cached": True}, deep=True)
+
+    def set(
+        self,
+        tenant_id: UUID,
+        version: int,
+        question: str,
+        embedding: List[float],
+        response: AskResponse,
+        document_ids: Optional[List[UUID]] = None,
+        max_chunks: int = 5,
+    ) -> None:
+        """
+        Cache an answer under the corpus version it was computed against.
+
+        Args:
+            tenant_id: Tenant identifier
+            version: Tenant corpus version read before answering
+            question: Question text
+            embedding: Question embedding
+            response: Answer to cache
+            document_ids: Document filter of the request
+            max_chunks: max_chunks of the request
+        """
+        vector = _unit(embedding)
+        if vector is None:
+            return
+        key = self._bucket_key(tenant_id, version, document_ids, max_chunks)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket()
+            self._buckets[key] = bucket
+        bucket.add(vector, _Entry(question, question_numbers(question), response.model_copy(deep=True)))
+
+    def clear(self) -> None:
+        """Remove all cached answers and reset counters."""
+        self._buckets.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Mapping with bucket, hit and miss counts
+        """
+        return {"buckets": len(self._buckets), "hits": self.hits, "misses": self.misses}
+
+
+# Module-level shared cache used by the /ask route
+_shared_cache: Optional[SemanticAnswerCache] = None
+
+
+def get_answer_cache() -> SemanticAnswerCache:
+    """
+    Get the process-wide semantic answer cache.
+
+    Returns:
+        Shared SemanticAnswerCache instance
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = SemanticAnswerCache()
+    return _shared_cache
@@ -1,6 +1,6 @@
 """Citation validation for RAG answers."""
 import re
-from typing import List, Tuple
+from typing import List, Set, Tuple
 from uuid import UUID
 from .models import ChunkMatch, Citation
 
@@ -47,11 +47,7 @@ def validate_citations(answer: str, chunks: List[ChunkMatch]) -> bool:
         return any(phrase in answer_lower for phrase in NO_INFO_PHRASES)
 
     # Build set of valid (document_id, page) pairs from chunks
-    valid_refs = set()
-    for chunk in chunks:
-        doc_id_str = str(chunk.document_id)
-        for page in chunk.page_numbers:
-            valid_refs.add((doc_id_str, page))
+    valid_refs = valid_citation_refs(chunks)
 
     # Verify all citations reference valid chunks
     for doc_id, page in citations:
@@ -61,6 +57,61 @@ def validate_citations(answer: str, chunks: List[ChunkMatch]) -> bool:
     return True
 
 
+def valid_citation_refs(chunks: List[ChunkMatch]) -> Set[Tuple[str, int]]:
+    """
+    Build the set of (document_id, page) pairs that answers may cite.
+
+    Args:
+        chunks: Chunks used to generate the answer
+
+    Returns:
+        Set of citable (document_id, page) pairs
+    """
+    return {
+        (str(chunk.document_id), page)
+        for chunk in chunks
+        for page in chunk.page_numbers
+    }
+
+
+class StreamingCitationValidator:
+    """
+    Validate citations while an answer is being streamed.
+
+    Text deltas are appended with feed(); each citation is checked once it is
+    complete, even if its tokens arrive in separate deltas.
+    """
+
+    def __init__(self, chunks: List[ChunkMatch]):
+        """
+        Initialize validator.
+
+        Args:
+            chunks: Chunks used to generate the answer
+        """
+        self.valid_refs = valid_citation_refs(chunks)
+        self.answer = ""
+        self._scanned = 0
+
+    def feed(self, delta: str) -> List[Tuple[str, int, bool]]:
+        """
+        Append answer text and check citations completed by it.
+
+        Args:
+            delta: Next piece of answer text
+
+        Returns:
+            List of (document_id, page_number, is_valid) for new citations
+        """
+        self.answer += delta
+        completed = []
+        for match in CITATION_PATTERN.finditer(self.answer, self._scanned):
+            ref = (match.group(1), int(match.group(2)))
+            completed.append((ref[0], ref[1], ref in self.valid_refs))
+            self._scanned = match.end()
+        return completed
+
+
 def build_citations(answer: str, chunks: List[ChunkMatch], document_names: dict[UUID, str]) -> List[Citation]:
     """
     Build citation objects from answer text and chunks.
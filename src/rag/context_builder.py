@@ -1,10 +1,37 @@
 """Context builder for RAG pipeline with token limits."""
+import functools
+import re
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Optional
+
 import tiktoken
-from typing import List
+
 from .models import ChunkMatch
 
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Upper bound for "[DOC:<uuid>:PAGE:<n>]\n" (a UUID is ~20-25 tokens)
+CITATION_TAG_TOKENS = 32
 
-def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+# "\n---\n" between chunks
+SEPARATOR_TOKENS = 3
+
+
+@functools.lru_cache(maxsize=8)
+def get_encoding(model: str = DEFAULT_MODEL) -> tiktoken.Encoding:
+    """
+    Get the tokenizer for a model, loaded once per process.
+
+    Args:
+        model: Model name for encoding
+
+    Returns:
+        tiktoken Encoding
+    """
+    return tiktoken.encoding_for_model(model)
+
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
     """
     Count tokens in text using tiktoken.
 
@@ -15,36 +42,171 @@ def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
     Returns:
         Number of tokens
     """
-    encoding = tiktoken.encoding_for_model(model)
-    return len(encoding.encode(text))
+    return len(get_encoding(model).encode(text))
+
+
+@dataclass
+class ContextItem:
+    """
+    Candidate text for a token-budgeted prompt.
+
+    Attributes:
+        text: Text as it will appear in the prompt
+        score: Relevance (higher is better, >= 0)
+        tokens: Token count of text (counted with the cached encoder if None)
+        group: Key for per-group caps (e.g. document ID)
+    """
+
+    text: str
+    score: float
+    tokens: Optional[int] = None
+    group: Optional[Hashable] = None
+
+
+def pack_context(
+    items: List[ContextItem],
+    max_tokens: int,
+    max_per_group: Optional[int] = None,
+    separator_tokens: int = 0,
+    model: str = DEFAULT_MODEL,
+) -> List[int]:
+    """
+    Choose the items that fit a token budget, maximising total relevance.
+
+    Greedy 0/1 knapsack: items are taken by relevance per token, skipping
+    (not stopping at) items that no longer fit, with at most max_per_group
+    items per group. The single most relevant item that fits is used instead
+    if it alone beats the greedy pick (so one long, highly relevant chunk is
+    not crowded out by many short, weak ones).
 
+    Args:
+        items: Candidates
+        max_tokens: Token budget for the selected items and separators
+        max_per_group: Optional cap on items per group (None = no cap)
+        separator_tokens: Tokens added between consecutive items
+        model: Model name for counting items without a stored count
 
-def build_context(chunks: List[ChunkMatch], max_tokens: int = 6000) -> str:
+    Returns:
+        Indices of the selected items, in input order
+    """
+    costs = [
+        (item.tokens if item.tokens is not None else count_tokens(item.text, model)) + separator_tokens
+        for item in items
+    ]
+    budget = max_tokens + separator_tokens  # no separator before the first item
+
+    order = sorted(
+        range(len(items)),
+        key=lambda i: (-items[i].score / max(costs[i], 1), i),
+    )
+    selected: List[int] = []
+    used = 0
+    per_group: Dict[Hashable, int] = {}
+    for i in order:
+        group = items[i].group
+        if max_per_group is not None and group is not None and per_group.get(group, 0) >= max_per_group:
+            continue
+        if used + costs[i] > budget:
+            continue
+        selected.append(i)
+        used += costs[i]
+        if group is not None:
+            per_group[group] = per_group.get(group, 0) + 1
+
+    fitting = [i for i in range(len(items)) if costs[i] <= budget]
+    if fitting:
+        best = max(fitting, key=lambda i: (items[i].score, -i))
+        if items[best].score > sum(items[i].score for i in selected):
+            selected = [best]
+
+    return sorted(selected)
+
+
+def _chunk_text(chunk: ChunkMatch) -> str:
+    """Format chunk with citation tag."""
+    pages_str = str(chunk.page_numbers[0]) if chunk.page_numbers else "?"
+    return f"[DOC:{chunk.document_id}:PAGE:{pages_str}]\n{chunk.content}\n"
+
+
+def build_context(
+    chunks: List[ChunkMatch],
+    max_tokens: int = 6000,
+    max_chunks_per_document: Optional[int] = None,
+) -> str:
     """
     Build context string from chunks, respecting token limit.
 
+    Uses the token counts stored with each chunk (document_chunks.token_count)
+    and only tokenizes chunks without one. Chunks are chosen by relevance per
+    token (see pack_context) and kept in retrieval order.
+
     Args:
         chunks: Retrieved chunks sorted by relevance
         max_tokens: Maximum tokens allowed in context
+        max_chunks_per_document: Optional cap on chunks from one document
 
     Returns:
         Formatted context string with citations
     """
-    context_parts: List[str] = []
-    current_tokens = 0
+    items = [
+        ContextItem(
+            text=_chunk_text(chunk),
+            score=chunk.similarity,
+            tokens=None if chunk.token_count is None else chunk.token_count + CITATION_TAG_TOKENS,
+            group=chunk.document_id,
+        )
+        for chunk in chunks
+    ]
+    selected = pack_context(
+        items,
+        max_tokens,
+        max_per_group=max_chunks_per_document,
+        separator_tokens=SEPARATOR_TOKENS,
+    )
+    return "\n---\n".join(items[i].text for i in selected)
+
+
+def fit_document_text(
+    text: str,
+    max_tokens: int,
+    keywords: Iterable[str] = (),
+    model: str = DEFAULT_MODEL,
+) -> str:
+    """
+    Shorten document text to a token budget for a prompt.
 
-    for chunk in chunks:
-        # Format chunk with citation tag
-        pages_str = str(chunk.page_numbers[0]) if chunk.page_numbers else "?"
-        chunk_text = f"[DOC:{chunk.document_id}:PAGE:{pages_str}]\n{chunk.content}\n"
+    Text that fits is returned unchanged. Otherwise paragraphs are packed by
+    keyword hits per token (see pack_context) and kept in document order, so
+    the sections that mention the requested fields survive.
 
-        chunk_tokens = count_tokens(chunk_text)
+    Args:
+        text: Document text
+        max_tokens: Token budget for the text
+        keywords: Terms that make a paragraph relevant (e.g. field aliases)
+        model: Model name for encoding
 
-        # Stop if adding this chunk would exceed limit
-        if current_tokens + chunk_tokens > max_tokens:
-            break
+    Returns:
+        Text within the budget
+    """
+    # Every token is at least one character
+    if len(text) <= max_tokens:
+        return text
+    encoding = get_encoding(model)
+    if len(encoding.encode(text)) <= max_tokens:
+        return text
 
-        context_parts.append(chunk_text)
-        current_tokens += chunk_tokens
+    paragraphs = [paragraph for paragraph in re.split(r"\n\s*\n", text) if paragraph.strip()]
+    patterns = [
+        re.compile(r"\b" + re.escape(keyword.lower()) + r"\b")
+        for keyword in {keyword.replace("_", " ") for keyword in keywords}
+        if keyword
+    ]
+    items = []
+    for paragraph in paragraphs:
+        lowered = paragraph.lower()
+        hits = sum(1 for pattern in patterns if pattern.search(lowered))
+        # Paragraphs without hits still fill leftover budget
+        items.append(ContextItem(text=paragraph, score=hits + 0.1, tokens=len(encoding.encode(paragraph))))
 
-    return "\n---\n".join(context_parts)
+    selected = pack_context(items, max_tokens, separator_tokens=1)
+    return "\n\n".join(items[i].text for i in selected)
@@ -1,10 +1,12 @@
 """LLM generator for RAG pipeline with citation enforcement."""
 import logging
 import os
-from typing import Optional
+from dataclasses import dataclass
+from typing import AsyncGenerator, List, Optional
 from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletion, ChatCompletionMessageParam
 
-from .prompts import format_system_prompt, format_user_prompt
+from .prompts import SYSTEM_PROMPT, format_system_prompt, format_user_prompt
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +14,15 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 DEFAULT_MODEL = "gpt-4o-mini"
 
 
+@dataclass
+class GenerationResult:
+    """Generated answer with the tokens the call used."""
+
+    answer: str
+    prompt_tokens: int
+    completion_tokens: int
+
+
 class Generator:
     """
     LLM generator for answering questions with citations.
@@ -34,6 +45,10 @@ class Generator:
         self.client = AsyncOpenAI(api_key=api_key)
         self.model = model
 
+    async def close(self) -> None:
+        """Close the OpenAI client and its connection pool."""
+        await self.client.close()
+
     async def generate(self, question: str, context: str) -> str:
         """
         Generate answer from question and context.
@@ -48,9 +63,6 @@ class Generator:
         Raises:
             Exception: If LLM call fails
         """
-        system_prompt = format_system_prompt(context)
-        user_prompt = format_user_prompt(question)
-
         logger.info(
             "Generating answer with LLM",
             extra={
@@ -63,32 +75,11 @@ class Generator:
         try:
             response = await self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
+                messages=self._messages(question, context),
                 temperature=0.0,  # Deterministic for consistency
             )
 
-            # Validate that the response contains at least one choice with non-empty content
-            if not getattr(response, "choices", None):
-                logger.error(
-                    "LLM response contained no choices",
-                    extra={
-                        "model": self.model,
-                    },
-                )
-                raise RuntimeError("LLM response contained no choices.")
-
-            answer = response.choices[0].message.content
-            if answer is None:
-                logger.error(
-                    "LLM response choice had no content",
-                    extra={
-                        "model": self.model,
-                    },
-                )
-                raise RuntimeError("LLM response choice had no content.")
+            answer = self._answer_text(response)
 
             tokens_used = response.usage.total_tokens if response.usage else None
             logger.info(
@@ -99,8 +90,7 @@ class Generator:
                 },
             )
 
-            # Cast to str to satisfy mypy - we've already checked for None above
-            return str(answer)
+            return answer
 
         except Exception as e:
             logger.error(
@@ -111,3 +101,158 @@ class Generator:
                 },
             )
             raise
+
+    async def generate_with_usage(
+        self,
+        question: str,
+        context: str,
+        system_template: str = SYSTEM_PROMPT,
+        max_tokens: Optional[int] = None,
+    ) -> GenerationResult:
+        """
+        Generate an answer and report the tokens it used.
+
+        Args:
+            question: User question
+            context: Assembled context with citations
+            system_template: System prompt with a {context} placeholder
+            max_tokens: Optional cap on completion tokens
+
+        Returns:
+            GenerationResult with the answer and token usage
+
+        Raises:
+            Exception: If LLM call fails
+        """
+        try:
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=self._messages(question, context, system_template),
+                temperature=0.0,  # Deterministic for consistency
+                max_tokens=max_tokens,
+            )
+            answer = self._answer_text(response)
+        except Exception as e:
+            logger.error(
+                "Failed to generate answer",
+                extra={
+                    "error": str(e),
+                    "model": self.model,
+                },
+            )
+            raise
+
+        usage = response.usage
+        return GenerationResult(
+            answer=answer,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+        )
+
+    async def generate_stream(self, question: str, context: str) -> AsyncGenerator[str, None]:
+        """
+        Generate answer from question and context, yielding text as it arrives.
+
+        Closing the iterator early (e.g. after an invalid citation or a client
+        disconnect) closes the completion stream.
+
+        Args:
+            question: User question
+            context: Assembled context with citations
+
+        Yields:
+            Answer text deltas
+
+        Raises:
+            Exception: If LLM call fails
+        """
+        logger.info(
+            "Streaming answer with LLM",
+            extra={
+                "model": self.model,
+                "question_length": len(question),
+                "context_length": len(context),
+            },
+        )
+
+        answer_length = 0
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=self._messages(question, context),
+                temperature=0.0,  # Deterministic for consistency
+                stream=True,
+            )
+            try:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        answer_length += len(delta)
+                        yield delta
+            finally:
+                await stream.close()
+
+        except Exception as e:
+            logger.error(
+                "Failed to stream answer",
+                extra={
+                    "error": str(e),
+                    "model": self.model,
+                },
+            )
+            raise
+
+        logger.info(
+            "Streamed answer",
+            extra={
+                "answer_length": answer_length,
+            },
+        )
+
+    def _answer_text(self, response: ChatCompletion) -> str:
+        """
+        Get the answer text of a completion.
+
+        Raises:
+            RuntimeError: If the response has no choices or no content
+        """
+        # Validate that the response contains at least one choice with non-empty content
+        if not getattr(response, "choices", None):
+            logger.error(
+                "LLM response contained no choices",
+                extra={
+                    "model": self.model,
+                },
+            )
+            raise RuntimeError("LLM response contained no choices.")
+
+        answer = response.choices[0].message.content
+        if answer is None:
+            logger.error(
+                "LLM response choice had no content",
+                extra={
+                    "model": self.model,
+                },
+            )
+            raise RuntimeError("LLM response choice had no content.")
+
+        # Cast to str to satisfy mypy - we've already checked for None above
+        return str(answer)
+
+    @staticmethod
+    def _messages(
+        question: str,
+        context: str,
+        system_template: Optional[str] = None,
+    ) -> List[ChatCompletionMessageParam]:
+        """Build chat messages with the citation-enforcing system prompt."""
+        if system_template is None:
+            system = format_system_prompt(context)
+        else:
+            system = system_template.format(context=context)
+        return [
+            {"role": "system", "content": system},
+            {"role": "user", "content": format_user_prompt(question)},
+        ]
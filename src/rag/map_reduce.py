@@ -0,0 +1,200 @@
+"""
+Map-reduce helpers for portfolio-wide RAG questions.
+
+RAGPipeline's map_reduce mode answers each matching document separately
+(map), then combines the cited per-document answers (reduce). This module
+holds the per-request token and cost budget and the prompt formatting; the
+orchestration is in pipeline.py.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from .context_builder import CITATION_TAG_TOKENS
+from .models import ChunkMatch
+
+# Per-request defaults when the request sets no budget
+DEFAULT_TOKEN_BUDGET = 60_000
+DEFAULT_COST_BUDGET_USD = 0.05
+
+# Per-document generations in flight per request
+DEFAULT_MAP_CONCURRENCY = 4
+
+# Prompt and completion limits per call
+MAP_CONTEXT_TOKENS = 3000
+MAP_MAX_COMPLETION_TOKENS = 300
+REDUCE_MAX_COMPLETION_TOKENS = 800
+
+# System prompt template and question, on top of the context
+PROMPT_OVERHEAD_TOKENS = 250
+
+# USD per 1M (prompt, completion) tokens; unknown models use the highest price
+MODEL_PRICING_PER_MILLION: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """
+    Estimate the cost of an LLM call.
+
+    Args:
+        model: Model name
+        prompt_tokens: Prompt tokens
+        completion_tokens: Completion tokens
+
+    Returns:
+        Cost in USD
+    """
+    prompt_price, completion_price = MODEL_PRICING_PER_MILLION.get(
+        model, max(MODEL_PRICING_PER_MILLION.values())
+    )
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+def estimate_context_tokens(chunks: List[ChunkMatch], max_tokens: int) -> int:
+    """
+    Estimate the prompt tokens of a context without tokenizing it.
+
+    Uses stored token counts (about 4 characters per token without one).
+
+    Args:
+        chunks: Chunks in the context
+        max_tokens: Context token limit
+
+    Returns:
+        Estimated context tokens, at most max_tokens
+    """
+    total = sum(
+        (chunk.token_count if chunk.token_count is not None else len(chunk.content) // 4)
+        + CITATION_TAG_TOKENS
+        for chunk in chunks
+    )
+    return min(total, max_tokens)
+
+
+class RequestBudget:
+    """
+    Token and cost budget shared by the LLM calls of one request.
+
+    Calls reserve their worst case (estimated prompt plus maximum completion)
+    before they start and settle to the reported usage when they finish, so
+    concurrent calls never overshoot the budget.
+    """
+
+    def __init__(self, max_tokens: int, max_cost_usd: float, model: str):
+        """
+        Initialize request budget.
+
+        Args:
+            max_tokens: Maximum prompt plus completion tokens
+            max_cost_usd: Maximum cost in USD
+            model: Model name for pricing
+        """
+        self.max_tokens = max_tokens
+        self.max_cost_usd = max_cost_usd
+        self.model = model
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._reserved_tokens = 0
+        self._reserved_cost = 0.0
+
+    @property
+    def cost_usd(self) -> float:
+        """Cost of the settled calls."""
+        return estimate_cost(self.model, self.prompt_tokens, self.completion_tokens)
+
+    def reserve(self, prompt_tokens: int, completion_tokens: int) -> bool:
+        """
+        Reserve budget for a call.
+
+        Args:
+            prompt_tokens: Estimated prompt tokens
+            completion_tokens: Maximum completion tokens
+
+        Returns:
+            True if the call fits the remaining budget (and is reserved)
+        """
+        tokens = prompt_tokens + completion_tokens
+        cost = estimate_cost(self.model, prompt_tokens, completion_tokens)
+        used_tokens = self.prompt_tokens + self.completion_tokens + self._reserved_tokens
+        if used_tokens + tokens > self.max_tokens:
+            return False
+        if self.cost_usd + self._reserved_cost + cost > self.max_cost_usd:
+            return False
+        self._reserved_tokens += tokens
+        self._reserved_cost += cost
+        return True
+
+    def release(self, prompt_tokens: int, completion_tokens: int) -> None:
+        """Return a reservation (the call did not run)."""
+        self._reserved_tokens -= prompt_tokens + completion_tokens
+        self._reserved_cost -= estimate_cost(self.model, prompt_tokens, completion_tokens)
+
+    def settle(
+        self,
+        reserved: Tuple[int, int],
+        prompt_tokens: int,
+        completion_tokens: int,
+    ) -> None:
+        """
+        Replace a reservation with the call's reported usage.
+
+        Args:
+            reserved: (prompt, completion) tokens passed to reserve()
+            prompt_tokens: Reported prompt tokens
+            completion_tokens: Reported completion tokens
+        """
+        self.release(*reserved)
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+
+@dataclass
+class DocumentFinding:
+    """Cited answer from one document (map step output)."""
+
+    document_id: UUID
+    document_name: str
+    answer: str
+    chunks: List[ChunkMatch] = field(default_factory=list)
+
+
+def format_findings(findings: List[DocumentFinding]) -> str:
+    """
+    Format per-document answers as the reduce step's context.
+
+    Args:
+        findings: Per-document answers, best document first
+
+    Returns:
+        Findings text
+    """
+    return "\n\n".join(
+        f"Document: {finding.document_name}\n{finding.answer.strip()}" for finding in findings
+    )
+
+
+def combine_findings(findings: List[DocumentFinding]) -> str:
+    """
+    Combine per-document answers without an LLM call.
+
+    Used for a single finding, and when the reduce step is over budget or
+    fails; every citation of the findings is kept.
+
+    Args:
+        findings: Per-document answers, best document first
+
+    Returns:
+        Answer listing each document's findings
+    """
+    if len(findings) == 1:
+        return findings[0].answer.strip()
+    return "\n".join(f"- {finding.document_name}: {finding.answer.strip()}" for finding in findings)
+
+
+def chunks_of(findings: List[DocumentFinding]) -> List[ChunkMatch]:
+    """Chunks behind a list of findings, in finding order."""
+    return [chunk for finding in findings for chunk in finding.chunks]
+
@@ -1,8 +1,12 @@
 """Pydantic models for RAG pipeline."""
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Literal, Optional, List
 from uuid import UUID
 
+# "standard": answer from the top-ranked chunks; "map_reduce": answer each
+# document separately, then combine (portfolio-wide questions)
+AskMode = Literal["standard", "map_reduce"]
+
 
 class ChunkMatch(BaseModel):
     """Retrieved chunk with similarity score."""
@@ -12,6 +16,9 @@ class ChunkMatch(BaseModel):
     page_numbers: List[int] = Field(default_factory=list, description="Pages where chunk appears")
     similarity: float = Field(..., ge=0.0, le=1.0, description="Cosine similarity score")
     section_header: Optional[str] = Field(None, description="Section header if available")
+    token_count: Optional[int] = Field(
+        default=None, ge=0, description="Stored token count of content (document_chunks.token_count)"
+    )
 
 
 class Citation(BaseModel):
@@ -29,7 +36,36 @@ class AskRequest(BaseModel):
         None, description="Optional filter to specific documents"
     )
     max_chunks: int = Field(
-        default=5, ge=1, le=20, description="Maximum chunks to use in context"
+        default=5, ge=1, le=20, description="Maximum chunks to use in context (per document in map_reduce mode)"
+    )
+    stream: bool = Field(
+        default=False, description="Stream the answer as server-sent events (text/event-stream)"
+    )
+    bypass_cache: bool = Field(
+        default=False, description="Always generate a fresh answer (skip the semantic answer cache)"
+    )
+    mode: AskMode = Field(
+        default="standard", description="map_reduce answers each matching document, then combines the answers"
+    )
+    max_documents: int = Field(
+        default=10, ge=1, le=50, description="map_reduce: maximum documents to answer from"
+    )
+    token_budget: Optional[int] = Field(
+        default=None, ge=1000, le=500_000, description="map_reduce: maximum LLM tokens for the request"
+    )
+    cost_budget_usd: Optional[float] = Field(
+        default=None, gt=0.0, le=5.0, description="map_reduce: maximum LLM cost for the request in USD"
+    )
+
+
+class AskUsage(BaseModel):
+    """LLM usage of a map-reduce answer."""
+    prompt_tokens: int = Field(..., ge=0, description="Prompt tokens across all LLM calls")
+    completion_tokens: int = Field(..., ge=0, description="Completion tokens across all LLM calls")
+    cost_usd: float = Field(..., ge=0.0, description="Estimated LLM cost in USD")
+    documents_answered: int = Field(..., ge=0, description="Documents whose answer was used")
+    documents_skipped: int = Field(
+        ..., ge=0, description="Documents not answered because the token or cost budget ran out"
     )
 
 
@@ -46,3 +82,9 @@ class AskResponse(BaseModel):
     suggestion: Optional[str] = Field(
         None, description="Suggestion for improving query if no answer"
     )
+    cached: bool = Field(
+        default=False, description="Whether the answer was served from the semantic answer cache"
+    )
+    usage: Optional[AskUsage] = Field(
+        default=None, description="LLM usage (map_reduce mode only)"
+    )
@@ -1,31 +1,65 @@
 """RAG pipeline orchestration."""
+import asyncio
 import logging
-from typing import List, Dict
+from typing import Any, AsyncIterator, List, Dict, Optional, Tuple
 from uuid import UUID
 from supabase import Client
 
 from src.search.embeddings import EmbeddingService
-from .retriever import Retriever
+from src.search.keyword_store import KeywordStore
+from src.search.reranker import SearchReranker
+from src.search.vector_store import VectorStore
+from .answer_cache import SemanticAnswerCache
+from .retriever import DEFAULT_CANDIDATE_POOL, RetrievalMode, Retriever
 from .generator import Generator
 from .context_builder import build_context
-from .citations import validate_citations, build_citations
-from .models import AskRequest, AskResponse, ChunkMatch
+from .citations import (
+    StreamingCitationValidator,
+    build_citations,
+    extract_citations,
+    validate_citations,
+)
+from .map_reduce import (
+    DEFAULT_COST_BUDGET_USD,
+    DEFAULT_MAP_CONCURRENCY,
+    DEFAULT_TOKEN_BUDGET,
+    MAP_CONTEXT_TOKENS,
+    MAP_MAX_COMPLETION_TOKENS,
+    PROMPT_OVERHEAD_TOKENS,
+    REDUCE_MAX_COMPLETION_TOKENS,
+    DocumentFinding,
+    RequestBudget,
+    chunks_of,
+    combine_findings,
+    estimate_context_tokens,
+    format_findings,
+)
+from .models import AskRequest, AskResponse, AskUsage, ChunkMatch
+from .prompts import MAP_SYSTEM_PROMPT, NOT_RELEVANT, REDUCE_SYSTEM_PROMPT
 
 logger = logging.getLogger(__name__)
 
+# (event name, JSON-serialisable payload) emitted by RAGPipeline.ask_stream
+AskStreamEvent = Tuple[str, Dict[str, Any]]
+
 
 class RAGPipeline:
     """
     RAG pipeline for Q&A with mandatory citations.
 
     Pipeline flow:
+    0. Return a cached answer for a similar question, if any (answer_cache)
     1. Embed question
-    2. Retrieve candidate chunks (up to a fixed maximum, e.g. 20)
-    3. Re-rank and select top-N chunks based on request.max_chunks (configurable, typically 1–20)
+    2. Retrieve candidate chunks (candidate_pool, vector or hybrid search)
+    3. Re-rank (cross-encoder if available) and select top-N diverse chunks
+       based on request.max_chunks (configurable, typically 1–20)
     4. Build LLM context
     5. Generate answer with citations
     6. Validate citations
     7. Return response
+
+    With request.mode == "map_reduce" the question is answered per document
+    instead (see ask_map_reduce_stream).
     """
 
     def __init__(
@@ -33,6 +67,15 @@ class RAGPipeline:
         supabase_client: Client,
         embedding_service: EmbeddingService,
         generator: Generator,
+        vector_store: Optional[VectorStore] = None,
+        tenant_id: Optional[UUID] = None,
+        answer_cache: Optional[SemanticAnswerCache] = None,
+        search_mode: RetrievalMode = "semantic",
+        keyword_store: Optional[KeywordStore] = None,
+        fuzzy_keyword: bool = False,
+        reranker: Optional[SearchReranker] = None,
+        candidate_pool: int = DEFAULT_CANDIDATE_POOL,
+        map_concurrency: int = DEFAULT_MAP_CONCURRENCY,
     ):
         """
         Initialize RAG pipeline.
@@ -41,10 +84,34 @@ class RAGPipeline:
             supabase_client: Supabase client with user JWT
             embedding_service: Service for generating embeddings
             generator: LLM generator for answers
+            vector_store: Vector search backend (default: match_document_chunks RPC)
+            tenant_id: Tenant of the supabase_client JWT; required by local
+                stores and the answer cache
+            answer_cache: Optional semantic answer cache (used with tenant_id)
+            search_mode: Retrieval mode, "semantic" or "hybrid" (see Retriever)
+            keyword_store: Keyword search backend for hybrid mode
+            fuzzy_keyword: Fuse the fuzzy keyword leg too in hybrid mode
+            reranker: Optional cross-encoder for the candidate pool
+            candidate_pool: Chunks retrieved before re-ranking
+            map_concurrency: Per-document generations in flight per
+                map-reduce request
         """
         self.client = supabase_client
-        self.retriever = Retriever(supabase_client, embedding_service)
+        self.tenant_id = tenant_id
+        self.answer_cache = answer_cache
+        self.retriever = Retriever(
+            supabase_client,
+            embedding_service,
+            vector_store=vector_store,
+            tenant_id=tenant_id,
+            search_mode=search_mode,
+            keyword_store=keyword_store,
+            fuzzy_keyword=fuzzy_keyword,
+            reranker=reranker,
+            candidate_pool=candidate_pool,
+        )
         self.generator = generator
+        self.map_concurrency = map_concurrency
 
     async def ask(self, request: AskRequest) -> AskResponse:
         """
@@ -56,6 +123,9 @@ class RAGPipeline:
         Returns:
             Answer response with citations
         """
+        if request.mode == "map_reduce":
+            return await self.ask_map_reduce(request)
+
         logger.info(
             "Processing RAG query",
             extra={
@@ -65,10 +135,16 @@ class RAGPipeline:
             },
         )
 
+        # 0. Semantic answer cache
+        cache_key = await self._cache_key(request)
+        if cache_key is not None:
+            cached = self._cached_answer(request, cache_key)
+            if cached is not None:
+                return cached
+
         # 1-3. Retrieve and re-rank chunks
         chunks = await self.retriever.retrieve(
             question=request.question,
-            top_k=20,
             rerank_to=request.max_chunks,
             document_ids=request.document_ids,
         )
@@ -103,6 +179,7 @@ class RAGPipeline:
             chunks_used=len(chunks),
             suggestion=None,  # No suggestion needed for successful answers
         )
+        self._store_answer(request, cache_key, response)
 
         logger.info(
             "RAG query completed",
@@ -115,6 +192,438 @@ class RAGPipeline:
 
         return response
 
+    async def ask_stream(self, request: AskRequest) -> AsyncIterator[AskStreamEvent]:
+        """
+        Answer question about documents, streaming the answer as it is generated.
+
+        Events:
+        - ("token", {"text"}): answer text delta, forwarded as it arrives
+        - ("citation", {"document_id", "page", "valid"}): each citation once it
+          is complete, checked against the retrieved chunks
+        - ("done", AskResponse): final response; its answer is authoritative
+
+        In map_reduce mode the events are those of ask_map_reduce_stream.
+
+        Generation stops at the first citation that does not reference a
+        retrieved chunk, and the final response is then the no-context
+        response (as in ask()), so clients should replace the streamed text.
+
+        Args:
+            request: Question request with optional filters
+
+        Yields:
+            AskStreamEvent tuples
+        """
+        if request.mode == "map_reduce":
+            async for event in self.ask_map_reduce_stream(request):
+                yield event
+            return
+
+        logger.info(
+            "Processing streaming RAG query",
+            extra={
+                "question_length": len(request.question),
+                "max_chunks": request.max_chunks,
+                "document_filter": bool(request.document_ids),
+            },
+        )
+
+        cache_key = await self._cache_key(request)
+        if cache_key is not None:
+            cached = self._cached_answer(request, cache_key)
+            if cached is not None:
+                yield "done", cached.model_dump(mode="json")
+                return
+
+        chunks = await self.retriever.retrieve(
+            question=request.question,
+            rerank_to=request.max_chunks,
+            document_ids=request.document_ids,
+        )
+
+        if not chunks:
+            logger.info("No relevant chunks found for question")
+            yield "done", self._no_context_response().model_dump(mode="json")
+            return
+
+        context = build_context(chunks, max_tokens=6000)
+
+        # Document names load while the answer streams
+        names_task = asyncio.create_task(asyncio.to_thread(self._document_names, chunks))
+        validator = StreamingCitationValidator(chunks)
+        valid = True
+
+        try:
+            tokens = self.generator.generate_stream(request.question, context)
+            try:
+                async for delta in tokens:
+                    yield "token", {"text": delta}
+                    for doc_id, page, is_valid in validator.feed(delta):
+                        yield "citation", {"document_id": doc_id, "page": page, "valid": is_valid}
+                        valid = valid and is_valid
+                    if not valid:
+                        break
+            finally:
+                await tokens.aclose()
+
+            if not valid or not validate_citations(validator.answer, chunks):
+                logger.warning("Streamed answer failed citation validation")
+                yield "done", self._no_context_response().model_dump(mode="json")
+                return
+
+            document_names = await names_task
+        finally:
+            if not names_task.done():
+                names_task.cancel()
+
+        answer = validator.answer
+        confidence = self._calculate_confidence(chunks)
+        response = AskResponse(
+            answer=answer,
+            citations=build_citations(answer, chunks, document_names),
+            confidence=confidence,
+            chunks_used=len(chunks),
+            suggestion=None,
+        )
+        self._store_answer(request, cache_key, response)
+
+        logger.info(
+            "Streaming RAG query completed",
+            extra={
+                "chunks_used": len(chunks),
+                "citations_count": len(response.citations),
+                "confidence": confidence,
+            },
+        )
+
+        yield "done", response.model_dump(mode="json")
+
+    async def ask_map_reduce(self, request: AskRequest) -> AskResponse:
+        """
+        Answer a portfolio-wide question document by document.
+
+        Args:
+            request: Question request (mode "map_reduce")
+
+        Returns:
+            Combined answer response with citations and usage
+        """
+        response: Optional[AskResponse] = None
+        async for event, payload in self.ask_map_reduce_stream(request):
+            if event == "done":
+                response = AskResponse.model_validate(payload)
+        if response is None:
+            raise RuntimeError("Map-reduce stream ended without a response")
+        return response
+
+    async def ask_map_reduce_stream(self, request: AskRequest) -> AsyncIterator[AskStreamEvent]:
+        """
+        Answer a portfolio-wide question document by document, streaming partials.
+
+        Map: the best request.max_chunks chunks of each of the
+        request.max_documents best-matching documents are retrieved together
+        (one grouped search), and each document is answered separately, at
+        most map_concurrency at a time. Reduce: the cited per-document answers
+        are combined by one more LLM call (or listed as they are, for a single
+        document or when the budget or the call fails).
+
+        Every LLM call reserves its worst case against the request's token
+        and cost budget first (the reduce call is reserved up front); documents
+        that no longer fit are skipped and counted in the usage.
+
+        The semantic answer cache is not used in this mode.
+
+        Events:
+        - ("document", {"document_id", "document_name", "answer", "relevant"}):
+          each document's answer as it completes, best documents not
+          necessarily first; irrelevant, skipped and failed documents are
+          reported with relevant false and an empty answer
+        - ("done", AskResponse): final response with usage
+
+        Args:
+            request: Question request (mode "map_reduce")
+
+        Yields:
+            AskStreamEvent tuples
+        """
+        logger.info(
+            "Processing map-reduce RAG query",
+            extra={
+                "question_length": len(request.question),
+                "max_chunks": request.max_chunks,
+                "max_documents": request.max_documents,
+                "document_filter": bool(request.document_ids),
+            },
+        )
+
+        groups = await self.retriever.retrieve_grouped(
+            question=request.question,
+            chunks_per_document=request.max_chunks,
+            max_documents=request.max_documents,
+            document_ids=request.document_ids,
+        )
+        if not groups:
+            logger.info("No relevant chunks found for question")
+            yield "done", self._no_context_response().model_dump(mode="json")
+            return
+
+        document_names = await asyncio.to_thread(
+            self._document_names, [chunk for group in groups for chunk in group]
+        )
+        budget = RequestBudget(
+            max_tokens=request.token_budget or DEFAULT_TOKEN_BUDGET,
+            max_cost_usd=request.cost_budget_usd or DEFAULT_COST_BUDGET_USD,
+            model=self.generator.model,
+        )
+        # The reduce step must stay affordable however many documents match
+        reduce_reservation = (
+            PROMPT_OVERHEAD_TOKENS + len(groups) * MAP_MAX_COMPLETION_TOKENS,
+            REDUCE_MAX_COMPLETION_TOKENS,
+        )
+        reduce_reserved = budget.reserve(*reduce_reservation)
+
+        semaphore = asyncio.Semaphore(self.map_concurrency)
+        tasks = [
+            asyncio.create_task(
+                self._map_document(
+                    request.question,
+                    chunks,
+                    document_names.get(chunks[0].document_id, "Unknown Document"),
+                    budget,
+                    semaphore,
+                )
+            )
+            for chunks in groups
+        ]
+
+        findings: Dict[UUID, DocumentFinding] = {}
+        skipped = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                document_id, document_name, finding, status = await next_done
+                if finding is not None:
+                    findings[document_id] = finding
+                if status == "skipped":
+                    skipped += 1
+                yield "document", {
+                    "document_id": str(document_id),
+                    "document_name": document_name,
+                    "answer": finding.answer if finding else "",
+                    "relevant": finding is not None,
+                }
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # Best documents first, as retrieved
+        ordered = [
+            findings[chunks[0].document_id] for chunks in groups if chunks[0].document_id in findings
+        ]
+        if reduce_reserved:
+            budget.release(*reduce_reservation)
+
+        if not ordered:
+            logger.info("No document answered the question")
+            response = self._no_context_response()
+        else:
+            answer = await self._reduce_findings(request.question, ordered, budget)
+            chunks = chunks_of(ordered)
+            response = AskResponse(
+                answer=answer,
+                citations=build_citations(answer, chunks, document_names),
+                confidence=self._calculate_confidence(chunks),
+                chunks_used=len(chunks),
+                suggestion=None,
+            )
+
+        response.usage = AskUsage(
+            prompt_tokens=budget.prompt_tokens,
+            completion_tokens=budget.completion_tokens,
+            cost_usd=budget.cost_usd,
+            documents_answered=len(ordered),
+            documents_skipped=skipped,
+        )
+
+        logger.info(
+            "Map-reduce RAG query completed",
+            extra={
+                "documents": len(groups),
+                "documents_answered": len(ordered),
+                "documents_skipped": skipped,
+                "prompt_tokens": budget.prompt_tokens,
+                "completion_tokens": budget.completion_tokens,
+                "cost_usd": budget.cost_usd,
+            },
+        )
+
+        yield "done", response.model_dump(mode="json")
+
+    async def _map_document(
+        self,
+        question: str,
+        chunks: List[ChunkMatch],
+        document_name: str,
+        budget: RequestBudget,
+        semaphore: asyncio.Semaphore,
+    ) -> Tuple[UUID, str, Optional[DocumentFinding], str]:
+        """
+        Answer the question from one document's chunks (map step).
+
+        Returns:
+            (document_id, document_name, finding or None, status), status
+            being "answered", "not_relevant", "skipped" (over budget) or
+            "failed"
+        """
+        document_id = chunks[0].document_id
+        async with semaphore:
+            context = build_context(chunks, max_tokens=MAP_CONTEXT_TOKENS)
+            reservation = (
+                estimate_context_tokens(chunks, MAP_CONTEXT_TOKENS) + PROMPT_OVERHEAD_TOKENS,
+                MAP_MAX_COMPLETION_TOKENS,
+            )
+            if not budget.reserve(*reservation):
+                logger.info(
+                    "Document skipped: request budget exhausted",
+                    extra={"document_id": str(document_id)},
+                )
+                return document_id, document_name, None, "skipped"
+
+            try:
+                result = await self.generator.generate_with_usage(
+                    question,
+                    context,
+                    system_template=MAP_SYSTEM_PROMPT,
+                    max_tokens=MAP_MAX_COMPLETION_TOKENS,
+                )
+            except Exception as e:
+                budget.release(*reservation)
+                logger.warning(
+                    "Failed to answer from document",
+                    extra={"document_id": str(document_id), "error": str(e)},
+                )
+                return document_id, document_name, None, "failed"
+            budget.settle(reservation, result.prompt_tokens, result.completion_tokens)
+
+        answer = result.answer.strip()
+        if NOT_RELEVANT in answer or not extract_citations(answer):
+            return document_id, document_name, None, "not_relevant"
+        if not validate_citations(answer, chunks):
+            logger.warning(
+                "Document answer failed citation validation",
+                extra={"document_id": str(document_id)},
+            )
+            return document_id, document_name, None, "failed"
+
+        finding = DocumentFinding(
+            document_id=document_id,
+            document_name=document_name,
+            answer=answer,
+            chunks=chunks,
+        )
+        return document_id, document_name, finding, "answered"
+
+    async def _reduce_findings(
+        self,
+        question: str,
+        findings: List[DocumentFinding],
+        budget: RequestBudget,
+    ) -> str:
+        """
+        Combine per-document answers into one cited answer (reduce step).
+
+        Falls back to listing the findings when there is only one, when the
+        call does not fit the budget or fails, or when its citations are not
+        those of the findings.
+        """
+        if len(findings) == 1:
+            return combine_findings(findings)
+
+        context = format_findings(findings)
+        reservation = (
+            PROMPT_OVERHEAD_TOKENS + len(context) // 4,
+            REDUCE_MAX_COMPLETION_TOKENS,
+        )
+        if not budget.reserve(*reservation):
+            logger.info("Reduce step skipped: request budget exhausted")
+            return combine_findings(findings)
+
+        try:
+            result = await self.generator.generate_with_usage(
+                question,
+                context,
+                system_template=REDUCE_SYSTEM_PROMPT,
+                max_tokens=REDUCE_MAX_COMPLETION_TOKENS,
+            )
+        except Exception as e:
+            budget.release(*reservation)
+            logger.warning("Failed to combine document answers", extra={"error": str(e)})
+            return combine_findings(findings)
+        budget.settle(reservation, result.prompt_tokens, result.completion_tokens)
+
+        answer = result.answer.strip()
+        if not extract_citations(answer) or not validate_citations(answer, chunks_of(findings)):
+            logger.warning("Combined answer failed citation validation")
+            return combine_findings(findings)
+        return answer
+
+    async def _cache_key(self, request: AskRequest) -> Optional[Tuple[int, List[float]]]:
+        """
+        Read the corpus version and question embedding for the answer cache.
+
+        Returns:
+            (corpus version, question embedding), or None to skip the cache
+        """
+        if self.answer_cache is None or self.tenant_id is None:
+            return None
+        version = await self.answer_cache.get_version(self.tenant_id)
+        if version is None:
+            return None
+        # Shared query embedding cache: retrieval reuses this embedding. In
+        # hybrid mode a late or failed embedding skips the cache instead of
+        # holding up the keyword legs.
+        embedding = await self.retriever.try_embed_question(request.question)
+        if embedding is None:
+            return None
+        return version, embedding
+
+    def _cached_answer(
+        self,
+        request: AskRequest,
+        cache_key: Tuple[int, List[float]],
+    ) -> Optional[AskResponse]:
+        """Look up a cached answer for a similar question (bypass_cache skips it)."""
+        if self.answer_cache is None or self.tenant_id is None or request.bypass_cache:
+            return None
+        version, embedding = cache_key
+        return self.answer_cache.get(
+            self.tenant_id,
+            version,
+            request.question,
+            embedding,
+            document_ids=request.document_ids,
+            max_chunks=request.max_chunks,
+        )
+
+    def _store_answer(
+        self,
+        request: AskRequest,
+        cache_key: Optional[Tuple[int, List[float]]],
+        response: AskResponse,
+    ) -> None:
+        """Cache a validated answer (no-information responses are not cached)."""
+        if cache_key is None or self.answer_cache is None or self.tenant_id is None:
+            return
+        version, embedding = cache_key
+        self.answer_cache.set(
+            self.tenant_id,
+            version,
+            request.question,
+            embedding,
+            response,
+            document_ids=request.document_ids,
+            max_chunks=request.max_chunks,
+        )
+
     async def _fetch_document_names(self, chunks: List[ChunkMatch]) -> Dict[UUID, str]:
         """
         Fetch document filenames for citation building.
@@ -125,6 +634,10 @@ class RAGPipeline:
         Returns:
             Mapping of document_id to filename
         """
+        return self._document_names(chunks)
+
+    def _document_names(self, chunks: List[ChunkMatch]) -> Dict[UUID, str]:
+        """Look up document filenames for the chunks' documents."""
         doc_ids = list({chunk.document_id for chunk in chunks})
 
         result = self.client.table("documents").select("id, original_filename").in_(
@@ -12,6 +12,32 @@ RULES:
 CONTEXT:
 {context}"""
 
+# Map-reduce mode: one call per document, then one call to combine them
+NOT_RELEVANT = "NOT_RELEVANT"
+
+MAP_SYSTEM_PROMPT = """You are a CRE document analyst reviewing ONE commercial real estate document as part of a portfolio-wide question.
+
+RULES:
+1. Answer ONLY for this document, using ONLY the provided excerpts
+2. Every factual claim MUST have a citation in format [DOC:uuid:PAGE:n]
+3. If the excerpts do not address the question, respond exactly: NOT_RELEVANT
+4. Be brief: the findings from every document are combined afterwards
+5. For numbers, quote exactly from source
+
+DOCUMENT EXCERPTS:
+{context}"""
+
+REDUCE_SYSTEM_PROMPT = """You are a CRE document analyst combining per-document findings into one answer to a portfolio-wide question.
+
+RULES:
+1. Use ONLY the findings below; do not add information
+2. Keep every citation exactly as written, in format [DOC:uuid:PAGE:n], next to the claim it supports
+3. Name each document you draw on
+4. If no finding answers the question, respond: "I don't have enough information to answer this based on the available documents."
+
+FINDINGS:
+{context}"""
+
 
 def format_system_prompt(context: str) -> str:
     """
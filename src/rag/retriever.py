@@ -1,37 +1,175 @@
-"""Retriever for RAG pipeline: embed, retrieve, re-rank."""
+"""Retriever for RAG pipeline: embed, retrieve, re-rank, diversify."""
+import asyncio
 import logging
-from typing import List, Optional
+import re
+from typing import Dict, FrozenSet, List, Literal, Optional, Tuple, cast
 from uuid import UUID
 from supabase import Client
 
+from src.search.embedding_cache import QueryEmbeddingCache, get_query_embedding_cache
 from src.search.embeddings import EmbeddingService
+from src.search.hybrid import HybridSearchService, SearchResult, reciprocal_rank_fusion
+from src.search.keyword_store import KeywordStore
+from src.search.reranker import SearchReranker
+from src.search.vector_store import PostgresVectorStore, VectorStore
 from .models import ChunkMatch
 
 logger = logging.getLogger(__name__)
 
+RetrievalMode = Literal["semantic", "hybrid"]
+
+# Chunks fetched (and cross-encoder scored) before narrowing to rerank_to
+DEFAULT_CANDIDATE_POOL = 20
+
+# MMR trade-off: 1.0 ranks by relevance only, lower values favour chunks
+# unlike the ones already selected (amendments repeating the base lease)
+DEFAULT_MMR_LAMBDA = 0.7
+
+_WORD = re.compile(r"\w+")
+
+
+def _word_set(text: str) -> FrozenSet[str]:
+    return frozenset(_WORD.findall(text.lower()))
+
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def mmr_select(
+    contents: List[str],
+    relevance: List[float],
+    top_n: int,
+    mmr_lambda: float = DEFAULT_MMR_LAMBDA,
+) -> List[int]:
+    """
+    Pick diverse, relevant items by maximal marginal relevance.
+
+    Each step takes the item maximising
+    mmr_lambda * relevance - (1 - mmr_lambda) * max similarity to the items
+    already taken. Relevance is scaled to [0, 1] (divided by the best score,
+    or min-max normalised if any score is negative), and similarity is the
+    Jaccard overlap of the items' word sets (chunk embeddings are not
+    returned by the vector stores).
+
+    Args:
+        contents: Candidate texts
+        relevance: Relevance score per candidate (any scale, higher is better)
+        top_n: Number of items to pick
+        mmr_lambda: Relevance weight in [0, 1]
+
+    Returns:
+        Indices of the picked items, in pick order
+    """
+    if not contents:
+        return []
+    low, high = min(relevance), max(relevance)
+    if low >= 0.0 and high > 0.0:
+        # Similarities and RRF scores: keep their ratios
+        normalised = [score / high for score in relevance]
+    else:
+        # Cross-encoder logits can be negative
+        spread = high - low
+        normalised = [(score - low) / spread if spread > 0 else 1.0 for score in relevance]
+    words = [_word_set(content) for content in contents]
+
+    selected: List[int] = []
+    # Highest similarity of each candidate to any selected item
+    redundancy = [0.0] * len(contents)
+    remaining = set(range(len(contents)))
+    while remaining and len(selected) < top_n:
+        best = max(
+            remaining,
+            key=lambda i: (mmr_lambda * normalised[i] - (1 - mmr_lambda) * redundancy[i], -i),
+        )
+        selected.append(best)
+        remaining.discard(best)
+        for i in remaining:
+            redundancy[i] = max(redundancy[i], _jaccard(words[i], words[best]))
+    return selected
+
 
 class Retriever:
     """
     Retrieval service for RAG pipeline.
 
-    Handles query embedding, vector search, and re-ranking.
+    Handles query embedding, vector or hybrid search, cross-encoder
+    re-ranking and MMR diversification.
     """
 
-    def __init__(self, supabase_client: Client, embedding_service: EmbeddingService):
+    def __init__(
+        self,
+        supabase_client: Client,
+        embedding_service: EmbeddingService,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+        vector_store: Optional[VectorStore] = None,
+        tenant_id: Optional[UUID] = None,
+        search_mode: RetrievalMode = "semantic",
+        keyword_store: Optional[KeywordStore] = None,
+        fuzzy_keyword: bool = False,
+        reranker: Optional[SearchReranker] = None,
+        candidate_pool: int = DEFAULT_CANDIDATE_POOL,
+        mmr_lambda: Optional[float] = DEFAULT_MMR_LAMBDA,
+    ):
         """
         Initialize retriever.
 
         Args:
             supabase_client: Supabase client with user JWT
             embedding_service: Service for generating embeddings
+            query_cache: Query embedding cache (defaults to the process-wide
+                cache shared with HybridSearchService)
+            vector_store: Vector search backend (default: match_document_chunks RPC)
+            tenant_id: Tenant of the supabase_client JWT; required by local stores
+            search_mode: "semantic" for vector search only, "hybrid" for
+                HybridSearchService's hybrid mode (RRF over vector and keyword
+                search)
+            keyword_store: Keyword search backend for hybrid mode
+                (default: match_document_chunks_keyword RPC)
+            fuzzy_keyword: Fuse the fuzzy keyword leg too in hybrid mode
+            reranker: Optional cross-encoder; scores the candidate pool when available
+            candidate_pool: Chunks retrieved before re-ranking (default top_k)
+            mmr_lambda: MMR relevance weight in [0, 1] (None disables diversification)
+
+        Raises:
+            ValueError: If search_mode, candidate_pool or mmr_lambda is invalid
         """
+        if search_mode not in ("semantic", "hybrid"):
+            raise ValueError(f"Invalid search mode: {search_mode}")
+        if candidate_pool < 1:
+            raise ValueError("candidate_pool must be at least 1")
+        if mmr_lambda is not None and not 0.0 <= mmr_lambda <= 1.0:
+            raise ValueError("mmr_lambda must be in [0, 1]")
+
         self.client = supabase_client
         self.embeddings = embedding_service
+        self.query_cache = query_cache or get_query_embedding_cache()
+        self.vector_store = vector_store or PostgresVectorStore(supabase_client)
+        self.tenant_id = tenant_id
+        self.search_mode = search_mode
+        self.reranker = reranker
+        self.candidate_pool = candidate_pool
+        self.mmr_lambda = mmr_lambda
+
+        # Hybrid candidates come from the search service (legs, deadlines, RRF)
+        self.hybrid_search: Optional[HybridSearchService] = None
+        if search_mode == "hybrid":
+            self.hybrid_search = HybridSearchService(
+                supabase_client,
+                embedding_service,
+                query_cache=self.query_cache,
+                tenant_id=tenant_id,
+                vector_store=self.vector_store,
+                keyword_store=keyword_store,
+                fuzzy_keyword=fuzzy_keyword,
+            )
 
     async def retrieve(
         self,
         question: str,
-        top_k: int = 20,
+        top_k: Optional[int] = None,
         rerank_to: int = 5,
         document_ids: Optional[List[UUID]] = None,
     ) -> List[ChunkMatch]:
@@ -39,42 +177,169 @@ class Retriever:
         Retrieve and re-rank chunks for question.
 
         Pipeline:
-        1. Embed question
-        2. Retrieve top-k chunks via vector similarity
-        3. Re-rank to top-n most relevant
+        1. Embed question (in hybrid mode, the search service embeds it under
+           its vector deadline and degrades to the keyword legs)
+        2. Retrieve top-k candidates via vector similarity (hybrid search
+           in hybrid mode)
+        3. Re-rank candidates with the cross-encoder, if available
+        4. Select rerank_to chunks by MMR (or by relevance without mmr_lambda)
 
         Args:
             question: User question
-            top_k: Number of chunks to retrieve initially
+            top_k: Number of candidates to retrieve (default: candidate_pool)
             rerank_to: Number of chunks after re-ranking
             document_ids: Optional filter to specific documents
 
         Returns:
-            List of re-ranked ChunkMatch objects
+            List of re-ranked ChunkMatch objects, most relevant first
         """
-        # 1. Embed question
-        logger.info("Embedding question", extra={"question_length": len(question)})
-        query_embedding = await self.embeddings.embed_single(question)
-
-        # 2. Retrieve top-k chunks
-        logger.info("Retrieving chunks", extra={"top_k": top_k, "document_filter": bool(document_ids)})
-        chunks = await self._search_chunks(
-            embedding=query_embedding,
-            match_count=top_k,
-            document_ids=document_ids,
+        match_count = top_k or self.candidate_pool
+
+        # 1-2. Embed question and retrieve top-k candidates
+        logger.info(
+            "Retrieving chunks",
+            extra={"top_k": match_count, "mode": self.search_mode, "document_filter": bool(document_ids)},
         )
+        if self.hybrid_search is None:
+            chunks = await self._search_chunks(
+                embedding=await self.embed_question(question),
+                match_count=match_count,
+                document_ids=document_ids,
+            )
+            relevance = [chunk.similarity for chunk in chunks]
+        else:
+            chunks, relevance = await self._hybrid_candidates(
+                self.hybrid_search,
+                question,
+                match_count,
+                document_ids,
+            )
 
         if not chunks:
             logger.info("No chunks retrieved for question")
             return []
 
-        # 3. Re-rank to top-n
+        # 3-4. Re-rank to top-n
         logger.info("Re-ranking chunks", extra={"initial_count": len(chunks), "rerank_to": rerank_to})
-        reranked = self._rerank(chunks, rerank_to)
+        relevance = await self._cross_encoder_scores(question, chunks, relevance)
+        reranked = self._rerank(chunks, rerank_to, relevance)
 
         logger.info("Retrieved and re-ranked chunks", extra={"final_count": len(reranked)})
         return reranked
 
+    async def retrieve_grouped(
+        self,
+        question: str,
+        chunks_per_document: int,
+        max_documents: int,
+        document_ids: Optional[List[UUID]] = None,
+    ) -> List[List[ChunkMatch]]:
+        """
+        Retrieve the best chunks of each best-matching document.
+
+        Used by map-reduce answering, where every relevant document must be
+        represented rather than the globally top-ranked chunks.
+
+        Args:
+            question: User question
+            chunks_per_document: Maximum chunks per document
+            max_documents: Maximum number of documents
+            document_ids: Optional filter to specific documents
+
+        In hybrid mode, a question embedding that fails or misses the search
+        service's vector deadline degrades to keyword results grouped by
+        document.
+
+        Returns:
+            One list of chunks per document (best document first), each
+            sorted by similarity
+        """
+        query_embedding = await self.try_embed_question(question)
+        if query_embedding is None:
+            # Only in hybrid mode
+            return await self._keyword_groups(
+                cast(HybridSearchService, self.hybrid_search),
+                question,
+                chunks_per_document,
+                max_documents,
+                document_ids,
+            )
+
+        logger.info(
+            "Retrieving chunks per document",
+            extra={
+                "chunks_per_document": chunks_per_document,
+                "max_documents": max_documents,
+                "document_filter": bool(document_ids),
+            },
+        )
+        matches = await self.vector_store.search_grouped(
+            self.tenant_id,
+            query_embedding,
+            chunks_per_document,
+            max_documents,
+            document_ids or None,
+        )
+
+        groups: Dict[UUID, List[ChunkMatch]] = {}
+        for match in matches:
+            groups.setdefault(match.document_id, []).append(
+                ChunkMatch(
+                    id=match.chunk_id,
+                    document_id=match.document_id,
+                    content=match.content,
+                    page_numbers=match.page_numbers or [],
+                    similarity=min(max(match.similarity, 0.0), 1.0),
+                    section_header=match.section_header,
+                    token_count=match.token_count,
+                )
+            )
+
+        logger.info("Retrieved chunks per document", extra={"document_count": len(groups)})
+        return list(groups.values())
+
+    async def embed_question(self, question: str) -> List[float]:
+        """
+        Embed a question through the shared query embedding cache.
+
+        Args:
+            question: User question
+
+        Returns:
+            Question embedding
+        """
+        logger.info("Embedding question", extra={"question_length": len(question)})
+        return await self.query_cache.get_or_embed(self.embeddings, question)
+
+    async def try_embed_question(self, question: str) -> Optional[List[float]]:
+        """
+        Embed a question under the hybrid search vector deadline.
+
+        In hybrid mode the keyword legs can answer without an embedding, so
+        an embedding that fails or misses HybridSearchService.vector_timeout
+        gives None, as the service degrades. In semantic mode errors propagate.
+
+        Args:
+            question: User question
+
+        Returns:
+            Question embedding, or None in hybrid mode if it is unavailable
+        """
+        if self.hybrid_search is None:
+            return await self.embed_question(question)
+        try:
+            return await asyncio.wait_for(self.embed_question(question), self.hybrid_search.vector_timeout)
+        except Exception as e:
+            logger.warning(
+                "Question embedding unavailable, degrading to keyword search",
+                extra={
+                    "timed_out": isinstance(e, asyncio.TimeoutError),
+                    "timeout_seconds": self.hybrid_search.vector_timeout,
+                    "error": repr(e),
+                },
+            )
+            return None
+
     async def _search_chunks(
         self,
         embedding: List[float],
@@ -84,7 +349,7 @@ class Retriever:
         """
         Search chunks using vector similarity.
 
-        Calls match_document_chunks PostgreSQL function.
+        Uses the configured vector store (match_document_chunks by default).
 
         Args:
             embedding: Query embedding vector
@@ -94,46 +359,197 @@ class Retriever:
         Returns:
             List of ChunkMatch objects
         """
-        params = {
-            "query_embedding": embedding,
-            "match_count": match_count,
-        }
+        matches = await self.vector_store.search(
+            self.tenant_id,
+            embedding,
+            match_count,
+            document_ids or None,
+        )
+
+        return [
+            ChunkMatch(
+                id=match.chunk_id,
+                document_id=match.document_id,
+                content=match.content,
+                page_numbers=match.page_numbers or [],
+                # ChunkMatch is bounded to [0, 1]; cosine similarity is not
+                similarity=min(max(match.similarity, 0.0), 1.0),
+                section_header=match.section_header,
+                token_count=match.token_count,
+            )
+            for match in matches
+        ]
 
-        if document_ids:
-            params["filter_document_ids"] = [str(doc_id) for doc_id in document_ids]
+    async def _hybrid_candidates(
+        self,
+        hybrid_search: HybridSearchService,
+        question: str,
+        match_count: int,
+        document_ids: Optional[List[UUID]],
+    ) -> Tuple[List[ChunkMatch], List[float]]:
+        """
+        Retrieve candidates with the search service's hybrid mode.
 
-        result = self.client.rpc("match_document_chunks", params).execute()
+        Vector, keyword and (with fuzzy_keyword) fuzzy legs are fused exactly
+        as for /api/search, including its per-leg deadlines and degradation.
+        The service embeds the question (through the shared query embedding
+        cache) within its vector deadline.
 
-        if result.data is None or result.data == []:
-            return []
+        Args:
+            hybrid_search: Search service for the tenant
+            question: User question
+            match_count: Number of candidates to keep
+            document_ids: Optional document filter
+
+        Returns:
+            Fused candidates and their RRF scores
+        """
+        fused = await hybrid_search.search(
+            question,
+            mode="hybrid",
+            limit=match_count,
+            filter_document_ids=document_ids or None,
+        )
+        return self._fused_chunks(hybrid_search, fused), [result.score for result in fused]
+
+    async def _keyword_groups(
+        self,
+        hybrid_search: HybridSearchService,
+        question: str,
+        chunks_per_document: int,
+        max_documents: int,
+        document_ids: Optional[List[UUID]],
+    ) -> List[List[ChunkMatch]]:
+        """
+        Group keyword results by document (retrieve_grouped without an embedding).
 
-        chunks = []
-        for row in result.data:
-            chunks.append(ChunkMatch(
-                id=UUID(row["id"]),
-                document_id=UUID(row["document_id"]),
-                content=row["content"],
-                page_numbers=row.get("page_numbers") or [],
-                similarity=row["similarity"],
-                section_header=row.get("section_header"),
-            ))
+        Args:
+            hybrid_search: Search service for the tenant
+            question: User question
+            chunks_per_document: Maximum chunks per document
+            max_documents: Maximum number of documents
+            document_ids: Optional document filter
 
+        Returns:
+            One list of chunks per document (best document first)
+        """
+        results = await hybrid_search.search(
+            question,
+            mode="keyword",
+            limit=chunks_per_document * max_documents,
+            filter_document_ids=document_ids or None,
+        )
+        # Single-leg RRF scores, on the same scale as hybrid candidates
+        fused = reciprocal_rank_fusion([results], k=hybrid_search.rrf_k)
+
+        groups: Dict[UUID, List[ChunkMatch]] = {}
+        for chunk in self._fused_chunks(hybrid_search, fused):
+            group = groups.setdefault(chunk.document_id, [])
+            if len(group) < chunks_per_document:
+                group.append(chunk)
+
+        logger.info("Retrieved keyword chunks per document", extra={"document_count": len(groups)})
+        return list(groups.values())[:max_documents]
+
+    @staticmethod
+    def _fused_chunks(hybrid_search: HybridSearchService, fused: List[SearchResult]) -> List[ChunkMatch]:
+        """
+        Convert RRF-scored search results to chunks.
+
+        Similarity is the RRF score as a fraction of the best attainable one
+        (ranked first by every leg), so it is in [0, 1] and on the same scale
+        for every fused chunk, whichever legs returned it.
+
+        Args:
+            hybrid_search: Search service that fused the results
+            fused: Results with RRF scores
+
+        Returns:
+            ChunkMatch per result, in the same order
+        """
+        legs = 3 if hybrid_search.fuzzy_keyword else 2
+        best_score = legs / (hybrid_search.rrf_k + 1)
+        chunks: List[ChunkMatch] = []
+        for result in fused:
+            metadata = result.metadata or {}
+            chunks.append(
+                ChunkMatch(
+                    id=result.chunk_id,
+                    document_id=result.document_id,
+                    content=result.content,
+                    page_numbers=result.page_numbers or [],
+                    similarity=min(result.score / best_score, 1.0),
+                    section_header=metadata.get("section_header"),
+                    token_count=metadata.get("token_count"),
+                )
+            )
         return chunks
 
-    def _rerank(self, chunks: List[ChunkMatch], top_n: int) -> List[ChunkMatch]:
+    async def _cross_encoder_scores(
+        self,
+        question: str,
+        chunks: List[ChunkMatch],
+        relevance: List[float],
+    ) -> List[float]:
+        """
+        Score candidates with the cross-encoder.
+
+        Args:
+            question: User question
+            chunks: Candidate chunks
+            relevance: Current relevance per chunk
+
+        Returns:
+            Cross-encoder score per chunk, or relevance unchanged when no
+            reranker is available (or it returned the results unscored)
+        """
+        if self.reranker is None or not self.reranker.is_available() or len(chunks) <= 1:
+            return relevance
+
+        results = [
+            SearchResult(
+                chunk_id=chunk.id,
+                document_id=chunk.document_id,
+                content=chunk.content,
+                page_numbers=chunk.page_numbers,
+                score=score,
+            )
+            for chunk, score in zip(chunks, relevance)
+        ]
+        reranked = await self.reranker.rerank_async(question, results)
+        if reranked is results:
+            return relevance
+
+        # Candidates past the reranker's top_k keep their old scores, which
+        # are not comparable; rank them below every scored candidate.
+        scored = {result.chunk_id: result.score for result in reranked[: self.reranker.top_k]}
+        lowest = min(scored.values(), default=0.0)
+        return [scored.get(chunk.id, lowest - 1.0 - i) for i, chunk in enumerate(chunks)]
+
+    def _rerank(
+        self,
+        chunks: List[ChunkMatch],
+        top_n: int,
+        relevance: Optional[List[float]] = None,
+    ) -> List[ChunkMatch]:
         """
-        Re-rank chunks by similarity score.
+        Narrow candidates to the top-n chunks.
 
-        Simple re-ranking: sort by similarity and take top-n.
-        Future enhancement: use cross-encoder for more sophisticated re-ranking.
+        With mmr_lambda, chunks are picked by maximal marginal relevance so
+        near-duplicates (e.g. an amendment restating the base lease) do not
+        crowd out other evidence; otherwise they are sorted by relevance.
 
         Args:
-            chunks: Initial retrieved chunks
+            chunks: Candidate chunks
             top_n: Number of top chunks to return
+            relevance: Relevance per chunk (default: similarity)
 
         Returns:
-            Top-n chunks sorted by relevance
+            Top-n chunks, most relevant first
         """
-        # Sort by similarity descending
-        sorted_chunks = sorted(chunks, key=lambda c: c.similarity, reverse=True)
-        return sorted_chunks[:top_n]
+        scores = relevance if relevance is not None else [chunk.similarity for chunk in chunks]
+        if self.mmr_lambda is None:
+            order = sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)[:top_n]
+        else:
+            order = mmr_select([chunk.content for chunk in chunks], scores, top_n, self.mmr_lambda)
+        return [chunks[i] for i in order]
@@ -0,0 +1,551 @@
+"""
+BM25 Keyword Index - Understanding Plane
+
+In-process BM25 inverted index per tenant, usable as the keyword leg of
+hybrid search instead of match_document_chunks_keyword.
+
+Compared with ts_rank, BM25 normalises term frequency by chunk length (long
+boilerplate chunks no longer win by repeating common terms) and weights rare
+terms by inverse document frequency. Text is analysed like the Postgres
+`english` configuration (same stop words and stemmer as the highlighter).
+
+The index is updated per document: add_document() replaces a document's
+chunks (superseded versions), delete_document() removes them. save() writes
+a compact segment with only live chunks:
+
+    b"CARBM25" + version byte
+    uint32 header length, zlib-compressed JSON header (parameters, chunk
+        metadata and content, terms with document frequencies)
+    postings: per term, varint (row delta, term frequency) pairs
+
+Segments live at <root>/<tenant_id>/bm25.seg and are stamped with the
+tenant's search corpus version (055_search_result_cache.sql);
+get_tenant_keyword_store() only serves a segment whose stamp matches the
+current version, so a tenant uses the Postgres RPC from its first chunk write
+until the segment is rebuilt (scripts/build_bm25_index.py).
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import struct
+import threading
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+
+from src.search.highlighter import ENGLISH_STOP_WORDS, stem
+from src.search.keyword_store import KeywordMatch, KeywordStore
+from src.search.local_vector_store import TenantVectorCache, file_stamp
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_FILE = "bm25.seg"
+SEGMENT_MAGIC = b"CARBM25"
+SEGMENT_VERSION = 1
+
+# Standard BM25 parameters
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def analyze(text: str) -> List[str]:
+    """
+    Split text into index terms (lowercase, stop words removed, stemmed).
+
+    Args:
+        text: Chunk content or query text
+
+    Returns:
+        Terms in text order
+    """
+    return [
+        stem(token)
+        for token in _TOKEN_PATTERN.findall(text.lower())
+        if token not in ENGLISH_STOP_WORDS
+    ]
+
+
+@dataclass
+class IndexedChunk:
+    """Stored fields for one indexed chunk."""
+
+    chunk_id: str
+    document_id: str
+    content: str
+    page_numbers: Optional[List[int]]
+    length: int
+
+
+def _encode_varints(values: Iterable[int]) -> bytes:
+    """Encode non-negative integers as LEB128 varints."""
+    out = bytearray()
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def _decode_varints(data: bytes, count: int, offset: int = 0) -> Tuple[List[int], int]:
+    """Decode count varints starting at offset; returns (values, next offset)."""
+    values: List[int] = []
+    for _ in range(count):
+        value = 0
+        shift = 0
+        while True:
+            byte = data[offset]
+            offset += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        values.append(value)
+    return values, offset
+
+
+class BM25Index:
+    """
+    BM25 inverted index over one tenant's chunks.
+
+    Thread-safe: searches and updates may run concurrently from worker threads.
+    """
+
+    def __init__(self, k1: float = DEFAULT_K1, b: float = DEFAULT_B):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Length normalisation strength (0 disables)
+        """
+        self.k1 = k1
+        self.b = b
+        self._rows: List[Optional[IndexedChunk]] = []
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._documents: Dict[str, List[int]] = {}
+        self._live_rows = 0
+        self._total_length = 0
+        self._lock = threading.RLock()
+        # Tenant corpus version the indexed chunks reflect (None: unknown)
+        self.corpus_version: Optional[int] = None
+        # Segment file version when loaded (None: not loaded from a file)
+        self.file_stamp: Optional[Tuple[int, int]] = None
+
+    def __len__(self) -> int:
+        return self._live_rows
+
+    def add_document(self, document_id: UUID, chunks: Sequence[Dict[str, Any]]) -> int:
+        """
+        Index a document's chunks, replacing any previously indexed version.
+
+        Args:
+            document_id: Document identifier
+            chunks: Chunk dicts with id, content and optional page_numbers
+
+        Returns:
+            Number of chunks indexed
+        """
+        with self._lock:
+            self.delete_document(document_id)
+            rows: List[int] = []
+            for chunk in chunks:
+                terms = Counter(analyze(chunk["content"]))
+                row = len(self._rows)
+                length = sum(terms.values())
+                self._rows.append(
+                    IndexedChunk(
+                        chunk_id=str(chunk["id"]),
+                        document_id=str(document_id),
+                        content=chunk["content"],
+                        page_numbers=chunk.get("page_numbers"),
+                        length=length,
+                    )
+                )
+                for term, frequency in terms.items():
+                    self._postings.setdefault(term, {})[row] = frequency
+                rows.append(row)
+                self._live_rows += 1
+                self._total_length += length
+            if rows:
+                self._documents[str(document_id)] = rows
+            return len(rows)
+
+    def delete_document(self, document_id: UUID) -> int:
+        """
+        Remove a document's chunks.
+
+        Args:
+            document_id: Document identifier
+
+        Returns:
+            Number of chunks removed
+        """
+        with self._lock:
+            rows = self._documents.pop(str(document_id), [])
+            for row in rows:
+                chunk = self._rows[row]
+                if chunk is None:
+                    continue
+                for term in set(analyze(chunk.content)):
+                    postings = self._postings.get(term)
+                    if postings is not None:
+                        postings.pop(row, None)
+                        if not postings:
+                            del self._postings[term]
+                self._rows[row] = None
+                self._live_rows -= 1
+                self._total_length -= chunk.length
+            return len(rows)
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        filter_document_ids: Optional[List[UUID]] = None,
+    ) -> List[Tuple[IndexedChunk, float]]:
+        """
+        Rank chunks by BM25 score.
+
+        Any query term may match (unlike plainto_tsquery, which requires all);
+        chunks matching more and rarer terms score higher.
+
+        Args:
+            query: Search query text
+            k: Maximum number of results
+            filter_document_ids: Optional document ID filter
+
+        Returns:
+            (chunk, score) pairs sorted by score (descending)
+        """
+        terms = list(dict.fromkeys(analyze(query)))
+        if not terms or k <= 0:
+            return []
+
+        with self._lock:
+            if self._live_rows == 0:
+                return []
+
+            allowed: Optional[Set[int]] = None
+            if filter_document_ids:
+                allowed = set()
+                for doc_id in filter_document_ids:
+                    allowed.update(self._documents.get(str(doc_id), ()))
+                if not allowed:
+                    return []
+
+            total = self._live_rows
+            average_length = self._total_length / total
+            k1, b = self.k1, self.b
+            scores: Dict[int, float] = {}
+
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1.0 + (total - df + 0.5) / (df + 0.5))
+                if allowed is not None and len(allowed) < df:
+                    entries: Iterable[Tuple[int, int]] = (
+                        (row, postings[row]) for row in allowed if row in postings
+                    )
+                else:
+                    entries = postings.items()
+                for row, frequency in entries:
+                    if allowed is not None and row not in allowed:
+                        continue
+                    length = self._rows[row].length  # type: ignore[union-attr]
+                    norm = k1 * (1.0 - b + b * length / average_length)
+                    scores[row] = scores.get(row, 0.0) + idf * frequency * (k1 + 1.0) / (frequency + norm)
+
+            top = heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))
+            return [(self._rows[row], score) for row, score in top]  # type: ignore[misc]
+
+    def nbytes(self) -> int:
+        """Approximate memory size for cache accounting."""
+        with self._lock:
+            content = sum(len(chunk.content) for chunk in self._rows if chunk is not None)
+            entries = sum(len(postings) for postings in self._postings.values())
+            return content + 100 * entries + 200 * len(self._rows)
+
+    def save(self, path: Path) -> None:
+        """
+        Write the live chunks as a compact segment (atomic replace).
+
+        Deleted rows are dropped and the remaining rows renumbered.
+
+        Args:
+            path: Segment file path
+        """
+        with self._lock:
+            live = [row for row, chunk in enumerate(self._rows) if chunk is not None]
+            renumber = {row: new_row for new_row, row in enumerate(live)}
+
+            chunks = []
+            for row in live:
+                chunk = self._rows[row]
+                assert chunk is not None
+                chunks.append([chunk.chunk_id, chunk.document_id, chunk.length, chunk.page_numbers, chunk.content])
+
+            terms = []
+            blobs = []
+            for term in sorted(self._postings):
+                rows = sorted((renumber[row], frequency) for row, frequency in self._postings[term].items())
+                values: List[int] = []
+                previous = 0
+                for row, frequency in rows:
+                    values.extend((row - previous, frequency))
+                    previous = row
+                blob = _encode_varints(values)
+                terms.append([term, len(rows), len(blob)])
+                blobs.append(blob)
+
+            header = zlib.compress(
+                json.dumps(
+                    {
+                        "k1": self.k1,
+                        "b": self.b,
+                        "corpus_version": self.corpus_version,
+                        "chunks": chunks,
+                        "terms": terms,
+                    },
+                    separators=(",", ":"),
+                ).encode("utf-8")
+            )
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(SEGMENT_MAGIC + bytes([SEGMENT_VERSION]))
+            f.write(struct.pack(">I", len(header)))
+            f.write(header)
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        """
+        Load a segment written by save().
+
+        Args:
+            path: Segment file path
+
+        Returns:
+            Loaded index
+
+        Raises:
+            ValueError: If the file is not a supported segment
+        """
+        # Stamped before reading, so a concurrent rewrite is seen as newer
+        stamp = file_stamp(Path(path))
+        with open(path, "rb") as f:
+            data = f.read()
+
+        if data[: len(SEGMENT_MAGIC)] != SEGMENT_MAGIC or data[len(SEGMENT_MAGIC)] != SEGMENT_VERSION:
+            raise ValueError(f"Unsupported BM25 segment: {path}")
+
+        offset = len(SEGMENT_MAGIC) + 1
+        (header_length,) = struct.unpack_from(">I", data, offset)
+        offset += 4
+        header = json.loads(zlib.decompress(data[offset : offset + header_length]))
+        offset += header_length
+
+        index = cls(k1=header["k1"], b=header["b"])
+        index.corpus_version = header.get("corpus_version")
+        index.file_stamp = stamp
+        for chunk_id, document_id, length, page_numbers, content in header["chunks"]:
+            index._documents.setdefault(document_id, []).append(len(index._rows))
+            index._rows.append(IndexedChunk(chunk_id, document_id, content, page_numbers, length))
+            index._total_length += length
+        index._live_rows = len(index._rows)
+
+        for term, df, blob_length in header["terms"]:
+            values, _ = _decode_varints(data[offset : offset + blob_length], df * 2)
+            offset += blob_length
+            postings: Dict[int, int] = {}
+            row = 0
+            for i in range(0, len(values), 2):
+                row += values[i]
+                postings[row] = values[i + 1]
+            index._postings[term] = postings
+
+        return index
+
+
+class BM25KeywordStore(KeywordStore):
+    """Keyword search over per-tenant BM25 indexes."""
+
+    def __init__(self, root: Path, cache: Optional[TenantVectorCache] = None):
+        """
+        Initialize BM25 keyword store.
+
+        Args:
+            root: Directory containing one segment directory per tenant
+            cache: Loaded-tenant cache with size-based eviction (shared type
+                with the local vector stores)
+        """
+        self.root = Path(root)
+        self.cache = cache or TenantVectorCache()
+
+    def segment_path(self, tenant_id: UUID) -> Path:
+        """Segment file for a tenant."""
+        return self.root / str(tenant_id) / SEGMENT_FILE
+
+    def has_tenant(self, tenant_id: UUID) -> bool:
+        """Check whether a segment exists for a tenant."""
+        return self.segment_path(tenant_id).exists()
+
+    def index(self, tenant_id: UUID) -> BM25Index:
+        """
+        Get a tenant's index (loaded from its segment, or empty).
+
+        Args:
+            tenant_id: Tenant identifier
+
+        Returns:
+            Tenant index
+        """
+
+        def load() -> Tuple[Any, int]:
+            path = self.segment_path(tenant_id)
+            index = BM25Index.load(path) if path.exists() else BM25Index()
+            return index, index.nbytes()
+
+        loaded: BM25Index = self.cache.get_or_load(tenant_id, load)
+        return loaded
+
+    def add_document(self, tenant_id: UUID, document_id: UUID, chunks: Sequence[Dict[str, Any]]) -> int:
+        """Index (or re-index) one document for a tenant. Call save() to persist."""
+        return self.index(tenant_id).add_document(document_id, chunks)
+
+    def delete_document(self, tenant_id: UUID, document_id: UUID) -> int:
+        """Remove one document from a tenant's index. Call save() to persist."""
+        return self.index(tenant_id).delete_document(document_id)
+
+    def save(self, tenant_id: UUID) -> None:
+        """Write a tenant's index as a compact segment."""
+        self.index(tenant_id).save(self.segment_path(tenant_id))
+
+    def invalidate(self, tenant_id: UUID) -> None:
+        """Reload a tenant's segment on next use (after another process rewrote it)."""
+        self.cache.invalidate(tenant_id)
+
+    def is_current(self, tenant_id: UUID, corpus_version: int) -> bool:
+        """
+        Check whether a tenant's segment was built at a corpus version.
+
+        Blocking (may load the segment). A segment rewritten since it was
+        loaded is reloaded first.
+
+        Args:
+            tenant_id: Tenant identifier
+            corpus_version: Tenant's current corpus version
+
+        Returns:
+            True if the segment matches the tenant's chunks
+        """
+        index = self.index(tenant_id)
+        if index.corpus_version == corpus_version:
+            return True
+        path = self.segment_path(tenant_id)
+        if not path.exists() or file_stamp(path) == index.file_stamp:
+            return False
+        self.invalidate(tenant_id)
+        return self.index(tenant_id).corpus_version == corpus_version
+
+    async def search(
+        self,
+        tenant_id: Optional[UUID],
+        query: str,
+        match_count: int,
+        filter_document_ids: Optional[List[UUID]] = None,
+    ) -> List[KeywordMatch]:
+        """Rank the tenant's chunks by BM25 (off the event loop)."""
+        if tenant_id is None:
+            raise ValueError("Local keyword stores require a tenant_id")
+
+        def run() -> List[KeywordMatch]:
+            return [
+                KeywordMatch(
+                    chunk_id=UUID(chunk.chunk_id),
+                    document_id=UUID(chunk.document_id),
+                    content=chunk.content,
+                    page_numbers=chunk.page_numbers,
+                    score=score,
+                )
+                for chunk, score in self.index(tenant_id).search(query, match_count, filter_document_ids)
+            ]
+
+        return await asyncio.to_thread(run)
+
+    def variant(self) -> str:
+        """Describe the backend, for result cache keys."""
+        return "bm25"
+
+
+# Module-level shared BM25 store (None when not configured)
+_shared_store: Optional[BM25KeywordStore] = None
+_shared_store_loaded = False
+
+
+def get_local_keyword_store() -> Optional[BM25KeywordStore]:
+    """
+    Get the process-wide BM25 keyword store, if configured.
+
+    KEYWORD_STORE_BACKEND=bm25 enables it (default "postgres": none).
+    Segments are read from KEYWORD_STORE_PATH and the cache budget is
+    KEYWORD_STORE_CACHE_MB.
+
+    Returns:
+        Shared BM25 store, or None
+    """
+    global _shared_store, _shared_store_loaded
+    if not _shared_store_loaded:
+        _shared_store_loaded = True
+        if os.getenv("KEYWORD_STORE_BACKEND", "postgres") == "bm25":
+            root = Path(os.getenv("KEYWORD_STORE_PATH", "data/keyword_segments"))
+            cache = TenantVectorCache(int(os.getenv("KEYWORD_STORE_CACHE_MB", "512")) * 1024 * 1024)
+            _shared_store = BM25KeywordStore(root, cache)
+            logger.info("BM25 keyword store enabled", extra={"root": str(root)})
+    return _shared_store
+
+
+async def get_tenant_keyword_store(tenant_id: UUID) -> Optional[KeywordStore]:
+    """
+    Get the BM25 store for a tenant with an up-to-date segment.
+
+    Segments built before the tenant's latest chunk write (or without a
+    readable corpus version) are not served.
+
+    Args:
+        tenant_id: Tenant of the authenticated caller
+
+    Returns:
+        BM25 store, or None to use the Postgres RPC
+    """
+    store = get_local_keyword_store()
+    if store is None or not store.has_tenant(tenant_id):
+        return None
+
+    from src.search.result_cache import get_search_result_cache
+
+    version = await get_search_result_cache().get_version(tenant_id)
+    if version is None or not await asyncio.to_thread(store.is_current, tenant_id, version):
+        logger.debug(
+            "BM25 segment is stale, using Postgres",
+            extra={"tenant_id": str(tenant_id), "corpus_version": version},
+        )
+        return None
+    return store
@@ -0,0 +1,255 @@
+"""
+Query Embedding Cache - Understanding Plane
+
+Process-wide LRU + TTL cache for query embeddings with single-flight
+de-duplication. Repeated, paginated and concurrent identical queries share one
+embedding API call instead of paying 100-300ms each.
+
+Only query text is cached (never document content). Keys are the embedding
+model, its output dimensions and the normalized query text, so they carry no
+tenant data and can be shared across tenants safely.
+"""
+
+import asyncio
+import functools
+import logging
+from array import array
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from cachetools import TTLCache
+
+from src.search.embeddings import EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+# Each entry holds ~12KB (1536 float64 values), so 1024 entries is ~12MB.
+CACHE_TTL_SECONDS = 3600  # 1 hour
+CACHE_MAX_SIZE = 1024
+
+CacheKey = Tuple[Hashable, Hashable, str]
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize query text for cache keys.
+
+    Collapses whitespace and case-folds, so "Base  Rent" and "base rent" share
+    an entry.
+
+    Args:
+        text: Raw query text
+
+    Returns:
+        Normalized query text
+    """
+    return " ".join(text.split()).casefold()
+
+
+class QueryEmbeddingCache:
+    """
+    LRU + TTL cache for query embeddings with single-flight loading.
+
+    Concurrent requests for the same key await one in-flight embedding call.
+    The call runs as its own task, so a caller that is cancelled (for example
+    by a search deadline) does not cancel the load for the others, and the
+    result is still cached for the next request.
+    """
+
+    def __init__(self, maxsize: int = CACHE_MAX_SIZE, ttl: float = CACHE_TTL_SECONDS):
+        """
+        Initialize query embedding cache.
+
+        Args:
+            maxsize: Maximum number of cached embeddings (least recently used evicted first)
+            ttl: Time-to-live for each entry in seconds
+        """
+        self._cache: TTLCache[CacheKey, array[float]] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight: Dict[CacheKey, "asyncio.Task[List[float]]"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _key(self, embedding_service: EmbeddingService, text: str) -> CacheKey:
+        """Build cache key from model, output dimensions and normalized text."""
+        return (
+            getattr(embedding_service, "model", None),
+            getattr(embedding_service, "embedding_dimension", None),
+            normalize_query(text),
+        )
+
+    async def get_or_embed(self, embedding_service: EmbeddingService, text: str) -> List[float]:
+        """
+        Return the query embedding, embedding it at most once per key.
+
+        Args:
+            embedding_service: Service used on cache miss
+            text: Query text
+
+        Returns:
+            Embedding vector
+
+        Raises:
+            ValueError: If text is empty
+            Exception: If the embedding call fails (failures are not cached)
+        """
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("Text must be a non-empty string")
+
+        key = self._key(embedding_service, text)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached.tolist()
+
+        loop = asyncio.get_running_loop()
+        task = self._in_flight.get(key)
+        if task is not None and task.get_loop() is loop:
+            self.coalesced += 1
+            return list(await asyncio.shield(task))
+
+        self.misses += 1
+        task = loop.create_task(self._load(key, embedding_service, text))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return list(await asyncio.shield(task))
+
+    async def get_or_embed_many(
+        self,
+        embedding_service: EmbeddingService,
+        texts: List[str],
+    ) -> List[List[float]]:
+        """
+        Return embeddings for several queries with at most one embedding call.
+
+        Cached and in-flight keys are reused; the remaining distinct keys are
+        embedded together in a single EmbeddingService.embed() call.
+
+        Args:
+            embedding_service: Service used for cache misses
+            texts: Query texts
+
+        Returns:
+            Embedding vectors in the order of texts
+
+        Raises:
+            ValueError: If any text is empty
+            Exception: If the embedding call fails (failures are not cached)
+        """
+        if not all(isinstance(text, str) and text.strip() for text in texts):
+            raise ValueError("Text must be a non-empty string")
+
+        loop = asyncio.get_running_loop()
+        keys = [self._key(embedding_service, text) for text in texts]
+        loaded: Dict[CacheKey, List[float]] = {}
+        pending: Dict[CacheKey, "asyncio.Task[List[float]]"] = {}
+        missing: Dict[CacheKey, str] = {}
+
+        for key, text in zip(keys, texts):
+            if key in loaded or key in pending or key in missing:
+                continue
+            cached = self._cache.get(key)
+            if cached is not None:
+                self.hits += 1
+                loaded[key] = cached.tolist()
+                continue
+            task = self._in_flight.get(key)
+            if task is not None and task.get_loop() is loop:
+                self.coalesced += 1
+                pending[key] = task
+                continue
+            self.misses += 1
+            missing[key] = text
+
+        if missing:
+            batch = loop.create_task(self._load_many(embedding_service, missing))
+            for key in missing:
+                task = loop.create_task(self._await_key(batch, key))
+                self._in_flight[key] = task
+                task.add_done_callback(functools.partial(self._finish, key))
+                pending[key] = task
+
+        for key, task in pending.items():
+            loaded[key] = list(await asyncio.shield(task))
+
+        return [list(loaded[key]) for key in keys]
+
+    async def _load_many(
+        self,
+        embedding_service: EmbeddingService,
+        missing: Dict[CacheKey, str],
+    ) -> Dict[CacheKey, List[float]]:
+        """Embed several query texts in one call and store the results."""
+        embeddings = await embedding_service.embed(list(missing.values()))
+        loaded = dict(zip(missing, embeddings))
+        for key, embedding in loaded.items():
+            self._cache[key] = array("d", embedding)
+        return loaded
+
+    @staticmethod
+    async def _await_key(
+        batch: "asyncio.Task[Dict[CacheKey, List[float]]]",
+        key: CacheKey,
+    ) -> List[float]:
+        """Per-key view of a batch load (for single-flight waiters)."""
+        return (await asyncio.shield(batch))[key]
+
+    async def _load(
+        self,
+        key: CacheKey,
+        embedding_service: EmbeddingService,
+        text: str,
+    ) -> List[float]:
+        """Embed query text and store the result."""
+        embedding = await embedding_service.embed_single(text)
+        self._cache[key] = array("d", embedding)
+        return embedding
+
+    def _finish(self, key: CacheKey, task: "asyncio.Task[List[float]]") -> None:
+        """Clear the in-flight entry and consume unobserved failures."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(
+                "Query embedding load failed",
+                extra={"error": str(task.exception())},
+            )
+
+    def clear(self) -> None:
+        """Remove all cached embeddings and reset counters."""
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Mapping with size, hits, misses and coalesced request counts
+        """
+        return {
+            "size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+
+# Module-level shared cache used by HybridSearchService and rag.Retriever
+_shared_cache: Optional[QueryEmbeddingCache] = None
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """
+    Get the process-wide query embedding cache.
+
+    Returns:
+        Shared QueryEmbeddingCache instance
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = QueryEmbeddingCache()
+    return _shared_cache
@@ -7,7 +7,7 @@ Embeds text in batches for efficiency.
 
 import logging
 import os
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from openai import AsyncOpenAI
 
 logger = logging.getLogger(__name__)
@@ -15,32 +15,58 @@ logger = logging.getLogger(__name__)
 # OpenAI API key from environment
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 DEFAULT_BATCH_SIZE = 100  # OpenAI allows up to 2048 inputs per request
+DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
+FULL_EMBEDDING_DIMENSIONS = 1536
+
+# Dimensions of the half-precision expression index (053_compact_embeddings.sql).
+# Must match the subvector length used by the index and match_document_chunks_compact,
+# which projects the full query embedding itself (first N dims, re-normalized).
+COMPACT_EMBEDDING_DIMENSIONS = 768
 
 
 class EmbeddingService:
     """
     Service for generating text embeddings using OpenAI.
     
-    Uses text-embedding-3-small model (1536 dimensions).
+    Uses text-embedding-3-small model (1536 dimensions by default).
+    Supports the model's ``dimensions`` parameter for reduced-size vectors.
     Automatically batches requests for efficiency.
     """
     
-    def __init__(self, api_key: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        dimensions: Optional[int] = None,
+    ):
         """
         Initialize embedding service.
         
         Args:
             api_key: OpenAI API key (defaults to OPENAI_API_KEY env var)
             batch_size: Number of texts to embed per API call (default: 100)
+            dimensions: Optional reduced output size (default: full 1536).
+                Only for callers that store reduced vectors themselves;
+                document_chunks and the match RPCs are vector(1536).
         """
         api_key = api_key or OPENAI_API_KEY
         if not api_key:
             raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY environment variable.")
         
+        if dimensions is not None and not 1 <= dimensions <= FULL_EMBEDDING_DIMENSIONS:
+            raise ValueError(
+                f"dimensions must be between 1 and {FULL_EMBEDDING_DIMENSIONS}, got {dimensions}"
+            )
+        
         self.client = AsyncOpenAI(api_key=api_key)
-        self.model = "text-embedding-3-small"
+        self.model = DEFAULT_EMBEDDING_MODEL
         self.batch_size = batch_size
-        self.embedding_dimension = 1536
+        self.dimensions = dimensions
+        self.embedding_dimension = FULL_EMBEDDING_DIMENSIONS if dimensions is None else dimensions
+    
+    async def close(self) -> None:
+        """Close the OpenAI client and its connection pool."""
+        await self.client.close()
     
     async def embed(self, texts: List[str]) -> List[List[float]]:
         """
@@ -56,7 +82,7 @@ class EmbeddingService:
             texts: List of text strings to embed (should be redacted if containing PII)
             
         Returns:
-            List of embedding vectors (each is a list of 1536 floats)
+            List of embedding vectors (each is a list of ``embedding_dimension`` floats)
             
         Raises:
             ValueError: If texts list is empty or contains non-string values
@@ -75,11 +101,12 @@ class EmbeddingService:
         for i in range(0, len(texts), self.batch_size):
             batch = texts[i : i + self.batch_size]
             
+            request: Dict[str, Any] = {"model": self.model, "input": batch}
+            if self.dimensions is not None:
+                request["dimensions"] = self.dimensions
+            
             try:
-                response = await self.client.embeddings.create(
-                    model=self.model,
-                    input=batch
-                )
+                response = await self.client.embeddings.create(**request)
                 
                 batch_embeddings = [item.embedding for item in response.data]
                 all_embeddings.extend(batch_embeddings)
@@ -123,7 +150,7 @@ class EmbeddingService:
             text: Text string to embed
             
         Returns:
-            Embedding vector (list of 1536 floats)
+            Embedding vector (list of ``embedding_dimension`` floats)
         """
         if not isinstance(text, str) or not text.strip():
             raise ValueError("Text must be a non-empty string")
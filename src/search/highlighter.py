@@ -3,10 +3,201 @@ Search Highlighter - Understanding Plane
 
 Generates text snippets with highlighted query terms.
 Wraps matching terms in <mark> tags for UI rendering.
+
+Each query is compiled once into a single alternation pattern (cached and
+reused across all results), and each document is scanned in one pass. Terms
+match by stem, like Postgres' `english` text search configuration, so a
+search for "leases" highlights "lease" and "leased".
+
+OPTIONAL: Uses the snowballstemmer library (the Snowball English stemmer that
+Postgres uses) when installed, otherwise a light suffix-stripping stemmer.
 """
 
 import re
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Literal, Optional, Pattern, Tuple
+
+try:
+    import snowballstemmer
+    _snowball = snowballstemmer.stemmer("english")
+    SNOWBALL_AVAILABLE = True
+except ImportError:
+    _snowball = None
+    SNOWBALL_AVAILABLE = False
+
+# Matching modes:
+# - stem: word stem equals a query term stem (plainto_tsquery('english', ...))
+# - prefix: word stem starts with a query term stem (to_tsquery('term:*'))
+HighlightMode = Literal["stem", "prefix"]
+
+# Postgres `english` configuration stop words (snowball english.stop)
+ENGLISH_STOP_WORDS: FrozenSet[str] = frozenset({
+    "i", "me", "my", "myself", "we", "our", "ours", "ourselves", "you", "your",
+    "yours", "yourself", "yourselves", "he", "him", "his", "himself", "she", "her",
+    "hers", "herself", "it", "its", "itself", "they", "them", "their", "theirs",
+    "themselves", "what", "which", "who", "whom", "this", "that", "these", "those",
+    "am", "is", "are", "was", "were", "be", "been", "being", "have", "has", "had",
+    "having", "do", "does", "did", "doing", "a", "an", "the", "and", "but", "if",
+    "or", "because", "as", "until", "while", "of", "at", "by", "for", "with",
+    "about", "against", "between", "into", "through", "during", "before", "after",
+    "above", "below", "to", "from", "up", "down", "in", "out", "on", "off", "over",
+    "under", "again", "further", "then", "once", "here", "there", "when", "where",
+    "why", "how", "all", "any", "both", "each", "few", "more", "most", "other",
+    "some", "such", "no", "nor", "not", "only", "own", "same", "so", "than", "too",
+    "very", "s", "t", "can", "will", "just", "don", "should", "now",
+})
+
+# Fallback stemmer suffixes (checked in order, first match wins)
+_FALLBACK_SUFFIXES: Tuple[Tuple[str, str], ...] = (
+    ("sses", "ss"),
+    ("ies", "i"),
+    ("ied", "i"),
+    ("ings", ""),
+    ("ing", ""),
+    ("edly", ""),
+    ("ed", ""),
+    ("ly", ""),
+    ("es", ""),
+    ("s", ""),
+)
+
+# Upper bound on remembered word decisions per compiled query
+MAX_CACHED_DECISIONS = 4096
+
+_TERM_PATTERN = re.compile(r"\b\w+\b")
+
+Match = Tuple[int, int, str]
+
+
+@lru_cache(maxsize=8192)
+def stem(word: str) -> str:
+    """
+    Stem a lowercase word the way the Postgres `english` configuration does.
+
+    Args:
+        word: Lowercase word
+
+    Returns:
+        Word stem
+    """
+    if _snowball is not None:
+        return str(_snowball.stemWord(word))
+
+    for suffix, replacement in _FALLBACK_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            if suffix == "s" and word.endswith(("ss", "us", "is")):
+                break
+            word = word[: -len(suffix)] + replacement
+            break
+    if word.endswith("y") and len(word) > 3 and word[-2] not in "aeiou":
+        word = word[:-1] + "i"
+    elif word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def extract_query_terms(query: str) -> List[str]:
+    """
+    Extract individual query terms from query string.
+
+    Splits on whitespace and punctuation and removes stop words.
+    Filters out very short terms (< 2 chars).
+
+    Args:
+        query: Search query string
+
+    Returns:
+        List of normalized query terms
+    """
+    terms = _TERM_PATTERN.findall(query.lower())
+    return [term for term in terms if term not in ENGLISH_STOP_WORDS and len(term) >= 2]
+
+
+class QueryMatcher:
+    """
+    Compiled matcher for one query.
+
+    Holds a single case-insensitive alternation of stem prefixes. Candidate
+    words are found in one pass over the content and kept only if their stem
+    matches a query term stem.
+    """
+
+    def __init__(self, terms: List[str], mode: HighlightMode = "stem"):
+        """
+        Compile matcher for query terms.
+
+        Args:
+            terms: Normalized query terms (see extract_query_terms)
+            mode: 'stem' for exact stem matches, 'prefix' for stem prefixes
+        """
+        self.mode = mode
+        self.stems: FrozenSet[str] = frozenset(stem(term) for term in terms)
+
+        # Stemming can rewrite the word ending (y -> i, dropped e), so the
+        # pattern matches on the part of each stem every surface form shares.
+        prefixes = {
+            term_stem[:-1] if len(term_stem) > 2 and term_stem[-1] in "ei" else term_stem
+            for term_stem in self.stems
+        }
+        # Per-word stem decisions, so repeated words are checked once
+        self._decisions: Dict[str, bool] = {}
+
+        alternation = "|".join(re.escape(prefix) for prefix in sorted(prefixes, key=len, reverse=True))
+        # First-character lookahead lets the scan skip most word starts cheaply
+        first_chars = "".join(sorted({re.escape(prefix[0]) for prefix in prefixes}))
+        self.pattern: Pattern[str] = re.compile(
+            r"\b(?=[" + first_chars + r"])(?:" + alternation + r")\w*",
+            re.IGNORECASE,
+        )
+
+    def find_matches(self, content: str) -> List[Match]:
+        """
+        Find all query term matches in content in a single pass.
+
+        Args:
+            content: Text content to search
+
+        Returns:
+            List of (start_pos, end_pos, matched_word) tuples in position order
+        """
+        decisions = self._decisions
+        matches = []
+        for match in self.pattern.finditer(content):
+            word = match.group()
+            keep = decisions.get(word)
+            if keep is None:
+                keep = self._matches_stem(stem(word.lower()))
+                if len(decisions) < MAX_CACHED_DECISIONS:
+                    decisions[word] = keep
+            if keep:
+                matches.append((match.start(), match.end(), word))
+        return matches
+
+    def _matches_stem(self, word_stem: str) -> bool:
+        """Check a content word stem against the query stems."""
+        if word_stem in self.stems:
+            return True
+        if self.mode == "prefix":
+            return any(word_stem.startswith(term_stem) for term_stem in self.stems)
+        return False
+
+
+@lru_cache(maxsize=256)
+def compile_query(query: str, mode: HighlightMode = "stem") -> Optional[QueryMatcher]:
+    """
+    Compile (or reuse) the matcher for a query.
+
+    Args:
+        query: Search query string
+        mode: 'stem' or 'prefix' matching
+
+    Returns:
+        QueryMatcher, or None if the query has no searchable terms
+    """
+    terms = extract_query_terms(query)
+    if not terms:
+        return None
+    return QueryMatcher(terms, mode)
 
 
 class SearchHighlighter:
@@ -21,6 +212,7 @@ class SearchHighlighter:
         self,
         snippet_length: int = 200,
         max_highlights: int = 3,
+        match_mode: HighlightMode = "stem",
     ):
         """
         Initialize search highlighter.
@@ -28,9 +220,11 @@ class SearchHighlighter:
         Args:
             snippet_length: Target length of snippet in characters (default 200)
             max_highlights: Maximum number of highlight snippets per result (default 3)
+            match_mode: 'stem' (like plainto_tsquery) or 'prefix' (like 'term:*')
         """
         self.snippet_length = snippet_length
         self.max_highlights = max_highlights
+        self.match_mode = match_mode
 
     def highlight(self, content: str, query: str) -> List[str]:
         """
@@ -50,13 +244,13 @@ class SearchHighlighter:
         if not content or not query:
             return []
 
-        # Extract individual query terms (split on whitespace)
-        query_terms = self._extract_query_terms(query)
-        if not query_terms:
+        # Compiled once per query and shared across results
+        matcher = compile_query(query, self.match_mode)
+        if matcher is None:
             return []
 
         # Find all matches in content
-        matches = self._find_matches(content, query_terms)
+        matches = matcher.find_matches(content)
         if not matches:
             return []
 
@@ -70,57 +264,18 @@ class SearchHighlighter:
         """
         Extract individual query terms from query string.
 
-        Splits on whitespace and removes common stop words.
-        Filters out very short terms (< 2 chars).
-
         Args:
             query: Search query string
 
         Returns:
             List of normalized query terms
         """
-        # Split on whitespace and punctuation
-        terms = re.findall(r'\b\w+\b', query.lower())
-
-        # Filter out stop words and very short terms
-        stop_words = {'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for',
-                      'from', 'has', 'he', 'in', 'is', 'it', 'its', 'of', 'on',
-                      'that', 'the', 'to', 'was', 'will', 'with'}
-
-        return [term for term in terms if term not in stop_words and len(term) >= 2]
-
-    def _find_matches(self, content: str, query_terms: List[str]) -> List[Tuple[int, int, str]]:
-        """
-        Find all matches of query terms in content.
-
-        Uses case-insensitive word boundary matching.
-
-        Args:
-            content: Text content to search
-            query_terms: List of terms to find
-
-        Returns:
-            List of (start_pos, end_pos, matched_term) tuples
-        """
-        matches = []
-
-        for term in query_terms:
-            # Use word boundary regex for whole-word matching
-            # Case-insensitive matching
-            pattern = re.compile(r'\b' + re.escape(term) + r'\b', re.IGNORECASE)
-
-            for match in pattern.finditer(content):
-                matches.append((match.start(), match.end(), match.group()))
-
-        # Sort matches by position
-        matches.sort(key=lambda x: x[0])
-
-        return matches
+        return extract_query_terms(query)
 
     def _generate_snippets(
         self,
         content: str,
-        matches: List[Tuple[int, int, str]],
+        matches: List[Match],
     ) -> List[str]:
         """
         Generate snippets centered around matches.
@@ -138,11 +293,12 @@ class SearchHighlighter:
             return []
 
         snippets = []
-        used_positions = set()
+        # Matches are in position order, so covered ranges only grow rightwards
+        covered_until = 0
 
         for start, end, term in matches:
             # Skip if this match is already covered by a previous snippet
-            if start in used_positions:
+            if start < covered_until:
                 continue
 
             # Calculate snippet boundaries
@@ -168,8 +324,7 @@ class SearchHighlighter:
             snippets.append(snippet)
 
             # Mark entire snippet range as used to avoid overlapping snippets
-            for pos in range(snippet_start, snippet_end):
-                used_positions.add(pos)
+            covered_until = max(covered_until, snippet_end)
 
         return snippets
 
@@ -208,7 +363,7 @@ class SearchHighlighter:
     def _highlight_terms(
         self,
         snippet: str,
-        matches: List[Tuple[int, int, str]],
+        matches: List[Match],
         snippet_start: int,
     ) -> str:
         """
@@ -233,12 +388,12 @@ class SearchHighlighter:
         if not relevant_matches:
             return snippet
 
-        # Sort matches by position (descending) to avoid offset issues
-        relevant_matches.sort(key=lambda x: x[0], reverse=True)
-
-        # Insert <mark> tags (backward to avoid position shifts)
-        result = snippet
+        # Build the snippet left to right in one pass
+        parts: List[str] = []
+        position = 0
         for start, end, term in relevant_matches:
-            result = result[:start] + "<mark>" + result[start:end] + "</mark>" + result[end:]
+            parts.extend((snippet[position:start], "<mark>", snippet[start:end], "</mark>"))
+            position = end
+        parts.append(snippet[position:])
 
-        return result
+        return "".join(parts)
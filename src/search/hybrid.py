@@ -5,17 +5,51 @@ Combines vector (semantic) and keyword (lexical) search using Reciprocal Rank Fu
 Provides significantly better search results than either method alone.
 """
 
+import asyncio
 import logging
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any, Literal
+from typing import TYPE_CHECKING, Any, Awaitable, Dict, List, Literal, Optional, TypeVar
 from uuid import UUID
 from supabase import Client
 
+from src.search.embedding_cache import QueryEmbeddingCache, get_query_embedding_cache
 from src.search.embeddings import EmbeddingService
+from src.search.keyword_store import KeywordStore, PostgresKeywordStore
+from src.search.vector_store import (
+    DEFAULT_EXACT_SEARCH_MAX_CHUNKS,
+    DEFAULT_RESCORE_FACTOR,
+    PostgresVectorStore,
+    VectorIndex,
+    VectorStore,
+)
+
+if TYPE_CHECKING:
+    from src.search.result_cache import SearchResultCache
 
 logger = logging.getLogger(__name__)
 
-SearchMode = Literal["hybrid", "semantic", "keyword"]
+T = TypeVar("T")
+
+SearchMode = Literal["hybrid", "semantic", "keyword", "fuzzy"]
+HybridFusion = Literal["application", "database"]
+
+# Per-leg deadlines for hybrid search (seconds). The semantic leg includes the
+# embedding API call, so it gets the larger budget.
+DEFAULT_VECTOR_TIMEOUT_SECONDS = 2.0
+DEFAULT_KEYWORD_TIMEOUT_SECONDS = 1.5
+
+# Minimum pg_trgm word_similarity for the fuzzy keyword leg
+DEFAULT_FUZZY_THRESHOLD = 0.5
+
+# search_many: one deadline for the whole batch, and at most this many
+# queries in flight (each runs up to three legs in the thread pool)
+DEFAULT_BATCH_TIMEOUT_SECONDS = 5.0
+DEFAULT_BATCH_CONCURRENCY = 8
+
+# Set when the current search degraded to a single leg; such results are not
+# cached, so the next request gets a full search.
+_search_degraded: ContextVar[bool] = ContextVar("search_degraded", default=False)
 
 
 @dataclass
@@ -30,6 +64,57 @@ class SearchResult:
     metadata: Optional[Dict[str, Any]] = None
 
 
+@dataclass
+class BatchSearchResult:
+    """Results (or the error) for one query of a batch search."""
+
+    query: str
+    results: List[SearchResult]
+    error: Optional[str] = None
+
+
+def reciprocal_rank_fusion(rankings: List[List[SearchResult]], k: int = 60) -> List[SearchResult]:
+    """
+    Combine rankings using Reciprocal Rank Fusion.
+
+    RRF formula: score = sum(1 / (k + rank)) over the rankings that contain a
+    chunk, where rank starts at 1 for the top result. Each ranking has the
+    same weight; for a chunk in several rankings, the first ranking's result
+    supplies content and metadata.
+
+    Args:
+        rankings: Result lists, each sorted by relevance
+        k: RRF constant (default 60)
+
+    Returns:
+        Combined results sorted by RRF score (descending)
+    """
+    scores: Dict[UUID, float] = {}
+    result_map: Dict[UUID, SearchResult] = {}
+
+    for ranking in rankings:
+        for rank, result in enumerate(ranking):
+            chunk_id = result.chunk_id
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + rank + 1)
+            if chunk_id not in result_map:
+                result_map[chunk_id] = result
+
+    # Sort by combined score (descending)
+    sorted_ids = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+
+    return [
+        SearchResult(
+            chunk_id=result_map[chunk_id].chunk_id,
+            document_id=result_map[chunk_id].document_id,
+            content=result_map[chunk_id].content,
+            page_numbers=result_map[chunk_id].page_numbers,
+            score=rrf_score,
+            metadata=result_map[chunk_id].metadata,
+        )
+        for chunk_id, rrf_score in sorted_ids
+    ]
+
+
 class HybridSearchService:
     """
     Service for hybrid search combining vector and keyword search.
@@ -43,6 +128,20 @@ class HybridSearchService:
         supabase_client: Client,
         embedding_service: EmbeddingService,
         rrf_k: int = 60,
+        vector_index: VectorIndex = "full",
+        rescore_factor: int = DEFAULT_RESCORE_FACTOR,
+        vector_timeout: Optional[float] = DEFAULT_VECTOR_TIMEOUT_SECONDS,
+        keyword_timeout: Optional[float] = DEFAULT_KEYWORD_TIMEOUT_SECONDS,
+        hybrid_fusion: HybridFusion = "application",
+        query_cache: Optional[QueryEmbeddingCache] = None,
+        tenant_id: Optional[UUID] = None,
+        result_cache: Optional["SearchResultCache"] = None,
+        ef_search: Optional[int] = None,
+        exact_search_max_chunks: int = DEFAULT_EXACT_SEARCH_MAX_CHUNKS,
+        vector_store: Optional[VectorStore] = None,
+        keyword_store: Optional[KeywordStore] = None,
+        fuzzy_keyword: bool = False,
+        fuzzy_threshold: float = DEFAULT_FUZZY_THRESHOLD,
     ):
         """
         Initialize hybrid search service.
@@ -51,10 +150,71 @@ class HybridSearchService:
             supabase_client: Supabase client with user JWT (for tenant isolation)
             embedding_service: Service for generating query embeddings
             rrf_k: RRF constant (default 60, standard value from literature)
+            vector_index: "full" for the float32 HNSW index, "compact" for the
+                768-dim halfvec index (053_compact_embeddings.sql)
+            rescore_factor: With the compact index, fetch limit * rescore_factor
+                candidates and re-rank them with full-precision vectors
+                (1 or less disables re-scoring)
+            vector_timeout: Hybrid-mode deadline for the semantic leg in seconds
+                (None disables). On timeout, hybrid degrades to keyword-only.
+            keyword_timeout: Hybrid-mode deadline for the keyword leg in seconds
+                (None disables). On timeout, hybrid degrades to semantic-only.
+            hybrid_fusion: "application" runs both legs and fuses in Python;
+                "database" uses match_document_chunks_hybrid, which fuses in
+                SQL and returns only the final rows in one round trip
+                (full-precision index only; the compact index and the fuzzy
+                leg fall back to application fusion)
+            query_cache: Query embedding cache (defaults to the process-wide
+                cache shared with rag.Retriever)
+            tenant_id: Tenant of the supabase_client JWT; required for result caching
+            result_cache: Tenant-versioned result cache (None disables caching)
+            ef_search: HNSW candidate list size per query (None means 40;
+                always raised to the result limit). Higher values raise
+                recall and latency. Full-precision index only.
+            exact_search_max_chunks: Filtered semantic searches over at most
+                this many chunks are scored exactly instead of through the
+                HNSW index (0 disables). Full-precision index only.
+            vector_store: Backend for the semantic leg (default:
+                PostgresVectorStore built from the settings above). Local
+                stores need tenant_id.
+            keyword_store: Backend for the keyword leg (default:
+                PostgresKeywordStore, ts_rank). Local stores need tenant_id.
+            fuzzy_keyword: Add match_document_chunks_fuzzy (prefix and trigram
+                matching, 058_fuzzy_keyword_search.sql) to hybrid search as a
+                third RRF leg, under keyword_timeout
+            fuzzy_threshold: Minimum word similarity (0-1) for trigram
+                matches; lower tolerates more typos
         """
+        if hybrid_fusion not in ("application", "database"):
+            raise ValueError(f"Invalid hybrid fusion: {hybrid_fusion}")
+
+        if not 0.0 <= fuzzy_threshold <= 1.0:
+            raise ValueError(f"Invalid fuzzy threshold: {fuzzy_threshold}")
+
+        # Validates vector_index and ef_search even when a store is injected
+        default_store = PostgresVectorStore(
+            supabase_client,
+            vector_index=vector_index,
+            rescore_factor=rescore_factor,
+            ef_search=ef_search,
+            exact_search_max_chunks=exact_search_max_chunks,
+        )
+
         self.client = supabase_client
         self.embedding_service = embedding_service
         self.rrf_k = rrf_k
+        self.vector_index = vector_index
+        self.rescore_factor = rescore_factor
+        self.vector_timeout = vector_timeout
+        self.keyword_timeout = keyword_timeout
+        self.hybrid_fusion = hybrid_fusion
+        self.query_cache = query_cache or get_query_embedding_cache()
+        self.tenant_id = tenant_id
+        self.result_cache = result_cache
+        self.vector_store = vector_store or default_store
+        self.keyword_store = keyword_store or PostgresKeywordStore(supabase_client)
+        self.fuzzy_keyword = fuzzy_keyword
+        self.fuzzy_threshold = fuzzy_threshold
 
     async def search(
         self,
@@ -69,9 +229,13 @@ class HybridSearchService:
         SECURITY: Tenant isolation enforced by database functions.
         Database functions extract tenant_id from JWT token.
 
+        With a result_cache and tenant_id, results are served from the cache
+        until the tenant's corpus version changes. Degraded (single-leg)
+        hybrid results are not cached.
+
         Args:
             query: Search query text
-            mode: Search mode (hybrid, semantic, or keyword)
+            mode: Search mode (hybrid, semantic, keyword, or fuzzy)
             limit: Maximum number of results to return
             filter_document_ids: Optional list of document IDs to filter
 
@@ -84,14 +248,185 @@ class HybridSearchService:
         if not query or not query.strip():
             raise ValueError("Query must be a non-empty string")
 
-        if mode not in ("hybrid", "semantic", "keyword"):
+        if mode not in ("hybrid", "semantic", "keyword", "fuzzy"):
+            raise ValueError(f"Invalid search mode: {mode}")
+
+        # Result cache (only with a tenant; entries are tenant-versioned)
+        result_cache = self.result_cache if self.tenant_id is not None else None
+        corpus_version: Optional[int] = None
+
+        if result_cache is not None and self.tenant_id is not None:
+            corpus_version = await result_cache.get_version(self.tenant_id)
+            if corpus_version is not None:
+                cached = await result_cache.get(
+                    self.tenant_id,
+                    corpus_version,
+                    query,
+                    mode,
+                    limit,
+                    filter_document_ids=filter_document_ids,
+                    variant=self._cache_variant(),
+                )
+                if cached is not None:
+                    return cached
+
+        token = _search_degraded.set(False)
+        try:
+            results = await self._search_mode(query, mode, limit, filter_document_ids)
+            degraded = _search_degraded.get()
+        finally:
+            _search_degraded.reset(token)
+
+        if (
+            result_cache is not None
+            and self.tenant_id is not None
+            and corpus_version is not None
+            and not degraded
+        ):
+            await result_cache.set(
+                self.tenant_id,
+                corpus_version,
+                query,
+                mode,
+                limit,
+                results,
+                filter_document_ids=filter_document_ids,
+                variant=self._cache_variant(),
+            )
+
+        return results
+
+    async def search_many(
+        self,
+        queries: List[str],
+        mode: SearchMode = "hybrid",
+        limit: int = 20,
+        filter_document_ids: Optional[List[UUID]] = None,
+        timeout: Optional[float] = DEFAULT_BATCH_TIMEOUT_SECONDS,
+        max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    ) -> List[BatchSearchResult]:
+        """
+        Search several queries with one embedding call and a shared deadline.
+
+        All query embeddings are fetched up front through one
+        EmbeddingService.embed() call (cached ones are reused), then each
+        distinct query runs through search() concurrently. Queries that have
+        not finished when the batch deadline passes are cancelled and
+        reported with an error; the others keep their results.
+
+        If the batch embedding call fails, hybrid queries degrade to
+        keyword-only results and semantic queries report the error.
+
+        Args:
+            queries: Search query texts
+            mode: Search mode for every query
+            limit: Maximum number of results per query
+            filter_document_ids: Optional document ID filter for every query
+            timeout: Deadline for the whole batch in seconds (None disables)
+            max_concurrency: Maximum number of queries searched at once
+
+        Returns:
+            One BatchSearchResult per query, in input order
+
+        Raises:
+            ValueError: If queries is empty, a query is empty, or mode is invalid
+        """
+        if not queries:
+            raise ValueError("Queries must be a non-empty list")
+
+        if not all(isinstance(query, str) and query.strip() for query in queries):
+            raise ValueError("Query must be a non-empty string")
+
+        if mode not in ("hybrid", "semantic", "keyword", "fuzzy"):
             raise ValueError(f"Invalid search mode: {mode}")
 
-        # Execute search based on mode
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        distinct = list(dict.fromkeys(queries))
+
+        embedding_error: Optional[Exception] = None
+        if mode in ("hybrid", "semantic"):
+            try:
+                await self._with_deadline(
+                    self.query_cache.get_or_embed_many(self.embedding_service, distinct),
+                    timeout,
+                )
+            except Exception as e:
+                embedding_error = e
+                logger.warning(
+                    "Batch query embedding unavailable",
+                    extra={
+                        "query_count": len(distinct),
+                        "timed_out": isinstance(e, asyncio.TimeoutError),
+                        "error": repr(e),
+                    },
+                )
+
+        semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+        async def run(query: str) -> List[SearchResult]:
+            async with semaphore:
+                if embedding_error is None:
+                    return await self.search(query, mode, limit, filter_document_ids)
+                if mode == "semantic":
+                    raise embedding_error
+                # Hybrid without embeddings: keyword-only, as in _hybrid_search
+                keyword_results = await self._keyword_search(query, limit * 2, filter_document_ids)
+                return self._reciprocal_rank_fusion([], keyword_results, k=self.rrf_k)[:limit]
+
+        tasks = {query: asyncio.ensure_future(run(query)) for query in distinct}
+        remaining = None if deadline is None else max(deadline - loop.time(), 0.0)
+        _, not_done = await asyncio.wait(tasks.values(), timeout=remaining)
+        for task in not_done:
+            task.cancel()
+
+        outcomes: Dict[str, BatchSearchResult] = {}
+        for query, task in tasks.items():
+            if task in not_done:
+                outcomes[query] = BatchSearchResult(query=query, results=[], error="Search timed out")
+            elif task.exception() is not None:
+                logger.warning(
+                    "Batch search query failed",
+                    extra={"error": repr(task.exception())},
+                )
+                outcomes[query] = BatchSearchResult(query=query, results=[], error="Search failed")
+            else:
+                outcomes[query] = BatchSearchResult(query=query, results=task.result())
+
+        logger.info(
+            "Batch search completed",
+            extra={
+                "query_count": len(queries),
+                "distinct_count": len(distinct),
+                "timed_out": len(not_done),
+                "mode": mode,
+            },
+        )
+
+        return [outcomes[query] for query in queries]
+
+    def _cache_variant(self) -> str:
+        """Describe the settings that change results, for result cache keys."""
+        fuzzy = f"fuzzy{self.fuzzy_threshold}" if self.fuzzy_keyword else "exact"
+        return (
+            f"{self.vector_store.variant()}:{self.keyword_store.variant()}:"
+            f"{self.hybrid_fusion}:{self.rrf_k}:{fuzzy}"
+        )
+
+    async def _search_mode(
+        self,
+        query: str,
+        mode: SearchMode,
+        limit: int,
+        filter_document_ids: Optional[List[UUID]],
+    ) -> List[SearchResult]:
+        """Execute search based on mode (uncached)."""
         if mode == "hybrid":
             return await self._hybrid_search(query, limit, filter_document_ids)
         elif mode == "semantic":
             return await self._vector_search(query, limit, filter_document_ids)
+        elif mode == "fuzzy":
+            return await self._fuzzy_search(query, limit, filter_document_ids)
         else:  # keyword
             return await self._keyword_search(query, limit, filter_document_ids)
 
@@ -110,44 +445,72 @@ class HybridSearchService:
             filter_document_ids: Optional document ID filter
 
         Returns:
-            List of SearchResult objects sorted by similarity
+            List of SearchResult objects sorted by similarity (metadata holds
+            the chunk's section_header and token_count)
         """
-        # Generate query embedding
-        query_embedding = await self.embedding_service.embed_single(query)
+        # Generate query embedding (cached and de-duplicated across requests)
+        query_embedding = await self.query_cache.get_or_embed(self.embedding_service, query)
+
+        matches = await self.vector_store.search(
+            self.tenant_id,
+            query_embedding,
+            limit,
+            filter_document_ids,
+        )
 
-        # Convert UUID list to string list for RPC call
-        doc_ids = [str(doc_id) for doc_id in filter_document_ids] if filter_document_ids else None
+        return [
+            SearchResult(
+                chunk_id=match.chunk_id,
+                document_id=match.document_id,
+                content=match.content,
+                page_numbers=match.page_numbers,
+                score=match.similarity,
+                metadata={"section_header": match.section_header, "token_count": match.token_count},
+            )
+            for match in matches
+        ]
 
-        # Call vector search function
-        result = self.client.rpc(
-            "match_document_chunks",
-            {
-                "query_embedding": query_embedding,
-                "match_count": limit,
-                "filter_document_ids": doc_ids,
-            }
-        ).execute()
+    async def _keyword_search(
+        self,
+        query: str,
+        limit: int,
+        filter_document_ids: Optional[List[UUID]],
+    ) -> List[SearchResult]:
+        """
+        Perform keyword search through the configured keyword store.
+
+        Args:
+            query: Search query text
+            limit: Maximum number of results
+            filter_document_ids: Optional document ID filter
+
+        Returns:
+            List of SearchResult objects sorted by keyword score
+        """
+        matches = await self.keyword_store.search(
+            self.tenant_id, query, limit, filter_document_ids
+        )
 
         # Convert to SearchResult objects
         return [
             SearchResult(
-                chunk_id=UUID(row["id"]),
-                document_id=UUID(row["document_id"]),
-                content=row["content"],
-                page_numbers=row.get("page_numbers"),
-                score=float(row["similarity"]),
+                chunk_id=match.chunk_id,
+                document_id=match.document_id,
+                content=match.content,
+                page_numbers=match.page_numbers,
+                score=match.score,
             )
-            for row in result.data
+            for match in matches
         ]
 
-    async def _keyword_search(
+    async def _fuzzy_search(
         self,
         query: str,
         limit: int,
         filter_document_ids: Optional[List[UUID]],
     ) -> List[SearchResult]:
         """
-        Perform keyword search using PostgreSQL full-text search.
+        Perform prefix and typo-tolerant keyword search (pg_trgm + prefix tsquery).
 
         Args:
             query: Search query text
@@ -155,22 +518,20 @@ class HybridSearchService:
             filter_document_ids: Optional document ID filter
 
         Returns:
-            List of SearchResult objects sorted by text rank
+            List of SearchResult objects sorted by match rank
         """
-        # Convert UUID list to string list for RPC call
         doc_ids = [str(doc_id) for doc_id in filter_document_ids] if filter_document_ids else None
 
-        # Call keyword search function
-        result = self.client.rpc(
-            "match_document_chunks_keyword",
+        result = await self._execute_rpc(
+            "match_document_chunks_fuzzy",
             {
                 "query_text": query,
                 "match_count": limit,
                 "filter_document_ids": doc_ids,
-            }
-        ).execute()
+                "similarity_threshold": self.fuzzy_threshold,
+            },
+        )
 
-        # Convert to SearchResult objects
         return [
             SearchResult(
                 chunk_id=UUID(row["id"]),
@@ -194,6 +555,13 @@ class HybridSearchService:
         Combines vector and keyword search results using RRF algorithm.
         RRF gives equal weight to both ranking methods.
 
+        Both legs run concurrently, each under its own deadline, so latency
+        approaches max(vector, keyword) instead of the sum. If one leg misses
+        its deadline or fails, results degrade to the other leg alone.
+
+        With fuzzy_keyword, the fuzzy leg runs alongside under keyword_timeout
+        and is fused as a third ranking; if it fails, the other two are used.
+
         Args:
             query: Search query text
             limit: Maximum number of results
@@ -201,30 +569,234 @@ class HybridSearchService:
 
         Returns:
             List of SearchResult objects sorted by combined RRF score
+
+        Raises:
+            Exception: If every leg fails
         """
+        # Database fusion runs both legs in SQL, so only with the Postgres stores,
+        # the full-precision index and without the fuzzy leg
+        if (
+            self.hybrid_fusion == "database"
+            and not self.fuzzy_keyword
+            and isinstance(self.vector_store, PostgresVectorStore)
+            and self.vector_store.vector_index == "full"
+            and isinstance(self.keyword_store, PostgresKeywordStore)
+        ):
+            return await self._database_hybrid_search(query, limit, filter_document_ids)
+
         # Fetch more results from each method to improve RRF quality
         fetch_limit = limit * 2
 
-        # Run both searches in parallel (if possible)
-        # For now, run sequentially since we're using async
-        vector_results = await self._vector_search(query, fetch_limit, filter_document_ids)
-        keyword_results = await self._keyword_search(query, fetch_limit, filter_document_ids)
+        legs = [
+            self._with_deadline(
+                self._vector_search(query, fetch_limit, filter_document_ids),
+                self.vector_timeout,
+            ),
+            self._with_deadline(
+                self._keyword_search(query, fetch_limit, filter_document_ids),
+                self.keyword_timeout,
+            ),
+        ]
+        if self.fuzzy_keyword:
+            legs.append(
+                self._with_deadline(
+                    self._fuzzy_search(query, fetch_limit, filter_document_ids),
+                    self.keyword_timeout,
+                )
+            )
+
+        vector_outcome, keyword_outcome, *fuzzy_outcomes = await asyncio.gather(
+            *legs, return_exceptions=True
+        )
 
-        # Apply Reciprocal Rank Fusion
+        if (
+            isinstance(vector_outcome, BaseException)
+            and isinstance(keyword_outcome, BaseException)
+            and all(isinstance(outcome, BaseException) for outcome in fuzzy_outcomes)
+        ):
+            logger.error(
+                "All hybrid search legs failed",
+                extra={
+                    "vector_error": repr(vector_outcome),
+                    "keyword_error": repr(keyword_outcome),
+                },
+            )
+            raise keyword_outcome
+
+        vector_results: List[SearchResult] = []
+        keyword_results: List[SearchResult] = []
+
+        if isinstance(vector_outcome, BaseException):
+            _search_degraded.set(True)
+            logger.warning(
+                "Semantic leg unavailable, degrading to keyword-only results",
+                extra={
+                    "timed_out": isinstance(vector_outcome, asyncio.TimeoutError),
+                    "timeout_seconds": self.vector_timeout,
+                    "error": repr(vector_outcome),
+                },
+            )
+        else:
+            vector_results = vector_outcome
+
+        if isinstance(keyword_outcome, BaseException):
+            _search_degraded.set(True)
+            logger.warning(
+                "Keyword leg unavailable, degrading to semantic-only results",
+                extra={
+                    "timed_out": isinstance(keyword_outcome, asyncio.TimeoutError),
+                    "timeout_seconds": self.keyword_timeout,
+                    "error": repr(keyword_outcome),
+                },
+            )
+        else:
+            keyword_results = keyword_outcome
+
+        fuzzy_results: List[SearchResult] = []
+        for fuzzy_outcome in fuzzy_outcomes:
+            if isinstance(fuzzy_outcome, BaseException):
+                _search_degraded.set(True)
+                logger.warning(
+                    "Fuzzy keyword leg unavailable, fusing remaining legs",
+                    extra={
+                        "timed_out": isinstance(fuzzy_outcome, asyncio.TimeoutError),
+                        "timeout_seconds": self.keyword_timeout,
+                        "error": repr(fuzzy_outcome),
+                    },
+                )
+            else:
+                fuzzy_results = fuzzy_outcome
+
+        # Apply Reciprocal Rank Fusion (a single leg keeps RRF score semantics)
         fused_results = self._reciprocal_rank_fusion(
             vector_results,
             keyword_results,
             k=self.rrf_k,
+            fuzzy_results=fuzzy_results,
         )
 
         # Return top N results
         return fused_results[:limit]
 
+    async def _database_hybrid_search(
+        self,
+        query: str,
+        limit: int,
+        filter_document_ids: Optional[List[UUID]],
+    ) -> List[SearchResult]:
+        """
+        Perform hybrid search with RRF applied in the database.
+
+        Calls match_document_chunks_hybrid, which runs both legs as CTEs and
+        returns only the top ``limit`` fused rows. The vector leg gets the
+        store's ef_search and exact-path threshold. If the query embedding
+        misses its deadline, degrades to keyword-only results.
+
+        Args:
+            query: Search query text
+            limit: Maximum number of results
+            filter_document_ids: Optional document ID filter
+
+        Returns:
+            List of SearchResult objects sorted by RRF score
+        """
+        try:
+            query_embedding = await self._with_deadline(
+                self.query_cache.get_or_embed(self.embedding_service, query),
+                self.vector_timeout,
+            )
+        except Exception as e:
+            _search_degraded.set(True)
+            logger.warning(
+                "Query embedding unavailable, degrading to keyword-only results",
+                extra={
+                    "timed_out": isinstance(e, asyncio.TimeoutError),
+                    "timeout_seconds": self.vector_timeout,
+                    "error": repr(e),
+                },
+            )
+            keyword_results = await self._keyword_search(query, limit * 2, filter_document_ids)
+            return self._reciprocal_rank_fusion([], keyword_results, k=self.rrf_k)[:limit]
+
+        doc_ids = [str(doc_id) for doc_id in filter_document_ids] if filter_document_ids else None
+
+        params: Dict[str, Any] = {
+            "query_embedding": query_embedding,
+            "query_text": query,
+            "match_count": limit,
+            "filter_document_ids": doc_ids,
+            "rrf_k": self.rrf_k,
+            "candidate_count": limit * 2,
+        }
+        # Same recall/latency knobs as the semantic leg (057_vector_search_tuning.sql)
+        if isinstance(self.vector_store, PostgresVectorStore):
+            if self.vector_store.ef_search is not None:
+                params["ef_search"] = self.vector_store.ef_search
+            if doc_ids:
+                params["exact_max_chunks"] = self.vector_store.exact_search_max_chunks
+
+        result = await self._execute_rpc("match_document_chunks_hybrid", params)
+
+        return [
+            SearchResult(
+                chunk_id=UUID(row["id"]),
+                document_id=UUID(row["document_id"]),
+                content=row["content"],
+                page_numbers=row.get("page_numbers"),
+                score=float(row["score"]),
+            )
+            for row in result.data
+        ]
+
+    async def _with_deadline(
+        self,
+        leg: Awaitable[T],
+        timeout: Optional[float],
+    ) -> T:
+        """
+        Await a search step, enforcing an optional deadline.
+
+        Note: A timed-out RPC keeps running in its worker thread; only the
+        caller stops waiting for it.
+
+        Args:
+            leg: Search or embedding coroutine
+            timeout: Deadline in seconds (None waits indefinitely)
+
+        Returns:
+            Result of the awaited step
+
+        Raises:
+            asyncio.TimeoutError: If the deadline passes
+        """
+        if timeout is None:
+            return await leg
+        return await asyncio.wait_for(leg, timeout=timeout)
+
+    async def _execute_rpc(self, function_name: str, params: Dict[str, Any]) -> Any:
+        """
+        Execute a database function without blocking the event loop.
+
+        The Supabase client is synchronous, so the request runs in the
+        default thread pool executor.
+
+        Args:
+            function_name: Database function name
+            params: Function parameters
+
+        Returns:
+            PostgREST response with ``data`` rows
+        """
+        return await asyncio.to_thread(
+            lambda: self.client.rpc(function_name, params).execute()
+        )
+
     def _reciprocal_rank_fusion(
         self,
         vector_results: List[SearchResult],
         keyword_results: List[SearchResult],
         k: int = 60,
+        fuzzy_results: Optional[List[SearchResult]] = None,
     ) -> List[SearchResult]:
         """
         Combine rankings using Reciprocal Rank Fusion.
@@ -236,51 +808,21 @@ class HybridSearchService:
             vector_results: Results from vector search
             keyword_results: Results from keyword search
             k: RRF constant (default 60)
+            fuzzy_results: Optional results from fuzzy keyword search
 
         Returns:
             Combined results sorted by RRF score (descending)
         """
-        scores: Dict[UUID, float] = {}
-        result_map: Dict[UUID, SearchResult] = {}
-
-        # Add scores from vector results
-        for rank, result in enumerate(vector_results):
-            chunk_id = result.chunk_id
-            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + rank + 1)
-            result_map[chunk_id] = result
-
-        # Add scores from keyword results
-        for rank, result in enumerate(keyword_results):
-            chunk_id = result.chunk_id
-            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + rank + 1)
-            # Store result if not already stored (prefer vector result for content)
-            if chunk_id not in result_map:
-                result_map[chunk_id] = result
-
-        # Sort by combined score (descending)
-        sorted_ids = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-
-        # Build final result list with RRF scores
-        combined_results = []
-        for chunk_id, rrf_score in sorted_ids:
-            result = result_map[chunk_id]
-            # Update score to RRF score
-            combined_results.append(
-                SearchResult(
-                    chunk_id=result.chunk_id,
-                    document_id=result.document_id,
-                    content=result.content,
-                    page_numbers=result.page_numbers,
-                    score=rrf_score,
-                    metadata=result.metadata,
-                )
-            )
+        combined_results = reciprocal_rank_fusion(
+            [vector_results, keyword_results, fuzzy_results or []], k=k
+        )
 
         logger.debug(
             "Applied Reciprocal Rank Fusion",
             extra={
                 "vector_count": len(vector_results),
                 "keyword_count": len(keyword_results),
+                "fuzzy_count": len(fuzzy_results or []),
                 "fused_count": len(combined_results),
                 "k": k,
             },
@@ -0,0 +1,117 @@
+"""
+Keyword Store - Understanding Plane
+
+Interface for the keyword leg of hybrid search.
+
+Backends:
+- PostgresKeywordStore: match_document_chunks_keyword RPC (ts_rank, default)
+- BM25KeywordStore: in-process BM25 index per tenant (src/search/bm25.py)
+
+SECURITY: The Postgres backend takes the tenant from the client JWT. Local
+backends search the index for the tenant_id they are given, which must come
+from the authenticated request context, never from user input.
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Optional
+from uuid import UUID
+
+from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class KeywordMatch:
+    """Single keyword search match."""
+
+    chunk_id: UUID
+    document_id: UUID
+    content: str
+    page_numbers: Optional[List[int]]
+    score: float
+
+
+class KeywordStore(ABC):
+    """Interface for keyword search over a tenant's chunks."""
+
+    @abstractmethod
+    async def search(
+        self,
+        tenant_id: Optional[UUID],
+        query: str,
+        match_count: int,
+        filter_document_ids: Optional[List[UUID]] = None,
+    ) -> List[KeywordMatch]:
+        """
+        Find the chunks that best match a keyword query.
+
+        Args:
+            tenant_id: Tenant of the authenticated caller
+            query: Search query text
+            match_count: Maximum number of matches
+            filter_document_ids: Optional document ID filter
+
+        Returns:
+            Matches sorted by relevance score (descending)
+        """
+        pass
+
+    def variant(self) -> str:
+        """Describe the backend, for result cache keys."""
+        return type(self).__name__
+
+
+class PostgresKeywordStore(KeywordStore):
+    """
+    Keyword search through match_document_chunks_keyword (044_keyword_search.sql).
+
+    Tenant isolation is enforced by the database function, which reads the
+    tenant from the client JWT; tenant_id is ignored.
+    """
+
+    def __init__(self, supabase_client: Client):
+        """
+        Initialize Postgres keyword store.
+
+        Args:
+            supabase_client: Supabase client with user JWT (for tenant isolation)
+        """
+        self.client = supabase_client
+
+    async def search(
+        self,
+        tenant_id: Optional[UUID],
+        query: str,
+        match_count: int,
+        filter_document_ids: Optional[List[UUID]] = None,
+    ) -> List[KeywordMatch]:
+        """Find matching chunks with one RPC (run off the event loop)."""
+        params = {
+            "query_text": query,
+            "match_count": match_count,
+            "filter_document_ids": [str(doc_id) for doc_id in filter_document_ids] if filter_document_ids else None,
+        }
+
+        # Blocking client: run in the default thread pool executor
+        result = await asyncio.to_thread(
+            lambda: self.client.rpc("match_document_chunks_keyword", params).execute()
+        )
+
+        return [
+            KeywordMatch(
+                chunk_id=UUID(row["id"]),
+                document_id=UUID(row["document_id"]),
+                content=row["content"],
+                page_numbers=row.get("page_numbers"),
+                score=float(row["rank"]),
+            )
+            for row in result.data or []
+        ]
+
+    def variant(self) -> str:
+        """Describe the backend, for result cache keys."""
+        return "fts"
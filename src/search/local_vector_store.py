@@ -0,0 +1,665 @@
+"""
+Local Vector Stores - Understanding Plane
+
+In-process vector search over per-tenant segments exported from
+document_chunks. Used for offline benchmarks and as a fast path for the
+largest tenants (no network hop per query).
+
+Segment layout (one directory per tenant under the store root):
+    <root>/<tenant_id>/embeddings.f16   L2-normalized float16 matrix (N x D)
+    <root>/<tenant_id>/chunks.json      dimension, row metadata and content
+    <root>/<tenant_id>/hnsw.bin         HNSW graph (HNSWVectorStore, built on first load)
+
+Embeddings are stored as memory-mapped float16 (half the size of the
+database vectors). Loaded tenants live in a TenantVectorCache that evicts the
+least recently used tenants once a byte budget is exceeded; NumpyVectorStore
+decodes cached tenants to float32, which scans ~10x faster than float16.
+
+Segments are snapshots stamped with the tenant's search corpus version
+(bumped by triggers on every document_chunks write, 055_search_result_cache.sql).
+get_tenant_vector_store() only serves a segment whose stamp matches the
+current version, so a tenant falls back to the Postgres RPCs from its first
+chunk write until it is re-exported (scripts/export_tenant_vectors.py); a
+re-exported segment is reloaded on next use.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from src.search.vector_store import (
+    DEFAULT_EXACT_SEARCH_MAX_CHUNKS,
+    MAX_EF_SEARCH,
+    VectorMatch,
+    VectorStore,
+)
+
+try:
+    import hnswlib
+
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+EMBEDDINGS_FILE = "embeddings.f16"
+CHUNKS_FILE = "chunks.json"
+HNSW_FILE = "hnsw.bin"
+
+# Hot cache budget for loaded segments (embeddings + HNSW graphs)
+DEFAULT_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 1 GiB
+
+# Rows converted to float32 per block during brute-force scoring
+SCORE_BLOCK_ROWS = 8192
+
+# HNSW build parameters (same as 041_vector_index.sql)
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 64
+DEFAULT_EF_SEARCH = 40
+
+
+def file_stamp(path: Path) -> Tuple[int, int]:
+    """Identify a file version: (inode, mtime); segments are replaced by rename."""
+    stat = path.stat()
+    return stat.st_ino, stat.st_mtime_ns
+
+
+class TenantVectorSegment:
+    """Memory-mapped embeddings and chunk metadata for one tenant."""
+
+    def __init__(self, path: Path, load_float32: bool = False):
+        """
+        Open a tenant segment.
+
+        Args:
+            path: Segment directory
+            load_float32: Decode the embeddings into a float32 array in memory
+                (2x the file size). Float16 has no BLAS path, so decoding once
+                makes every brute-force scan several times faster.
+
+        Raises:
+            FileNotFoundError: If the segment files do not exist
+        """
+        self.path = path
+        # Stamped before reading, so a concurrent re-export is seen as newer
+        self.file_stamp = file_stamp(path / CHUNKS_FILE)
+        with open(path / CHUNKS_FILE, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        self.dimension: int = int(manifest["dimension"])
+        self.chunks: List[Dict[str, Any]] = manifest["chunks"]
+        # Corpus version the segment was exported at (None: unknown, never current)
+        self.corpus_version: Optional[int] = manifest.get("corpus_version")
+
+        self.embeddings: np.ndarray
+        if self.chunks:
+            self.embeddings = np.memmap(
+                path / EMBEDDINGS_FILE,
+                dtype=np.float16,
+                mode="r",
+                shape=(len(self.chunks), self.dimension),
+            )
+            if load_float32:
+                self.embeddings = np.asarray(self.embeddings, dtype=np.float32)
+        else:
+            self.embeddings = np.zeros((0, self.dimension), dtype=np.float16)
+
+        # Per-row document index, for filters without touching the metadata
+        self.document_ids: List[str] = sorted({chunk["document_id"] for chunk in self.chunks})
+        positions = {document_id: i for i, document_id in enumerate(self.document_ids)}
+        self.row_documents = np.fromiter(
+            (positions[chunk["document_id"]] for chunk in self.chunks),
+            dtype=np.int32,
+            count=len(self.chunks),
+        )
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate resident size for cache accounting."""
+        return int(self.embeddings.nbytes + self.row_documents.nbytes)
+
+    def rows_for_documents(self, document_ids: Iterable[UUID]) -> np.ndarray:
+        """
+        Row indices belonging to the given documents.
+
+        Args:
+            document_ids: Documents to include
+
+        Returns:
+            Sorted int64 array of row indices
+        """
+        wanted = {str(doc_id) for doc_id in document_ids}
+        positions = [i for i, document_id in enumerate(self.document_ids) if document_id in wanted]
+        if not positions:
+            return np.zeros(0, dtype=np.int64)
+        return np.flatnonzero(np.isin(self.row_documents, positions))
+
+    def search_exact(
+        self,
+        query: np.ndarray,
+        k: int,
+        rows: Optional[np.ndarray] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Brute-force cosine search.
+
+        Args:
+            query: L2-normalized float32 query vector
+            k: Number of matches
+            rows: Optional subset of row indices to score
+
+        Returns:
+            (row, similarity) pairs sorted by similarity (descending)
+        """
+        candidates = np.arange(len(self), dtype=np.int64) if rows is None else rows
+        if k <= 0 or len(candidates) == 0:
+            return []
+
+        scores = np.empty(len(candidates), dtype=np.float32)
+        for start in range(0, len(candidates), SCORE_BLOCK_ROWS):
+            block_rows = candidates[start : start + SCORE_BLOCK_ROWS]
+            if rows is None:
+                block = self.embeddings[block_rows[0] : block_rows[-1] + 1]
+            else:
+                block = self.embeddings[block_rows]
+            # float16 has no BLAS path; score in float32 one block at a time
+            scores[start : start + len(block_rows)] = block.astype(np.float32, copy=False) @ query
+
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+    def match(self, row: int, similarity: float) -> VectorMatch:
+        """Build a VectorMatch for a row."""
+        chunk = self.chunks[row]
+        return VectorMatch(
+            chunk_id=UUID(chunk["id"]),
+            document_id=UUID(chunk["document_id"]),
+            content=chunk["content"],
+            page_numbers=chunk.get("page_numbers"),
+            # float16 rounding can push self-similarity slightly past 1
+            similarity=max(-1.0, min(1.0, similarity)),
+            section_header=chunk.get("section_header"),
+            token_count=chunk.get("token_count"),
+        )
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows (zero rows are left as zeros)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    normalized: np.ndarray = matrix / norms
+    return normalized
+
+
+def write_tenant_segment(
+    root: Path,
+    tenant_id: UUID,
+    chunks: Sequence[Dict[str, Any]],
+    embeddings: np.ndarray,
+    corpus_version: Optional[int] = None,
+) -> Path:
+    """
+    Write (or replace) a tenant segment.
+
+    Files are written next to the segment and renamed into place, so readers
+    never see a partial segment. Any HNSW graph is removed and rebuilt on load.
+
+    Args:
+        root: Store root directory
+        tenant_id: Tenant that owns the chunks
+        chunks: Row metadata dicts (id, document_id, content, page_numbers,
+            section_header), one per embedding row
+        embeddings: N x D embedding matrix
+        corpus_version: Tenant corpus version read before the chunks were
+            fetched (None: the segment is never served by
+            get_tenant_vector_store)
+
+    Returns:
+        Segment directory
+
+    Raises:
+        ValueError: If chunks and embeddings disagree in length
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.ndim != 2 or matrix.shape[0] != len(chunks):
+        raise ValueError("Expected one embedding row per chunk")
+
+    path = Path(root) / str(tenant_id)
+    path.mkdir(parents=True, exist_ok=True)
+
+    manifest = {
+        "tenant_id": str(tenant_id),
+        "dimension": int(matrix.shape[1]),
+        "corpus_version": corpus_version,
+        "chunks": [
+            {
+                "id": str(chunk["id"]),
+                "document_id": str(chunk["document_id"]),
+                "content": chunk["content"],
+                "page_numbers": chunk.get("page_numbers"),
+                "section_header": chunk.get("section_header"),
+                "token_count": chunk.get("token_count"),
+            }
+            for chunk in chunks
+        ],
+    }
+
+    normalize_rows(matrix).astype(np.float16).tofile(path / f"{EMBEDDINGS_FILE}.tmp")
+    with open(path / f"{CHUNKS_FILE}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+    (path / HNSW_FILE).unlink(missing_ok=True)
+    os.replace(path / f"{EMBEDDINGS_FILE}.tmp", path / EMBEDDINGS_FILE)
+    os.replace(path / f"{CHUNKS_FILE}.tmp", path / CHUNKS_FILE)
+    return path
+
+
+class TenantVectorCache:
+    """
+    LRU cache of loaded tenant data with a byte budget.
+
+    The most recently used tenant is always kept, even if it alone exceeds
+    the budget.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        """
+        Initialize tenant cache.
+
+        Args:
+            max_bytes: Total size of loaded tenants before eviction
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[UUID, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(self, tenant_id: UUID, loader: Callable[[], Tuple[Any, int]]) -> Any:
+        """
+        Get loaded tenant data, loading it on miss.
+
+        Args:
+            tenant_id: Tenant identifier
+            loader: Returns (data, size in bytes)
+
+        Returns:
+            Loaded tenant data
+        """
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+            if entry is not None:
+                self._entries.move_to_end(tenant_id)
+                self.hits += 1
+                return entry[0]
+
+            # Load under the lock so concurrent misses load a tenant once
+            self.misses += 1
+            data, size = loader()
+            self._entries[tenant_id] = (data, size)
+            self.current_bytes += size
+            self._evict()
+            return data
+
+    def _evict(self) -> None:
+        """Drop least recently used tenants until within budget."""
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            tenant_id, (_, size) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
+            logger.debug(
+                "Evicted tenant vectors from cache",
+                extra={"tenant_id": str(tenant_id), "bytes": size},
+            )
+
+    def invalidate(self, tenant_id: UUID) -> None:
+        """Drop a tenant so its segment is re-read on next use."""
+        with self._lock:
+            entry = self._entries.pop(tenant_id, None)
+            if entry is not None:
+                self.current_bytes -= entry[1]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Mapping with tenants, bytes, hits, misses and evictions
+        """
+        return {
+            "tenants": len(self._entries),
+            "bytes": self.current_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Exact brute-force search over per-tenant segments.
+
+    Hot tenants are decoded to float32 in the TenantVectorCache; with
+    hot_float32=False they are scanned straight from the float16 memory map
+    (half the memory, slower scans).
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        cache: Optional[TenantVectorCache] = None,
+        hot_float32: bool = True,
+    ):
+        """
+        Initialize NumPy vector store.
+
+        Args:
+            root: Directory containing one segment directory per tenant
+            cache: Hot tenant cache (default: new TenantVectorCache)
+            hot_float32: Decode cached tenants to float32
+        """
+        self.root = Path(root)
+        self.cache = cache or TenantVectorCache()
+        self.hot_float32 = hot_float32
+
+    def has_tenant(self, tenant_id: UUID) -> bool:
+        """Check whether a segment exists for a tenant."""
+        return (self.root / str(tenant_id) / CHUNKS_FILE).exists()
+
+    def invalidate(self, tenant_id: UUID) -> None:
+        """Reload a tenant's segment on next search (after re-export)."""
+        self.cache.invalidate(tenant_id)
+
+    def is_current(self, tenant_id: UUID, corpus_version: int) -> bool:
+        """
+        Check whether a tenant's segment was exported at a corpus version.
+
+        Blocking (may load the segment). A segment re-exported since it was
+        loaded is reloaded first.
+
+        Args:
+            tenant_id: Tenant identifier
+            corpus_version: Tenant's current corpus version
+
+        Returns:
+            True if the segment matches the tenant's chunks
+        """
+        segment = self._loaded_segment(tenant_id)
+        if segment.corpus_version == corpus_version:
+            return True
+        if file_stamp(segment.path / CHUNKS_FILE) == segment.file_stamp:
+            return False
+        self.invalidate(tenant_id)
+        return self._loaded_segment(tenant_id).corpus_version == corpus_version
+
+    def _loaded_segment(self, tenant_id: UUID) -> TenantVectorSegment:
+        """The tenant's segment as loaded in the hot cache."""
+        return self._segment(tenant_id)
+
+    async def search(
+        self,
+        tenant_id: Optional[UUID],
+        query_embedding: List[float],
+        match_count: int,
+        filter_document_ids: Optional[List[UUID]] = None,
+    ) -> List[VectorMatch]:
+        """Find similar chunks in the tenant's segment (off the event loop)."""
+        if tenant_id is None:
+            raise ValueError("Local vector stores require a tenant_id")
+        return await asyncio.to_thread(
+            self._search, tenant_id, query_embedding, match_count, filter_document_ids
+        )
+
+    def _search(
+        self,
+        tenant_id: UUID,
+        query_embedding: List[float],
+        match_count: int,
+        filter_document_ids: Optional[List[UUID]],
+    ) -> List[VectorMatch]:
+        """Blocking search."""
+        segment = self._segment(tenant_id)
+        query = _normalize_query(query_embedding, segment.dimension)
+        rows = segment.rows_for_documents(filter_document_ids) if filter_document_ids else None
+        return [segment.match(row, score) for row, score in segment.search_exact(query, match_count, rows)]
+
+    def _segment(self, tenant_id: UUID) -> TenantVectorSegment:
+        """Get the tenant's segment from the hot cache."""
+
+        def load() -> Tuple[Any, int]:
+            segment = TenantVectorSegment(self.root / str(tenant_id), load_float32=self.hot_float32)
+            return segment, segment.nbytes
+
+        segment: TenantVectorSegment = self.cache.get_or_load(tenant_id, load)
+        return segment
+
+    def variant(self) -> str:
+        """Describe the settings that change results, for result cache keys."""
+        return "numpy"
+
+
+class _TenantGraph:
+    """Segment plus its HNSW graph."""
+
+    def __init__(self, segment: TenantVectorSegment, index: Any):
+        self.segment = segment
+        self.index = index
+        self.lock = threading.Lock()  # set_ef mutates shared index state
+
+
+class HNSWVectorStore(NumpyVectorStore):
+    """
+    Approximate search with an in-process HNSW graph per tenant (hnswlib).
+
+    Filtered searches over at most exact_search_max_chunks rows are scored
+    exactly from the segment, mirroring match_document_chunks.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        cache: Optional[TenantVectorCache] = None,
+        ef_search: int = DEFAULT_EF_SEARCH,
+        exact_search_max_chunks: int = DEFAULT_EXACT_SEARCH_MAX_CHUNKS,
+    ):
+        """
+        Initialize HNSW vector store.
+
+        Args:
+            root: Directory containing one segment directory per tenant
+            cache: Hot tenant cache (default: new TenantVectorCache)
+            ef_search: HNSW candidate list size per query
+            exact_search_max_chunks: Filtered searches over at most this many
+                chunks are scored exactly (0 disables)
+
+        Raises:
+            ImportError: If hnswlib is not installed
+            ValueError: If ef_search is out of range
+        """
+        if not HNSWLIB_AVAILABLE:
+            raise ImportError("hnswlib not installed. Install with: pip install hnswlib")
+
+        if not 1 <= ef_search <= MAX_EF_SEARCH:
+            raise ValueError(f"ef_search must be between 1 and {MAX_EF_SEARCH}")
+
+        # The graph keeps its own float32 vectors; the segment stays memory-mapped
+        super().__init__(root, cache, hot_float32=False)
+        self.ef_search = ef_search
+        self.exact_search_max_chunks = exact_search_max_chunks
+
+    def _search(
+        self,
+        tenant_id: UUID,
+        query_embedding: List[float],
+        match_count: int,
+        filter_document_ids: Optional[List[UUID]],
+    ) -> List[VectorMatch]:
+        """Blocking search."""
+        graph = self._graph(tenant_id)
+        segment = graph.segment
+        query = _normalize_query(query_embedding, segment.dimension)
+
+        rows: Optional[np.ndarray] = None
+        row_filter: Optional[Callable[[int], bool]] = None
+        if filter_document_ids:
+            rows = segment.rows_for_documents(filter_document_ids)
+            if len(rows) <= self.exact_search_max_chunks:
+                return self._exact(segment, query, match_count, rows)
+            allowed = np.zeros(len(segment), dtype=bool)
+            allowed[rows] = True
+
+            def row_filter(label: int) -> bool:
+                return bool(allowed[label])
+
+        k = min(match_count, len(segment) if rows is None else len(rows))
+        if k <= 0:
+            return []
+
+        try:
+            with graph.lock:
+                graph.index.set_ef(max(self.ef_search, k))
+                labels, distances = graph.index.knn_query(query, k=k, filter=row_filter)
+        except RuntimeError:
+            # hnswlib could not collect k filtered neighbours within ef
+            return self._exact(segment, query, match_count, rows)
+
+        return [
+            segment.match(int(label), 1.0 - float(distance))
+            for label, distance in zip(labels[0], distances[0])
+        ]
+
+    @staticmethod
+    def _exact(
+        segment: TenantVectorSegment,
+        query: np.ndarray,
+        match_count: int,
+        rows: Optional[np.ndarray],
+    ) -> List[VectorMatch]:
+        """Brute-force search over a row subset."""
+        return [segment.match(row, score) for row, score in segment.search_exact(query, match_count, rows)]
+
+    def _graph(self, tenant_id: UUID) -> _TenantGraph:
+        """Get the tenant's segment and graph from the hot cache."""
+
+        def load() -> Tuple[Any, int]:
+            segment = TenantVectorSegment(self.root / str(tenant_id))
+            index = self._load_index(segment)
+            # hnswlib keeps a float32 copy of every vector plus 2*M links per node
+            index_bytes = len(segment) * (segment.dimension * 4 + HNSW_M * 2 * 4)
+            return _TenantGraph(segment, index), segment.nbytes + index_bytes
+
+        graph: _TenantGraph = self.cache.get_or_load(tenant_id, load)
+        return graph
+
+    def _loaded_segment(self, tenant_id: UUID) -> TenantVectorSegment:
+        """The tenant's segment as loaded with its graph."""
+        return self._graph(tenant_id).segment
+
+    def _load_index(self, segment: TenantVectorSegment) -> Any:
+        """Load the segment's HNSW graph, building and saving it if missing."""
+        index = hnswlib.Index(space="ip", dim=segment.dimension)
+        index_path = segment.path / HNSW_FILE
+
+        if index_path.exists():
+            index.load_index(str(index_path), max_elements=max(len(segment), 1))
+            return index
+
+        index.init_index(max_elements=max(len(segment), 1), ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+        for start in range(0, len(segment), SCORE_BLOCK_ROWS):
+            block = np.asarray(segment.embeddings[start : start + SCORE_BLOCK_ROWS], dtype=np.float32)
+            index.add_items(block, np.arange(start, start + len(block)))
+        index.save_index(str(index_path))
+        logger.info(
+            "Built HNSW graph for tenant segment",
+            extra={"path": str(segment.path), "rows": len(segment)},
+        )
+        return index
+
+    def variant(self) -> str:
+        """Describe the settings that change results, for result cache keys."""
+        return f"hnsw:{self.ef_search}:{self.exact_search_max_chunks}"
+
+
+def _normalize_query(query_embedding: List[float], dimension: int) -> np.ndarray:
+    """Convert a query embedding to a normalized float32 vector."""
+    query = np.asarray(query_embedding, dtype=np.float32)
+    if query.shape != (dimension,):
+        raise ValueError(f"Query embedding must have {dimension} dimensions")
+    norm = float(np.linalg.norm(query))
+    return query / norm if norm > 0 else query
+
+
+# Module-level shared local store (None when not configured)
+_shared_store: Optional[NumpyVectorStore] = None
+_shared_store_loaded = False
+
+
+def get_local_vector_store() -> Optional[NumpyVectorStore]:
+    """
+    Get the process-wide local vector store, if configured.
+
+    VECTOR_STORE_BACKEND selects "numpy" or "hnsw" (default "postgres": no
+    local store). Segments are read from VECTOR_STORE_PATH and the hot cache
+    budget is VECTOR_STORE_CACHE_MB.
+
+    Returns:
+        Shared local store, or None
+    """
+    global _shared_store, _shared_store_loaded
+    if not _shared_store_loaded:
+        _shared_store_loaded = True
+        backend = os.getenv("VECTOR_STORE_BACKEND", "postgres")
+        if backend in ("numpy", "hnsw"):
+            root = Path(os.getenv("VECTOR_STORE_PATH", "data/vector_segments"))
+            cache = TenantVectorCache(int(os.getenv("VECTOR_STORE_CACHE_MB", "1024")) * 1024 * 1024)
+            if backend == "hnsw":
+                _shared_store = HNSWVectorStore(root, cache)
+            else:
+                _shared_store = NumpyVectorStore(root, cache)
+            logger.info("Local vector store enabled", extra={"backend": backend, "root": str(root)})
+    return _shared_store
+
+
+async def get_tenant_vector_store(tenant_id: UUID) -> Optional[VectorStore]:
+    """
+    Get the local vector store for a tenant with an up-to-date segment.
+
+    Segments exported before the tenant's latest chunk write (or without a
+    readable corpus version) are not served.
+
+    Args:
+        tenant_id: Tenant of the authenticated caller
+
+    Returns:
+        Local store, or None to use the Postgres RPCs
+    """
+    store = get_local_vector_store()
+    if store is None or not store.has_tenant(tenant_id):
+        return None
+
+    from src.search.result_cache import get_search_result_cache
+
+    version = await get_search_result_cache().get_version(tenant_id)
+    if version is None or not await asyncio.to_thread(store.is_current, tenant_id, version):
+        logger.debug(
+            "Local vector segment is stale, using Postgres",
+            extra={"tenant_id": str(tenant_id), "corpus_version": version},
+        )
+        return None
+    return store
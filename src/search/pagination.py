@@ -0,0 +1,393 @@
+"""
+Search Pagination - Understanding Plane
+
+Cursor-based pagination over a snapshot of the fused ranking.
+
+The first page runs the search for one page plus one result (to know whether
+there is a next page) and keeps the ranking in a server-side snapshot. Only
+when a cursor is followed past the snapshot is the search re-run, for at least
+twice as many results each time, so a client paging to depth n runs
+O(log n) searches while most clients, who never ask for page 2, pay for one
+page. Pages inside the snapshot cost no embedding call, no index scan and no
+re-fusion, and rows do not shift between them while the snapshot lives.
+
+Cursors are opaque, URL-safe tokens. Besides the snapshot id and offset they
+carry the last returned (score, chunk_id) key, so if the snapshot has expired
+(or lives in another process) the next page is found by re-running the search
+and seeking past that key.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import secrets
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from cachetools import TTLCache
+
+from src.search.embedding_cache import normalize_query
+from src.search.hybrid import HybridSearchService, SearchMode, SearchResult
+
+logger = logging.getLogger(__name__)
+
+# Snapshot configuration
+SNAPSHOT_TTL_SECONDS = 600  # 10 minutes
+SNAPSHOT_MAX_SIZE = 1024
+
+# Pages fetched up front for a new snapshot (more pre-fetches for clients
+# known to page deep), and the deepest result reachable
+SNAPSHOT_PAGES = 1
+MAX_PAGINATED_RESULTS = 500
+
+SnapshotKey = Tuple[UUID, str]
+
+
+@dataclass
+class SearchCursor:
+    """Decoded pagination cursor."""
+
+    snapshot_id: str
+    offset: int
+    request_hash: str
+    last_score: Optional[float] = None
+    last_chunk_id: Optional[str] = None
+
+
+@dataclass
+class SearchSnapshot:
+    """Fused ranking for one search, shared by all of its pages."""
+
+    request_hash: str
+    results: List[SearchResult]
+    exhausted: bool
+    base_offset: int = 0  # absolute position of results[0]
+
+
+@dataclass
+class SearchPage:
+    """One page of results and the cursor for the next page."""
+
+    results: List[SearchResult]
+    next_cursor: Optional[str]
+
+
+def request_hash(
+    query: str,
+    mode: str,
+    filter_document_ids: Optional[List[UUID]] = None,
+    limit: int = 20,
+    fuzzy: bool = False,
+    rerank: bool = False,
+) -> str:
+    """
+    Hash the parameters a cursor is bound to.
+
+    Cursor offsets are only meaningful for the page size and ranking they
+    were issued under, so a cursor replayed with a different limit, fuzzy
+    matching or reranking is rejected rather than skipping or repeating rows.
+
+    Args:
+        query: Search query text (normalized)
+        mode: Search mode
+        filter_document_ids: Optional document filter (order-insensitive)
+        limit: Page size
+        fuzzy: Whether fuzzy keyword matching is on
+        rerank: Whether pages are reranked
+
+    Returns:
+        Short hex digest
+    """
+    filters = sorted(str(doc_id) for doc_id in filter_document_ids) if filter_document_ids else None
+    payload = json.dumps(
+        [normalize_query(query), mode, filters, limit, fuzzy, rerank],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_cursor(cursor: SearchCursor) -> str:
+    """
+    Encode a cursor as an opaque URL-safe token.
+
+    Args:
+        cursor: Cursor to encode
+
+    Returns:
+        Cursor token
+    """
+    payload: Dict[str, Any] = {
+        "s": cursor.snapshot_id,
+        "o": cursor.offset,
+        "h": cursor.request_hash,
+    }
+    if cursor.last_chunk_id is not None:
+        payload["k"] = [cursor.last_score, cursor.last_chunk_id]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> SearchCursor:
+    """
+    Decode a cursor token.
+
+    Args:
+        token: Cursor token from a previous page
+
+    Returns:
+        Decoded cursor
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        key = payload.get("k") or [None, None]
+        cursor = SearchCursor(
+            snapshot_id=str(payload["s"]),
+            offset=int(payload["o"]),
+            request_hash=str(payload["h"]),
+            last_score=float(key[0]) if key[0] is not None else None,
+            last_chunk_id=str(key[1]) if key[1] is not None else None,
+        )
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError, IndexError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if cursor.offset < 0:
+        raise ValueError("Invalid cursor")
+    return cursor
+
+
+class SearchPaginator:
+    """
+    Serves search result pages from per-tenant ranking snapshots.
+
+    SECURITY: Snapshots are keyed by tenant_id, so a cursor issued to one
+    tenant can never read another tenant's snapshot.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = SNAPSHOT_MAX_SIZE,
+        ttl: float = SNAPSHOT_TTL_SECONDS,
+        snapshot_pages: int = SNAPSHOT_PAGES,
+        max_results: int = MAX_PAGINATED_RESULTS,
+    ):
+        """
+        Initialize paginator.
+
+        Args:
+            maxsize: Maximum number of live snapshots
+            ttl: Snapshot lifetime in seconds
+            snapshot_pages: Pages of results fetched for a new snapshot
+                (opt-in over-fetch; the snapshot is extended lazily)
+            max_results: Deepest result position reachable through cursors
+        """
+        self._snapshots: TTLCache[SnapshotKey, SearchSnapshot] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.snapshot_pages = snapshot_pages
+        self.max_results = max_results
+
+    async def search_page(
+        self,
+        service: HybridSearchService,
+        tenant_id: UUID,
+        query: str,
+        mode: SearchMode = "hybrid",
+        limit: int = 20,
+        filter_document_ids: Optional[List[UUID]] = None,
+        cursor: Optional[str] = None,
+        rerank: bool = False,
+    ) -> SearchPage:
+        """
+        Get one page of search results.
+
+        Args:
+            service: Search service for the caller's tenant
+            tenant_id: Tenant of the authenticated caller
+            query: Search query text
+            mode: Search mode
+            limit: Page size
+            filter_document_ids: Optional document filter
+            cursor: Cursor from the previous page (None for the first page)
+            rerank: Whether the caller reranks each page (bound into the
+                cursor with the page size and the service's fuzzy setting)
+
+        Returns:
+            SearchPage with results and next_cursor (None on the last page)
+
+        Raises:
+            ValueError: If the cursor is malformed or belongs to a different search
+        """
+        current_hash = request_hash(
+            query,
+            mode,
+            filter_document_ids,
+            limit=limit,
+            fuzzy=service.fuzzy_keyword,
+            rerank=rerank,
+        )
+
+        if cursor is None:
+            snapshot_id = secrets.token_urlsafe(12)
+            snapshot = await self._fetch(
+                service,
+                query,
+                mode,
+                limit * self.snapshot_pages + 1,
+                filter_document_ids,
+                current_hash,
+            )
+            self._snapshots[(tenant_id, snapshot_id)] = snapshot
+            return self._slice(snapshot, snapshot_id, 0, limit)
+
+        decoded = decode_cursor(cursor)
+        if decoded.request_hash != current_hash:
+            raise ValueError("Cursor does not match this search")
+
+        key = (tenant_id, decoded.snapshot_id)
+        cached = self._snapshots.get(key)
+
+        if cached is not None and self._covers(cached, decoded.offset, limit):
+            snapshot = cached
+        else:
+            # Snapshot expired, lives in another process, or is too short:
+            # re-run the search and seek past the cursor key
+            logger.debug(
+                "Rebuilding search snapshot from cursor",
+                extra={
+                    "tenant_id": str(tenant_id),
+                    "offset": decoded.offset,
+                    "snapshot_found": cached is not None,
+                },
+            )
+            snapshot = await self._rebuild(service, query, mode, limit, filter_document_ids, decoded)
+            self._snapshots[key] = snapshot
+
+        return self._slice(snapshot, decoded.snapshot_id, decoded.offset, limit)
+
+    def _covers(self, snapshot: SearchSnapshot, offset: int, limit: int) -> bool:
+        """Check whether a snapshot can serve a page at offset."""
+        if offset < snapshot.base_offset:
+            return False
+        end = snapshot.base_offset + len(snapshot.results)
+        return snapshot.exhausted or offset + limit <= end
+
+    async def _fetch(
+        self,
+        service: HybridSearchService,
+        query: str,
+        mode: SearchMode,
+        count: int,
+        filter_document_ids: Optional[List[UUID]],
+        search_hash: str,
+    ) -> SearchSnapshot:
+        """Run the search for up to count results (capped at max_results)."""
+        count = min(count, self.max_results)
+        results = await service.search(
+            query=query,
+            mode=mode,
+            limit=count,
+            filter_document_ids=filter_document_ids,
+        )
+        exhausted = len(results) < count or count >= self.max_results
+        return SearchSnapshot(request_hash=search_hash, results=results, exhausted=exhausted)
+
+    async def _rebuild(
+        self,
+        service: HybridSearchService,
+        query: str,
+        mode: SearchMode,
+        limit: int,
+        filter_document_ids: Optional[List[UUID]],
+        cursor: SearchCursor,
+    ) -> SearchSnapshot:
+        """
+        Rebuild a snapshot that starts right after the cursor key.
+
+        Fetches at least twice the cursor offset, so deep paging re-runs the
+        search a logarithmic number of times. The rebuilt snapshot's results
+        begin at absolute position cursor.offset, so offsets in later cursors
+        stay consistent.
+        """
+        snapshot = await self._fetch(
+            service,
+            query,
+            mode,
+            max(cursor.offset + limit * self.snapshot_pages, 2 * cursor.offset) + 1,
+            filter_document_ids,
+            cursor.request_hash,
+        )
+
+        if cursor.last_chunk_id is None:
+            position = cursor.offset
+        else:
+            position = self._seek(snapshot.results, cursor)
+
+        snapshot.results = snapshot.results[position:]
+        snapshot.base_offset = cursor.offset
+        return snapshot
+
+    @staticmethod
+    def _seek(results: List[SearchResult], cursor: SearchCursor) -> int:
+        """Index of the first result after the cursor key."""
+        for index, result in enumerate(results):
+            if str(result.chunk_id) == cursor.last_chunk_id:
+                return index + 1
+
+        # Key not found (ranking changed): continue below its score
+        last_score = cursor.last_score if cursor.last_score is not None else float("inf")
+        for index, result in enumerate(results):
+            if result.score < last_score:
+                return index
+        return len(results)
+
+    def _slice(
+        self,
+        snapshot: SearchSnapshot,
+        snapshot_id: str,
+        offset: int,
+        limit: int,
+    ) -> SearchPage:
+        """Build a page and the cursor that follows it."""
+        start = offset - snapshot.base_offset
+        page = snapshot.results[start : start + limit]
+        next_offset = offset + len(page)
+
+        has_more = start + len(page) < len(snapshot.results) or (
+            not snapshot.exhausted and next_offset < self.max_results
+        )
+        next_cursor = None
+        if page and has_more:
+            last = page[-1]
+            next_cursor = encode_cursor(
+                SearchCursor(
+                    snapshot_id=snapshot_id,
+                    offset=next_offset,
+                    request_hash=snapshot.request_hash,
+                    last_score=last.score,
+                    last_chunk_id=str(last.chunk_id),
+                )
+            )
+
+        return SearchPage(results=page, next_cursor=next_cursor)
+
+
+# Module-level shared paginator used by search routes
+_shared_paginator: Optional[SearchPaginator] = None
+
+
+def get_search_paginator() -> SearchPaginator:
+    """
+    Get the process-wide search paginator.
+
+    Returns:
+        Shared SearchPaginator instance
+    """
+    global _shared_paginator
+    if _shared_paginator is None:
+        _shared_paginator = SearchPaginator()
+    return _shared_paginator
@@ -9,8 +9,14 @@ OPTIONAL: This module requires sentence-transformers library.
 If not installed, the service will gracefully degrade to no reranking.
 """
 
+import asyncio
+import hashlib
 import logging
-from typing import List, Optional
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Set, Tuple
+
+from cachetools import TTLCache
 
 try:
     from sentence_transformers import CrossEncoder
@@ -23,6 +29,35 @@ from src.search.hybrid import SearchResult
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+# Micro-batching: pairs from concurrent requests are scored together once
+# max_batch_size pairs are queued or max_latency_ms has passed, whichever
+# comes first.
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_LATENCY_MS = 5.0
+
+# Score cache configuration
+# Keyed by (query hash, chunk_id); chunk ids are unique across tenants.
+SCORE_CACHE_TTL_SECONDS = 3600  # 1 hour
+SCORE_CACHE_MAX_SIZE = 10000
+
+ScorePair = Tuple[str, str]
+ScoreKey = Tuple[str, str]
+
+
+def hash_query(query: str) -> str:
+    """
+    Hash query text for score cache keys.
+
+    Args:
+        query: Search query text
+
+    Returns:
+        SHA-256 hex digest of the query
+    """
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
 
 class SearchReranker:
     """
@@ -36,20 +71,41 @@ class SearchReranker:
 
     def __init__(
         self,
-        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        model_name: str = DEFAULT_RERANKER_MODEL,
         top_k: int = 20,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_latency_ms: float = DEFAULT_MAX_LATENCY_MS,
+        score_cache_size: int = SCORE_CACHE_MAX_SIZE,
     ):
         """
         Initialize reranker service.
 
+        Loads the cross-encoder model from disk, so construct it once per
+        process (see get_search_reranker) rather than per request.
+
         Args:
             model_name: Hugging Face cross-encoder model name
             top_k: Number of top results to rerank (default 20)
+            max_batch_size: Queued pairs that trigger an immediate batch
+            max_latency_ms: Longest a pair waits for other requests to join its batch
+            score_cache_size: Maximum cached (query hash, chunk_id) scores
         """
         self.model_name = model_name
         self.top_k = top_k
+        self.max_batch_size = max_batch_size
+        self.max_latency_ms = max_latency_ms
         self.model: Optional[CrossEncoder] = None
 
+        self._score_cache: TTLCache[ScoreKey, float] = TTLCache(
+            maxsize=score_cache_size,
+            ttl=SCORE_CACHE_TTL_SECONDS,
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Tuple[List[ScorePair], "asyncio.Future[List[float]]"]] = []
+        self._pending_pairs = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: Set["asyncio.Task[None]"] = set()
+
         if not CROSS_ENCODER_AVAILABLE:
             logger.warning(
                 "sentence-transformers not installed, reranking disabled",
@@ -93,7 +149,7 @@ class SearchReranker:
             Original results if reranking unavailable
         """
         # Return original results if reranking unavailable
-        if self.model is None or not CROSS_ENCODER_AVAILABLE:
+        if not self.is_available():
             return results
 
         # Only rerank top-k results (for performance)
@@ -108,38 +164,9 @@ class SearchReranker:
             pairs = [(query, result.content) for result in top_results]
 
             # Get cross-encoder scores
-            scores = self.model.predict(pairs)
-
-            # Update result scores and sort
-            reranked = []
-            for result, score in zip(top_results, scores):
-                reranked.append(
-                    SearchResult(
-                        chunk_id=result.chunk_id,
-                        document_id=result.document_id,
-                        content=result.content,
-                        page_numbers=result.page_numbers,
-                        score=float(score),
-                        metadata=result.metadata,
-                    )
-                )
+            scores = self._predict(pairs)
 
-            # Sort by new scores
-            reranked.sort(key=lambda x: x.score, reverse=True)
-
-            # Append remaining results (not reranked)
-            reranked.extend(remaining_results)
-
-            logger.debug(
-                "Reranked search results",
-                extra={
-                    "query_length": len(query),
-                    "results_count": len(top_results),
-                    "top_k": self.top_k,
-                },
-            )
-
-            return reranked
+            return self._apply_scores(query, top_results, scores, remaining_results)
 
         except Exception as e:
             logger.error(
@@ -151,6 +178,221 @@ class SearchReranker:
             )
             return results
 
+    async def rerank_async(
+        self,
+        query: str,
+        results: List[SearchResult],
+    ) -> List[SearchResult]:
+        """
+        Rerank search results without blocking the event loop.
+
+        Cached (query hash, chunk_id) scores are reused; the remaining pairs
+        are queued and scored on the reranker thread together with pairs from
+        concurrent requests.
+
+        Args:
+            query: Search query text
+            results: List of search results to rerank
+
+        Returns:
+            Reranked list of SearchResult objects
+            Original results if reranking unavailable or scoring fails
+        """
+        if not self.is_available():
+            return results
+
+        if len(results) <= 1:
+            return results
+
+        top_results = results[: self.top_k]
+        remaining_results = results[self.top_k :]
+
+        query_hash = hash_query(query)
+        keys = [(query_hash, str(result.chunk_id)) for result in top_results]
+        scores: List[Optional[float]] = [self._score_cache.get(key) for key in keys]
+        missing = [index for index, score in enumerate(scores) if score is None]
+
+        if missing:
+            try:
+                new_scores = await self._score_batched(
+                    [(query, top_results[index].content) for index in missing]
+                )
+            except Exception as e:
+                logger.error(
+                    "Reranking failed, returning original results",
+                    extra={
+                        "error": str(e),
+                        "results_count": len(results),
+                    },
+                )
+                return results
+
+            for index, score in zip(missing, new_scores):
+                scores[index] = score
+                self._score_cache[keys[index]] = score
+
+        return self._apply_scores(
+            query,
+            top_results,
+            [float(score) for score in scores if score is not None],
+            remaining_results,
+        )
+
+    def _apply_scores(
+        self,
+        query: str,
+        top_results: List[SearchResult],
+        scores: List[float],
+        remaining_results: List[SearchResult],
+    ) -> List[SearchResult]:
+        """Replace top-k scores, sort them and append the remaining results."""
+        # Update result scores and sort
+        reranked = []
+        for result, score in zip(top_results, scores):
+            reranked.append(
+                SearchResult(
+                    chunk_id=result.chunk_id,
+                    document_id=result.document_id,
+                    content=result.content,
+                    page_numbers=result.page_numbers,
+                    score=float(score),
+                    metadata=result.metadata,
+                )
+            )
+
+        # Sort by new scores
+        reranked.sort(key=lambda x: x.score, reverse=True)
+
+        # Append remaining results (not reranked)
+        reranked.extend(remaining_results)
+
+        logger.debug(
+            "Reranked search results",
+            extra={
+                "query_length": len(query),
+                "results_count": len(top_results),
+                "top_k": self.top_k,
+            },
+        )
+
+        return reranked
+
+    def _predict(self, pairs: List[ScorePair]) -> List[float]:
+        """Score query-document pairs with the cross-encoder (blocking)."""
+        if self.model is None:
+            raise RuntimeError("Cross-encoder model not loaded")
+        scores = self.model.predict(pairs, batch_size=self.max_batch_size)
+        return [float(score) for score in scores]
+
+    async def _score_batched(self, pairs: List[ScorePair]) -> List[float]:
+        """
+        Queue pairs for the next micro-batch and wait for their scores.
+
+        Args:
+            pairs: Query-document pairs from one request
+
+        Returns:
+            Scores in the same order as pairs
+        """
+        loop = asyncio.get_running_loop()
+
+        # A batch never spans event loops
+        if self._pending and self._pending[0][1].get_loop() is not loop:
+            self._reset_pending()
+
+        future: "asyncio.Future[List[float]]" = loop.create_future()
+        self._pending.append((pairs, future))
+        self._pending_pairs += len(pairs)
+
+        if self._pending_pairs >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_latency_ms / 1000, self._flush)
+
+        return await future
+
+    def _reset_pending(self) -> None:
+        """Drop the queued batch and its timer."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending = []
+        self._pending_pairs = 0
+
+    def _flush(self) -> None:
+        """Start scoring the queued batch on the reranker thread."""
+        batch = self._pending
+        self._reset_pending()
+        if not batch:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(
+        self,
+        batch: List[Tuple[List[ScorePair], "asyncio.Future[List[float]]"]],
+    ) -> None:
+        """Score one micro-batch and hand each request its slice of scores."""
+        pairs = [pair for request_pairs, _ in batch for pair in request_pairs]
+        loop = asyncio.get_running_loop()
+
+        try:
+            scores = await loop.run_in_executor(self._get_executor(), self._predict, pairs)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        logger.debug(
+            "Scored reranker batch",
+            extra={"requests_count": len(batch), "pairs_count": len(pairs)},
+        )
+
+        offset = 0
+        for request_pairs, future in batch:
+            if not future.done():
+                future.set_result(scores[offset : offset + len(request_pairs)])
+            offset += len(request_pairs)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the dedicated scoring thread (created on first use)."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reranker")
+        return self._executor
+
+    def warmup(self) -> bool:
+        """
+        Run one prediction so the first request does not pay model warmup.
+
+        Returns:
+            True if the model is loaded and scored the warmup pair
+        """
+        if not self.is_available():
+            return False
+
+        try:
+            self._predict([("warmup query", "warmup document")])
+            logger.info(
+                "Cross-encoder model warmed up",
+                extra={"model_name": self.model_name},
+            )
+            return True
+        except Exception as e:
+            logger.error(
+                "Cross-encoder warmup failed",
+                extra={"model_name": self.model_name, "error": str(e)},
+            )
+            return False
+
+    def close(self) -> None:
+        """Shut down the scoring thread."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
     def is_available(self) -> bool:
         """
         Check if reranking is available.
@@ -159,3 +401,33 @@ class SearchReranker:
             True if cross-encoder model loaded successfully
         """
         return self.model is not None
+
+
+# Global reranker instance (initialized on first use or at startup)
+_reranker: Optional[SearchReranker] = None
+
+
+def get_search_reranker() -> SearchReranker:
+    """
+    Get or initialize the process-wide reranker.
+
+    RERANKER_MAX_LATENCY_MS overrides how long pairs wait to be batched
+    with concurrent requests.
+
+    Returns:
+        SearchReranker instance (singleton)
+    """
+    global _reranker
+    if _reranker is None:
+        _reranker = SearchReranker(
+            max_latency_ms=float(os.getenv("RERANKER_MAX_LATENCY_MS", DEFAULT_MAX_LATENCY_MS)),
+        )
+    return _reranker
+
+
+def shutdown_search_reranker() -> None:
+    """Shut down the process-wide reranker, if it was initialized."""
+    global _reranker
+    if _reranker is not None:
+        _reranker.close()
+        _reranker = None
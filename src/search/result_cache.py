@@ -0,0 +1,414 @@
+"""
+Search Result Cache - Understanding Plane
+
+Caches search results per tenant, tagged with a per-tenant corpus version.
+Triggers on document_chunks bump the version on every insert, update and
+delete (055_search_result_cache.sql), so cached results are invalidated
+when the tenant's corpus changes, whichever process wrote it, instead of
+after a guessed TTL. The entry TTL only bounds memory.
+
+Versions are kept in process for VERSION_TTL_SECONDS, so a cache hit costs
+no database round trip; a chunk write is seen within that window.
+
+Both stores read versions from search_corpus_versions; entries live in:
+- InMemorySearchCacheStore: per-process (default)
+- SupabaseSearchCacheStore: shared across API and worker processes
+
+SECURITY: Keys always include the tenant_id, and the tenant_id must come from
+the authenticated request context, never from user input.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from cachetools import TTLCache
+from supabase import Client
+
+from src.search.embedding_cache import normalize_query
+from src.search.hybrid import SearchResult
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+CACHE_TTL_SECONDS = 600  # 10 minutes
+CACHE_MAX_SIZE = 2048
+
+# How long a tenant's corpus version is reused before it is read again
+VERSION_TTL_SECONDS = 2.0
+VERSION_MAX_SIZE = 4096
+
+
+def read_corpus_version(client: Client, tenant_id: UUID) -> int:
+    """Read a tenant's corpus version (blocking; 0 if never bumped)."""
+    result = (
+        client.table("search_corpus_versions")
+        .select("version")
+        .eq("tenant_id", str(tenant_id))
+        .limit(1)
+        .execute()
+    )
+    if not result.data:
+        return 0
+    return int(result.data[0]["version"])
+
+
+class SearchCacheStore(ABC):
+    """Interface for search result storage and corpus version lookup."""
+
+    @abstractmethod
+    async def get_version(self, tenant_id: UUID) -> Optional[int]:
+        """
+        Get the current corpus version for a tenant.
+
+        Args:
+            tenant_id: Tenant identifier
+
+        Returns:
+            Corpus version (0 if the tenant has never been bumped), or None
+            if versions cannot be read (nothing is cached)
+        """
+        pass
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[List[SearchResult]]:
+        """
+        Get cached results.
+
+        Args:
+            key: Cache key (see SearchResultCache.build_key)
+
+        Returns:
+            Cached results, or None on miss
+        """
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, tenant_id: UUID, results: List[SearchResult]) -> None:
+        """
+        Store results.
+
+        Args:
+            key: Cache key
+            tenant_id: Tenant that owns the results
+            results: Search results to cache
+        """
+        pass
+
+
+class InMemorySearchCacheStore(SearchCacheStore):
+    """Per-process store (LRU + TTL entries, corpus versions from the database)."""
+
+    def __init__(
+        self,
+        supabase_client: Optional[Client] = None,
+        maxsize: int = CACHE_MAX_SIZE,
+        ttl: float = CACHE_TTL_SECONDS,
+    ):
+        """
+        Initialize in-memory store.
+
+        Args:
+            supabase_client: Supabase client with service_role key for corpus
+                versions (None disables caching)
+            maxsize: Maximum number of cached result lists
+            ttl: Time-to-live for each entry in seconds
+        """
+        self.client = supabase_client
+        self._entries: TTLCache[str, List[SearchResult]] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get_version(self, tenant_id: UUID) -> Optional[int]:
+        """Get the current corpus version for a tenant."""
+        if self.client is None:
+            return None
+        return await asyncio.to_thread(read_corpus_version, self.client, tenant_id)
+
+    async def get(self, key: str) -> Optional[List[SearchResult]]:
+        """Get cached results."""
+        return self._entries.get(key)
+
+    async def set(self, key: str, tenant_id: UUID, results: List[SearchResult]) -> None:
+        """Store results."""
+        self._entries[key] = results
+
+
+class SupabaseSearchCacheStore(SearchCacheStore):
+    """
+    Shared store backed by Supabase tables.
+
+    Uses search_corpus_versions and search_result_cache from
+    055_search_result_cache.sql. Requires a service_role client.
+    """
+
+    def __init__(self, supabase_client: Client, ttl: float = CACHE_TTL_SECONDS):
+        """
+        Initialize Supabase-backed store.
+
+        Args:
+            supabase_client: Supabase client with service_role key
+            ttl: Time-to-live for each entry in seconds
+        """
+        self.client = supabase_client
+        self.ttl = ttl
+
+    async def get_version(self, tenant_id: UUID) -> Optional[int]:
+        """Get the current corpus version for a tenant."""
+        return await asyncio.to_thread(read_corpus_version, self.client, tenant_id)
+
+    async def get(self, key: str) -> Optional[List[SearchResult]]:
+        """Get cached results that have not expired."""
+        query = (
+            self.client.table("search_result_cache")
+            .select("results")
+            .eq("cache_key", key)
+            .gt("expires_at", datetime.now(timezone.utc).isoformat())
+            .limit(1)
+        )
+        result = await asyncio.to_thread(query.execute)
+        if not result.data:
+            return None
+        return [_result_from_dict(row) for row in result.data[0]["results"]]
+
+    async def set(self, key: str, tenant_id: UUID, results: List[SearchResult]) -> None:
+        """Store results with an expiry."""
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl)
+        query = self.client.table("search_result_cache").upsert(
+            {
+                "cache_key": key,
+                "tenant_id": str(tenant_id),
+                "results": [_result_to_dict(result) for result in results],
+                "expires_at": expires_at.isoformat(),
+            }
+        )
+        await asyncio.to_thread(query.execute)
+
+
+def _result_to_dict(result: SearchResult) -> Dict[str, Any]:
+    """Serialize a SearchResult for the shared store."""
+    return {
+        "chunk_id": str(result.chunk_id),
+        "document_id": str(result.document_id),
+        "content": result.content,
+        "page_numbers": result.page_numbers,
+        "score": result.score,
+        "metadata": result.metadata,
+    }
+
+
+def _result_from_dict(row: Dict[str, Any]) -> SearchResult:
+    """Deserialize a SearchResult from the shared store."""
+    return SearchResult(
+        chunk_id=UUID(row["chunk_id"]),
+        document_id=UUID(row["document_id"]),
+        content=row["content"],
+        page_numbers=row.get("page_numbers"),
+        score=float(row["score"]),
+        metadata=row.get("metadata"),
+    )
+
+
+class SearchResultCache:
+    """
+    Tenant-versioned search result cache.
+
+    Keys combine tenant, corpus version, mode, normalized query, document
+    filter, limit and a variant tag for search settings. A chunk write bumps
+    the tenant's version in the database, making all of its previous entries
+    unreachable.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SearchCacheStore] = None,
+        version_ttl: float = VERSION_TTL_SECONDS,
+    ):
+        """
+        Initialize search result cache.
+
+        Args:
+            store: Backing store (default: InMemorySearchCacheStore without a
+                version client, which caches nothing)
+            version_ttl: Seconds a tenant's corpus version is reused before it
+                is read again (0 reads it on every lookup)
+        """
+        self.store = store or InMemorySearchCacheStore()
+        self.version_ttl = version_ttl
+        self._versions: Optional[TTLCache[UUID, int]] = (
+            TTLCache(maxsize=VERSION_MAX_SIZE, ttl=version_ttl) if version_ttl > 0 else None
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def build_key(
+        tenant_id: UUID,
+        version: int,
+        query: str,
+        mode: str,
+        limit: int,
+        filter_document_ids: Optional[List[UUID]] = None,
+        variant: str = "",
+    ) -> str:
+        """
+        Build a cache key.
+
+        Args:
+            tenant_id: Tenant identifier
+            version: Tenant corpus version
+            query: Search query text (normalized for the key)
+            mode: Search mode
+            limit: Result limit
+            filter_document_ids: Optional document filter (order-insensitive)
+            variant: Search settings that change results (index, fusion)
+
+        Returns:
+            Hex digest cache key
+        """
+        filters = sorted(str(doc_id) for doc_id in filter_document_ids) if filter_document_ids else None
+        payload = json.dumps(
+            [str(tenant_id), version, mode, normalize_query(query), filters, limit, variant],
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get_version(self, tenant_id: UUID) -> Optional[int]:
+        """
+        Get the tenant's current corpus version.
+
+        Read it once per search and pass it to both get() and set(), so
+        results computed before a concurrent write are never stored under the
+        newer version. The version is reused for version_ttl seconds.
+
+        Returns:
+            Corpus version, or None if versions are unavailable (do not cache)
+        """
+        if self._versions is not None:
+            cached = self._versions.get(tenant_id)
+            if cached is not None:
+                return cached
+
+        try:
+            version = await self.store.get_version(tenant_id)
+        except Exception as e:
+            logger.warning(
+                "Search corpus version lookup failed",
+                extra={"tenant_id": str(tenant_id), "error": str(e)},
+            )
+            return None
+
+        if version is not None and self._versions is not None:
+            self._versions[tenant_id] = version
+        return version
+
+    async def get(
+        self,
+        tenant_id: UUID,
+        version: int,
+        query: str,
+        mode: str,
+        limit: int,
+        filter_document_ids: Optional[List[UUID]] = None,
+        variant: str = "",
+    ) -> Optional[List[SearchResult]]:
+        """
+        Get cached results for a corpus version.
+
+        Store errors are logged and treated as misses.
+
+        Returns:
+            Copy of the cached result list, or None on miss
+        """
+        key = self.build_key(tenant_id, version, query, mode, limit, filter_document_ids, variant)
+        try:
+            results = await self.store.get(key)
+        except Exception as e:
+            logger.warning(
+                "Search result cache lookup failed",
+                extra={"tenant_id": str(tenant_id), "error": str(e)},
+            )
+            return None
+
+        if results is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return list(results)
+
+    async def set(
+        self,
+        tenant_id: UUID,
+        version: int,
+        query: str,
+        mode: str,
+        limit: int,
+        results: List[SearchResult],
+        filter_document_ids: Optional[List[UUID]] = None,
+        variant: str = "",
+    ) -> None:
+        """
+        Cache results under the corpus version they were computed against.
+
+        Store errors are logged and ignored.
+        """
+        key = self.build_key(tenant_id, version, query, mode, limit, filter_document_ids, variant)
+        try:
+            await self.store.set(key, tenant_id, list(results))
+        except Exception as e:
+            logger.warning(
+                "Search result cache store failed",
+                extra={"tenant_id": str(tenant_id), "error": str(e)},
+            )
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Mapping with hit and miss counts
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+
+# Module-level shared cache used by search routes and the RAG answer cache
+_shared_cache: Optional[SearchResultCache] = None
+
+
+def get_search_result_cache() -> SearchResultCache:
+    """
+    Get the process-wide search result cache.
+
+    Corpus versions are read with a service_role client (requires
+    SUPABASE_SERVICE_KEY; without it nothing is cached).
+    SEARCH_CACHE_BACKEND=supabase shares entries across processes; the
+    default is in-memory.
+
+    Returns:
+        Shared SearchResultCache instance
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        from src.auth.client import create_service_client
+
+        client: Optional[Client] = None
+        try:
+            client = create_service_client()
+        except Exception as e:
+            logger.warning(
+                "Search result cache disabled: no service client for corpus versions",
+                extra={"error": str(e)},
+            )
+
+        store: SearchCacheStore
+        if client is not None and os.getenv("SEARCH_CACHE_BACKEND", "memory") == "supabase":
+            store = SupabaseSearchCacheStore(client)
+        else:
+            store = InMemorySearchCacheStore(client)
+        _shared_cache = SearchResultCache(store)
+    return _shared_cache
@@ -0,0 +1,276 @@
+"""
+Vector Store - Understanding Plane
+
+Interface for nearest-neighbour search over chunk embeddings, used by
+HybridSearchService and rag.Retriever.
+
+Backends:
+- PostgresVectorStore: match_document_chunks / match_document_chunks_compact
+  RPCs (default)
+- NumpyVectorStore, HNSWVectorStore: in-process search over per-tenant
+  segments exported from document_chunks (src/search/local_vector_store.py)
+
+SECURITY: The Postgres backend takes the tenant from the client JWT. Local
+backends search the segment for the tenant_id they are given, which must come
+from the authenticated request context, never from user input.
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Literal, Optional
+from uuid import UUID
+
+from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+VectorIndex = Literal["full", "compact"]
+
+# Candidates fetched from the compact index per requested result when re-scoring
+DEFAULT_RESCORE_FACTOR = 4
+
+# Filtered vector searches over at most this many chunks run exact (brute
+# force) instead of through the HNSW index (057_vector_search_tuning.sql)
+DEFAULT_EXACT_SEARCH_MAX_CHUNKS = 1000
+
+# pgvector's upper bound for hnsw.ef_search
+MAX_EF_SEARCH = 1000
+
+# Grouped search: nearest chunks ranked per document, per requested result
+# (max_documents * chunks_per_document)
+DEFAULT_GROUPED_CANDIDATE_FACTOR = 8
+
+
+@dataclass
+class VectorMatch:
+    """Single nearest-neighbour match."""
+
+    chunk_id: UUID
+    document_id: UUID
+    content: str
+    page_numbers: Optional[List[int]]
+    similarity: float
+    section_header: Optional[str] = None
+    token_count: Optional[int] = None
+
+
+class VectorStore(ABC):
+    """Interface for vector similarity search over a tenant's chunks."""
+
+    @abstractmethod
+    async def search(
+        self,
+        tenant_id: Optional[UUID],
+        query_embedding: List[float],
+        match_count: int,
+        filter_document_ids: Optional[List[UUID]] = None,
+    ) -> List[VectorMatch]:
+        """
+        Find the chunks most similar to a query embedding.
+
+        Args:
+            tenant_id: Tenant of the authenticated caller
+            query_embedding: Query embedding vector
+            match_count: Maximum number of matches
+            filter_document_ids: Optional document ID filter
+
+        Returns:
+            Matches sorted by cosine similarity (descending)
+        """
+        pass
+
+    async def search_grouped(
+        self,
+        tenant_id: Optional[UUID],
+        query_embedding: List[float],
+        chunks_per_document: int,
+        max_documents: int,
+        filter_document_ids: Optional[List[UUID]] = None,
+    ) -> List[VectorMatch]:
+        """
+        Find the best chunks of the best-matching documents.
+
+        The default ranks the nearest max_documents * chunks_per_document *
+        DEFAULT_GROUPED_CANDIDATE_FACTOR chunks per document.
+
+        Args:
+            tenant_id: Tenant of the authenticated caller
+            query_embedding: Query embedding vector
+            chunks_per_document: Maximum matches per document
+            max_documents: Maximum number of documents
+            filter_document_ids: Optional document ID filter
+
+        Returns:
+            Matches grouped by document (best document first), each group
+            sorted by cosine similarity (descending)
+        """
+        candidate_count = max_documents * chunks_per_document * DEFAULT_GROUPED_CANDIDATE_FACTOR
+        matches = await self.search(tenant_id, query_embedding, candidate_count, filter_document_ids)
+        return group_matches(matches, chunks_per_document, max_documents)
+
+    def variant(self) -> str:
+        """Describe the settings that change results, for result cache keys."""
+        return type(self).__name__
+
+
+def group_matches(
+    matches: List[VectorMatch],
+    chunks_per_document: int,
+    max_documents: int,
+) -> List[VectorMatch]:
+    """
+    Keep the top chunks of the top documents.
+
+    Args:
+        matches: Matches in any order
+        chunks_per_document: Maximum matches per document
+        max_documents: Maximum number of documents
+
+    Returns:
+        Matches grouped by document (best document first), each group sorted
+        by similarity (descending)
+    """
+    groups: Dict[UUID, List[VectorMatch]] = {}
+    for match in sorted(matches, key=lambda m: m.similarity, reverse=True):
+        group = groups.setdefault(match.document_id, [])
+        if len(group) < chunks_per_document:
+            group.append(match)
+    # Insertion order is best-first
+    return [match for group in list(groups.values())[:max_documents] for match in group]
+
+
+class PostgresVectorStore(VectorStore):
+    """
+    Vector search through the Supabase match functions.
+
+    Tenant isolation is enforced by the database functions, which read the
+    tenant from the client JWT; tenant_id is ignored.
+    """
+
+    def __init__(
+        self,
+        supabase_client: Client,
+        vector_index: VectorIndex = "full",
+        rescore_factor: int = DEFAULT_RESCORE_FACTOR,
+        ef_search: Optional[int] = None,
+        exact_search_max_chunks: int = DEFAULT_EXACT_SEARCH_MAX_CHUNKS,
+    ):
+        """
+        Initialize Postgres vector store.
+
+        Args:
+            supabase_client: Supabase client with user JWT (for tenant isolation)
+            vector_index: "full" for the float32 HNSW index, "compact" for the
+                768-dim halfvec index (053_compact_embeddings.sql)
+            rescore_factor: With the compact index, fetch limit * rescore_factor
+                candidates and re-rank them with full-precision vectors
+                (1 or less disables re-scoring)
+            ef_search: HNSW candidate list size per query (None means 40;
+                always raised to the result limit). Full-precision index only.
+            exact_search_max_chunks: Filtered searches over at most this many
+                chunks are scored exactly (0 disables). Full-precision index only.
+
+        Raises:
+            ValueError: If vector_index or ef_search is invalid
+        """
+        if vector_index not in ("full", "compact"):
+            raise ValueError(f"Invalid vector index: {vector_index}")
+
+        if ef_search is not None and not 1 <= ef_search <= MAX_EF_SEARCH:
+            raise ValueError(f"ef_search must be between 1 and {MAX_EF_SEARCH}")
+
+        self.client = supabase_client
+        self.vector_index = vector_index
+        self.rescore_factor = rescore_factor
+        self.ef_search = ef_search
+        self.exact_search_max_chunks = exact_search_max_chunks
+
+    async def search(
+        self,
+        tenant_id: Optional[UUID],
+        query_embedding: List[float],
+        match_count: int,
+        filter_document_ids: Optional[List[UUID]] = None,
+    ) -> List[VectorMatch]:
+        """Find similar chunks with one RPC (run off the event loop)."""
+        doc_ids = [str(doc_id) for doc_id in filter_document_ids] if filter_document_ids else None
+
+        params: Dict[str, Any] = {
+            "query_embedding": query_embedding,
+            "match_count": match_count,
+            "filter_document_ids": doc_ids,
+        }
+
+        function_name = "match_document_chunks"
+        if self.vector_index == "compact":
+            function_name = "match_document_chunks_compact"
+            params["rescore_count"] = match_count * self.rescore_factor if self.rescore_factor > 1 else 0
+        else:
+            # Recall/latency knobs (057_vector_search_tuning.sql); filtered
+            # searches also use iterative index scans in the database
+            if self.ef_search is not None:
+                params["ef_search"] = self.ef_search
+            if doc_ids:
+                params["exact_max_chunks"] = self.exact_search_max_chunks
+
+        # Blocking client: run in the default thread pool executor
+        result = await asyncio.to_thread(
+            lambda: self.client.rpc(function_name, params).execute()
+        )
+
+        return [
+            VectorMatch(
+                chunk_id=UUID(row["id"]),
+                document_id=UUID(row["document_id"]),
+                content=row["content"],
+                page_numbers=row.get("page_numbers"),
+                similarity=float(row["similarity"]),
+                section_header=row.get("section_header"),
+                token_count=row.get("token_count"),
+            )
+            for row in result.data or []
+        ]
+
+    async def search_grouped(
+        self,
+        tenant_id: Optional[UUID],
+        query_embedding: List[float],
+        chunks_per_document: int,
+        max_documents: int,
+        filter_document_ids: Optional[List[UUID]] = None,
+    ) -> List[VectorMatch]:
+        """Find the best chunks per document with one RPC (061_match_chunks_grouped.sql)."""
+        params: Dict[str, Any] = {
+            "query_embedding": query_embedding,
+            "chunks_per_document": chunks_per_document,
+            "max_documents": max_documents,
+            "candidate_count": min(
+                max_documents * chunks_per_document * DEFAULT_GROUPED_CANDIDATE_FACTOR,
+                MAX_EF_SEARCH,
+            ),
+            "filter_document_ids": (
+                [str(doc_id) for doc_id in filter_document_ids] if filter_document_ids else None
+            ),
+        }
+
+        result = await asyncio.to_thread(
+            lambda: self.client.rpc("match_document_chunks_grouped", params).execute()
+        )
+
+        return [
+            VectorMatch(
+                chunk_id=UUID(row["id"]),
+                document_id=UUID(row["document_id"]),
+                content=row["content"],
+                page_numbers=row.get("page_numbers"),
+                similarity=float(row["similarity"]),
+                token_count=row.get("token_count"),
+            )
+            for row in result.data or []
+        ]
+
+    def variant(self) -> str:
+        """Describe the settings that change results, for result cache keys."""
+        return f"{self.vector_index}:{self.rescore_factor}:{self.ef_search}:{self.exact_search_max_chunks}"
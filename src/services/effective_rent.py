@@ -5,16 +5,21 @@ Calculates effective rent (base rent + additional fees) from extraction data.
 Provides portfolio-level analytics on tenant rent obligations.
 """
 
+import asyncio
 import logging
-import re
+from dataclasses import dataclass, field
+from functools import cached_property
 from typing import List, Optional, Dict, Any
 from uuid import UUID
+
+import numpy as np
 from supabase import Client
 
 from src.db.models.effective_rent import (
     TenantEffectiveRent,
     RentComponents,
     EffectiveRentListResponse,
+    EffectiveRentDashboard,
     EffectiveRentSummary,
     PropertyRentSummary,
     RentByPropertyResponse,
@@ -24,9 +29,92 @@ from src.db.models.effective_rent import (
     RentPerSFResponse,
     PortfolioMetrics,
 )
+from src.services.rent_analytics import (
+    NO_GROUP,
+    RentColumns,
+    group_totals,
+    herfindahl_index,
+    percentiles,
+    portfolio_shares,
+    rent_per_sf_annual,
+    top_n_share,
+)
 
 logger = logging.getLogger(__name__)
 
+# Columns of rent_facts (migration 062) read by the analytics
+RENT_FACT_COLUMNS = (
+    "extraction_id, document_id, document_name, document_type, extracted_at, "
+    "tenant_name, property_name, property_address, base_rent, cam_charges, "
+    "tax_reimbursement, insurance_reimbursement, parking_fee, storage_rent, "
+    "effective_monthly_rent, square_footage, confidence, "
+    "field_confidence_sum, field_confidence_count"
+)
+
+# Rows per rent_facts page (PostgREST's default response limit)
+PAGE_SIZE = 1000
+
+# One rent_facts row
+RentFact = Dict[str, Any]
+
+# Property of leases without a property name
+UNKNOWN_PROPERTY = "Unknown Property"
+
+
+def _rent_list(tenants: List[TenantEffectiveRent]) -> EffectiveRentListResponse:
+    """Effective rent list with totals."""
+    return EffectiveRentListResponse(
+        tenants=tenants,
+        total_count=len(tenants),
+        total_effective_monthly_rent=sum(t.effective_monthly_rent for t in tenants),
+        total_effective_annual_rent=sum(t.effective_annual_rent for t in tenants),
+    )
+
+
+@dataclass
+class PortfolioSnapshot:
+    """
+    A tenant's portfolio, loaded once and shared by the analytics.
+
+    Holds every tenant's effective rent, the rent facts behind them and
+    their columnar form (src/services/rent_analytics.py) for the vectorized
+    aggregates. The analytics methods of EffectiveRentService accept a
+    snapshot, so several of them (the dashboard) read rent_facts once per
+    request.
+    """
+
+    # Highest effective rent first
+    tenants: List[TenantEffectiveRent] = field(default_factory=list)
+    # Rent facts by extraction_id
+    facts: Dict[str, RentFact] = field(default_factory=dict)
+
+    @property
+    def total_monthly_rent(self) -> float:
+        """Total effective monthly rent."""
+        return sum(t.effective_monthly_rent for t in self.tenants)
+
+    @property
+    def total_annual_rent(self) -> float:
+        """Total effective annual rent."""
+        return sum(t.effective_annual_rent for t in self.tenants)
+
+    @cached_property
+    def columns(self) -> RentColumns:
+        """Rent facts as columns; row i is tenants[i]."""
+        return RentColumns.from_facts(list(self.facts.values()))
+
+    def fact_of(self, tenant: TenantEffectiveRent) -> RentFact:
+        """Rent fact of a tenant's extraction."""
+        return self.facts.get(str(tenant.extraction_id), {})
+
+    def ascending(self) -> List[TenantEffectiveRent]:
+        """Tenants by effective rent, lowest first."""
+        return sorted(self.tenants, key=lambda t: t.effective_monthly_rent)
+
+    def rent_list(self, sort_desc: bool = True) -> EffectiveRentListResponse:
+        """Effective rents of the portfolio with totals."""
+        return _rent_list(list(self.tenants) if sort_desc else self.ascending())
+
 
 class EffectiveRentService:
     """
@@ -34,61 +122,114 @@ class EffectiveRentService:
 
     Effective Rent = Base Rent + CAM + Tax + Insurance + Parking + Storage
 
+    Reads the typed rent_facts projection (one row per current extraction
+    with rent, maintained by database triggers; migration 062), so a
+    portfolio loads in one indexed query per 1000 leases.
+
     Enforces tenant isolation via RLS.
     """
 
-    def __init__(self, supabase_client: Client):
+    def __init__(self, supabase_client: Client, tenant_id: Optional[UUID] = None):
         """
         Initialize effective rent service.
 
         Args:
             supabase_client: Supabase client with user JWT (for tenant isolation)
+            tenant_id: Tenant of the supabase_client JWT; filters queries
+                explicitly so the rent_facts indexes are used
         """
         self.client = supabase_client
+        self.tenant_id = tenant_id
+
+    def _facts_query(self) -> Any:
+        """rent_facts query (RLS enforces tenant isolation)."""
+        query = self.client.table('rent_facts').select(RENT_FACT_COLUMNS)
+        if self.tenant_id is not None:
+            query = query.eq('tenant_id', str(self.tenant_id))
+        return query
 
-    def _extract_numeric(self, value_str: Optional[str]) -> float:
+    def _fetch_facts(self, limit: Optional[int] = None, sort_desc: bool = True) -> List[RentFact]:
         """
-        Extract numeric value from currency string.
+        Fetch rent facts: the top `limit` by effective rent, or all of them.
 
         Args:
-            value_str: String like "$5,000.00" or "5000"
+            limit: Optional limit (one indexed top-N query)
+            sort_desc: Highest effective rent first when limited
 
         Returns:
-            Numeric value as float
+            rent_facts rows
         """
-        if not value_str:
-            return 0.0
-
-        # Remove currency symbols, commas, spaces
-        cleaned = re.sub(r'[^\d.]', '', str(value_str))
-        try:
-            return float(cleaned) if cleaned else 0.0
-        except ValueError:
-            return 0.0
+        if limit:
+            result = self._facts_query().order(
+                'effective_monthly_rent', desc=sort_desc
+            ).order('extraction_id').limit(limit).execute()
+            return result.data or []
+
+        rows: List[RentFact] = []
+        start = 0
+        while True:
+            result = self._facts_query().order('extraction_id').range(
+                start, start + PAGE_SIZE - 1
+            ).execute()
+            page = result.data or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+            start += PAGE_SIZE
+
+    def _tenant_rent(self, fact: RentFact) -> TenantEffectiveRent:
+        """Build a tenant's effective rent from its rent fact."""
+        effective_monthly = float(fact['effective_monthly_rent'])
+        return TenantEffectiveRent(
+            tenant_name=fact['tenant_name'],
+            document_id=UUID(fact['document_id']),
+            document_name=fact.get('document_name') or 'Unknown',
+            document_type=fact.get('document_type'),
+            extraction_id=UUID(fact['extraction_id']),
+            rent_components=RentComponents(
+                base_rent=float(fact['base_rent']),
+                cam_charges=float(fact['cam_charges']),
+                tax_reimbursement=float(fact['tax_reimbursement']),
+                insurance_reimbursement=float(fact['insurance_reimbursement']),
+                parking_fee=float(fact['parking_fee']),
+                storage_rent=float(fact['storage_rent']),
+            ),
+            effective_monthly_rent=effective_monthly,
+            effective_annual_rent=effective_monthly * 12,
+            confidence=fact.get('confidence'),
+            extracted_at=fact.get('extracted_at'),
+        )
 
-    def _get_field_value(self, fields: List[Dict[str, Any]], field_name: str) -> float:
+    async def load_snapshot(self) -> PortfolioSnapshot:
         """
-        Get numeric value for a specific field from extraction fields.
-
-        Args:
-            fields: List of extraction field dictionaries
-            field_name: Field name to search for
+        Load the portfolio once for several analytics.
 
         Returns:
-            Numeric value as float
+            PortfolioSnapshot of every tenant's effective rent
         """
-        for field in fields:
-            if field.get('field_name') == field_name:
-                value_str = field.get('field_value', {}).get('value', '')
-                return self._extract_numeric(value_str)
-        return 0.0
-
-    def _get_field_confidence(self, fields: List[Dict[str, Any]], field_name: str) -> Optional[float]:
-        """Get confidence score for a specific field."""
-        for field in fields:
-            if field.get('field_name') == field_name:
-                return field.get('confidence')
-        return None
+        # Blocking Supabase calls run off the event loop
+        facts = await asyncio.to_thread(self._fetch_facts)
+        if not facts:
+            logger.info("No rent facts found")
+
+        tenant_rents = [self._tenant_rent(fact) for fact in facts]
+        tenant_rents.sort(key=lambda t: t.effective_monthly_rent, reverse=True)
+
+        snapshot = PortfolioSnapshot(
+            tenants=tenant_rents,
+            facts={fact['extraction_id']: fact for fact in facts},
+        )
+
+        logger.info(
+            "Calculated effective rents",
+            extra={
+                "tenant_count": len(snapshot.tenants),
+                "total_monthly": snapshot.total_monthly_rent,
+                "total_annual": snapshot.total_annual_rent,
+            },
+        )
+
+        return snapshot
 
     async def calculate_all_effective_rents(
         self,
@@ -107,139 +248,16 @@ class EffectiveRentService:
         """
         logger.info("Calculating effective rents for all tenants")
 
-        # Get all current extractions (RLS enforces tenant isolation)
-        extractions_result = self.client.table('extractions').select(
-            'id, document_id, document_type, extracted_at'
-        ).eq('is_current', True).execute()
-
-        if not extractions_result.data:
-            logger.info("No current extractions found")
-            return EffectiveRentListResponse(
-                tenants=[],
-                total_count=0,
-                total_effective_monthly_rent=0.0,
-                total_effective_annual_rent=0.0,
-            )
-
-        tenant_rents: List[TenantEffectiveRent] = []
-
-        for extraction in extractions_result.data:
-            extraction_id = extraction['id']
-            doc_id = extraction['document_id']
-
-            # Get all fields for this extraction
-            fields_result = self.client.table('extraction_fields').select(
-                'field_name, field_value, confidence'
-            ).eq('extraction_id', extraction_id).execute()
+        if not limit:
+            snapshot = await self.load_snapshot()
+            return snapshot.rent_list(sort_desc=sort_desc)
 
-            if not fields_result.data:
-                continue
-
-            fields = fields_result.data
-
-            # Get tenant name
-            tenant_name = None
-            for field in fields:
-                if field.get('field_name') == 'tenant_name':
-                    tenant_name = field.get('field_value', {}).get('value')
-                    break
-
-            if not tenant_name:
-                continue
+        # Top-N query, already sorted by effective rent
+        facts = await asyncio.to_thread(self._fetch_facts, limit, sort_desc)
+        if not facts:
+            logger.info("No rent facts found")
 
-            # Extract rent components
-            base_rent = self._get_field_value(fields, 'base_rent') or self._get_field_value(fields, 'monthly_rent')
-            cam_charges = self._get_field_value(fields, 'cam_charges')
-            tax_reimbursement = self._get_field_value(fields, 'tax_reimbursement')
-            insurance_reimbursement = self._get_field_value(fields, 'insurance_reimbursement')
-            parking_fee = (
-                self._get_field_value(fields, 'parking_fee') or
-                self._get_field_value(fields, 'parking_rent')
-            )
-            storage_rent = self._get_field_value(fields, 'storage_rent')
-
-            # Calculate effective rent
-            effective_monthly = (
-                base_rent +
-                cam_charges +
-                tax_reimbursement +
-                insurance_reimbursement +
-                parking_fee +
-                storage_rent
-            )
-
-            # Skip if no rent data
-            if effective_monthly == 0.0:
-                continue
-
-            # Get document details
-            doc_result = self.client.table('documents').select(
-                'original_filename'
-            ).eq('id', doc_id).maybe_single().execute()
-
-            doc_name = doc_result.data['original_filename'] if doc_result.data else 'Unknown'
-
-            # Calculate average confidence
-            confidences = [
-                c for c in [
-                    self._get_field_confidence(fields, 'base_rent'),
-                    self._get_field_confidence(fields, 'tenant_name'),
-                ] if c is not None
-            ]
-            avg_confidence = sum(confidences) / len(confidences) if confidences else None
-
-            # Build response object
-            tenant_rent = TenantEffectiveRent(
-                tenant_name=tenant_name,
-                document_id=UUID(doc_id),
-                document_name=doc_name,
-                document_type=extraction['document_type'],
-                extraction_id=UUID(extraction_id),
-                rent_components=RentComponents(
-                    base_rent=base_rent,
-                    cam_charges=cam_charges,
-                    tax_reimbursement=tax_reimbursement,
-                    insurance_reimbursement=insurance_reimbursement,
-                    parking_fee=parking_fee,
-                    storage_rent=storage_rent,
-                ),
-                effective_monthly_rent=effective_monthly,
-                effective_annual_rent=effective_monthly * 12,
-                confidence=avg_confidence,
-                extracted_at=extraction.get('extracted_at'),
-            )
-
-            tenant_rents.append(tenant_rent)
-
-        # Sort by effective rent
-        tenant_rents.sort(
-            key=lambda t: t.effective_monthly_rent,
-            reverse=sort_desc,
-        )
-
-        # Apply limit if specified
-        if limit:
-            tenant_rents = tenant_rents[:limit]
-
-        # Calculate totals
-        total_monthly = sum(t.effective_monthly_rent for t in tenant_rents)
-        total_annual = sum(t.effective_annual_rent for t in tenant_rents)
-
-        logger.info(
-            "Calculated effective rents",
-            extra={
-                "tenant_count": len(tenant_rents),
-                "total_monthly": total_monthly,
-                "total_annual": total_annual,
-            },
-        )
-
-        return EffectiveRentListResponse(
-            tenants=tenant_rents,
-            total_count=len(tenant_rents),
-            total_effective_monthly_rent=total_monthly,
-            total_effective_annual_rent=total_annual,
-        )
+        return _rent_list([self._tenant_rent(fact) for fact in facts[:limit]])
 
     async def get_highest_effective_rent(self) -> Optional[TenantEffectiveRent]:
         """
@@ -251,18 +269,22 @@ class EffectiveRentService:
         result = await self.calculate_all_effective_rents(limit=1, sort_desc=True)
         return result.tenants[0] if result.tenants else None
 
-    async def get_summary(self) -> EffectiveRentSummary:
+    async def get_summary(self, snapshot: Optional[PortfolioSnapshot] = None) -> EffectiveRentSummary:
         """
         Get portfolio summary statistics for effective rent.
 
+        Args:
+            snapshot: Portfolio snapshot to reuse (loaded when omitted)
+
         Returns:
             EffectiveRentSummary with portfolio-level metrics
         """
         logger.info("Generating effective rent summary")
 
-        all_rents = await self.calculate_all_effective_rents(limit=None, sort_desc=True)
+        if snapshot is None:
+            snapshot = await self.load_snapshot()
 
-        if not all_rents.tenants:
+        if not snapshot.tenants:
             return EffectiveRentSummary(
                 total_tenants=0,
                 highest_effective_rent=None,
@@ -272,174 +294,174 @@ class EffectiveRentService:
                 total_portfolio_annual_rent=0.0,
             )
 
-        highest = all_rents.tenants[0]
-        lowest = all_rents.tenants[-1]
-        average_monthly = (
-            all_rents.total_effective_monthly_rent / len(all_rents.tenants)
-            if all_rents.tenants else 0.0
-        )
+        highest = snapshot.tenants[0]
+        lowest = snapshot.tenants[-1]
+        total_monthly = snapshot.total_monthly_rent
+        average_monthly = total_monthly / len(snapshot.tenants)
 
         return EffectiveRentSummary(
-            total_tenants=len(all_rents.tenants),
+            total_tenants=len(snapshot.tenants),
             highest_effective_rent=highest,
             lowest_effective_rent=lowest,
             average_effective_monthly_rent=average_monthly,
-            total_portfolio_monthly_rent=all_rents.total_effective_monthly_rent,
-            total_portfolio_annual_rent=all_rents.total_effective_annual_rent,
+            total_portfolio_monthly_rent=total_monthly,
+            total_portfolio_annual_rent=snapshot.total_annual_rent,
         )
 
-    async def calculate_rent_by_property(self) -> RentByPropertyResponse:
+    async def calculate_rent_by_property(
+        self,
+        snapshot: Optional[PortfolioSnapshot] = None,
+    ) -> RentByPropertyResponse:
         """
         Calculate rent grouped by property.
 
+        Args:
+            snapshot: Portfolio snapshot to reuse (loaded when omitted)
+
         Returns:
             RentByPropertyResponse with rent totals per property
         """
         logger.info("Calculating rent by property")
 
-        # Get all tenants with rent data
-        all_rents = await self.calculate_all_effective_rents(limit=None, sort_desc=False)
+        if snapshot is None:
+            snapshot = await self.load_snapshot()
 
-        if not all_rents.tenants:
+        if not snapshot.tenants:
             return RentByPropertyResponse(
                 properties=[],
                 total_properties=0,
                 total_portfolio_monthly=0.0,
             )
 
-        # Group tenants by property
-        properties_map: Dict[str, List[TenantEffectiveRent]] = {}
-        property_addresses: Dict[str, Optional[str]] = {}
-
-        for tenant in all_rents.tenants:
-            # Get property name from extraction fields
-            fields_result = self.client.table('extraction_fields').select(
-                'field_name, field_value'
-            ).eq('extraction_id', str(tenant.extraction_id)).execute()
-
-            property_name = "Unknown Property"
-            property_address = None
+        columns = snapshot.columns
 
-            if fields_result.data:
-                for field in fields_result.data:
-                    if field.get('field_name') == 'property_name':
-                        property_name = field.get('field_value', {}).get('value', 'Unknown Property')
-                    elif field.get('field_name') == 'property_address':
-                        property_address = field.get('field_value', {}).get('value')
+        # Unnamed properties are pooled as one group
+        names = columns.property_names + [UNKNOWN_PROPERTY]
+        codes = np.where(columns.property_codes == NO_GROUP, len(columns.property_names), columns.property_codes)
+        totals = group_totals(codes, len(names), columns)
 
-            if property_name not in properties_map:
-                properties_map[property_name] = []
-                property_addresses[property_name] = property_address
-
-            properties_map[property_name].append(tenant)
+        # Rows of each property, lowest rent first
+        ascending = np.argsort(columns.effective_monthly_rent, kind='stable')
+        members = np.split(
+            ascending[np.argsort(codes[ascending], kind='stable')],
+            np.cumsum(totals.lease_count)[:-1],
+        )
 
-        # Build property summaries
+        # Build property summaries, highest total rent first
         property_summaries: List[PropertyRentSummary] = []
 
-        for prop_name, tenants in properties_map.items():
-            total_monthly = sum(t.effective_monthly_rent for t in tenants)
-            total_annual = sum(t.effective_annual_rent for t in tenants)
-            avg_per_tenant = total_monthly / len(tenants) if tenants else 0.0
+        for code in np.argsort(-totals.monthly_rent, kind='stable'):
+            if not totals.lease_count[code]:
+                continue
+
+            tenants = [snapshot.tenants[row] for row in members[code]]
+            total_monthly = float(totals.monthly_rent[code])
 
             property_summaries.append(PropertyRentSummary(
-                property_name=prop_name,
-                property_address=property_addresses.get(prop_name),
+                property_name=names[code],
+                property_address=snapshot.fact_of(tenants[0]).get('property_address'),
                 tenant_count=len(tenants),
                 total_monthly_rent=total_monthly,
-                total_annual_rent=total_annual,
-                average_rent_per_tenant=avg_per_tenant,
+                total_annual_rent=total_monthly * 12,
+                average_rent_per_tenant=total_monthly / len(tenants),
                 tenants=tenants,
             ))
 
-        # Sort by total rent descending
-        property_summaries.sort(key=lambda p: p.total_monthly_rent, reverse=True)
+        total_portfolio = columns.total_monthly_rent
 
         logger.info(
             "Calculated rent by property",
             extra={
                 "property_count": len(property_summaries),
-                "total_monthly": all_rents.total_effective_monthly_rent,
+                "total_monthly": total_portfolio,
             },
         )
 
         return RentByPropertyResponse(
             properties=property_summaries,
             total_properties=len(property_summaries),
-            total_portfolio_monthly=all_rents.total_effective_monthly_rent,
+            total_portfolio_monthly=total_portfolio,
         )
 
-    async def calculate_rent_concentration(self, top_n: int = 20) -> RentConcentrationResponse:
+    async def calculate_rent_concentration(
+        self,
+        top_n: int = 20,
+        snapshot: Optional[PortfolioSnapshot] = None,
+    ) -> RentConcentrationResponse:
         """
         Calculate rent concentration (top tenants by % of portfolio).
 
         Args:
             top_n: Number of top tenants to return
+            snapshot: Portfolio snapshot to reuse (loaded when omitted)
 
         Returns:
             RentConcentrationResponse with concentration analysis
         """
         logger.info("Calculating rent concentration", extra={"top_n": top_n})
 
-        # Get all tenants sorted by rent (highest first)
-        all_rents = await self.calculate_all_effective_rents(limit=None, sort_desc=True)
+        if snapshot is None:
+            snapshot = await self.load_snapshot()
 
-        if not all_rents.tenants:
+        if not snapshot.tenants:
             return RentConcentrationResponse(
                 top_tenants=[],
                 top_10_concentration=0.0,
+                herfindahl_index=0.0,
                 total_portfolio_monthly=0.0,
             )
 
-        total_portfolio = all_rents.total_effective_monthly_rent
-
-        # Calculate concentration for each tenant
-        concentrations: List[TenantConcentration] = []
-        cumulative_pct = 0.0
-
-        for tenant in all_rents.tenants[:top_n]:
-            pct_of_portfolio = (tenant.effective_monthly_rent / total_portfolio * 100) if total_portfolio > 0 else 0.0
-            cumulative_pct += pct_of_portfolio
+        columns = snapshot.columns
+        shares, cumulative = portfolio_shares(columns)
 
-            concentrations.append(TenantConcentration(
+        # Concentration of the top tenants
+        concentrations = [
+            TenantConcentration(
                 tenant_name=tenant.tenant_name,
                 effective_monthly_rent=tenant.effective_monthly_rent,
                 effective_annual_rent=tenant.effective_annual_rent,
-                percentage_of_portfolio=pct_of_portfolio,
-                cumulative_percentage=cumulative_pct,
+                percentage_of_portfolio=float(shares[row]),
+                cumulative_percentage=float(cumulative[row]),
                 document_name=tenant.document_name,
-            ))
+            )
+            for row, tenant in enumerate(snapshot.tenants[:top_n])
+        ]
 
-        # Calculate top 10 concentration
-        top_10_monthly = sum(t.effective_monthly_rent for t in all_rents.tenants[:10])
-        top_10_pct = (top_10_monthly / total_portfolio * 100) if total_portfolio > 0 else 0.0
+        top_10_pct = top_n_share(columns, 10)
+        hhi = herfindahl_index(columns)
 
         logger.info(
             "Calculated rent concentration",
             extra={
                 "top_n": len(concentrations),
                 "top_10_concentration": top_10_pct,
+                "herfindahl_index": hhi,
             },
         )
 
         return RentConcentrationResponse(
             top_tenants=concentrations,
             top_10_concentration=top_10_pct,
-            total_portfolio_monthly=total_portfolio,
+            herfindahl_index=hhi,
+            total_portfolio_monthly=columns.total_monthly_rent,
         )
 
-    async def calculate_rent_per_sf(self) -> RentPerSFResponse:
+    async def calculate_rent_per_sf(self, snapshot: Optional[PortfolioSnapshot] = None) -> RentPerSFResponse:
         """
         Calculate rent per square foot for all tenants with SF data.
 
+        Args:
+            snapshot: Portfolio snapshot to reuse (loaded when omitted)
+
         Returns:
             RentPerSFResponse with rent per SF analysis
         """
         logger.info("Calculating rent per square foot")
 
-        # Get all tenants with rent data
-        all_rents = await self.calculate_all_effective_rents(limit=None, sort_desc=False)
+        if snapshot is None:
+            snapshot = await self.load_snapshot()
 
-        if not all_rents.tenants:
+        if not snapshot.tenants:
             return RentPerSFResponse(
                 tenants=[],
                 average_rent_per_sf_monthly=0.0,
@@ -447,52 +469,30 @@ class EffectiveRentService:
                 total_square_footage=0.0,
             )
 
-        # Build rent per SF analysis for tenants with SF data
+        columns = snapshot.columns
+        rows, per_sf_annual = rent_per_sf_annual(columns)
+
+        # Tenants with SF data, lowest rent first
         analyses: List[RentPerSFAnalysis] = []
-        total_sf = 0.0
-        total_monthly_rent = 0.0
-
-        for tenant in all_rents.tenants:
-            # Get square footage from extraction fields
-            fields_result = self.client.table('extraction_fields').select(
-                'field_name, field_value'
-            ).eq('extraction_id', str(tenant.extraction_id)).execute()
-
-            square_footage = None
-            property_name = None
-
-            if fields_result.data:
-                for field in fields_result.data:
-                    field_name = field.get('field_name')
-                    if field_name in ('square_footage', 'rentable_square_feet', 'usable_square_feet'):
-                        sf_value = field.get('field_value', {}).get('value', '')
-                        square_footage = self._extract_numeric(sf_value)
-                        if square_footage > 0:
-                            break
-                    elif field_name == 'property_name':
-                        property_name = field.get('field_value', {}).get('value')
-
-            # Skip tenants without SF data
-            if not square_footage or square_footage == 0:
-                continue
 
-            rent_per_sf_monthly = tenant.effective_monthly_rent / square_footage
-            rent_per_sf_annual = tenant.effective_annual_rent / square_footage
+        for row in rows[np.argsort(columns.effective_monthly_rent[rows], kind='stable')]:
+            tenant = snapshot.tenants[row]
+            square_footage = float(columns.square_footage[row])
+            property_code = columns.property_codes[row]
 
             analyses.append(RentPerSFAnalysis(
                 tenant_name=tenant.tenant_name,
                 effective_monthly_rent=tenant.effective_monthly_rent,
                 square_footage=square_footage,
-                rent_per_sf_monthly=rent_per_sf_monthly,
-                rent_per_sf_annual=rent_per_sf_annual,
-                property_name=property_name,
+                rent_per_sf_monthly=tenant.effective_monthly_rent / square_footage,
+                rent_per_sf_annual=tenant.effective_annual_rent / square_footage,
+                property_name=columns.property_names[property_code] if property_code != NO_GROUP else None,
                 document_name=tenant.document_name,
             ))
 
-            total_sf += square_footage
-            total_monthly_rent += tenant.effective_monthly_rent
-
         # Calculate averages
+        total_sf = float(columns.square_footage[rows].sum())
+        total_monthly_rent = float(columns.effective_monthly_rent[rows].sum())
         avg_monthly_per_sf = (total_monthly_rent / total_sf) if total_sf > 0 else 0.0
         avg_annual_per_sf = avg_monthly_per_sf * 12
 
@@ -510,21 +510,25 @@ class EffectiveRentService:
             average_rent_per_sf_monthly=avg_monthly_per_sf,
             average_rent_per_sf_annual=avg_annual_per_sf,
             total_square_footage=total_sf,
+            rent_per_sf_annual_percentiles=percentiles(per_sf_annual),
         )
 
-    async def calculate_portfolio_metrics(self) -> PortfolioMetrics:
+    async def calculate_portfolio_metrics(self, snapshot: Optional[PortfolioSnapshot] = None) -> PortfolioMetrics:
         """
         Calculate comprehensive portfolio health metrics.
 
+        Args:
+            snapshot: Portfolio snapshot to reuse (loaded when omitted)
+
         Returns:
             PortfolioMetrics with portfolio-level analytics
         """
         logger.info("Calculating portfolio metrics")
 
-        # Get all tenant rent data
-        all_rents = await self.calculate_all_effective_rents(limit=None, sort_desc=True)
+        if snapshot is None:
+            snapshot = await self.load_snapshot()
 
-        if not all_rents.tenants:
+        if not snapshot.tenants:
             return PortfolioMetrics(
                 total_tenants=0,
                 total_properties=0,
@@ -540,68 +544,24 @@ class EffectiveRentService:
                 average_extraction_confidence=0.0,
             )
 
-        # Get property count (unique properties)
-        properties_set = set()
-        total_sf = 0.0
-        confidences: List[float] = []
-
-        for tenant in all_rents.tenants:
-            # Get property name and SF
-            fields_result = self.client.table('extraction_fields').select(
-                'field_name, field_value, confidence'
-            ).eq('extraction_id', str(tenant.extraction_id)).execute()
-
-            if fields_result.data:
-                for field in fields_result.data:
-                    field_name = field.get('field_name')
-
-                    if field_name == 'property_name':
-                        prop_name = field.get('field_value', {}).get('value')
-                        if prop_name:
-                            properties_set.add(prop_name)
-
-                    elif field_name in ('square_footage', 'rentable_square_feet'):
-                        sf_value = field.get('field_value', {}).get('value', '')
-                        sf = self._extract_numeric(sf_value)
-                        if sf > 0:
-                            total_sf += sf
-
-                    # Collect confidences
-                    conf = field.get('confidence')
-                    if conf is not None:
-                        confidences.append(conf)
-
-        # Calculate concentration percentages
-        total_monthly = all_rents.total_effective_monthly_rent
-
-        top_1_monthly = all_rents.tenants[0].effective_monthly_rent if all_rents.tenants else 0.0
-        top_1_pct = (top_1_monthly / total_monthly * 100) if total_monthly > 0 else 0.0
-
-        top_5_monthly = sum(t.effective_monthly_rent for t in all_rents.tenants[:5])
-        top_5_pct = (top_5_monthly / total_monthly * 100) if total_monthly > 0 else 0.0
-
-        top_10_monthly = sum(t.effective_monthly_rent for t in all_rents.tenants[:10])
-        top_10_pct = (top_10_monthly / total_monthly * 100) if total_monthly > 0 else 0.0
-
-        # Calculate averages
-        avg_rent = total_monthly / len(all_rents.tenants) if all_rents.tenants else 0.0
-        avg_sf = total_sf / len(all_rents.tenants) if all_rents.tenants else 0.0
-        avg_rent_per_sf_annual = ((total_monthly * 12) / total_sf) if total_sf > 0 else 0.0
-        avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        columns = snapshot.columns
+        tenant_count = len(columns)
+        total_monthly = columns.total_monthly_rent
+        total_sf = columns.total_square_footage
 
         metrics = PortfolioMetrics(
-            total_tenants=len(all_rents.tenants),
-            total_properties=len(properties_set),
+            total_tenants=tenant_count,
+            total_properties=len(columns.property_names),
             total_monthly_rent=total_monthly,
-            total_annual_rent=all_rents.total_effective_annual_rent,
-            average_rent_per_tenant=avg_rent,
+            total_annual_rent=total_monthly * 12,
+            average_rent_per_tenant=total_monthly / tenant_count,
             total_square_footage=total_sf,
-            average_sf_per_tenant=avg_sf,
-            average_rent_per_sf_annual=avg_rent_per_sf_annual,
-            top_tenant_concentration=top_1_pct,
-            top_5_concentration=top_5_pct,
-            top_10_concentration=top_10_pct,
-            average_extraction_confidence=avg_confidence,
+            average_sf_per_tenant=total_sf / tenant_count,
+            average_rent_per_sf_annual=((total_monthly * 12) / total_sf) if total_sf > 0 else 0.0,
+            top_tenant_concentration=top_n_share(columns, 1),
+            top_5_concentration=top_n_share(columns, 5),
+            top_10_concentration=top_n_share(columns, 10),
+            average_extraction_confidence=columns.average_confidence,
         )
 
         logger.info(
@@ -614,3 +574,26 @@ class EffectiveRentService:
         )
 
         return metrics
+
+    async def get_dashboard(self, top_n: int = 20) -> EffectiveRentDashboard:
+        """
+        Calculate every portfolio analytic from one snapshot.
+
+        Args:
+            top_n: Number of top tenants in the concentration analysis
+
+        Returns:
+            EffectiveRentDashboard with summary, metrics, property, concentration
+            and rent per SF analytics
+        """
+        logger.info("Calculating effective rent dashboard", extra={"top_n": top_n})
+
+        snapshot = await self.load_snapshot()
+
+        return EffectiveRentDashboard(
+            summary=await self.get_summary(snapshot),
+            portfolio_metrics=await self.calculate_portfolio_metrics(snapshot),
+            rent_by_property=await self.calculate_rent_by_property(snapshot),
+            rent_concentration=await self.calculate_rent_concentration(top_n, snapshot),
+            rent_per_sf=await self.calculate_rent_per_sf(snapshot),
+        )
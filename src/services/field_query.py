@@ -0,0 +1,548 @@
+"""
+Structured Field Query Service - Understanding Plane
+
+Filters, sorts and projects current extractions by typed field values
+(extraction_field_values, migration 059). Each filter is one indexed range
+scan on (tenant_id, field_name, value_*), read in pages; matching
+extractions are intersected in Python and their field values fetched in
+batches. Sort-only queries are ordered and limited in the database.
+
+Also answers list-style questions ("which leases expire before 2027?") for
+/ask without retrieval or an LLM call.
+"""
+
+import asyncio
+import calendar
+import logging
+import re
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from supabase import Client
+
+from src.db.models.field_query import (
+    FieldFilter,
+    FieldOperator,
+    FieldQueryRequest,
+    FieldQueryResponse,
+    FieldQueryRow,
+    FieldQueryValue,
+    FieldScalar,
+    FieldSort,
+)
+from src.extraction.cre_fields import (
+    FieldType,
+    get_cre_lease_fields,
+    get_cre_rent_roll_fields,
+)
+from src.rag.models import AskResponse, Citation
+
+logger = logging.getLogger(__name__)
+
+# Typed column of extraction_field_values per field type
+COLUMN_BY_TYPE = {
+    FieldType.DATE: "value_date",
+    FieldType.CURRENCY: "value_number",
+    FieldType.INTEGER: "value_number",
+    FieldType.FLOAT: "value_number",
+}
+TEXT_COLUMN = "value_text"
+
+# Extraction ids per in_() filter (keeps PostgREST URLs short)
+IN_CHUNK_SIZE = 200
+
+# Rows per page (PostgREST's default response limit)
+PAGE_SIZE = 1000
+
+VALUE_COLUMNS = (
+    "extraction_id, document_id, field_name, value_text, value_number, "
+    "value_date, confidence, page_number, is_override"
+)
+
+
+def field_column(field_name: str) -> str:
+    """
+    Get the typed column for a field.
+
+    Args:
+        field_name: Field name from the lease or rent roll definitions
+
+    Returns:
+        value_date, value_number or value_text
+
+    Raises:
+        ValueError: If the field is unknown
+    """
+    definition = get_cre_lease_fields().get(field_name) or get_cre_rent_roll_fields().get(field_name)
+    if definition is None:
+        raise ValueError(f"Unknown field: {field_name}")
+    return COLUMN_BY_TYPE.get(definition.type, TEXT_COLUMN)
+
+
+def _coerce(column: str, value: Optional[FieldScalar]) -> Any:
+    """Convert a filter value to the column type (ValueError if it does not fit)."""
+    if value is None:
+        raise ValueError("Filter value is required")
+    if column == "value_number":
+        return float(value)
+    if column == "value_date":
+        return date.fromisoformat(str(value)).isoformat()
+    return str(value)
+
+
+def _fetch_pages(build_query: Callable[[], Any]) -> List[Dict[str, Any]]:
+    """
+    Read every row of a query, PAGE_SIZE rows at a time.
+
+    PostgREST silently truncates a response at its max-rows limit, so
+    unbounded reads must be paged.
+
+    Args:
+        build_query: Builds a fresh query ordered by a unique key (stable pages)
+
+    Returns:
+        All rows
+    """
+    rows: List[Dict[str, Any]] = []
+    start = 0
+    while True:
+        result = build_query().range(start, start + PAGE_SIZE - 1).execute()
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+class FieldQueryService:
+    """
+    Query current extractions by typed field values.
+
+    Enforces tenant isolation via RLS and an explicit tenant_id filter.
+    """
+
+    def __init__(self, supabase_client: Client, tenant_id: UUID):
+        """
+        Initialize field query service.
+
+        Args:
+            supabase_client: Supabase client with user JWT (for tenant isolation)
+            tenant_id: Caller tenant UUID
+        """
+        self.client = supabase_client
+        self.tenant_id = tenant_id
+
+    def _base_query(self, field_name: str, columns: str, count: Optional[str] = None) -> Any:
+        return (
+            self.client.table("extraction_field_values")
+            .select(columns, count=count)
+            .eq("tenant_id", str(self.tenant_id))
+            .eq("field_name", field_name)
+        )
+
+    def _match_filter(
+        self,
+        field_filter: FieldFilter,
+        document_ids: Optional[List[UUID]],
+    ) -> Set[str]:
+        """Extraction ids matching one filter (one indexed scan, paged)."""
+        rows = _fetch_pages(
+            lambda: self._filter_query(field_filter, document_ids).order("extraction_id")
+        )
+        return {row["extraction_id"] for row in rows}
+
+    def _filter_query(
+        self,
+        field_filter: FieldFilter,
+        document_ids: Optional[List[UUID]],
+    ) -> Any:
+        """Query for the extraction ids matching one filter (ValueError if invalid)."""
+        column = field_column(field_filter.field)
+        query = self._base_query(field_filter.field, "extraction_id")
+        op = field_filter.op
+
+        if op in ("in", "between"):
+            values = [_coerce(column, value) for value in field_filter.values or []]
+            if op == "in":
+                if not values:
+                    raise ValueError("'in' filter requires values")
+                query = query.in_(column, values)
+            else:
+                if len(values) != 2:
+                    raise ValueError("'between' filter requires [low, high]")
+                query = query.gte(column, values[0]).lte(column, values[1])
+        else:
+            value = _coerce(column, field_filter.value)
+            method = {"eq": "eq", "ne": "neq", "lt": "lt", "lte": "lte", "gt": "gt", "gte": "gte"}[op]
+            query = getattr(query, method)(column, value)
+
+        if document_ids:
+            query = query.in_("document_id", [str(doc_id) for doc_id in document_ids])
+        return query
+
+    def _fetch_values(
+        self,
+        extraction_ids: List[str],
+        field_names: List[str],
+    ) -> List[Dict[str, Any]]:
+        """Field values for the matching extractions, chunked by IN_CHUNK_SIZE and paged."""
+        rows: List[Dict[str, Any]] = []
+        for start in range(0, len(extraction_ids), IN_CHUNK_SIZE):
+            chunk = extraction_ids[start:start + IN_CHUNK_SIZE]
+            rows.extend(_fetch_pages(
+                lambda: self.client.table("extraction_field_values")
+                .select(VALUE_COLUMNS)
+                .eq("tenant_id", str(self.tenant_id))
+                .in_("extraction_id", chunk)
+                .in_("field_name", field_names)
+                .order("extraction_id")
+                .order("field_name")
+            ))
+        return rows
+
+    def _fetch_document_names(self, document_ids: Set[str]) -> Dict[str, str]:
+        names: Dict[str, str] = {}
+        ids = sorted(document_ids)
+        for start in range(0, len(ids), IN_CHUNK_SIZE):
+            result = (
+                self.client.table("documents")
+                .select("id, original_filename")
+                .in_("id", ids[start:start + IN_CHUNK_SIZE])
+                .execute()
+            )
+            for row in result.data or []:
+                names[row["id"]] = row.get("original_filename") or "Unknown"
+        return names
+
+    def _run(self, request: FieldQueryRequest) -> FieldQueryResponse:
+        if not request.filters and request.sort is None:
+            raise ValueError("At least one filter or sort is required")
+
+        field_names = list(dict.fromkeys(
+            [field_filter.field for field_filter in request.filters]
+            + ([request.sort.field] if request.sort else [])
+            + request.fields
+        ))
+        for field_name in field_names:
+            field_column(field_name)
+
+        # Most selective filters are unknown up front; stop once empty
+        matched: Optional[Set[str]] = None
+        for field_filter in request.filters:
+            ids = self._match_filter(field_filter, request.document_ids)
+            matched = ids if matched is None else matched & ids
+            if not matched:
+                return FieldQueryResponse(rows=[], total_count=0)
+
+        total_count: Optional[int] = None
+        if matched is None and request.sort is not None:
+            # Sort only: the database orders the extractions that have the
+            # sort field and returns the first `limit` (values missing last)
+            query = self._base_query(request.sort.field, "extraction_id", count="exact")
+            if request.document_ids:
+                query = query.in_("document_id", [str(doc_id) for doc_id in request.document_ids])
+            result = (
+                query.order(field_column(request.sort.field), desc=request.sort.descending, nullsfirst=False)
+                .order("extraction_id")
+                .limit(request.limit)
+                .execute()
+            )
+            matched = {row["extraction_id"] for row in result.data or []}
+            total_count = result.count
+
+        value_rows = self._fetch_values(sorted(matched or set()), field_names)
+
+        rows_by_extraction: Dict[str, FieldQueryRow] = {}
+        for value_row in value_rows:
+            extraction_id = value_row["extraction_id"]
+            row = rows_by_extraction.get(extraction_id)
+            if row is None:
+                row = FieldQueryRow(
+                    document_id=value_row["document_id"],
+                    document_name="Unknown",
+                    extraction_id=extraction_id,
+                )
+                rows_by_extraction[extraction_id] = row
+            row.fields[value_row["field_name"]] = FieldQueryValue(
+                value_text=value_row.get("value_text"),
+                value_number=value_row.get("value_number"),
+                value_date=value_row.get("value_date"),
+                confidence=value_row.get("confidence"),
+                page_number=value_row.get("page_number"),
+                is_override=bool(value_row.get("is_override")),
+            )
+
+        rows = list(rows_by_extraction.values())
+        if request.sort is not None:
+            rows = _sort_rows(rows, request.sort.field, field_column(request.sort.field), request.sort.descending)
+        else:
+            rows.sort(key=lambda row: str(row.document_id))
+
+        if total_count is None:
+            total_count = len(rows)
+        rows = rows[:request.limit]
+
+        names = self._fetch_document_names({str(row.document_id) for row in rows})
+        for row in rows:
+            row.document_name = names.get(str(row.document_id), "Unknown")
+
+        return FieldQueryResponse(rows=rows, total_count=total_count)
+
+    async def query(self, request: FieldQueryRequest) -> FieldQueryResponse:
+        """
+        Run a structured field query.
+
+        Args:
+            request: Filters, sort, projected fields and limit
+
+        Returns:
+            FieldQueryResponse with matching documents
+
+        Raises:
+            ValueError: If a field is unknown or a value does not fit its type
+        """
+        response = await asyncio.to_thread(self._run, request)
+        logger.info(
+            "Field query completed",
+            extra={
+                "tenant_id": str(self.tenant_id),
+                "filter_count": len(request.filters),
+                "sorted": request.sort is not None,
+                "total_count": response.total_count,
+            },
+        )
+        return response
+
+
+def _sort_rows(
+    rows: List[FieldQueryRow],
+    field_name: str,
+    column: str,
+    descending: bool,
+) -> List[FieldQueryRow]:
+    """Sort by the typed value of field_name; rows without a value go last."""
+    present: List[Tuple[Any, FieldQueryRow]] = []
+    missing: List[FieldQueryRow] = []
+    for row in rows:
+        value = row.fields.get(field_name)
+        key = getattr(value, column) if value is not None else None
+        if key is None:
+            missing.append(row)
+        else:
+            present.append((key, row))
+    present.sort(key=lambda item: item[0], reverse=descending)
+    return [row for _, row in present] + missing
+
+
+# =============================================================================
+# Question routing for /ask
+# =============================================================================
+
+_LIST_CUE = re.compile(r"^\s*(which|what|list|show|find|give me|how many)\b", re.IGNORECASE)
+_SUBJECT = re.compile(r"\b(leases|tenants|documents|properties|buildings|units)\b", re.IGNORECASE)
+
+_MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+_DATE = r"(\d{4}-\d{1,2}-\d{1,2}|\d{1,2}/\d{1,2}/\d{4}|(?:[a-z]+\s+)?\d{4})"
+_DATE_CONDITIONS = (
+    ("lease_end_date", re.compile(rf"\b(?:expir\w*|end(?:s|ing)?|terminat\w*)\s+(before|after|by|in|on)\s+{_DATE}", re.IGNORECASE)),
+    ("lease_start_date", re.compile(rf"\b(?:commenc\w*|start(?:s|ing)?|began|begin\w*)\s+(before|after|by|in|on)\s+{_DATE}", re.IGNORECASE)),
+)
+_RENT_CONDITION = re.compile(
+    r"\b(?:base\s+)?rent\s+(?:is\s+|of\s+)?"
+    r"(over|above|greater than|more than|at least|under|below|less than|at most)\s+"
+    r"\$?\s*([\d,]+(?:\.\d+)?)\s*(k\b)?"
+    r"\s*(/\s*sf\b|per\s+(?:sf|square\s+foot|sq\.?\s*ft\.?))?",
+    re.IGNORECASE,
+)
+_RENT_OPS: Dict[str, FieldOperator] = {
+    "over": "gt", "above": "gt", "greater than": "gt", "more than": "gt", "at least": "gte",
+    "under": "lt", "below": "lt", "less than": "lt", "at most": "lte",
+}
+_BUILDING_TYPE = re.compile(r"\b(office|retail|industrial|medical|mixed[\s_-]use)\b", re.IGNORECASE)
+
+# Words that may surround the recognised conditions; any other word means the
+# question asks for more than the field query answers
+_FILLER = frozenset(
+    "a an the all any our my me us is are was were will be do does that which who whose "
+    "with have has having in at on of for and or currently located space".split()
+)
+_WORD = re.compile(r"[a-z0-9]+", re.IGNORECASE)
+
+
+def _date_range(text: str) -> Optional[Tuple[date, date]]:
+    """First and last day covered by a date, "Month YYYY" or "YYYY" (None if invalid, e.g. year 0)."""
+    text = text.strip().lower()
+    try:
+        if "-" in text:
+            day = date.fromisoformat(text)
+            return day, day
+        if "/" in text:
+            month, day_of_month, year = (int(part) for part in text.split("/"))
+            day = date(year, month, day_of_month)
+            return day, day
+
+        parts = text.split()
+        year = int(parts[-1])
+        if len(parts) == 2:
+            if parts[0] not in _MONTHS:
+                return None
+            month = _MONTHS[parts[0]]
+            return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+        return date(year, 1, 1), date(year, 12, 31)
+    except ValueError:
+        return None
+
+
+def _date_filter(field_name: str, preposition: str, text: str) -> Optional[FieldFilter]:
+    bounds = _date_range(text)
+    if bounds is None:
+        return None
+    first, last = bounds
+    preposition = preposition.lower()
+    if preposition == "before":
+        return FieldFilter(field=field_name, op="lt", value=first.isoformat())
+    if preposition == "after":
+        return FieldFilter(field=field_name, op="gt", value=last.isoformat())
+    if preposition == "by":
+        return FieldFilter(field=field_name, op="lte", value=last.isoformat())
+    return FieldFilter(field=field_name, op="between", values=[first.isoformat(), last.isoformat()])
+
+
+def _fully_consumed(question: str, spans: List[Tuple[int, int]]) -> bool:
+    """True if only filler words remain once the spans are removed."""
+    remaining = list(question)
+    for start, end in spans:
+        remaining[start:end] = " " * (end - start)
+    return all(word.lower() in _FILLER for word in _WORD.findall("".join(remaining)))
+
+
+def parse_field_question(question: str) -> Optional[FieldQueryRequest]:
+    """
+    Turn a list-style question into a structured field query.
+
+    Recognises lease expiry/commencement dates ("expiring before 2027",
+    "commencing in June 2025"), rent thresholds ("base rent over $30/SF") and
+    building types, combined with AND. Questions without a list cue ("which",
+    "list", ...) and a plural subject ("leases", "tenants", ...), and compound
+    questions that ask for more than the recognised conditions ("... and what
+    are their renewal options?"), are left to the RAG pipeline.
+
+    Args:
+        question: User question
+
+    Returns:
+        FieldQueryRequest, or None if the question is not a field query
+    """
+    cue = _LIST_CUE.search(question)
+    subjects = list(_SUBJECT.finditer(question))
+    if not cue or not subjects:
+        return None
+
+    # Spans of the question consumed by the cue, subjects and conditions
+    consumed: List[Tuple[int, int]] = [cue.span()] + [subject.span() for subject in subjects]
+
+    filters: List[FieldFilter] = []
+    for field_name, pattern in _DATE_CONDITIONS:
+        match = pattern.search(question)
+        if match:
+            date_filter = _date_filter(field_name, match.group(1), match.group(2))
+            if date_filter is None:
+                return None
+            filters.append(date_filter)
+            consumed.append(match.span())
+
+    rent = _RENT_CONDITION.search(question)
+    if rent:
+        amount = float(rent.group(2).replace(",", "")) * (1000 if rent.group(3) else 1)
+        field_name = "rent_per_square_foot" if rent.group(4) else "base_rent"
+        filters.append(FieldFilter(field=field_name, op=_RENT_OPS[rent.group(1).lower()], value=amount))
+        consumed.append(rent.span())
+
+    building_type = _BUILDING_TYPE.search(question)
+    if building_type:
+        value = re.sub(r"[\s-]", "_", building_type.group(1).lower())
+        filters.append(FieldFilter(field="building_type", op="eq", value=value))
+        consumed.append(building_type.span())
+
+    if not filters or not _fully_consumed(question, consumed):
+        return None
+
+    date_fields = [field_filter.field for field_filter in filters if field_filter.field.endswith("_date")]
+    return FieldQueryRequest(
+        filters=filters,
+        fields=["tenant_name"],
+        sort=FieldSort(field=date_fields[0]) if date_fields else None,
+        limit=100,
+    )
+
+
+def _describe(field_filter: FieldFilter) -> str:
+    label = field_filter.field.replace("_", " ")
+    symbols = {"eq": "=", "ne": "!=", "lt": "<", "lte": "<=", "gt": ">", "gte": ">="}
+    if field_filter.op == "between" and field_filter.values:
+        return f"{label} between {field_filter.values[0]} and {field_filter.values[1]}"
+    if field_filter.op == "in" and field_filter.values:
+        return f"{label} in {', '.join(str(value) for value in field_filter.values)}"
+    return f"{label} {symbols[field_filter.op]} {field_filter.value}"
+
+
+def build_field_answer(request: FieldQueryRequest, response: FieldQueryResponse) -> AskResponse:
+    """
+    Format a field query result as an /ask answer with citations.
+
+    Each matching document is one line citing the page of its first filter
+    field (page 1 if unknown). Without matches the answer says so: the
+    extracted fields are authoritative for the question.
+
+    Args:
+        request: Query that was run
+        response: Its result
+
+    Returns:
+        AskResponse with chunks_used=0
+    """
+    conditions = " and ".join(_describe(field_filter) for field_filter in request.filters)
+    if not response.rows:
+        return AskResponse(
+            answer=f"No documents match where {conditions}.",
+            citations=[],
+            confidence=1.0,
+            chunks_used=0,
+            suggestion="Only documents with extracted fields are included; check that extraction has completed.",
+        )
+    shown = f" (showing {len(response.rows)})" if response.total_count > len(response.rows) else ""
+    lines = [f"Found {response.total_count} matching document(s) where {conditions}{shown}:"]
+    citations: List[Citation] = []
+    confidences: List[float] = []
+
+    shown_fields = list(dict.fromkeys(["tenant_name"] + [field_filter.field for field_filter in request.filters]))
+    for row in response.rows:
+        values = [
+            f"{field_name.replace('_', ' ')}: {row.fields[field_name].value_text}"
+            for field_name in shown_fields
+            if field_name in row.fields and row.fields[field_name].value_text
+        ]
+        cited = next(
+            (row.fields[f.field] for f in request.filters if f.field in row.fields),
+            None,
+        )
+        page = cited.page_number if cited is not None and cited.page_number else 1
+        lines.append(f"- {row.document_name}: {'; '.join(values)} [DOC:{row.document_id}:PAGE:{page}]")
+        citations.append(Citation(
+            document_id=row.document_id,
+            document_name=row.document_name,
+            page=page,
+            snippet="; ".join(values),
+        ))
+        confidences.extend(
+            value.confidence for value in row.fields.values() if value.confidence is not None
+        )
+
+    return AskResponse(
+        answer="\n".join(lines),
+        citations=citations,
+        confidence=round(sum(confidences) / len(confidences), 2) if confidences else 1.0,
+        chunks_used=0,
+        suggestion=None,
+    )
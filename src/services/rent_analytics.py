@@ -0,0 +1,235 @@
+"""
+Rent Analytics Engine - Data Plane
+
+Vectorized portfolio rent analytics over columnar rent facts.
+
+RentColumns holds a portfolio's rent facts (migration 062) as NumPy arrays,
+one row per lease, highest effective rent first. Tenants and properties are
+factorized to integer codes once, so group-bys are bincounts and the
+portfolio aggregates (top-N shares, HHI concentration, percentiles, rent per
+SF distributions) are array operations instead of per-lease Python loops.
+
+EffectiveRentService builds the columns once per PortfolioSnapshot; per-lease
+Pydantic objects are only built for responses that list leases.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+# Percentiles reported by the distributions
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Group code of leases without a value (e.g. no property name)
+NO_GROUP = -1
+
+
+def _factorize(values: Sequence[Any]) -> Tuple[np.ndarray, List[Any]]:
+    """
+    Encode values as integer codes in order of first appearance.
+
+    Args:
+        values: Hashable values (None and "" are encoded as NO_GROUP)
+
+    Returns:
+        (int64 codes, distinct values by code)
+    """
+    # Code each value by the row of its first appearance, then densify
+    first_rows: Dict[Any, int] = {}
+    first = np.fromiter(map(first_rows.setdefault, values, range(len(values))), dtype=np.int64, count=len(values))
+    rows, codes = np.unique(first, return_inverse=True)
+
+    named = np.array([bool(values[row]) for row in rows], dtype=bool)
+    remap = np.where(named, np.cumsum(named) - 1, NO_GROUP)
+    return remap[codes].astype(np.int64), [values[row] for row in rows[named]]
+
+
+@dataclass(frozen=True)
+class RentColumns:
+    """Rent facts as columns, highest effective rent first."""
+
+    effective_monthly_rent: np.ndarray  # float64
+    square_footage: np.ndarray  # float64, 0 when unknown
+    field_confidence_sum: np.ndarray  # float64
+    field_confidence_count: np.ndarray  # int64
+    tenant_codes: np.ndarray  # int64 index into tenant_names
+    tenant_names: List[str]  # distinct, in order of first appearance in the facts
+    property_codes: np.ndarray  # int64 index into property_names, NO_GROUP when unnamed
+    property_names: List[str]  # distinct, in order of first appearance in the facts
+
+    @classmethod
+    def from_facts(cls, facts: Sequence[Mapping[str, Any]]) -> "RentColumns":
+        """
+        Build columns from rent_facts rows.
+
+        Rows are ordered by effective rent descending; ties keep the order of
+        `facts` (the order of EffectiveRentService.load_snapshot tenants).
+
+        Args:
+            facts: rent_facts rows
+
+        Returns:
+            RentColumns
+        """
+        def column(name: str, dtype: Any) -> np.ndarray:
+            values = np.array([fact.get(name) for fact in facts], dtype=np.float64)
+            return np.nan_to_num(values, copy=False).astype(dtype, copy=False)
+
+        rent = column('effective_monthly_rent', np.float64)
+        order = np.argsort(-rent, kind='stable')
+
+        tenant_codes, tenant_names = _factorize([fact['tenant_name'] for fact in facts])
+        property_codes, property_names = _factorize([fact.get('property_name') for fact in facts])
+
+        return cls(
+            effective_monthly_rent=rent[order],
+            square_footage=column('square_footage', np.float64)[order],
+            field_confidence_sum=column('field_confidence_sum', np.float64)[order],
+            field_confidence_count=column('field_confidence_count', np.int64)[order],
+            tenant_codes=tenant_codes[order],
+            tenant_names=tenant_names,
+            property_codes=property_codes[order],
+            property_names=property_names,
+        )
+
+    def __len__(self) -> int:
+        return len(self.effective_monthly_rent)
+
+    @property
+    def total_monthly_rent(self) -> float:
+        """Total effective monthly rent."""
+        return float(self.effective_monthly_rent.sum())
+
+    @property
+    def total_square_footage(self) -> float:
+        """Total leased square footage."""
+        return float(self.square_footage.sum())
+
+    @property
+    def average_confidence(self) -> float:
+        """Pooled confidence of the rent fields (0.0 without any)."""
+        count = int(self.field_confidence_count.sum())
+        return float(self.field_confidence_sum.sum()) / count if count else 0.0
+
+
+@dataclass(frozen=True)
+class GroupTotals:
+    """Lease count and rent totals per group, by group code."""
+
+    lease_count: np.ndarray  # int64
+    monthly_rent: np.ndarray  # float64
+    square_footage: np.ndarray  # float64
+
+
+def group_totals(codes: np.ndarray, groups: int, columns: RentColumns) -> GroupTotals:
+    """
+    Sum leases per group.
+
+    Args:
+        codes: Group code per lease (negative codes are left out)
+        groups: Number of groups
+        columns: Rent columns the codes index
+
+    Returns:
+        GroupTotals with one entry per group code
+    """
+    grouped = codes >= 0
+    codes = codes[grouped]
+    return GroupTotals(
+        lease_count=np.bincount(codes, minlength=groups),
+        monthly_rent=np.bincount(codes, weights=columns.effective_monthly_rent[grouped], minlength=groups),
+        square_footage=np.bincount(codes, weights=columns.square_footage[grouped], minlength=groups),
+    )
+
+
+def property_totals(columns: RentColumns) -> GroupTotals:
+    """Lease count and rent totals per named property."""
+    return group_totals(columns.property_codes, len(columns.property_names), columns)
+
+
+def tenant_totals(columns: RentColumns) -> GroupTotals:
+    """Lease count and rent totals per tenant name (tenants with several leases are pooled)."""
+    return group_totals(columns.tenant_codes, len(columns.tenant_names), columns)
+
+
+def portfolio_shares(columns: RentColumns) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Share of portfolio rent per lease.
+
+    Returns:
+        (% of portfolio rent, cumulative %) per lease, highest rent first;
+        all zero when the portfolio has no rent
+    """
+    total = columns.total_monthly_rent
+    if total <= 0:
+        zeros = np.zeros(len(columns))
+        return zeros, zeros
+    shares = columns.effective_monthly_rent / total * 100
+    # Rounding can take the running sum a hair past 100%
+    return shares, np.minimum(np.cumsum(shares), 100.0)
+
+
+def top_n_share(columns: RentColumns, n: int) -> float:
+    """
+    % of portfolio rent from the n highest-rent leases.
+
+    Args:
+        columns: Rent columns
+        n: Number of leases
+
+    Returns:
+        Percentage (0.0 for an empty portfolio or one without rent)
+    """
+    total = columns.total_monthly_rent
+    if total <= 0 or n <= 0:
+        return 0.0
+    return min(float(columns.effective_monthly_rent[:n].sum()) / total * 100, 100.0)
+
+
+def herfindahl_index(columns: RentColumns) -> float:
+    """
+    Herfindahl-Hirschman index of tenant rent concentration.
+
+    Sum of squared % shares of portfolio rent per tenant name: 10,000 for a
+    single tenant, approaching 0 for many equal tenants.
+
+    Args:
+        columns: Rent columns
+
+    Returns:
+        HHI between 0 and 10,000 (0.0 for a portfolio without rent)
+    """
+    total = columns.total_monthly_rent
+    if total <= 0:
+        return 0.0
+    shares = tenant_totals(columns).monthly_rent / total * 100
+    return min(float(np.square(shares).sum()), 10000.0)
+
+
+def percentiles(values: np.ndarray) -> Dict[str, float]:
+    """
+    Percentiles of a distribution.
+
+    Args:
+        values: Sample
+
+    Returns:
+        Values by "p10", "p25", "p50", "p75", "p90" (empty for an empty sample)
+    """
+    if not len(values):
+        return {}
+    points = np.percentile(values, PERCENTILES)
+    return {f"p{q}": float(point) for q, point in zip(PERCENTILES, points)}
+
+
+def rent_per_sf_annual(columns: RentColumns) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Annual rent per SF of the leases with square footage.
+
+    Returns:
+        (row indices of the leases with square footage, annual rent per SF)
+    """
+    rows = np.flatnonzero(columns.square_footage > 0)
+    per_sf = columns.effective_monthly_rent[rows] * 12 / columns.square_footage[rows]
+    return rows, per_sf
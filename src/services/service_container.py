@@ -0,0 +1,204 @@
+"""
+Service Container - Application Lifespan
+
+Owns the long-lived, expensive-to-build services shared by every request and
+worker task: the OpenAI-backed EmbeddingService, Generator and FieldExtractor
+(each holds an AsyncOpenAI client with its own connection pool) and the
+cross-encoder reranker.
+
+Services are created on first use, so a missing OPENAI_API_KEY only fails the
+requests that need it. warmup() builds them (and loads the tokenizer and
+reranker model) before traffic arrives, optionally only the ones a process
+uses; aclose() closes their HTTP clients.
+
+The API creates the container at startup (see src/main.py) and routes get it
+through the get_services dependency; the extraction worker owns its own.
+"""
+
+import asyncio
+import logging
+from typing import Iterable, Optional
+
+from src.extraction.extractor import FieldExtractor
+from src.rag.context_builder import get_encoding
+from src.rag.generator import Generator
+from src.search.embeddings import EmbeddingService
+from src.search.reranker import SearchReranker, get_search_reranker, shutdown_search_reranker
+
+logger = logging.getLogger(__name__)
+
+# Everything warmup() can prepare
+WARMUP_SERVICES = ("embedding_service", "generator", "field_extractor", "tokenizer", "reranker")
+
+
+class ServiceContainer:
+    """
+    Process-wide holder of shared OpenAI clients and models.
+
+    All services are safe to share between concurrent requests: they keep no
+    per-request state, and AsyncOpenAI clients pool connections.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty container (services are built on first use)."""
+        self._embedding_service: Optional[EmbeddingService] = None
+        self._generator: Optional[Generator] = None
+        self._field_extractor: Optional[FieldExtractor] = None
+        self._reranker: Optional[SearchReranker] = None
+        self.closed = False
+
+    def _check_open(self) -> None:
+        if self.closed:
+            raise RuntimeError("Service container is closed")
+
+    @property
+    def embedding_service(self) -> EmbeddingService:
+        """
+        Shared embedding service.
+
+        Raises:
+            ValueError: If OPENAI_API_KEY is not set
+            RuntimeError: If the container is closed
+        """
+        self._check_open()
+        if self._embedding_service is None:
+            self._embedding_service = EmbeddingService()
+        return self._embedding_service
+
+    @property
+    def generator(self) -> Generator:
+        """
+        Shared RAG answer generator.
+
+        Raises:
+            ValueError: If OPENAI_API_KEY is not set
+            RuntimeError: If the container is closed
+        """
+        self._check_open()
+        if self._generator is None:
+            self._generator = Generator()
+        return self._generator
+
+    @property
+    def field_extractor(self) -> FieldExtractor:
+        """
+        Shared CRE field extractor.
+
+        Raises:
+            ValueError: If OPENAI_API_KEY is not set
+            RuntimeError: If the container is closed
+        """
+        self._check_open()
+        if self._field_extractor is None:
+            self._field_extractor = FieldExtractor()
+        return self._field_extractor
+
+    @property
+    def reranker(self) -> SearchReranker:
+        """Shared cross-encoder reranker (degrades to no-op without the model)."""
+        self._check_open()
+        if self._reranker is None:
+            self._reranker = get_search_reranker()
+        return self._reranker
+
+    async def warmup(self, services: Optional[Iterable[str]] = None) -> None:
+        """
+        Build services and load models before the first request.
+
+        Failures are logged, not raised; the affected service is retried on
+        first use.
+
+        Args:
+            services: Names from WARMUP_SERVICES to prepare (default: all)
+
+        Raises:
+            ValueError: If a service name is unknown
+        """
+        selected = WARMUP_SERVICES if services is None else tuple(services)
+        unknown = set(selected) - set(WARMUP_SERVICES)
+        if unknown:
+            raise ValueError(f"Unknown warmup services: {', '.join(sorted(unknown))}")
+
+        for name in ("embedding_service", "generator", "field_extractor"):
+            if name not in selected:
+                continue
+            try:
+                getattr(self, name)
+            except Exception as e:
+                logger.warning(
+                    "Service not available at warmup",
+                    extra={"service": name, "error": str(e)},
+                )
+
+        if "tokenizer" in selected:
+            try:
+                await asyncio.to_thread(get_encoding)
+            except Exception as e:
+                logger.warning("Tokenizer not loaded at warmup", extra={"error": str(e)})
+
+        if "reranker" in selected:
+            try:
+                await asyncio.to_thread(self.reranker.warmup)
+            except Exception as e:
+                logger.error(
+                    "Failed to warm up cross-encoder reranker",
+                    extra={"error": str(e)},
+                    exc_info=True,
+                )
+
+        logger.info("Service container warmed up", extra={"services": list(selected)})
+
+    async def aclose(self) -> None:
+        """
+        Close the OpenAI clients. Safe to call twice.
+
+        The reranker is a process-wide singleton also used outside the
+        container; shutdown_service_container() shuts it down.
+        """
+        if self.closed:
+            return
+        self.closed = True
+
+        for service in (self._embedding_service, self._generator, self._field_extractor):
+            if service is None:
+                continue
+            try:
+                await service.close()
+            except Exception as e:
+                logger.warning(
+                    "Failed to close service client",
+                    extra={"service": type(service).__name__, "error": str(e)},
+                )
+        self._embedding_service = None
+        self._generator = None
+        self._field_extractor = None
+
+        self._reranker = None
+
+        logger.info("Service container closed")
+
+
+# Module-level container shared by API routes
+_container: Optional[ServiceContainer] = None
+
+
+def get_service_container() -> ServiceContainer:
+    """
+    Get the process-wide service container.
+
+    Returns:
+        Shared ServiceContainer instance
+    """
+    global _container
+    if _container is None or _container.closed:
+        _container = ServiceContainer()
+    return _container
+
+
+async def shutdown_service_container() -> None:
+    """Close the process-wide service container, if it was created, and the shared reranker."""
+    global _container
+    if _container is not None:
+        await _container.aclose()
+        _container = None
+    shutdown_search_reranker()
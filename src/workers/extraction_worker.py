@@ -21,12 +21,14 @@ from uuid import UUID
 from supabase import Client
 
 from src.auth.client import create_service_client
+from src.extraction.extractor import FieldExtractor
 from src.extraction.pipeline import process_document
 from src.services.error_sanitizer import sanitize_exception, get_loggable_error
 from src.extraction.idempotency import (
     ensure_idempotent_processing,
     cleanup_stale_locks,
 )
+from src.services.service_container import ServiceContainer
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +55,7 @@ class ExtractionWorker:
         max_attempts: int = DEFAULT_MAX_ATTEMPTS,
         retry_delay: int = DEFAULT_RETRY_DELAY,
         stale_timeout: int = DEFAULT_STALE_TIMEOUT,
+        services: Optional[ServiceContainer] = None,
     ):
         """
         Initialize extraction worker.
@@ -63,12 +66,16 @@ class ExtractionWorker:
             max_attempts: Maximum retry attempts before dead letter (default: 3)
             retry_delay: Seconds to wait before retrying failed items (default: 60)
             stale_timeout: Seconds before considering processing items stale (default: 3600)
+            services: Shared services (field extractor); the worker creates
+                and closes its own container if not given
         """
         self.concurrency = concurrency
         self.poll_interval = poll_interval
         self.max_attempts = max_attempts
         self.retry_delay = retry_delay
         self.stale_timeout = stale_timeout
+        self.services = services or ServiceContainer()
+        self._owns_services = services is None
 
         self.supabase: Optional[Client] = None
         self.running = False
@@ -391,8 +398,12 @@ class ExtractionWorker:
                 started_at=datetime.utcnow(),
             )
 
-            # Process the document
-            result = await process_document(document_id, supabase)
+            # Process the document (one OpenAI client for all documents)
+            result = await process_document(
+                document_id,
+                supabase,
+                extractor=self._field_extractor(),
+            )
 
             # Check result status
             if result["status"] == "ready":
@@ -478,6 +489,23 @@ class ExtractionWorker:
             # Remove from processing set
             self.processing_ids.discard(item_id)
 
+    def _field_extractor(self) -> Optional[FieldExtractor]:
+        """
+        Get the shared field extractor.
+
+        Returns:
+            FieldExtractor, or None if it cannot be built (e.g. no API key);
+            process_document then fails the document with the same error
+        """
+        try:
+            return self.services.field_extractor
+        except Exception as e:
+            logger.warning(
+                "Shared field extractor unavailable",
+                extra={"error": str(e)},
+            )
+            return None
+
     async def _update_queue_status(
         self,
         item_id: str,
@@ -604,6 +632,9 @@ class ExtractionWorker:
                     extra={"remaining_count": len(self.processing_ids)},
                 )
 
+        if self._owns_services:
+            await self.services.aclose()
+
         logger.info(
             "Extraction worker stopped",
             extra={
@@ -641,11 +672,16 @@ async def main() -> None:
         ],
     )
 
+    # Shared OpenAI client for the worker's lifetime (only extraction runs here)
+    services = ServiceContainer()
+    await services.warmup(["field_extractor"])
+
     # Create and start worker
     worker = ExtractionWorker(
         concurrency=int(os.getenv("WORKER_CONCURRENCY", DEFAULT_CONCURRENCY)),
         poll_interval=int(os.getenv("WORKER_POLL_INTERVAL", DEFAULT_POLL_INTERVAL)),
         max_attempts=int(os.getenv("WORKER_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)),
+        services=services,
     )
 
     try:
@@ -654,6 +690,7 @@ async def main() -> None:
         logger.info("Keyboard interrupt received")
     finally:
         await worker.stop()
+        await services.aclose()
 
 
 if __name__ == "__main__":
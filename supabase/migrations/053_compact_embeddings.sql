@@ -0,0 +1,137 @@
+-- Understanding plane: Reduced-dimension, half-precision vector index
+-- Indexes a 768-dimension halfvec projection of document_chunks.embedding
+-- instead of the full 1536-dimension float32 vector.
+--
+-- text-embedding-3 embeddings are Matryoshka-style: the first N dimensions,
+-- re-normalized, equal the vector returned by the API with dimensions=N.
+-- The projection is therefore computed from the stored embedding, so no
+-- re-embedding or extra column is needed. Full-precision vectors stay in the
+-- heap and are used to re-score the approximate top-k.
+--
+-- Index size per row: 768 dims x 2 bytes = 1.5KB (vs 1536 x 4 bytes = 6KB).
+--
+-- Requires pgvector >= 0.8.0 (halfvec, subvector, l2_normalize,
+-- hnsw.iterative_scan).
+
+-- HNSW expression index on the compact projection using cosine distance
+-- NOTE: The expression must match match_document_chunks_compact exactly,
+-- otherwise the planner will not use this index.
+CREATE INDEX IF NOT EXISTS idx_chunks_embedding_compact ON public.document_chunks
+  USING hnsw ((l2_normalize(subvector(embedding, 1, 768))::halfvec(768)) halfvec_cosine_ops)
+  WITH (m = 16, ef_construction = 64);
+
+-- Compact vector search with optional full-precision re-scoring
+CREATE OR REPLACE FUNCTION public.match_document_chunks_compact(
+  query_embedding vector(1536),
+  match_count INT DEFAULT 10,
+  filter_document_ids UUID[] DEFAULT NULL,
+  rescore_count INT DEFAULT 0
+)
+RETURNS TABLE (
+  id UUID,
+  document_id UUID,
+  content TEXT,
+  page_numbers INT[],
+  similarity FLOAT
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+STABLE
+AS $$
+DECLARE
+  caller_tenant_id UUID;
+  compact_query halfvec(768);
+BEGIN
+  -- SECURITY: Enforce tenant isolation - caller can only query their own tenant
+  -- Extract tenant_id from JWT token (cannot be overridden by callers)
+  caller_tenant_id := public.tenant_id();
+
+  -- Project the full query embedding the same way the index projects rows
+  compact_query := l2_normalize(subvector(query_embedding, 1, 768))::halfvec(768);
+
+  -- ef_search must cover the compact candidates (default 40, which would cap
+  -- re-scoring at 40 rows); pgvector caps it at 1000
+  PERFORM set_config(
+    'hnsw.ef_search',
+    LEAST(GREATEST(COALESCE(rescore_count, 0), match_count, 40), 1000)::TEXT,
+    true
+  );
+
+  IF filter_document_ids IS NOT NULL THEN
+    -- Keep scanning the graph until enough rows pass the filter
+    PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+  END IF;
+
+  IF COALESCE(rescore_count, 0) <= match_count THEN
+    -- Compact-only: rank and score by the half-precision projection
+    -- (relaxed_order scans can return rows slightly out of order, so re-sort
+    -- the already limited candidates)
+    RETURN QUERY
+    WITH candidates AS MATERIALIZED (
+      SELECT
+        dc.id,
+        dc.document_id,
+        dc.content,
+        dc.page_numbers,
+        (l2_normalize(subvector(dc.embedding, 1, 768))::halfvec(768)) <=> compact_query AS distance
+      FROM public.document_chunks dc
+      WHERE dc.tenant_id = caller_tenant_id
+        AND dc.embedding IS NOT NULL
+        AND (filter_document_ids IS NULL OR dc.document_id = ANY(filter_document_ids))
+      ORDER BY (l2_normalize(subvector(dc.embedding, 1, 768))::halfvec(768)) <=> compact_query
+      LIMIT match_count
+    )
+    SELECT
+      c.id,
+      c.document_id,
+      c.content,
+      c.page_numbers,
+      1 - c.distance AS similarity
+    FROM candidates c
+    ORDER BY c.distance;
+  ELSE
+    -- Re-scoring: fetch rescore_count candidates from the compact index,
+    -- then re-rank them with the full-precision vectors
+    RETURN QUERY
+    WITH candidates AS (
+      SELECT
+        dc.id,
+        dc.document_id,
+        dc.content,
+        dc.page_numbers,
+        dc.embedding
+      FROM public.document_chunks dc
+      WHERE dc.tenant_id = caller_tenant_id
+        AND dc.embedding IS NOT NULL
+        AND (filter_document_ids IS NULL OR dc.document_id = ANY(filter_document_ids))
+      ORDER BY (l2_normalize(subvector(dc.embedding, 1, 768))::halfvec(768)) <=> compact_query
+      LIMIT rescore_count
+    )
+    SELECT
+      c.id,
+      c.document_id,
+      c.content,
+      c.page_numbers,
+      1 - (c.embedding <=> query_embedding) AS similarity
+    FROM candidates c
+    ORDER BY c.embedding <=> query_embedding
+    LIMIT match_count;
+  END IF;
+END;
+$$;
+
+-- Grant execute to authenticated users
+GRANT EXECUTE ON FUNCTION public.match_document_chunks_compact(vector(1536), INT, UUID[], INT) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.match_document_chunks_compact(vector(1536), INT, UUID[], INT) TO anon;
+
+-- Note:
+-- - Existing callers of match_document_chunks keep using idx_chunks_embedding.
+--   Once the compact path is validated (scripts/benchmark_compact_embeddings.py),
+--   the full-precision HNSW index can be dropped with
+--   scripts/migrate_compact_embeddings.py to reclaim index memory.
+-- - rescore_count <= match_count disables re-scoring (compact scores returned).
+-- - hnsw.ef_search is raised to max(rescore_count, match_count), so the compact
+--   index returns every re-scoring candidate; filtered calls use iterative
+--   scans so the document filter does not empty the candidate list.
+-- - Tenant isolation: Always uses tenant_id from JWT token (public.tenant_id())
+--   Never accepts tenant_id as parameter to prevent cross-tenant access
@@ -0,0 +1,117 @@
+-- Understanding plane: Single-round-trip hybrid search
+-- Runs the vector (HNSW) and keyword (content_tsv) legs as CTEs, fuses them
+-- with Reciprocal Rank Fusion in the database, and returns only the final
+-- match_count rows. Content is fetched once, for the fused results only.
+--
+-- Equivalent to HybridSearchService._reciprocal_rank_fusion over
+-- match_document_chunks and match_document_chunks_keyword results.
+--
+-- Requires pgvector >= 0.8.0 (hnsw.iterative_scan).
+
+CREATE OR REPLACE FUNCTION public.match_document_chunks_hybrid(
+  query_embedding vector(1536),
+  query_text TEXT,
+  match_count INT DEFAULT 10,
+  filter_document_ids UUID[] DEFAULT NULL,
+  rrf_k INT DEFAULT 60,
+  candidate_count INT DEFAULT NULL
+)
+RETURNS TABLE (
+  id UUID,
+  document_id UUID,
+  content TEXT,
+  page_numbers INT[],
+  score FLOAT
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+STABLE
+AS $$
+DECLARE
+  caller_tenant_id UUID;
+  search_query tsquery;
+  leg_count INT;
+BEGIN
+  -- SECURITY: Enforce tenant isolation - caller can only query their own tenant
+  -- Extract tenant_id from JWT token (cannot be overridden by callers)
+  caller_tenant_id := public.tenant_id();
+
+  -- Same parsing as match_document_chunks_keyword
+  search_query := plainto_tsquery('english', query_text);
+
+  -- Candidates per leg (defaults to 2x match_count, like the Python fusion)
+  leg_count := COALESCE(candidate_count, match_count * 2);
+
+  -- ef_search must cover leg_count (default 40); pgvector caps it at 1000
+  PERFORM set_config('hnsw.ef_search', LEAST(GREATEST(leg_count, 40), 1000)::TEXT, true);
+
+  IF filter_document_ids IS NOT NULL THEN
+    -- Keep scanning the graph until leg_count rows pass the filter
+    PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+  END IF;
+
+  RETURN QUERY
+  WITH vector_candidates AS MATERIALIZED (
+    SELECT
+      dc.id AS chunk_id,
+      dc.embedding <=> query_embedding AS distance
+    FROM public.document_chunks dc
+    WHERE dc.tenant_id = caller_tenant_id
+      AND dc.embedding IS NOT NULL
+      AND (filter_document_ids IS NULL OR dc.document_id = ANY(filter_document_ids))
+    ORDER BY dc.embedding <=> query_embedding
+    LIMIT leg_count
+  ),
+  vector_leg AS (
+    -- Rank by distance: relaxed_order scans can return rows slightly out of order
+    SELECT
+      vc.chunk_id,
+      row_number() OVER (ORDER BY vc.distance) AS leg_rank
+    FROM vector_candidates vc
+  ),
+  keyword_leg AS (
+    SELECT
+      dc.id AS chunk_id,
+      row_number() OVER (ORDER BY ts_rank(dc.content_tsv, search_query) DESC) AS leg_rank
+    FROM public.document_chunks dc
+    WHERE dc.tenant_id = caller_tenant_id
+      AND dc.content_tsv @@ search_query
+      AND (filter_document_ids IS NULL OR dc.document_id = ANY(filter_document_ids))
+    ORDER BY ts_rank(dc.content_tsv, search_query) DESC
+    LIMIT leg_count
+  ),
+  fused AS (
+    SELECT
+      COALESCE(v.chunk_id, k.chunk_id) AS chunk_id,
+      COALESCE(1.0 / (rrf_k + v.leg_rank), 0.0)
+        + COALESCE(1.0 / (rrf_k + k.leg_rank), 0.0) AS rrf_score,
+      v.leg_rank AS vector_rank
+    FROM vector_leg v
+    FULL OUTER JOIN keyword_leg k ON v.chunk_id = k.chunk_id
+    ORDER BY rrf_score DESC, v.leg_rank ASC NULLS LAST
+    LIMIT match_count
+  )
+  SELECT
+    dc.id,
+    dc.document_id,
+    dc.content,
+    dc.page_numbers,
+    f.rrf_score::FLOAT AS score
+  FROM fused f
+  JOIN public.document_chunks dc ON dc.id = f.chunk_id
+  ORDER BY f.rrf_score DESC, f.vector_rank ASC NULLS LAST;
+END;
+$$;
+
+-- Grant execute to authenticated users
+GRANT EXECUTE ON FUNCTION public.match_document_chunks_hybrid(vector(1536), TEXT, INT, UUID[], INT, INT) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.match_document_chunks_hybrid(vector(1536), TEXT, INT, UUID[], INT, INT) TO anon;
+
+-- Note:
+-- - row_number() matches the 1-based ranks used by the Python RRF
+-- - Ties are broken in favour of the vector leg, as in the Python fusion
+-- - hnsw.ef_search is raised to leg_count, so the vector leg is not capped at
+--   the default 40 candidates; filtered calls use iterative scans
+-- - Only the fused match_count rows carry content over the wire
+-- - Tenant isolation: Always uses tenant_id from JWT token (public.tenant_id())
+--   Never accepts tenant_id as parameter to prevent cross-tenant access
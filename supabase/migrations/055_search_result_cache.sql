@@ -0,0 +1,145 @@
+-- Understanding plane: Shared search result cache
+-- Backs SupabaseSearchCacheStore (SEARCH_CACHE_BACKEND=supabase) so cached
+-- search results and per-tenant corpus versions are shared by API and worker
+-- processes. Statement-level triggers on document_chunks bump the tenant's
+-- corpus version on every insert, update and delete (including document and
+-- tenant cascades), whoever writes; cache keys include the version, so older
+-- entries are never read again.
+--
+-- SECURITY: Service role only. Cached results contain chunk content, so these
+-- tables are never exposed to authenticated or anon roles.
+
+-- Per-tenant corpus version
+CREATE TABLE IF NOT EXISTS public.search_corpus_versions (
+  tenant_id UUID PRIMARY KEY REFERENCES public.tenants(id) ON DELETE CASCADE,
+  version BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ DEFAULT now() NOT NULL
+);
+
+-- Cached result lists (key = hash of tenant, version, query, mode, filters, limit)
+CREATE TABLE IF NOT EXISTS public.search_result_cache (
+  cache_key TEXT PRIMARY KEY,
+  tenant_id UUID NOT NULL REFERENCES public.tenants(id) ON DELETE CASCADE,
+  results JSONB NOT NULL,
+  expires_at TIMESTAMPTZ NOT NULL,
+  created_at TIMESTAMPTZ DEFAULT now() NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_search_result_cache_expires
+ON public.search_result_cache(expires_at);
+
+CREATE INDEX IF NOT EXISTS idx_search_result_cache_tenant
+ON public.search_result_cache(tenant_id);
+
+-- Enable RLS immediately (no access without policies)
+ALTER TABLE public.search_corpus_versions ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.search_result_cache ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role manages search corpus versions"
+ON public.search_corpus_versions
+FOR ALL
+USING (auth.role() = 'service_role')
+WITH CHECK (auth.role() = 'service_role');
+
+CREATE POLICY "Service role manages search result cache"
+ON public.search_result_cache
+FOR ALL
+USING (auth.role() = 'service_role')
+WITH CHECK (auth.role() = 'service_role');
+
+-- Atomically increment a tenant's corpus version and drop its cached results
+CREATE OR REPLACE FUNCTION public.bump_search_corpus_version(p_tenant_id UUID)
+RETURNS BIGINT
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+  new_version BIGINT;
+BEGIN
+  INSERT INTO public.search_corpus_versions (tenant_id, version, updated_at)
+  VALUES (p_tenant_id, 1, now())
+  ON CONFLICT (tenant_id) DO UPDATE
+    SET version = public.search_corpus_versions.version + 1,
+        updated_at = now()
+  RETURNING version INTO new_version;
+
+  -- Entries for older versions are unreachable; reclaim the space now
+  DELETE FROM public.search_result_cache WHERE tenant_id = p_tenant_id;
+
+  RETURN new_version;
+END;
+$$;
+
+-- Service role only (manual invalidation, e.g. after changing search settings)
+REVOKE EXECUTE ON FUNCTION public.bump_search_corpus_version(UUID) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.bump_search_corpus_version(UUID) TO service_role;
+
+-- Bump the corpus version of every tenant whose chunks a statement changed
+CREATE OR REPLACE FUNCTION public.bump_search_corpus_versions(p_tenant_ids UUID[])
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+  -- Tenants deleted by the same statement (cascade) have nothing to invalidate
+  INSERT INTO public.search_corpus_versions (tenant_id, version, updated_at)
+  SELECT t.id, 1, now()
+  FROM public.tenants t
+  WHERE t.id = ANY(p_tenant_ids)
+  ON CONFLICT (tenant_id) DO UPDATE
+    SET version = public.search_corpus_versions.version + 1,
+        updated_at = now();
+
+  DELETE FROM public.search_result_cache WHERE tenant_id = ANY(p_tenant_ids);
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.bump_search_corpus_versions(UUID[]) FROM PUBLIC;
+
+-- Statement-level trigger: one bump per tenant per statement, not per row
+CREATE OR REPLACE FUNCTION public.bump_chunk_corpus_versions()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    PERFORM public.bump_search_corpus_versions(ARRAY(SELECT DISTINCT tenant_id FROM new_chunks));
+  ELSIF TG_OP = 'UPDATE' THEN
+    PERFORM public.bump_search_corpus_versions(ARRAY(
+      SELECT tenant_id FROM new_chunks UNION SELECT tenant_id FROM old_chunks
+    ));
+  ELSE
+    PERFORM public.bump_search_corpus_versions(ARRAY(SELECT DISTINCT tenant_id FROM old_chunks));
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+-- Transition tables allow one event per trigger
+DROP TRIGGER IF EXISTS trg_chunks_corpus_version_insert ON public.document_chunks;
+CREATE TRIGGER trg_chunks_corpus_version_insert
+  AFTER INSERT ON public.document_chunks
+  REFERENCING NEW TABLE AS new_chunks
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION public.bump_chunk_corpus_versions();
+
+DROP TRIGGER IF EXISTS trg_chunks_corpus_version_update ON public.document_chunks;
+CREATE TRIGGER trg_chunks_corpus_version_update
+  AFTER UPDATE ON public.document_chunks
+  REFERENCING OLD TABLE AS old_chunks NEW TABLE AS new_chunks
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION public.bump_chunk_corpus_versions();
+
+DROP TRIGGER IF EXISTS trg_chunks_corpus_version_delete ON public.document_chunks;
+CREATE TRIGGER trg_chunks_corpus_version_delete
+  AFTER DELETE ON public.document_chunks
+  REFERENCING OLD TABLE AS old_chunks
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION public.bump_chunk_corpus_versions();
+
+-- Note:
+-- - Both cache backends read search_corpus_versions, so every process sees a
+--   bump as soon as the writing transaction commits
+-- - Expired rows are filtered on read; purge periodically with
+--   DELETE FROM public.search_result_cache WHERE expires_at < now();
@@ -0,0 +1,368 @@
+-- Understanding plane: Tenant-partitioned document chunks
+-- Rebuilds public.document_chunks as a LIST-partitioned table with one
+-- partition per tenant. Every index (HNSW, compact HNSW, GIN, B-tree) is
+-- declared on the parent and therefore built per partition:
+--
+-- - HNSW scans only walk the caller's own graph, so small tenants keep full
+--   recall instead of sharing a global graph dominated by large tenants
+-- - The tenant_id = public.tenant_id() predicate prunes every other partition
+--   (at plan time, or at run time for generic plans inside the match functions)
+-- - A document_ids filter plans against one tenant's rows instead of a
+--   sequential scan over all chunks
+--
+-- New tenants get a partition from a trigger on public.tenants. Rows for a
+-- tenant without a partition land in document_chunks_default.
+--
+-- Rollback: the previous rows are kept as document_chunks_unpartitioned, a
+-- data-only backup (no indexes, keys or triggers, so it costs disk only and
+-- is not touched by document or tenant deletes). Once search has been
+-- verified, drop it in a follow-up migration:
+--   DROP TABLE IF EXISTS public.document_chunks_unpartitioned;
+--
+-- Requires PostgreSQL >= 13 and pgvector >= 0.7.0 (see 053_compact_embeddings.sql).
+
+-- ============================================================================
+-- Step 1: Move the existing table aside
+-- ============================================================================
+
+ALTER TABLE public.document_chunks RENAME TO document_chunks_unpartitioned;
+
+-- Keep only the data: drop keys (frees document_chunks_pkey for the new
+-- table; without foreign keys, deletes no longer cascade into the backup)
+-- and every index (HNSW and GIN indexes would otherwise keep their disk and
+-- memory footprint)
+DO $$
+DECLARE
+  item RECORD;
+BEGIN
+  FOR item IN
+    SELECT conname
+    FROM pg_constraint
+    WHERE conrelid = 'public.document_chunks_unpartitioned'::regclass
+      AND contype IN ('p', 'u', 'f')
+  LOOP
+    EXECUTE format('ALTER TABLE public.document_chunks_unpartitioned DROP CONSTRAINT %I', item.conname);
+  END LOOP;
+
+  FOR item IN
+    SELECT indexrelid::regclass AS index_name
+    FROM pg_index
+    WHERE indrelid = 'public.document_chunks_unpartitioned'::regclass
+  LOOP
+    EXECUTE format('DROP INDEX %s', item.index_name);
+  END LOOP;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_update_chunk_tsv ON public.document_chunks_unpartitioned;
+DROP TRIGGER IF EXISTS trg_chunks_corpus_version_insert ON public.document_chunks_unpartitioned;
+DROP TRIGGER IF EXISTS trg_chunks_corpus_version_update ON public.document_chunks_unpartitioned;
+DROP TRIGGER IF EXISTS trg_chunks_corpus_version_delete ON public.document_chunks_unpartitioned;
+
+-- ============================================================================
+-- Step 2: Partitioned table
+-- ============================================================================
+
+-- Primary and unique keys must include the partition key
+CREATE TABLE public.document_chunks (
+  id UUID NOT NULL DEFAULT gen_random_uuid(),
+  tenant_id UUID NOT NULL REFERENCES public.tenants(id) ON DELETE CASCADE,
+  document_id UUID NOT NULL REFERENCES public.documents(id) ON DELETE CASCADE,
+  extraction_id UUID,  -- Nullable: references future extractions table
+  chunk_index INT NOT NULL,
+  content TEXT NOT NULL,
+  embedding vector(1536),  -- OpenAI text-embedding-3-small
+  token_count INT NOT NULL,
+  page_numbers INT[],
+  section_header TEXT,
+  metadata JSONB DEFAULT '{}',
+  created_at TIMESTAMPTZ DEFAULT now() NOT NULL,
+  content_tsv tsvector,
+  fts tsvector GENERATED ALWAYS AS (to_tsvector('english', content)) STORED,
+  PRIMARY KEY (tenant_id, id),
+  UNIQUE (tenant_id, document_id, chunk_index)
+) PARTITION BY LIST (tenant_id);
+
+-- Catch-all for tenants without a partition (should stay empty)
+CREATE TABLE public.document_chunks_default
+  PARTITION OF public.document_chunks DEFAULT;
+
+-- ============================================================================
+-- Step 3: Indexes (created on every partition, present and future)
+-- ============================================================================
+
+CREATE INDEX idx_chunks_document ON public.document_chunks(tenant_id, document_id);
+CREATE INDEX idx_chunks_extraction ON public.document_chunks(extraction_id)
+  WHERE extraction_id IS NOT NULL;
+
+-- Same parameters as 041_vector_index.sql
+CREATE INDEX idx_chunks_embedding ON public.document_chunks
+  USING hnsw (embedding vector_cosine_ops)
+  WITH (m = 16, ef_construction = 64);
+
+-- NOTE: Expression must match match_document_chunks_compact exactly
+CREATE INDEX idx_chunks_embedding_compact ON public.document_chunks
+  USING hnsw ((l2_normalize(subvector(embedding, 1, 768))::halfvec(768)) halfvec_cosine_ops)
+  WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX idx_chunks_content_tsv ON public.document_chunks USING GIN(content_tsv);
+CREATE INDEX idx_chunks_fts ON public.document_chunks USING GIN(fts);
+
+-- ============================================================================
+-- Step 4: Partition management
+-- ============================================================================
+
+-- Partition name for a tenant (document_chunks_<tenant uuid hex>)
+CREATE OR REPLACE FUNCTION public.document_chunks_partition_name(p_tenant_id UUID)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT 'document_chunks_' || replace(p_tenant_id::text, '-', '');
+$$;
+
+-- Create the tenant's partition if it does not exist
+CREATE OR REPLACE FUNCTION public.create_document_chunks_partition(p_tenant_id UUID)
+RETURNS TEXT
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+  partition_name TEXT := public.document_chunks_partition_name(p_tenant_id);
+BEGIN
+  IF to_regclass(format('public.%I', partition_name)) IS NULL THEN
+    EXECUTE format(
+      'CREATE TABLE public.%I PARTITION OF public.document_chunks FOR VALUES IN (%L)',
+      partition_name,
+      p_tenant_id
+    );
+  END IF;
+  RETURN partition_name;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.create_document_chunks_partition(UUID) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.create_document_chunks_partition(UUID) TO service_role;
+
+-- New tenants get their partition before any chunk is written
+CREATE OR REPLACE FUNCTION public.create_tenant_chunks_partition()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+  PERFORM public.create_document_chunks_partition(NEW.id);
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_create_tenant_chunks_partition ON public.tenants;
+CREATE TRIGGER trg_create_tenant_chunks_partition
+  AFTER INSERT ON public.tenants
+  FOR EACH ROW
+  EXECUTE FUNCTION public.create_tenant_chunks_partition();
+
+-- Existing tenants
+SELECT public.create_document_chunks_partition(t.id) FROM public.tenants t;
+
+-- ============================================================================
+-- Step 5: Copy data
+-- ============================================================================
+
+INSERT INTO public.document_chunks (
+  id, tenant_id, document_id, extraction_id, chunk_index, content, embedding,
+  token_count, page_numbers, section_header, metadata, created_at, content_tsv
+)
+SELECT
+  id, tenant_id, document_id, extraction_id, chunk_index, content, embedding,
+  token_count, page_numbers, section_header, metadata, created_at, content_tsv
+FROM public.document_chunks_unpartitioned;
+
+ANALYZE public.document_chunks;
+
+-- Keep content_tsv maintained (function from 044_keyword_search.sql)
+CREATE TRIGGER trg_update_chunk_tsv
+  BEFORE INSERT OR UPDATE OF content, section_header
+  ON public.document_chunks
+  FOR EACH ROW
+  EXECUTE FUNCTION public.update_chunk_tsv();
+
+-- Keep search cache corpus versions current (function from 055_search_result_cache.sql)
+CREATE TRIGGER trg_chunks_corpus_version_insert
+  AFTER INSERT ON public.document_chunks
+  REFERENCING NEW TABLE AS new_chunks
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION public.bump_chunk_corpus_versions();
+
+CREATE TRIGGER trg_chunks_corpus_version_update
+  AFTER UPDATE ON public.document_chunks
+  REFERENCING OLD TABLE AS old_chunks NEW TABLE AS new_chunks
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION public.bump_chunk_corpus_versions();
+
+CREATE TRIGGER trg_chunks_corpus_version_delete
+  AFTER DELETE ON public.document_chunks
+  REFERENCING OLD TABLE AS old_chunks
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION public.bump_chunk_corpus_versions();
+
+-- ============================================================================
+-- Step 6: Security (same grants and policies as 040_document_chunks.sql)
+-- ============================================================================
+
+ALTER TABLE public.document_chunks ENABLE ROW LEVEL SECURITY;
+
+GRANT SELECT, INSERT, UPDATE ON public.document_chunks TO authenticated;
+GRANT SELECT, INSERT, UPDATE ON public.document_chunks TO anon;
+GRANT SELECT, INSERT, UPDATE, DELETE ON public.document_chunks TO service_role;
+
+CREATE POLICY "Users view own tenant chunks"
+ON public.document_chunks
+FOR SELECT
+USING (tenant_id = public.tenant_id());
+
+CREATE POLICY "Users insert own tenant chunks"
+ON public.document_chunks
+FOR INSERT
+WITH CHECK (tenant_id = public.tenant_id());
+
+CREATE POLICY "Users update own tenant chunks"
+ON public.document_chunks
+FOR UPDATE
+USING (tenant_id = public.tenant_id())
+WITH CHECK (tenant_id = public.tenant_id());
+
+CREATE POLICY "Service role manages chunks"
+ON public.document_chunks
+FOR ALL
+USING (
+  auth.role() = 'service_role' OR
+  (current_setting('request.jwt.claims', true)::jsonb ->> 'role') = 'service_role' OR
+  current_setting('request.jwt.claims', true) IS NULL
+)
+WITH CHECK (
+  auth.role() = 'service_role' OR
+  (current_setting('request.jwt.claims', true)::jsonb ->> 'role') = 'service_role' OR
+  current_setting('request.jwt.claims', true) IS NULL
+);
+
+-- The backup is no longer served to API roles
+REVOKE ALL ON public.document_chunks_unpartitioned FROM authenticated, anon;
+
+-- ============================================================================
+-- Step 7: Match functions
+-- ============================================================================
+-- match_document_chunks, match_document_chunks_keyword and
+-- match_document_chunks_compact already filter on tenant_id = caller_tenant_id
+-- before ordering, which prunes to the caller's partition and uses its
+-- indexes; they need no change. The hybrid function joined fused ids back to
+-- the table by id alone, which has no index on a partitioned table (the key
+-- is (tenant_id, id)) and scanned every partition. Join on the full key.
+
+CREATE OR REPLACE FUNCTION public.match_document_chunks_hybrid(
+  query_embedding vector(1536),
+  query_text TEXT,
+  match_count INT DEFAULT 10,
+  filter_document_ids UUID[] DEFAULT NULL,
+  rrf_k INT DEFAULT 60,
+  candidate_count INT DEFAULT NULL
+)
+RETURNS TABLE (
+  id UUID,
+  document_id UUID,
+  content TEXT,
+  page_numbers INT[],
+  score FLOAT
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+STABLE
+AS $$
+DECLARE
+  caller_tenant_id UUID;
+  search_query tsquery;
+  leg_count INT;
+BEGIN
+  -- SECURITY: Enforce tenant isolation - caller can only query their own tenant
+  -- Extract tenant_id from JWT token (cannot be overridden by callers)
+  caller_tenant_id := public.tenant_id();
+
+  -- Same parsing as match_document_chunks_keyword
+  search_query := plainto_tsquery('english', query_text);
+
+  -- Candidates per leg (defaults to 2x match_count, like the Python fusion)
+  leg_count := COALESCE(candidate_count, match_count * 2);
+
+  -- ef_search must cover leg_count (default 40); pgvector caps it at 1000
+  PERFORM set_config('hnsw.ef_search', LEAST(GREATEST(leg_count, 40), 1000)::TEXT, true);
+
+  IF filter_document_ids IS NOT NULL THEN
+    -- Keep scanning the graph until leg_count rows pass the filter
+    PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+  END IF;
+
+  RETURN QUERY
+  WITH vector_candidates AS MATERIALIZED (
+    SELECT
+      dc.id AS chunk_id,
+      dc.embedding <=> query_embedding AS distance
+    FROM public.document_chunks dc
+    WHERE dc.tenant_id = caller_tenant_id
+      AND dc.embedding IS NOT NULL
+      AND (filter_document_ids IS NULL OR dc.document_id = ANY(filter_document_ids))
+    ORDER BY dc.embedding <=> query_embedding
+    LIMIT leg_count
+  ),
+  vector_leg AS (
+    -- Rank by distance: relaxed_order scans can return rows slightly out of order
+    SELECT
+      vc.chunk_id,
+      row_number() OVER (ORDER BY vc.distance) AS leg_rank
+    FROM vector_candidates vc
+  ),
+  keyword_leg AS (
+    SELECT
+      dc.id AS chunk_id,
+      row_number() OVER (ORDER BY ts_rank(dc.content_tsv, search_query) DESC) AS leg_rank
+    FROM public.document_chunks dc
+    WHERE dc.tenant_id = caller_tenant_id
+      AND dc.content_tsv @@ search_query
+      AND (filter_document_ids IS NULL OR dc.document_id = ANY(filter_document_ids))
+    ORDER BY ts_rank(dc.content_tsv, search_query) DESC
+    LIMIT leg_count
+  ),
+  fused AS (
+    SELECT
+      COALESCE(v.chunk_id, k.chunk_id) AS chunk_id,
+      COALESCE(1.0 / (rrf_k + v.leg_rank), 0.0)
+        + COALESCE(1.0 / (rrf_k + k.leg_rank), 0.0) AS rrf_score,
+      v.leg_rank AS vector_rank
+    FROM vector_leg v
+    FULL OUTER JOIN keyword_leg k ON v.chunk_id = k.chunk_id
+    ORDER BY rrf_score DESC, v.leg_rank ASC NULLS LAST
+    LIMIT match_count
+  )
+  SELECT
+    dc.id,
+    dc.document_id,
+    dc.content,
+    dc.page_numbers,
+    f.rrf_score::FLOAT AS score
+  FROM fused f
+  JOIN public.document_chunks dc
+    ON dc.tenant_id = caller_tenant_id
+   AND dc.id = f.chunk_id
+  ORDER BY f.rrf_score DESC, f.vector_rank ASC NULLS LAST;
+END;
+$$;
+
+-- Note:
+-- - Follow-up: a later migration runs
+--   DROP TABLE IF EXISTS public.document_chunks_unpartitioned;
+--   once partitioned search has been verified in production
+-- - Verified by tests/test_chunk_partition_plans.py against a local
+--   Postgres + pgvector (set CHUNKS_TEST_DATABASE_URL)
+-- - Each partition is a separate HNSW graph; very large tenants can be moved
+--   to their own tablespace or re-indexed independently
+-- - Tenant isolation: Always uses tenant_id from JWT token (public.tenant_id())
+--   Never accepts tenant_id as parameter to prevent cross-tenant access
@@ -0,0 +1,233 @@
+-- Understanding plane: Vector search recall/latency tuning
+-- Extends match_document_chunks (and the vector leg of
+-- match_document_chunks_hybrid) with:
+--
+-- - ef_search: per-call hnsw.ef_search (candidate list size). Higher values
+--   raise recall at the cost of latency; NULL means 40. Always set, and
+--   raised to match_count, so a search never returns fewer rows than asked
+--   for because the candidate list was shorter than the LIMIT.
+-- - Iterative index scans for filtered searches. Without them the HNSW scan
+--   returns ef_search candidates and filter_document_ids is applied afterwards,
+--   so a narrow filter often returns fewer than match_count rows.
+-- - An exact (brute-force) path when the filter selects at most
+--   exact_max_chunks chunks. Scoring a few hundred vectors directly is both
+--   faster and exact, where the approximate scan would walk the whole graph.
+-- - exact: force brute-force search (ground truth for recall benchmarks).
+--
+-- All settings are transaction-local (set_config(..., true)), so they never
+-- leak into other requests on a pooled connection.
+--
+-- Requires pgvector >= 0.8.0 (hnsw.iterative_scan).
+
+-- Replace the 3-argument signature (an overload would make calls ambiguous)
+DROP FUNCTION IF EXISTS public.match_document_chunks(vector(1536), INT, UUID[]);
+
+CREATE OR REPLACE FUNCTION public.match_document_chunks(
+  query_embedding vector(1536),
+  match_count INT DEFAULT 10,
+  filter_document_ids UUID[] DEFAULT NULL,
+  ef_search INT DEFAULT NULL,
+  exact_max_chunks INT DEFAULT 1000,
+  exact BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (
+  id UUID,
+  document_id UUID,
+  content TEXT,
+  page_numbers INT[],
+  similarity FLOAT
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+STABLE
+AS $$
+DECLARE
+  caller_tenant_id UUID;
+  use_exact BOOLEAN := COALESCE(exact, FALSE);
+  filtered_chunks BIGINT;
+BEGIN
+  -- SECURITY: Enforce tenant isolation - caller can only query their own tenant
+  -- Extract tenant_id from JWT token (cannot be overridden by callers)
+  caller_tenant_id := public.tenant_id();
+
+  -- ef_search must cover match_count (default 40); pgvector caps it at 1000
+  PERFORM set_config(
+    'hnsw.ef_search',
+    LEAST(GREATEST(COALESCE(ef_search, 40), match_count), 1000)::TEXT,
+    true
+  );
+
+  IF NOT use_exact AND filter_document_ids IS NOT NULL THEN
+    -- Cheap count over idx_chunks_document (tenant_id, document_id)
+    SELECT count(*) INTO filtered_chunks
+    FROM public.document_chunks dc
+    WHERE dc.tenant_id = caller_tenant_id
+      AND dc.document_id = ANY(filter_document_ids)
+      AND dc.embedding IS NOT NULL;
+
+    use_exact := filtered_chunks <= COALESCE(exact_max_chunks, 0);
+
+    IF NOT use_exact THEN
+      -- Keep scanning the graph until match_count rows pass the filter
+      PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+    END IF;
+  END IF;
+
+  IF use_exact THEN
+    -- Brute force: the MATERIALIZED CTE keeps the planner off the HNSW index
+    RETURN QUERY
+    WITH scoped AS MATERIALIZED (
+      SELECT
+        dc.id,
+        dc.document_id,
+        dc.content,
+        dc.page_numbers,
+        dc.embedding <=> query_embedding AS distance
+      FROM public.document_chunks dc
+      WHERE dc.tenant_id = caller_tenant_id
+        AND dc.embedding IS NOT NULL
+        AND (filter_document_ids IS NULL OR dc.document_id = ANY(filter_document_ids))
+    )
+    SELECT
+      s.id,
+      s.document_id,
+      s.content,
+      s.page_numbers,
+      1 - s.distance AS similarity
+    FROM scoped s
+    ORDER BY s.distance
+    LIMIT match_count;
+  ELSE
+    -- Approximate: relaxed_order iterative scans can return rows slightly
+    -- out of order, so re-sort the (already limited) candidates
+    RETURN QUERY
+    WITH candidates AS MATERIALIZED (
+      SELECT
+        dc.id,
+        dc.document_id,
+        dc.content,
+        dc.page_numbers,
+        dc.embedding <=> query_embedding AS distance
+      FROM public.document_chunks dc
+      WHERE dc.tenant_id = caller_tenant_id
+        AND dc.embedding IS NOT NULL
+        AND (filter_document_ids IS NULL OR dc.document_id = ANY(filter_document_ids))
+      ORDER BY dc.embedding <=> query_embedding
+      LIMIT match_count
+    )
+    SELECT
+      c.id,
+      c.document_id,
+      c.content,
+      c.page_numbers,
+      1 - c.distance AS similarity
+    FROM candidates c
+    ORDER BY c.distance;
+  END IF;
+END;
+$$;
+
+-- Grant execute to authenticated users
+GRANT EXECUTE ON FUNCTION public.match_document_chunks(vector(1536), INT, UUID[], INT, INT, BOOLEAN) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.match_document_chunks(vector(1536), INT, UUID[], INT, INT, BOOLEAN) TO anon;
+
+-- Database-fused hybrid search with the same knobs. The vector leg calls
+-- match_document_chunks, so it gets the same ef_search, iterative scans and
+-- exact path as the semantic leg of the application fusion.
+DROP FUNCTION IF EXISTS public.match_document_chunks_hybrid(vector(1536), TEXT, INT, UUID[], INT, INT);
+
+CREATE OR REPLACE FUNCTION public.match_document_chunks_hybrid(
+  query_embedding vector(1536),
+  query_text TEXT,
+  match_count INT DEFAULT 10,
+  filter_document_ids UUID[] DEFAULT NULL,
+  rrf_k INT DEFAULT 60,
+  candidate_count INT DEFAULT NULL,
+  ef_search INT DEFAULT NULL,
+  exact_max_chunks INT DEFAULT 1000
+)
+RETURNS TABLE (
+  id UUID,
+  document_id UUID,
+  content TEXT,
+  page_numbers INT[],
+  score FLOAT
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+STABLE
+AS $$
+DECLARE
+  caller_tenant_id UUID;
+  search_query tsquery;
+  leg_count INT;
+BEGIN
+  -- SECURITY: Enforce tenant isolation - caller can only query their own tenant
+  -- Extract tenant_id from JWT token (cannot be overridden by callers)
+  caller_tenant_id := public.tenant_id();
+
+  -- Same parsing as match_document_chunks_keyword
+  search_query := plainto_tsquery('english', query_text);
+
+  -- Candidates per leg (defaults to 2x match_count, like the Python fusion)
+  leg_count := COALESCE(candidate_count, match_count * 2);
+
+  RETURN QUERY
+  WITH vector_leg AS (
+    -- match_document_chunks returns rows best first and raises ef_search to
+    -- leg_count itself
+    SELECT
+      m.id AS chunk_id,
+      row_number() OVER (ORDER BY m.similarity DESC) AS leg_rank
+    FROM public.match_document_chunks(
+      query_embedding, leg_count, filter_document_ids, ef_search, exact_max_chunks
+    ) m
+  ),
+  keyword_leg AS (
+    SELECT
+      dc.id AS chunk_id,
+      row_number() OVER (ORDER BY ts_rank(dc.content_tsv, search_query) DESC) AS leg_rank
+    FROM public.document_chunks dc
+    WHERE dc.tenant_id = caller_tenant_id
+      AND dc.content_tsv @@ search_query
+      AND (filter_document_ids IS NULL OR dc.document_id = ANY(filter_document_ids))
+    ORDER BY ts_rank(dc.content_tsv, search_query) DESC
+    LIMIT leg_count
+  ),
+  fused AS (
+    SELECT
+      COALESCE(v.chunk_id, k.chunk_id) AS chunk_id,
+      COALESCE(1.0 / (rrf_k + v.leg_rank), 0.0)
+        + COALESCE(1.0 / (rrf_k + k.leg_rank), 0.0) AS rrf_score,
+      v.leg_rank AS vector_rank
+    FROM vector_leg v
+    FULL OUTER JOIN keyword_leg k ON v.chunk_id = k.chunk_id
+    ORDER BY rrf_score DESC, v.leg_rank ASC NULLS LAST
+    LIMIT match_count
+  )
+  SELECT
+    dc.id,
+    dc.document_id,
+    dc.content,
+    dc.page_numbers,
+    f.rrf_score::FLOAT AS score
+  FROM fused f
+  JOIN public.document_chunks dc
+    ON dc.tenant_id = caller_tenant_id
+   AND dc.id = f.chunk_id
+  ORDER BY f.rrf_score DESC, f.vector_rank ASC NULLS LAST;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.match_document_chunks_hybrid(vector(1536), TEXT, INT, UUID[], INT, INT, INT, INT) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.match_document_chunks_hybrid(vector(1536), TEXT, INT, UUID[], INT, INT, INT, INT) TO anon;
+
+-- Note:
+-- - Existing 3-argument callers (rag.Retriever) get the new defaults: iterative
+--   scans and the exact path for small document filters.
+-- - match_document_chunks_hybrid takes the same ef_search and
+--   exact_max_chunks; the compact index has no database fusion (the search
+--   service fuses compact results in Python).
+-- - Recall/latency per ef_search: scripts/benchmark_vector_recall.py
+-- - Tenant isolation: Always uses tenant_id from JWT token (public.tenant_id())
+--   Never accepts tenant_id as parameter to prevent cross-tenant access
@@ -0,0 +1,120 @@
+-- Understanding plane: Prefix and fuzzy keyword search for document chunks
+-- match_document_chunks_keyword (plainto_tsquery) only matches whole lexemes,
+-- so partial names ("Starb"), suite numbers ("Suite 20") and typos
+-- ("escalaton") return nothing. match_document_chunks_fuzzy unions two
+-- index-backed candidate sets:
+--
+-- - Prefix: websearch_to_tsquery OR every query word as a prefix ("starb:*"),
+--   over the content_tsv GIN index
+-- - Trigram: word_similarity(query, content) >= similarity_threshold
+--   ("<%" operator), over a pg_trgm GIN index on content
+--
+-- and ranks them by the better of ts_rank and word_similarity. The Python
+-- service fuses it with the semantic and keyword legs by RRF.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Trigram index (created on every tenant partition of document_chunks)
+CREATE INDEX IF NOT EXISTS idx_chunks_content_trgm
+ON public.document_chunks USING GIN (content gin_trgm_ops);
+
+-- Every word of query_text as an English prefix term, AND-ed ("starb:* & 20:*")
+CREATE OR REPLACE FUNCTION public.prefix_tsquery(query_text TEXT)
+RETURNS tsquery
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT to_tsquery('english', string_agg(quote_literal(word) || ':*', ' & '))
+  FROM regexp_split_to_table(lower(COALESCE(query_text, '')), '[^[:alnum:]]+') AS word
+  WHERE word <> '';
+$$;
+
+CREATE OR REPLACE FUNCTION public.match_document_chunks_fuzzy(
+  query_text TEXT,
+  match_count INT DEFAULT 10,
+  filter_document_ids UUID[] DEFAULT NULL,
+  similarity_threshold REAL DEFAULT 0.5
+)
+RETURNS TABLE (
+  id UUID,
+  document_id UUID,
+  content TEXT,
+  page_numbers INT[],
+  rank FLOAT
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+STABLE
+AS $$
+DECLARE
+  caller_tenant_id UUID;
+  search_query tsquery;
+  candidate_count INT := GREATEST(match_count, 1) * 4;
+BEGIN
+  -- SECURITY: Enforce tenant isolation - caller can only query their own tenant
+  caller_tenant_id := public.tenant_id();
+
+  -- Whole lexemes (quotes, OR, -exclusion) or every word as a prefix
+  search_query := websearch_to_tsquery('english', query_text) || public.prefix_tsquery(query_text);
+
+  -- Threshold for the <% operator (transaction-local)
+  PERFORM set_config(
+    'pg_trgm.word_similarity_threshold',
+    LEAST(GREATEST(similarity_threshold, 0), 1)::TEXT,
+    true
+  );
+
+  RETURN QUERY
+  WITH prefix_matches AS (
+    SELECT dc.id AS chunk_id
+    FROM public.document_chunks dc
+    WHERE dc.tenant_id = caller_tenant_id
+      AND dc.content_tsv @@ search_query
+      AND (filter_document_ids IS NULL OR dc.document_id = ANY(filter_document_ids))
+    ORDER BY ts_rank(dc.content_tsv, search_query) DESC
+    LIMIT candidate_count
+  ),
+  trigram_matches AS (
+    SELECT dc.id AS chunk_id
+    FROM public.document_chunks dc
+    WHERE dc.tenant_id = caller_tenant_id
+      AND query_text <% dc.content
+      AND (filter_document_ids IS NULL OR dc.document_id = ANY(filter_document_ids))
+    ORDER BY word_similarity(query_text, dc.content) DESC
+    LIMIT candidate_count
+  ),
+  candidates AS (
+    SELECT p.chunk_id FROM prefix_matches p
+    UNION
+    SELECT t.chunk_id FROM trigram_matches t
+  )
+  SELECT
+    dc.id,
+    dc.document_id,
+    dc.content,
+    dc.page_numbers,
+    GREATEST(
+      ts_rank(dc.content_tsv, search_query),
+      word_similarity(query_text, dc.content)
+    )::FLOAT AS rank
+  FROM candidates c
+  JOIN public.document_chunks dc
+    ON dc.tenant_id = caller_tenant_id AND dc.id = c.chunk_id
+  ORDER BY rank DESC
+  LIMIT match_count;
+END;
+$$;
+
+-- Grant execute permissions
+GRANT EXECUTE ON FUNCTION public.prefix_tsquery(TEXT) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.match_document_chunks_fuzzy(TEXT, INT, UUID[], REAL) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.match_document_chunks_fuzzy(TEXT, INT, UUID[], REAL) TO anon;
+
+-- Note:
+-- - word_similarity compares the query with the best-matching extent of the
+--   content, so long chunks are not penalised the way similarity() would
+-- - Lower similarity_threshold tolerates more typos but widens the trigram
+--   candidate set (more index rechecks)
+-- - Stop words are dropped from the prefix query by the english configuration
+-- - Index usage is checked in tests/test_chunk_partition_plans.py
+-- - Tenant isolation: Always uses tenant_id from JWT token
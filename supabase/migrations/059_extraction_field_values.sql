@@ -0,0 +1,239 @@
+-- Understanding plane: Typed projection of current extraction fields
+-- extraction_fields.field_value is JSONB (a bare value, or {"value": ...}),
+-- so "leases expiring before 2027 with base rent > $30/SF" cannot use an
+-- index. extraction_field_values keeps one typed row per field of each
+-- current extraction:
+--
+-- - value_text:   the value as text (enums, names)
+-- - value_number: first number in the value ("$52,500/month" -> 52500)
+-- - value_date:   ISO or US date ("2029-06-30", "06/30/2029")
+--
+-- with B-tree indexes on (tenant_id, field_name, value_*). Rows are
+-- maintained by triggers: field inserts/updates (including overrides, which
+-- win over extracted values) and is_current changes on extractions.
+
+-- Value text from a field_value JSONB
+CREATE OR REPLACE FUNCTION public.extraction_field_text(field_value JSONB)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT NULLIF(btrim(
+    CASE jsonb_typeof(field_value)
+      WHEN 'object' THEN field_value ->> 'value'
+      WHEN 'null' THEN NULL
+      ELSE field_value #>> '{}'
+    END
+  ), '');
+$$;
+
+-- First number in a value ("$4,250.50 per month" -> 4250.50), NULL if none
+CREATE OR REPLACE FUNCTION public.extraction_field_number(value TEXT)
+RETURNS NUMERIC
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT replace(substring(value FROM '-?[0-9][0-9,]*(?:\.[0-9]+)?'), ',', '')::NUMERIC;
+$$;
+
+-- ISO (YYYY-MM-DD) or US (MM/DD/YYYY) date, NULL if neither
+CREATE OR REPLACE FUNCTION public.extraction_field_date(value TEXT)
+RETURNS DATE
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+  IF value ~ '^\d{4}-\d{1,2}-\d{1,2}' THEN
+    RETURN to_date(substring(value FROM '^\d{4}-\d{1,2}-\d{1,2}'), 'YYYY-MM-DD');
+  ELSIF value ~ '^\d{1,2}/\d{1,2}/\d{4}' THEN
+    RETURN to_date(substring(value FROM '^\d{1,2}/\d{1,2}/\d{4}'), 'MM/DD/YYYY');
+  END IF;
+  RETURN NULL;
+EXCEPTION WHEN others THEN
+  RETURN NULL;
+END;
+$$;
+
+CREATE TABLE IF NOT EXISTS public.extraction_field_values (
+  extraction_id UUID NOT NULL REFERENCES public.extractions(id) ON DELETE CASCADE,
+  field_name TEXT NOT NULL,
+  field_id UUID NOT NULL REFERENCES public.extraction_fields(id) ON DELETE CASCADE,
+  tenant_id UUID NOT NULL REFERENCES public.tenants(id) ON DELETE CASCADE,
+  document_id UUID NOT NULL REFERENCES public.documents(id) ON DELETE CASCADE,
+  value_text TEXT,
+  value_number NUMERIC,
+  value_date DATE,
+  confidence FLOAT,
+  page_number INT,
+  is_override BOOLEAN NOT NULL DEFAULT false,
+  PRIMARY KEY (extraction_id, field_name)
+);
+
+-- Typed indexes for filters, ranges and sorts within a tenant
+CREATE INDEX IF NOT EXISTS idx_field_values_number
+  ON public.extraction_field_values(tenant_id, field_name, value_number)
+  WHERE value_number IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_field_values_date
+  ON public.extraction_field_values(tenant_id, field_name, value_date)
+  WHERE value_date IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_field_values_text
+  ON public.extraction_field_values(tenant_id, field_name, value_text);
+CREATE INDEX IF NOT EXISTS idx_field_values_document
+  ON public.extraction_field_values(tenant_id, document_id);
+
+-- Upsert the projection row for one field (overrides are never replaced by
+-- extracted values)
+CREATE OR REPLACE FUNCTION public.project_extraction_field(
+  field public.extraction_fields,
+  field_tenant_id UUID,
+  field_document_id UUID
+)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+  value TEXT := public.extraction_field_text(field.field_value);
+BEGIN
+  INSERT INTO public.extraction_field_values AS v (
+    extraction_id, field_name, field_id, tenant_id, document_id,
+    value_text, value_number, value_date, confidence, page_number, is_override
+  )
+  VALUES (
+    field.extraction_id, field.field_name, field.id, field_tenant_id, field_document_id,
+    value, public.extraction_field_number(value), public.extraction_field_date(value),
+    field.confidence, field.page_number, COALESCE(field.is_override, false)
+  )
+  ON CONFLICT (extraction_id, field_name) DO UPDATE SET
+    field_id = EXCLUDED.field_id,
+    value_text = EXCLUDED.value_text,
+    value_number = EXCLUDED.value_number,
+    value_date = EXCLUDED.value_date,
+    confidence = EXCLUDED.confidence,
+    page_number = EXCLUDED.page_number,
+    is_override = EXCLUDED.is_override
+  WHERE NOT v.is_override OR EXCLUDED.is_override OR v.field_id = EXCLUDED.field_id;
+END;
+$$;
+
+-- extraction_fields trigger: project fields of current extractions
+CREATE OR REPLACE FUNCTION public.sync_extraction_field_value()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+  parent RECORD;
+BEGIN
+  SELECT e.tenant_id, e.document_id, e.is_current INTO parent
+  FROM public.extractions e
+  WHERE e.id = NEW.extraction_id;
+
+  IF FOUND AND COALESCE(parent.is_current, false) THEN
+    PERFORM public.project_extraction_field(NEW, parent.tenant_id, parent.document_id);
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_sync_extraction_field_value ON public.extraction_fields;
+CREATE TRIGGER trg_sync_extraction_field_value
+  AFTER INSERT OR UPDATE OF field_value, is_override, confidence, page_number
+  ON public.extraction_fields
+  FOR EACH ROW
+  EXECUTE FUNCTION public.sync_extraction_field_value();
+
+-- extractions trigger: drop superseded extractions, (re)project current ones
+CREATE OR REPLACE FUNCTION public.sync_extraction_field_values_current()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+  field public.extraction_fields;
+BEGIN
+  IF NOT COALESCE(NEW.is_current, false) THEN
+    DELETE FROM public.extraction_field_values WHERE extraction_id = NEW.id;
+  ELSIF NOT COALESCE(OLD.is_current, false) THEN
+    FOR field IN
+      SELECT * FROM public.extraction_fields ef
+      WHERE ef.extraction_id = NEW.id
+      ORDER BY ef.is_override, ef.created_at
+    LOOP
+      PERFORM public.project_extraction_field(field, NEW.tenant_id, NEW.document_id);
+    END LOOP;
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_sync_extraction_field_values_current ON public.extractions;
+CREATE TRIGGER trg_sync_extraction_field_values_current
+  AFTER UPDATE OF is_current
+  ON public.extractions
+  FOR EACH ROW
+  WHEN (OLD.is_current IS DISTINCT FROM NEW.is_current)
+  EXECUTE FUNCTION public.sync_extraction_field_values_current();
+
+-- Backfill current extractions (overrides first, then the newest value)
+INSERT INTO public.extraction_field_values (
+  extraction_id, field_name, field_id, tenant_id, document_id,
+  value_text, value_number, value_date, confidence, page_number, is_override
+)
+SELECT DISTINCT ON (ef.extraction_id, ef.field_name)
+  ef.extraction_id,
+  ef.field_name,
+  ef.id,
+  e.tenant_id,
+  e.document_id,
+  public.extraction_field_text(ef.field_value),
+  public.extraction_field_number(public.extraction_field_text(ef.field_value)),
+  public.extraction_field_date(public.extraction_field_text(ef.field_value)),
+  ef.confidence,
+  ef.page_number,
+  COALESCE(ef.is_override, false)
+FROM public.extraction_fields ef
+JOIN public.extractions e ON e.id = ef.extraction_id
+WHERE e.is_current = true
+ORDER BY ef.extraction_id, ef.field_name, COALESCE(ef.is_override, false) DESC, ef.created_at DESC
+ON CONFLICT (extraction_id, field_name) DO NOTHING;
+
+-- Enable RLS immediately (no access without policies)
+ALTER TABLE public.extraction_field_values ENABLE ROW LEVEL SECURITY;
+
+-- Read-only for users; rows are written by the triggers above
+GRANT SELECT ON public.extraction_field_values TO authenticated;
+GRANT SELECT ON public.extraction_field_values TO anon;
+
+-- Policy: Users can SELECT field values for their own tenant only
+CREATE POLICY "Users view own tenant field values"
+ON public.extraction_field_values
+FOR SELECT
+USING (tenant_id = public.tenant_id());
+
+-- Policy: Service role has full access
+CREATE POLICY "Service role manages field values"
+ON public.extraction_field_values
+FOR ALL
+USING (
+  auth.role() = 'service_role' OR
+  (current_setting('request.jwt.claims', true)::jsonb ->> 'role') = 'service_role' OR
+  current_setting('request.jwt.claims', true) IS NULL
+)
+WITH CHECK (
+  auth.role() = 'service_role' OR
+  (current_setting('request.jwt.claims', true)::jsonb ->> 'role') = 'service_role' OR
+  current_setting('request.jwt.claims', true) IS NULL
+);
+
+-- Grant direct permissions to service_role
+GRANT SELECT, INSERT, UPDATE, DELETE ON public.extraction_field_values TO service_role;
+
+-- Note:
+-- - Typed columns are filled for every field; the query API picks the column
+--   from the field definition (src/extraction/cre_fields.py)
+-- - Queries: src/services/field_query.py (POST /api/v1/fields/query)
+-- - Tenant isolation: RLS on tenant_id, plus an explicit tenant_id filter in
+--   every query so the (tenant_id, field_name, value_*) indexes are used
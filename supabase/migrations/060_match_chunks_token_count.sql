@@ -0,0 +1,239 @@
+-- Understanding plane: Stored token counts in vector search results
+-- match_document_chunks and match_document_chunks_compact also return
+-- document_chunks.token_count, so the RAG context packer
+-- (src/rag/context_builder.py) budgets with the counts computed at ingestion
+-- instead of re-tokenizing every retrieved chunk on every question.
+--
+-- The function bodies are unchanged from 057_vector_search_tuning.sql and
+-- 053_compact_embeddings.sql apart from the extra column. A RETURNS TABLE
+-- change needs DROP + CREATE.
+
+DROP FUNCTION IF EXISTS public.match_document_chunks(vector(1536), INT, UUID[], INT, INT, BOOLEAN);
+DROP FUNCTION IF EXISTS public.match_document_chunks_compact(vector(1536), INT, UUID[], INT);
+
+CREATE OR REPLACE FUNCTION public.match_document_chunks(
+  query_embedding vector(1536),
+  match_count INT DEFAULT 10,
+  filter_document_ids UUID[] DEFAULT NULL,
+  ef_search INT DEFAULT NULL,
+  exact_max_chunks INT DEFAULT 1000,
+  exact BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (
+  id UUID,
+  document_id UUID,
+  content TEXT,
+  page_numbers INT[],
+  similarity FLOAT,
+  token_count INT
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+STABLE
+AS $$
+DECLARE
+  caller_tenant_id UUID;
+  use_exact BOOLEAN := COALESCE(exact, FALSE);
+  filtered_chunks BIGINT;
+BEGIN
+  -- SECURITY: Enforce tenant isolation - caller can only query their own tenant
+  -- Extract tenant_id from JWT token (cannot be overridden by callers)
+  caller_tenant_id := public.tenant_id();
+
+  -- ef_search must cover match_count (default 40); pgvector caps it at 1000
+  PERFORM set_config(
+    'hnsw.ef_search',
+    LEAST(GREATEST(COALESCE(ef_search, 40), match_count), 1000)::TEXT,
+    true
+  );
+
+  IF NOT use_exact AND filter_document_ids IS NOT NULL THEN
+    -- Cheap count over idx_chunks_document (tenant_id, document_id)
+    SELECT count(*) INTO filtered_chunks
+    FROM public.document_chunks dc
+    WHERE dc.tenant_id = caller_tenant_id
+      AND dc.document_id = ANY(filter_document_ids)
+      AND dc.embedding IS NOT NULL;
+
+    use_exact := filtered_chunks <= COALESCE(exact_max_chunks, 0);
+
+    IF NOT use_exact THEN
+      -- Keep scanning the graph until match_count rows pass the filter
+      PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+    END IF;
+  END IF;
+
+  IF use_exact THEN
+    -- Brute force: the MATERIALIZED CTE keeps the planner off the HNSW index
+    RETURN QUERY
+    WITH scoped AS MATERIALIZED (
+      SELECT
+        dc.id,
+        dc.document_id,
+        dc.content,
+        dc.page_numbers,
+        dc.token_count,
+        dc.embedding <=> query_embedding AS distance
+      FROM public.document_chunks dc
+      WHERE dc.tenant_id = caller_tenant_id
+        AND dc.embedding IS NOT NULL
+        AND (filter_document_ids IS NULL OR dc.document_id = ANY(filter_document_ids))
+    )
+    SELECT
+      s.id,
+      s.document_id,
+      s.content,
+      s.page_numbers,
+      1 - s.distance AS similarity,
+      s.token_count
+    FROM scoped s
+    ORDER BY s.distance
+    LIMIT match_count;
+  ELSE
+    -- Approximate: relaxed_order iterative scans can return rows slightly
+    -- out of order, so re-sort the (already limited) candidates
+    RETURN QUERY
+    WITH candidates AS MATERIALIZED (
+      SELECT
+        dc.id,
+        dc.document_id,
+        dc.content,
+        dc.page_numbers,
+        dc.token_count,
+        dc.embedding <=> query_embedding AS distance
+      FROM public.document_chunks dc
+      WHERE dc.tenant_id = caller_tenant_id
+        AND dc.embedding IS NOT NULL
+        AND (filter_document_ids IS NULL OR dc.document_id = ANY(filter_document_ids))
+      ORDER BY dc.embedding <=> query_embedding
+      LIMIT match_count
+    )
+    SELECT
+      c.id,
+      c.document_id,
+      c.content,
+      c.page_numbers,
+      1 - c.distance AS similarity,
+      c.token_count
+    FROM candidates c
+    ORDER BY c.distance;
+  END IF;
+END;
+$$;
+
+
+CREATE OR REPLACE FUNCTION public.match_document_chunks_compact(
+  query_embedding vector(1536),
+  match_count INT DEFAULT 10,
+  filter_document_ids UUID[] DEFAULT NULL,
+  rescore_count INT DEFAULT 0
+)
+RETURNS TABLE (
+  id UUID,
+  document_id UUID,
+  content TEXT,
+  page_numbers INT[],
+  similarity FLOAT,
+  token_count INT
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+STABLE
+AS $$
+DECLARE
+  caller_tenant_id UUID;
+  compact_query halfvec(768);
+BEGIN
+  -- SECURITY: Enforce tenant isolation - caller can only query their own tenant
+  -- Extract tenant_id from JWT token (cannot be overridden by callers)
+  caller_tenant_id := public.tenant_id();
+
+  -- Project the full query embedding the same way the index projects rows
+  compact_query := l2_normalize(subvector(query_embedding, 1, 768))::halfvec(768);
+
+  -- ef_search must cover the compact candidates (default 40, which would cap
+  -- re-scoring at 40 rows); pgvector caps it at 1000
+  PERFORM set_config(
+    'hnsw.ef_search',
+    LEAST(GREATEST(COALESCE(rescore_count, 0), match_count, 40), 1000)::TEXT,
+    true
+  );
+
+  IF filter_document_ids IS NOT NULL THEN
+    -- Keep scanning the graph until enough rows pass the filter
+    PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+  END IF;
+
+  IF COALESCE(rescore_count, 0) <= match_count THEN
+    -- Compact-only: rank and score by the half-precision projection
+    -- (relaxed_order scans can return rows slightly out of order, so re-sort
+    -- the already limited candidates)
+    RETURN QUERY
+    WITH candidates AS MATERIALIZED (
+      SELECT
+        dc.id,
+        dc.document_id,
+        dc.content,
+        dc.page_numbers,
+        dc.token_count,
+        (l2_normalize(subvector(dc.embedding, 1, 768))::halfvec(768)) <=> compact_query AS distance
+      FROM public.document_chunks dc
+      WHERE dc.tenant_id = caller_tenant_id
+        AND dc.embedding IS NOT NULL
+        AND (filter_document_ids IS NULL OR dc.document_id = ANY(filter_document_ids))
+      ORDER BY (l2_normalize(subvector(dc.embedding, 1, 768))::halfvec(768)) <=> compact_query
+      LIMIT match_count
+    )
+    SELECT
+      c.id,
+      c.document_id,
+      c.content,
+      c.page_numbers,
+      1 - c.distance AS similarity,
+      c.token_count
+    FROM candidates c
+    ORDER BY c.distance;
+  ELSE
+    -- Re-scoring: fetch rescore_count candidates from the compact index,
+    -- then re-rank them with the full-precision vectors
+    RETURN QUERY
+    WITH candidates AS (
+      SELECT
+        dc.id,
+        dc.document_id,
+        dc.content,
+        dc.page_numbers,
+        dc.token_count,
+        dc.embedding
+      FROM public.document_chunks dc
+      WHERE dc.tenant_id = caller_tenant_id
+        AND dc.embedding IS NOT NULL
+        AND (filter_document_ids IS NULL OR dc.document_id = ANY(filter_document_ids))
+      ORDER BY (l2_normalize(subvector(dc.embedding, 1, 768))::halfvec(768)) <=> compact_query
+      LIMIT rescore_count
+    )
+    SELECT
+      c.id,
+      c.document_id,
+      c.content,
+      c.page_numbers,
+      1 - (c.embedding <=> query_embedding) AS similarity,
+      c.token_count
+    FROM candidates c
+    ORDER BY c.embedding <=> query_embedding
+    LIMIT match_count;
+  END IF;
+END;
+$$;
+
+-- Grant execute to authenticated users
+GRANT EXECUTE ON FUNCTION public.match_document_chunks(vector(1536), INT, UUID[], INT, INT, BOOLEAN) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.match_document_chunks(vector(1536), INT, UUID[], INT, INT, BOOLEAN) TO anon;
+GRANT EXECUTE ON FUNCTION public.match_document_chunks_compact(vector(1536), INT, UUID[], INT) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.match_document_chunks_compact(vector(1536), INT, UUID[], INT) TO anon;
+
+-- Note:
+-- - token_count is the ingestion-time count of content (chunk_storage.py);
+--   the citation tag added by the context builder is budgeted separately
+-- - Tenant isolation: Always uses tenant_id from JWT token (public.tenant_id())
+--   Never accepts tenant_id as parameter to prevent cross-tenant access
@@ -0,0 +1,104 @@
+-- Understanding plane: Grouped vector search for map-reduce RAG
+-- match_document_chunks_grouped returns the top chunks_per_document chunks
+-- of each of the max_documents best-matching documents, so portfolio-wide
+-- questions ("which leases have co-tenancy clauses?") see every relevant
+-- lease instead of the globally top-ranked chunks, which can all come from a
+-- few documents (src/rag/pipeline.py, map-reduce mode).
+--
+-- Without a document filter, candidate_count nearest chunks come from the
+-- HNSW index (iterative scan) and are ranked per document. With a filter,
+-- the listed documents are scored exactly.
+
+CREATE OR REPLACE FUNCTION public.match_document_chunks_grouped(
+  query_embedding vector(1536),
+  chunks_per_document INT DEFAULT 3,
+  max_documents INT DEFAULT 10,
+  candidate_count INT DEFAULT 400,
+  filter_document_ids UUID[] DEFAULT NULL
+)
+RETURNS TABLE (
+  id UUID,
+  document_id UUID,
+  content TEXT,
+  page_numbers INT[],
+  similarity FLOAT,
+  token_count INT
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+STABLE
+AS $$
+DECLARE
+  caller_tenant_id UUID;
+BEGIN
+  -- SECURITY: Enforce tenant isolation - caller can only query their own tenant
+  -- Extract tenant_id from JWT token (cannot be overridden by callers)
+  caller_tenant_id := public.tenant_id();
+
+  IF filter_document_ids IS NULL THEN
+    -- ef_search must cover candidate_count; keep scanning the graph until
+    -- candidate_count rows pass the tenant filter
+    PERFORM set_config(
+      'hnsw.ef_search',
+      LEAST(GREATEST(candidate_count, 40), 1000)::TEXT,
+      true
+    );
+    PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+  END IF;
+
+  RETURN QUERY
+  WITH candidates AS MATERIALIZED (
+    SELECT
+      dc.id,
+      dc.document_id,
+      dc.content,
+      dc.page_numbers,
+      dc.token_count,
+      dc.embedding <=> query_embedding AS distance
+    FROM public.document_chunks dc
+    WHERE dc.tenant_id = caller_tenant_id
+      AND dc.embedding IS NOT NULL
+      AND (filter_document_ids IS NULL OR dc.document_id = ANY(filter_document_ids))
+    ORDER BY dc.embedding <=> query_embedding
+    -- LIMIT NULL: all chunks of the filtered documents
+    LIMIT CASE WHEN filter_document_ids IS NULL THEN candidate_count END
+  ),
+  ranked AS (
+    SELECT
+      c.*,
+      row_number() OVER (PARTITION BY c.document_id ORDER BY c.distance, c.id) AS chunk_rank,
+      min(c.distance) OVER (PARTITION BY c.document_id) AS document_distance
+    FROM candidates c
+  ),
+  top_documents AS (
+    SELECT r.document_id
+    FROM ranked r
+    WHERE r.chunk_rank = 1
+    ORDER BY r.distance, r.document_id
+    LIMIT max_documents
+  )
+  SELECT
+    r.id,
+    r.document_id,
+    r.content,
+    r.page_numbers,
+    1 - r.distance AS similarity,
+    r.token_count
+  FROM ranked r
+  JOIN top_documents t ON t.document_id = r.document_id
+  WHERE r.chunk_rank <= chunks_per_document
+  ORDER BY r.document_distance, r.document_id, r.chunk_rank;
+END;
+$$;
+
+-- Grant execute to authenticated users
+GRANT EXECUTE ON FUNCTION public.match_document_chunks_grouped(vector(1536), INT, INT, INT, UUID[]) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.match_document_chunks_grouped(vector(1536), INT, INT, INT, UUID[]) TO anon;
+
+-- Note:
+-- - Rows are ordered by document (best chunk first), then by rank within
+--   the document
+-- - Without a filter, a document is only found if one of its chunks is among
+--   the candidate_count nearest; raise candidate_count for large portfolios
+-- - Tenant isolation: Always uses tenant_id from JWT token (public.tenant_id())
+--   Never accepts tenant_id as parameter to prevent cross-tenant access
@@ -0,0 +1,276 @@
+-- Data plane: Materialized rent facts for effective rent analytics
+-- The effective rent endpoints used to read every rent field of every lease
+-- and parse currency strings out of JSONB on each request. rent_facts keeps
+-- one typed row per current extraction that has a tenant name and rent:
+-- the numeric rent components, square footage, property and tenant name.
+--
+-- Rows are built from extraction_field_values (migration 059), whose
+-- triggers already follow field inserts, overrides and is_current changes;
+-- a trigger on that projection refreshes the extraction's fact whenever one
+-- of its rent fields changes. rebuild_rent_facts() recomputes them in bulk
+-- (scripts/rebuild_rent_facts.py).
+
+-- Fields a rent fact is built from
+CREATE OR REPLACE FUNCTION public.rent_fact_fields()
+RETURNS TEXT[]
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT ARRAY[
+    'tenant_name', 'property_name', 'property_address',
+    'base_rent', 'monthly_rent', 'cam_charges', 'tax_reimbursement',
+    'insurance_reimbursement', 'parking_fee', 'parking_rent', 'storage_rent',
+    'square_footage', 'rentable_square_feet', 'usable_square_feet'
+  ];
+$$;
+
+CREATE TABLE IF NOT EXISTS public.rent_facts (
+  extraction_id UUID PRIMARY KEY REFERENCES public.extractions(id) ON DELETE CASCADE,
+  tenant_id UUID NOT NULL REFERENCES public.tenants(id) ON DELETE CASCADE,
+  document_id UUID NOT NULL REFERENCES public.documents(id) ON DELETE CASCADE,
+  document_name TEXT,
+  document_type TEXT,
+  extracted_at TIMESTAMPTZ,
+  tenant_name TEXT NOT NULL,
+  property_name TEXT,
+  property_address TEXT,
+  base_rent NUMERIC NOT NULL DEFAULT 0,
+  cam_charges NUMERIC NOT NULL DEFAULT 0,
+  tax_reimbursement NUMERIC NOT NULL DEFAULT 0,
+  insurance_reimbursement NUMERIC NOT NULL DEFAULT 0,
+  parking_fee NUMERIC NOT NULL DEFAULT 0,
+  storage_rent NUMERIC NOT NULL DEFAULT 0,
+  effective_monthly_rent NUMERIC GENERATED ALWAYS AS (
+    base_rent + cam_charges + tax_reimbursement + insurance_reimbursement
+    + parking_fee + storage_rent
+  ) STORED,
+  square_footage NUMERIC,
+  -- Average of the base_rent and tenant_name confidences
+  confidence FLOAT,
+  -- Sum and count of the rent field confidences (portfolio averages)
+  field_confidence_sum FLOAT NOT NULL DEFAULT 0,
+  field_confidence_count INT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Portfolio reads (paged by extraction_id) and top-N by effective rent
+CREATE INDEX IF NOT EXISTS idx_rent_facts_tenant
+  ON public.rent_facts(tenant_id, extraction_id);
+CREATE INDEX IF NOT EXISTS idx_rent_facts_effective_rent
+  ON public.rent_facts(tenant_id, effective_monthly_rent DESC);
+
+-- Recompute the fact of one extraction (removed unless the extraction is
+-- current and has a tenant name and rent)
+CREATE OR REPLACE FUNCTION public.refresh_rent_fact(target_extraction_id UUID)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+  fact RECORD;
+BEGIN
+  SELECT
+    e.tenant_id,
+    e.document_id,
+    d.original_filename AS document_name,
+    e.document_type,
+    e.extracted_at,
+    max(v.value_text) FILTER (WHERE v.field_name = 'tenant_name') AS tenant_name,
+    max(v.value_text) FILTER (WHERE v.field_name = 'property_name') AS property_name,
+    max(v.value_text) FILTER (WHERE v.field_name = 'property_address') AS property_address,
+    -- base_rent falls back to monthly_rent, parking_fee to parking_rent
+    COALESCE(
+      NULLIF(GREATEST(max(v.value_number) FILTER (WHERE v.field_name = 'base_rent'), 0), 0),
+      GREATEST(max(v.value_number) FILTER (WHERE v.field_name = 'monthly_rent'), 0),
+      0
+    ) AS base_rent,
+    COALESCE(GREATEST(max(v.value_number) FILTER (WHERE v.field_name = 'cam_charges'), 0), 0) AS cam_charges,
+    COALESCE(GREATEST(max(v.value_number) FILTER (WHERE v.field_name = 'tax_reimbursement'), 0), 0) AS tax_reimbursement,
+    COALESCE(GREATEST(max(v.value_number) FILTER (WHERE v.field_name = 'insurance_reimbursement'), 0), 0) AS insurance_reimbursement,
+    COALESCE(
+      NULLIF(GREATEST(max(v.value_number) FILTER (WHERE v.field_name = 'parking_fee'), 0), 0),
+      GREATEST(max(v.value_number) FILTER (WHERE v.field_name = 'parking_rent'), 0),
+      0
+    ) AS parking_fee,
+    COALESCE(GREATEST(max(v.value_number) FILTER (WHERE v.field_name = 'storage_rent'), 0), 0) AS storage_rent,
+    -- First positive of square_footage, rentable_square_feet, usable_square_feet
+    COALESCE(
+      NULLIF(GREATEST(max(v.value_number) FILTER (WHERE v.field_name = 'square_footage'), 0), 0),
+      NULLIF(GREATEST(max(v.value_number) FILTER (WHERE v.field_name = 'rentable_square_feet'), 0), 0),
+      NULLIF(GREATEST(max(v.value_number) FILTER (WHERE v.field_name = 'usable_square_feet'), 0), 0)
+    ) AS square_footage,
+    (
+      SELECT avg(c)
+      FROM unnest(ARRAY[
+        max(v.confidence) FILTER (WHERE v.field_name = 'base_rent'),
+        max(v.confidence) FILTER (WHERE v.field_name = 'tenant_name')
+      ]) AS c
+    ) AS confidence,
+    COALESCE(sum(v.confidence), 0) AS field_confidence_sum,
+    count(v.confidence) AS field_confidence_count
+  INTO fact
+  FROM public.extractions e
+  LEFT JOIN public.documents d ON d.id = e.document_id
+  LEFT JOIN public.extraction_field_values v
+    ON v.extraction_id = e.id
+   AND v.field_name = ANY(public.rent_fact_fields())
+  WHERE e.id = target_extraction_id
+    AND e.is_current = true
+  GROUP BY e.id, d.original_filename;
+
+  IF NOT FOUND
+     OR fact.tenant_name IS NULL
+     OR fact.base_rent + fact.cam_charges + fact.tax_reimbursement
+        + fact.insurance_reimbursement + fact.parking_fee + fact.storage_rent = 0 THEN
+    DELETE FROM public.rent_facts WHERE extraction_id = target_extraction_id;
+    RETURN;
+  END IF;
+
+  INSERT INTO public.rent_facts (
+    extraction_id, tenant_id, document_id, document_name, document_type, extracted_at,
+    tenant_name, property_name, property_address,
+    base_rent, cam_charges, tax_reimbursement, insurance_reimbursement, parking_fee, storage_rent,
+    square_footage, confidence, field_confidence_sum, field_confidence_count, updated_at
+  )
+  VALUES (
+    target_extraction_id, fact.tenant_id, fact.document_id, fact.document_name,
+    fact.document_type, fact.extracted_at,
+    fact.tenant_name, fact.property_name, fact.property_address,
+    fact.base_rent, fact.cam_charges, fact.tax_reimbursement, fact.insurance_reimbursement,
+    fact.parking_fee, fact.storage_rent,
+    fact.square_footage, fact.confidence, fact.field_confidence_sum, fact.field_confidence_count,
+    now()
+  )
+  ON CONFLICT (extraction_id) DO UPDATE SET
+    document_name = EXCLUDED.document_name,
+    document_type = EXCLUDED.document_type,
+    extracted_at = EXCLUDED.extracted_at,
+    tenant_name = EXCLUDED.tenant_name,
+    property_name = EXCLUDED.property_name,
+    property_address = EXCLUDED.property_address,
+    base_rent = EXCLUDED.base_rent,
+    cam_charges = EXCLUDED.cam_charges,
+    tax_reimbursement = EXCLUDED.tax_reimbursement,
+    insurance_reimbursement = EXCLUDED.insurance_reimbursement,
+    parking_fee = EXCLUDED.parking_fee,
+    storage_rent = EXCLUDED.storage_rent,
+    square_footage = EXCLUDED.square_footage,
+    confidence = EXCLUDED.confidence,
+    field_confidence_sum = EXCLUDED.field_confidence_sum,
+    field_confidence_count = EXCLUDED.field_confidence_count,
+    updated_at = EXCLUDED.updated_at;
+END;
+$$;
+
+-- extraction_field_values trigger: refresh the fact when a rent field changes
+-- (save_extraction inserts, overrides, extractions becoming (non-)current)
+CREATE OR REPLACE FUNCTION public.sync_rent_fact()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    PERFORM public.refresh_rent_fact(OLD.extraction_id);
+  ELSE
+    PERFORM public.refresh_rent_fact(NEW.extraction_id);
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_sync_rent_fact ON public.extraction_field_values;
+CREATE TRIGGER trg_sync_rent_fact
+  AFTER INSERT OR UPDATE
+  ON public.extraction_field_values
+  FOR EACH ROW
+  WHEN (NEW.field_name = ANY(public.rent_fact_fields()))
+  EXECUTE FUNCTION public.sync_rent_fact();
+
+DROP TRIGGER IF EXISTS trg_sync_rent_fact_delete ON public.extraction_field_values;
+CREATE TRIGGER trg_sync_rent_fact_delete
+  AFTER DELETE
+  ON public.extraction_field_values
+  FOR EACH ROW
+  WHEN (OLD.field_name = ANY(public.rent_fact_fields()))
+  EXECUTE FUNCTION public.sync_rent_fact();
+
+-- Recompute every fact (of one tenant, or of all tenants); returns the
+-- number of facts
+CREATE OR REPLACE FUNCTION public.rebuild_rent_facts(target_tenant_id UUID DEFAULT NULL)
+RETURNS INT
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+  current_extraction RECORD;
+  fact_count INT;
+BEGIN
+  DELETE FROM public.rent_facts
+  WHERE target_tenant_id IS NULL OR tenant_id = target_tenant_id;
+
+  FOR current_extraction IN
+    SELECT e.id
+    FROM public.extractions e
+    WHERE e.is_current = true
+      AND (target_tenant_id IS NULL OR e.tenant_id = target_tenant_id)
+  LOOP
+    PERFORM public.refresh_rent_fact(current_extraction.id);
+  END LOOP;
+
+  SELECT count(*) INTO fact_count
+  FROM public.rent_facts
+  WHERE target_tenant_id IS NULL OR tenant_id = target_tenant_id;
+
+  RETURN fact_count;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.refresh_rent_fact(UUID) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.refresh_rent_fact(UUID) TO service_role;
+REVOKE EXECUTE ON FUNCTION public.rebuild_rent_facts(UUID) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.rebuild_rent_facts(UUID) TO service_role;
+
+-- Backfill current extractions
+SELECT public.rebuild_rent_facts();
+
+-- Enable RLS immediately (no access without policies)
+ALTER TABLE public.rent_facts ENABLE ROW LEVEL SECURITY;
+
+-- Read-only for users; rows are written by the triggers above
+GRANT SELECT ON public.rent_facts TO authenticated;
+GRANT SELECT ON public.rent_facts TO anon;
+
+-- Policy: Users can SELECT rent facts for their own tenant only
+CREATE POLICY "Users view own tenant rent facts"
+ON public.rent_facts
+FOR SELECT
+USING (tenant_id = public.tenant_id());
+
+-- Policy: Service role has full access
+CREATE POLICY "Service role manages rent facts"
+ON public.rent_facts
+FOR ALL
+USING (
+  auth.role() = 'service_role' OR
+  (current_setting('request.jwt.claims', true)::jsonb ->> 'role') = 'service_role' OR
+  current_setting('request.jwt.claims', true) IS NULL
+)
+WITH CHECK (
+  auth.role() = 'service_role' OR
+  (current_setting('request.jwt.claims', true)::jsonb ->> 'role') = 'service_role' OR
+  current_setting('request.jwt.claims', true) IS NULL
+);
+
+-- Grant direct permissions to service_role
+GRANT SELECT, INSERT, UPDATE, DELETE ON public.rent_facts TO service_role;
+
+-- Note:
+-- - Numbers use extraction_field_number() (first number in the value), and
+--   negative components count as 0
+-- - Reads: src/services/effective_rent.py (/api/v1/analytics/effective-rent)
+-- - Rebuild after changing the projection rules:
+--   python scripts/rebuild_rent_facts.py [--tenant-id <uuid>]
+-- - Tenant isolation: RLS on tenant_id, plus an explicit tenant_id filter in
+--   every query so the (tenant_id, ...) indexes are used
@@ -5,12 +5,49 @@ Tests the complete flow from HTTP request to effective rent calculation.
 """
 
 import pytest
-from uuid import uuid4
+from uuid import UUID, uuid4
 from unittest.mock import Mock, patch
 from fastapi.testclient import TestClient
 
 from src.main import app
-from typing import Any
+from typing import Any, Dict, List
+
+
+def _rent_fact(
+    extraction_id: UUID,
+    document_id: UUID,
+    tenant_name: str,
+    document_name: str,
+    **components: float,
+) -> Dict[str, Any]:
+    """rent_facts row with the given rent components."""
+    rents = {
+        name: components.get(name, 0.0)
+        for name in (
+            "base_rent", "cam_charges", "tax_reimbursement",
+            "insurance_reimbursement", "parking_fee", "storage_rent",
+        )
+    }
+    return {
+        "extraction_id": str(extraction_id),
+        "document_id": str(document_id),
+        "document_name": document_name,
+        "document_type": "lease",
+        "extracted_at": None,
+        "tenant_name": tenant_name,
+        "confidence": 0.95,
+        **rents,
+        "effective_monthly_rent": sum(rents.values()),
+    }
+
+
+def _rent_facts_query(facts: List[Dict[str, Any]]) -> Mock:
+    """Chainable rent_facts query returning `facts`."""
+    query = Mock()
+    for method in ("select", "eq", "order", "limit", "range"):
+        getattr(query, method).return_value = query
+    query.execute.return_value.data = facts
+    return query
 
 
 class TestEffectiveRentAPIIntegration:
@@ -39,30 +76,9 @@ class TestEffectiveRentAPIIntegration:
                 mock_supabase = Mock()
                 mock_get_supabase.return_value = mock_supabase
 
-                def mock_table(table_name: str) -> Any:
-                    mock_chain = Mock()
-                    if table_name == "extractions":
-                        mock_chain.select.return_value.eq.return_value.execute.return_value.data = [
-                            {
-                                "id": str(extraction_id),
-                                "document_id": str(doc_id),
-                                "document_type": "lease",
-                                "extracted_at": "2024-01-01T00:00:00",
-                            }
-                        ]
-                    elif table_name == "extraction_fields":
-                        mock_chain.select.return_value.eq.return_value.execute.return_value.data = [
-                            {"field_name": "tenant_name", "field_value": {"value": "Test Tenant"}, "confidence": 0.95},
-                            {"field_name": "base_rent", "field_value": {"value": "$10,000"}, "confidence": 0.95},
-                            {"field_name": "cam_charges", "field_value": {"value": "$1,000"}, "confidence": 0.90},
-                        ]
-                    elif table_name == "documents":
-                        mock_chain.select.return_value.eq.return_value.single.return_value.execute.return_value.data = {
-                            "original_filename": "Test_Lease.pdf"
-                        }
-                    return mock_chain
-
-                mock_supabase.table.side_effect = mock_table
+                mock_supabase.table.return_value = _rent_facts_query([
+                    _rent_fact(extraction_id, doc_id, "Test Tenant", "Test_Lease.pdf", base_rent=10000, cam_charges=1000)
+                ])
 
                 # Make request
                 response = client.get("/api/v1/analytics/effective-rent")
@@ -96,37 +112,10 @@ class TestEffectiveRentAPIIntegration:
                 mock_supabase = Mock()
                 mock_get_supabase.return_value = mock_supabase
 
-                # Return multiple extractions
-                extractions = [
-                    {
-                        "id": str(uuid4()),
-                        "document_id": str(uuid4()),
-                        "document_type": "lease",
-                        "extracted_at": None,
-                    }
-                    for _ in range(10)
-                ]
-
-                call_count = [0]
-
-                def mock_table(table_name: str) -> Any:
-                    mock_chain = Mock()
-                    if table_name == "extractions":
-                        mock_chain.select.return_value.eq.return_value.execute.return_value.data = extractions
-                    elif table_name == "extraction_fields":
-                        idx = call_count[0]
-                        call_count[0] += 1
-                        mock_chain.select.return_value.eq.return_value.execute.return_value.data = [
-                            {"field_name": "tenant_name", "field_value": {"value": f"Tenant {idx}"}, "confidence": 0.95},
-                            {"field_name": "base_rent", "field_value": {"value": "$5000"}, "confidence": 0.95},
-                        ]
-                    elif table_name == "documents":
-                        mock_chain.select.return_value.eq.return_value.single.return_value.execute.return_value.data = {
-                            "original_filename": "Lease.pdf"
-                        }
-                    return mock_chain
-
-                mock_supabase.table.side_effect = mock_table
+                mock_supabase.table.return_value = _rent_facts_query([
+                    _rent_fact(uuid4(), uuid4(), f"Tenant {idx}", "Lease.pdf", base_rent=5000)
+                    for idx in range(10)
+                ])
 
                 # Make request with limit
                 response = client.get("/api/v1/analytics/effective-rent?limit=5")
@@ -147,32 +136,12 @@ class TestEffectiveRentAPIIntegration:
                 mock_supabase = Mock()
                 mock_get_supabase.return_value = mock_supabase
 
-                extractions = [
-                    {"id": str(uuid4()), "document_id": str(uuid4()), "document_type": "lease", "extracted_at": None}
-                    for _ in range(3)
-                ]
-
                 rents = [5000, 10000, 7500]
-                call_count = [0]
-
-                def mock_table(table_name: str) -> Any:
-                    mock_chain = Mock()
-                    if table_name == "extractions":
-                        mock_chain.select.return_value.eq.return_value.execute.return_value.data = extractions
-                    elif table_name == "extraction_fields":
-                        idx = call_count[0] % 3
-                        call_count[0] += 1
-                        mock_chain.select.return_value.eq.return_value.execute.return_value.data = [
-                            {"field_name": "tenant_name", "field_value": {"value": f"Tenant {idx}"}, "confidence": 0.95},
-                            {"field_name": "base_rent", "field_value": {"value": f"${rents[idx]}"}, "confidence": 0.95},
-                        ]
-                    elif table_name == "documents":
-                        mock_chain.select.return_value.eq.return_value.single.return_value.execute.return_value.data = {
-                            "original_filename": "Lease.pdf"
-                        }
-                    return mock_chain
-
-                mock_supabase.table.side_effect = mock_table
+
+                mock_supabase.table.return_value = _rent_facts_query([
+                    _rent_fact(uuid4(), uuid4(), f"Tenant {idx}", "Lease.pdf", base_rent=rent)
+                    for idx, rent in enumerate(rents)
+                ])
 
                 # Test ascending sort
                 response = client.get("/api/v1/analytics/effective-rent?sort=asc")
@@ -198,30 +167,9 @@ class TestEffectiveRentAPIIntegration:
                 mock_supabase = Mock()
                 mock_get_supabase.return_value = mock_supabase
 
-                def mock_table(table_name: str) -> Any:
-                    mock_chain = Mock()
-                    if table_name == "extractions":
-                        mock_chain.select.return_value.eq.return_value.execute.return_value.data = [
-                            {
-                                "id": str(extraction_id),
-                                "document_id": str(doc_id),
-                                "document_type": "lease",
-                                "extracted_at": None,
-                            }
-                        ]
-                    elif table_name == "extraction_fields":
-                        mock_chain.select.return_value.eq.return_value.execute.return_value.data = [
-                            {"field_name": "tenant_name", "field_value": {"value": "Highest Rent Tenant"}, "confidence": 0.95},
-                            {"field_name": "base_rent", "field_value": {"value": "$25,000"}, "confidence": 0.95},
-                            {"field_name": "cam_charges", "field_value": {"value": "$2,000"}, "confidence": 0.90},
-                        ]
-                    elif table_name == "documents":
-                        mock_chain.select.return_value.eq.return_value.single.return_value.execute.return_value.data = {
-                            "original_filename": "Premium_Lease.pdf"
-                        }
-                    return mock_chain
-
-                mock_supabase.table.side_effect = mock_table
+                mock_supabase.table.return_value = _rent_facts_query([
+                    _rent_fact(extraction_id, doc_id, "Highest Rent Tenant", "Premium_Lease.pdf", base_rent=25000, cam_charges=2000)
+                ])
 
                 # Make request
                 response = client.get("/api/v1/analytics/effective-rent/highest")
@@ -246,8 +194,8 @@ class TestEffectiveRentAPIIntegration:
                 mock_supabase = Mock()
                 mock_get_supabase.return_value = mock_supabase
 
-                # Return no extractions
-                mock_supabase.table.return_value.select.return_value.eq.return_value.execute.return_value.data = []
+                # No rent facts
+                mock_supabase.table.return_value = _rent_facts_query([])
 
                 # Make request
                 response = client.get("/api/v1/analytics/effective-rent/highest")
@@ -269,32 +217,12 @@ class TestEffectiveRentAPIIntegration:
                 mock_get_supabase.return_value = mock_supabase
 
                 # Create multiple tenants with different rents
-                extractions = [
-                    {"id": str(uuid4()), "document_id": str(uuid4()), "document_type": "lease", "extracted_at": None}
-                    for _ in range(5)
-                ]
-
                 rents = [5000, 7500, 10000, 6000, 8000]
-                call_count = [0]
-
-                def mock_table(table_name: str) -> Any:
-                    mock_chain = Mock()
-                    if table_name == "extractions":
-                        mock_chain.select.return_value.eq.return_value.execute.return_value.data = extractions
-                    elif table_name == "extraction_fields":
-                        idx = call_count[0] % 5
-                        call_count[0] += 1
-                        mock_chain.select.return_value.eq.return_value.execute.return_value.data = [
-                            {"field_name": "tenant_name", "field_value": {"value": f"Tenant {idx}"}, "confidence": 0.95},
-                            {"field_name": "base_rent", "field_value": {"value": f"${rents[idx]}"}, "confidence": 0.95},
-                        ]
-                    elif table_name == "documents":
-                        mock_chain.select.return_value.eq.return_value.single.return_value.execute.return_value.data = {
-                            "original_filename": "Lease.pdf"
-                        }
-                    return mock_chain
-
-                mock_supabase.table.side_effect = mock_table
+
+                mock_supabase.table.return_value = _rent_facts_query([
+                    _rent_fact(uuid4(), uuid4(), f"Tenant {idx}", "Lease.pdf", base_rent=rent)
+                    for idx, rent in enumerate(rents)
+                ])
 
                 # Make request
                 response = client.get("/api/v1/analytics/effective-rent/summary")
@@ -314,6 +242,37 @@ class TestEffectiveRentAPIIntegration:
                 assert data["highest_effective_rent"]["effective_monthly_rent"] == 10000.0
                 assert data["lowest_effective_rent"]["effective_monthly_rent"] == 5000.0
 
+    def test_get_dashboard_success(self, client: Any) -> None:
+        """Test all analytics are returned from one portfolio read."""
+        with patch("src.api.routes.effective_rent.get_supabase_client") as mock_get_supabase:
+            with patch("src.api.routes.effective_rent.require_permission") as mock_auth_dep:
+                mock_auth_context = Mock()
+                mock_auth_context.user_id = uuid4()
+                mock_auth_context.tenant_id = uuid4()
+                mock_auth_dep.return_value = lambda: mock_auth_context
+
+                mock_supabase = Mock()
+                mock_get_supabase.return_value = mock_supabase
+
+                rents = [5000, 7500, 10000]
+                mock_supabase.table.return_value = _rent_facts_query([
+                    _rent_fact(uuid4(), uuid4(), f"Tenant {idx}", "Lease.pdf", base_rent=rent)
+                    for idx, rent in enumerate(rents)
+                ])
+
+                response = client.get("/api/v1/analytics/effective-rent/dashboard?top_n=2")
+
+                assert response.status_code == 200
+                data = response.json()
+
+                assert data["summary"]["total_tenants"] == 3
+                assert data["portfolio_metrics"]["total_monthly_rent"] == 22500.0
+                assert data["rent_by_property"]["total_properties"] == 1
+                assert len(data["rent_concentration"]["top_tenants"]) == 2
+                assert data["rent_concentration"]["top_tenants"][0]["effective_monthly_rent"] == 10000.0
+                assert data["rent_per_sf"]["tenants"] == []
+                mock_supabase.table.assert_called_once_with("rent_facts")
+
     def test_validation_error_invalid_limit(self, client: Any) -> None:
         """Test validation error for invalid limit."""
         with patch("src.api.routes.effective_rent.get_supabase_client"):
@@ -0,0 +1,323 @@
+"""Tests for structured field queries and /ask field routing."""
+import asyncio
+import operator
+from typing import Any, Callable, Dict, List, Tuple
+from unittest.mock import Mock
+from uuid import uuid4
+
+import pytest
+
+from src.db.models.field_query import FieldFilter, FieldQueryRequest, FieldSort
+from src.rag.models import AskRequest
+from src.services import field_query
+from src.services.field_query import (
+    FieldQueryService,
+    build_field_answer,
+    field_column,
+    parse_field_question,
+)
+
+TENANT_ID = uuid4()
+
+
+class FakeQuery:
+    """In-memory stand-in for a PostgREST table query."""
+
+    def __init__(self, rows: List[Dict[str, Any]], calls: List[str]):
+        self.rows = rows
+        self.calls = calls
+        # Matching rows before range()/limit(), for count="exact"
+        self.count = len(rows)
+        self.orders: List[Tuple[str, bool]] = []
+
+    def _where(self, name: str, predicate: Callable[[Any], bool], column: str) -> "FakeQuery":
+        self.calls.append(f"{name}:{column}")
+        return FakeQuery(
+            [row for row in self.rows if row.get(column) is not None and predicate(row[column])],
+            self.calls,
+        )
+
+    def select(self, columns: str, count: Any = None) -> "FakeQuery":
+        return self
+
+    def order(self, column: str, desc: bool = False, nullsfirst: Any = None) -> "FakeQuery":
+        self.calls.append(f"order:{column}")
+        # Earlier order() calls are the primary keys: sort by the new key
+        # first and let the stable re-sorts by the earlier keys win
+        self.orders.append((column, desc))
+        rows = self.rows
+        for key, descending in reversed(self.orders):
+            present = sorted((row for row in rows if row.get(key) is not None),
+                             key=lambda row: row[key], reverse=descending)
+            rows = present + [row for row in rows if row.get(key) is None]
+        self.rows = rows
+        return self
+
+    def range(self, start: int, end: int) -> "FakeQuery":
+        self.calls.append(f"range:{start}")
+        self.rows = self.rows[start:end + 1]
+        return self
+
+    def limit(self, count: int) -> "FakeQuery":
+        self.calls.append(f"limit:{count}")
+        self.rows = self.rows[:count]
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        return self._where("eq", lambda item: item == value, column)
+
+    def neq(self, column: str, value: Any) -> "FakeQuery":
+        return self._where("neq", lambda item: item != value, column)
+
+    def lt(self, column: str, value: Any) -> "FakeQuery":
+        return self._where("lt", lambda item: operator.lt(item, value), column)
+
+    def lte(self, column: str, value: Any) -> "FakeQuery":
+        return self._where("lte", lambda item: operator.le(item, value), column)
+
+    def gt(self, column: str, value: Any) -> "FakeQuery":
+        return self._where("gt", lambda item: operator.gt(item, value), column)
+
+    def gte(self, column: str, value: Any) -> "FakeQuery":
+        return self._where("gte", lambda item: operator.ge(item, value), column)
+
+    def in_(self, column: str, values: List[Any]) -> "FakeQuery":
+        return self._where("in", lambda item: item in values, column)
+
+    def execute(self) -> Mock:
+        return Mock(data=list(self.rows), count=self.count)
+
+
+def _value_row(extraction_id: str, document_id: str, field_name: str, text: str, **typed: Any) -> Dict[str, Any]:
+    return {
+        "tenant_id": str(TENANT_ID),
+        "extraction_id": extraction_id,
+        "document_id": document_id,
+        "field_name": field_name,
+        "value_text": text,
+        "value_number": typed.get("number"),
+        "value_date": typed.get("date"),
+        "confidence": 0.9,
+        "page_number": typed.get("page"),
+        "is_override": False,
+    }
+
+
+@pytest.fixture
+def fake_supabase() -> Mock:
+    """Three leases: Acme (2026, $5,000), Globex (2028, $12,000), Initech (2027, no rent)."""
+    leases = [
+        ("Acme Corp", "2026-03-31", "$5,000.00", 5000.0, "lease_acme.pdf"),
+        ("Globex LLC", "2028-06-30", "$12,000.00", 12000.0, "lease_globex.pdf"),
+        ("Initech", "2027-01-31", None, None, "lease_initech.pdf"),
+    ]
+    values: List[Dict[str, Any]] = []
+    documents: List[Dict[str, Any]] = []
+    for tenant_name, end_date, rent_text, rent, filename in leases:
+        extraction_id, document_id = str(uuid4()), str(uuid4())
+        documents.append({"id": document_id, "original_filename": filename})
+        values.append(_value_row(extraction_id, document_id, "tenant_name", tenant_name))
+        values.append(_value_row(extraction_id, document_id, "lease_end_date", end_date, date=end_date, page=3))
+        if rent_text:
+            values.append(_value_row(extraction_id, document_id, "base_rent", rent_text, number=rent, page=4))
+    # Another tenant's row is never returned
+    values.append({**_value_row(str(uuid4()), str(uuid4()), "lease_end_date", "2026-01-01", date="2026-01-01"),
+                   "tenant_id": str(uuid4())})
+
+    client = Mock()
+    client.calls = []
+    client.table.side_effect = lambda name: FakeQuery(
+        values if name == "extraction_field_values" else documents, client.calls
+    )
+    return client
+
+
+class TestFieldColumn:
+    """Field type to typed column mapping."""
+
+    def test_typed_columns(self) -> None:
+        assert field_column("lease_end_date") == "value_date"
+        assert field_column("base_rent") == "value_number"
+        assert field_column("rent_per_square_foot") == "value_number"
+        assert field_column("building_type") == "value_text"
+
+    def test_unknown_field(self) -> None:
+        with pytest.raises(ValueError, match="Unknown field"):
+            field_column("favourite_colour")
+
+
+class TestFieldQueryService:
+    """Filtering, sorting and projection over extraction_field_values."""
+
+    def test_date_range_filter_with_sort(self, fake_supabase: Mock) -> None:
+        service = FieldQueryService(fake_supabase, TENANT_ID)
+        request = FieldQueryRequest(
+            filters=[FieldFilter(field="lease_end_date", op="lt", value="2028-01-01")],
+            sort=FieldSort(field="lease_end_date", descending=True),
+            fields=["tenant_name"],
+        )
+
+        response = asyncio.run(service.query(request))
+
+        assert response.total_count == 2
+        assert [row.fields["tenant_name"].value_text for row in response.rows] == ["Initech", "Acme Corp"]
+        assert response.rows[0].document_name == "lease_initech.pdf"
+        # Filter runs on the typed column, scoped to the tenant
+        assert "lt:value_date" in fake_supabase.calls
+        assert "eq:tenant_id" in fake_supabase.calls
+
+    def test_filters_are_intersected(self, fake_supabase: Mock) -> None:
+        service = FieldQueryService(fake_supabase, TENANT_ID)
+        request = FieldQueryRequest(
+            filters=[
+                FieldFilter(field="lease_end_date", op="between", values=["2026-01-01", "2028-12-31"]),
+                FieldFilter(field="base_rent", op="gt", value="10000"),
+            ],
+            fields=["tenant_name"],
+        )
+
+        response = asyncio.run(service.query(request))
+
+        assert [row.fields["tenant_name"].value_text for row in response.rows] == ["Globex LLC"]
+        assert response.rows[0].fields["base_rent"].value_number == 12000.0
+
+    def test_sort_only_puts_missing_values_last(self, fake_supabase: Mock) -> None:
+        service = FieldQueryService(fake_supabase, TENANT_ID)
+        request = FieldQueryRequest(
+            sort=FieldSort(field="base_rent", descending=True),
+            fields=["tenant_name"],
+            limit=1,
+        )
+
+        response = asyncio.run(service.query(request))
+
+        assert response.total_count == 2
+        assert response.rows[0].fields["tenant_name"].value_text == "Globex LLC"
+
+    def test_sort_only_is_limited_in_the_database(self, fake_supabase: Mock) -> None:
+        service = FieldQueryService(fake_supabase, TENANT_ID)
+        request = FieldQueryRequest(sort=FieldSort(field="lease_end_date"), fields=["tenant_name"], limit=2)
+
+        response = asyncio.run(service.query(request))
+
+        assert response.total_count == 3
+        assert [row.fields["tenant_name"].value_text for row in response.rows] == ["Acme Corp", "Initech"]
+        assert "order:value_date" in fake_supabase.calls
+        assert "limit:2" in fake_supabase.calls
+
+    def test_filters_read_every_page(self, fake_supabase: Mock, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(field_query, "PAGE_SIZE", 1)
+        service = FieldQueryService(fake_supabase, TENANT_ID)
+        request = FieldQueryRequest(
+            filters=[FieldFilter(field="lease_end_date", op="gte", value="2026-01-01")],
+            fields=["tenant_name"],
+        )
+
+        response = asyncio.run(service.query(request))
+
+        assert response.total_count == 3
+        assert "range:3" in fake_supabase.calls
+
+    def test_invalid_requests(self, fake_supabase: Mock) -> None:
+        service = FieldQueryService(fake_supabase, TENANT_ID)
+
+        with pytest.raises(ValueError, match="At least one filter or sort"):
+            asyncio.run(service.query(FieldQueryRequest()))
+        with pytest.raises(ValueError):
+            asyncio.run(service.query(FieldQueryRequest(
+                filters=[FieldFilter(field="lease_end_date", op="lt", value="next year")]
+            )))
+        with pytest.raises(ValueError, match="between"):
+            asyncio.run(service.query(FieldQueryRequest(
+                filters=[FieldFilter(field="base_rent", op="between", values=[1])]
+            )))
+
+
+class TestParseFieldQuestion:
+    """Routing of list-style questions to field queries."""
+
+    def test_expiry_before_year(self) -> None:
+        request = parse_field_question("Which leases expire before 2027?")
+
+        assert request is not None
+        assert request.filters == [FieldFilter(field="lease_end_date", op="lt", value="2027-01-01")]
+        assert request.sort == FieldSort(field="lease_end_date")
+
+    def test_combined_conditions(self) -> None:
+        request = parse_field_question("List retail tenants with rent over $30/SF expiring in June 2026")
+
+        assert request is not None
+        assert FieldFilter(
+            field="lease_end_date", op="between", values=["2026-06-01", "2026-06-30"]
+        ) in request.filters
+        assert FieldFilter(field="rent_per_square_foot", op="gt", value=30.0) in request.filters
+        assert FieldFilter(field="building_type", op="eq", value="retail") in request.filters
+
+    def test_base_rent_threshold(self) -> None:
+        request = parse_field_question("Show leases with base rent under 50k")
+
+        assert request is not None
+        assert request.filters == [FieldFilter(field="base_rent", op="lt", value=50000.0)]
+
+    @pytest.mark.parametrize(
+        "question",
+        [
+            "What is the base rent?",
+            "Does the tenant have a renewal option?",
+            "Which leases have a co-tenancy clause?",
+            "Which tenants are in retail buildings and what are their renewal options?",
+            "Which leases expire before 2027 and include a termination option?",
+        ],
+    )
+    def test_non_field_questions(self, question: str) -> None:
+        assert parse_field_question(question) is None
+
+    def test_conditions_with_filler_words(self) -> None:
+        request = parse_field_question("Which tenants are located in office buildings?")
+
+        assert request is not None
+        assert request.filters == [FieldFilter(field="building_type", op="eq", value="office")]
+
+    @pytest.mark.parametrize("question", ["Which leases expire in 0000?", "Which leases expire before 13/40/2026?"])
+    def test_invalid_dates(self, question: str) -> None:
+        assert parse_field_question(question) is None
+
+
+class TestFieldAnswer:
+    """Formatting field results as /ask answers."""
+
+    def test_answer_cites_filter_field_page(self, fake_supabase: Mock) -> None:
+        request = parse_field_question("Which leases expire before 2027?")
+        assert request is not None
+        response = asyncio.run(FieldQueryService(fake_supabase, TENANT_ID).query(request))
+
+        answer = build_field_answer(request, response)
+
+        assert answer.chunks_used == 0
+        assert answer.answer.startswith("Found 1 matching document(s) where lease end date < 2027-01-01")
+        assert "Acme Corp" in answer.answer
+        assert f"[DOC:{response.rows[0].document_id}:PAGE:3]" in answer.answer
+        assert answer.citations[0].document_name == "lease_acme.pdf"
+        assert answer.citations[0].page == 3
+        assert answer.confidence == 0.9
+
+    def test_no_matches_is_answered_from_fields(self, fake_supabase: Mock) -> None:
+        request = parse_field_question("Which leases expire before 2020?")
+        assert request is not None
+        response = asyncio.run(FieldQueryService(fake_supabase, TENANT_ID).query(request))
+
+        answer = build_field_answer(request, response)
+
+        assert answer.answer == "No documents match where lease end date < 2020-01-01."
+        assert answer.citations == []
+        assert answer.chunks_used == 0
+
+    def test_map_reduce_skips_field_routing(self, fake_supabase: Mock) -> None:
+        from src.api.routes.ask import _answer_from_fields
+
+        ask_request = AskRequest(question="Which leases expire before 2027?", mode="map_reduce")
+
+        answer = asyncio.run(_answer_from_fields(fake_supabase, Mock(tenant_id=TENANT_ID), ask_request, "req"))
+
+        assert answer is None
+        fake_supabase.table.assert_not_called()
@@ -3,7 +3,7 @@
 import asyncio
 import sys
 from pathlib import Path
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 from uuid import UUID, uuid4
 
 import pytest
@@ -13,6 +13,9 @@ from typing import Any, Generator
 project_root = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(project_root))
 
+from src.search.bm25 import BM25Index, BM25KeywordStore, analyze
+from src.search.embedding_cache import QueryEmbeddingCache
+from src.search.hybrid import HybridSearchService
 from src.search.keyword_search import KeywordSearchResult, KeywordSearchService
 
 
@@ -115,3 +118,128 @@ class TestKeywordSearchService:
 
         with pytest.raises(Exception, match="Database connection error"):
             asyncio.run(service.search_chunks(query_text="test query", match_count=5))
+
+
+class TestBM25KeywordStore:
+    """Unit tests for the local BM25 keyword index."""
+
+    BOILERPLATE = "Tenant shall pay Base Rent to Landlord. " + (
+        "Tenant shall maintain the Premises in good order and repair at its sole cost. " * 10
+    )
+
+    def _chunk(self, content: str) -> dict:
+        return {"id": uuid4(), "content": content, "page_numbers": [1]}
+
+    def test_analyze_matches_english_config(self) -> None:
+        """Stop words are dropped and terms stemmed."""
+        assert analyze("The escalations of the Rents") == ["escalation", "rent"]
+
+    def test_length_normalisation_prefers_short_chunk(self) -> None:
+        """A focused chunk outranks long boilerplate repeating the term."""
+        index = BM25Index()
+        focused = self._chunk("Base Rent: $52,500 per month")
+        index.add_document(uuid4(), [self._chunk(self.BOILERPLATE), focused])
+
+        results = index.search("base rent", k=2)
+
+        assert results[0][0].chunk_id == str(focused["id"])
+
+    def test_add_document_replaces_superseded_version(self) -> None:
+        """Re-indexing a document drops its previous chunks."""
+        index = BM25Index()
+        document_id = uuid4()
+        index.add_document(document_id, [self._chunk("Security deposit of two months")])
+        index.add_document(document_id, [self._chunk("Letter of credit in lieu of deposit")])
+
+        assert len(index) == 1
+        assert index.search("security", k=5) == []
+        assert len(index.search("letter credit", k=5)) == 1
+
+    def test_delete_document(self) -> None:
+        """Deleted documents no longer match."""
+        index = BM25Index()
+        kept, removed = uuid4(), uuid4()
+        index.add_document(kept, [self._chunk("Percentage rent over breakpoint")])
+        index.add_document(removed, [self._chunk("Percentage rent of six percent")])
+
+        assert index.delete_document(removed) == 1
+        results = index.search("percentage rent", k=5)
+        assert [chunk.document_id for chunk, _ in results] == [str(kept)]
+
+    def test_document_filter(self) -> None:
+        """Only chunks of filtered documents are returned."""
+        index = BM25Index()
+        first, second = uuid4(), uuid4()
+        index.add_document(first, [self._chunk("CAM charges reconciled annually")])
+        index.add_document(second, [self._chunk("CAM charges capped at five percent")])
+
+        results = index.search("cam charges", k=5, filter_document_ids=[second])
+
+        assert [chunk.document_id for chunk, _ in results] == [str(second)]
+        assert index.search("cam", k=5, filter_document_ids=[uuid4()]) == []
+
+    def test_segment_round_trip_compacts_deleted_rows(self, tmp_path: Path) -> None:
+        """A saved segment holds only live chunks and ranks identically."""
+        index = BM25Index()
+        deleted = uuid4()
+        index.add_document(deleted, [self._chunk("Holdover rent at 150 percent")])
+        index.add_document(uuid4(), [self._chunk(self.BOILERPLATE), self._chunk("Base rent abatement")])
+        index.delete_document(deleted)
+
+        path = tmp_path / "bm25.seg"
+        index.save(path)
+        loaded = BM25Index.load(path)
+
+        assert len(loaded) == 2
+        assert loaded.search("holdover", k=5) == []
+        expected = [(chunk.chunk_id, round(score, 9)) for chunk, score in index.search("base rent", k=5)]
+        actual = [(chunk.chunk_id, round(score, 9)) for chunk, score in loaded.search("base rent", k=5)]
+        assert actual == expected
+
+    def test_load_rejects_unknown_format(self, tmp_path: Path) -> None:
+        """Files without the segment header are rejected."""
+        path = tmp_path / "bm25.seg"
+        path.write_bytes(b"not a segment")
+
+        with pytest.raises(ValueError, match="Unsupported BM25 segment"):
+            BM25Index.load(path)
+
+    def test_hybrid_service_uses_keyword_store(self, tmp_path: Path) -> None:
+        """Keyword search goes to the injected store, not the RPC."""
+        tenant_id = uuid4()
+        store = BM25KeywordStore(tmp_path)
+        chunk = self._chunk("Operating expense stop of $12.50")
+        store.add_document(tenant_id, uuid4(), [chunk])
+        store.save(tenant_id)
+        assert store.has_tenant(tenant_id)
+
+        client = Mock(spec=Client)
+        service = HybridSearchService(
+            supabase_client=client,
+            embedding_service=Mock(embed_single=AsyncMock()),
+            query_cache=QueryEmbeddingCache(),
+            tenant_id=tenant_id,
+            keyword_store=BM25KeywordStore(tmp_path),
+        )
+
+        results = asyncio.run(service.search(query="expense stop", mode="keyword", limit=5))
+
+        assert [result.chunk_id for result in results] == [chunk["id"]]
+        client.rpc.assert_not_called()
+
+    def test_segment_served_only_at_current_corpus_version(self, tmp_path: Path) -> None:
+        """A segment is stale once the tenant's corpus version moves past its stamp."""
+        tenant_id = uuid4()
+        store = BM25KeywordStore(tmp_path)
+        store.add_document(tenant_id, uuid4(), [self._chunk("Base rent escalates 3% annually")])
+        store.index(tenant_id).corpus_version = 7
+        store.save(tenant_id)
+
+        reader = BM25KeywordStore(tmp_path)
+        assert reader.is_current(tenant_id, 7)
+        assert not reader.is_current(tenant_id, 8)
+
+        # Rebuilt by another process at the new version: reloaded on next check
+        store.index(tenant_id).corpus_version = 8
+        store.save(tenant_id)
+        assert reader.is_current(tenant_id, 8)
@@ -1,16 +1,40 @@
 """Tests for RAG Q&A pipeline."""
 import pytest
-from uuid import uuid4
+from uuid import UUID, uuid4
 from unittest.mock import Mock, AsyncMock, patch
 
 from src.rag.models import ChunkMatch, AskRequest, AskResponse
-from src.rag.citations import extract_citations, validate_citations, build_citations
-from src.rag.context_builder import count_tokens, build_context
-from src.rag.prompts import format_system_prompt, format_user_prompt
-from src.rag.retriever import Retriever
-from src.rag.generator import Generator
+from src.rag.citations import (
+    StreamingCitationValidator,
+    build_citations,
+    extract_citations,
+    validate_citations,
+)
+from src.rag.context_builder import (
+    ContextItem,
+    build_context,
+    count_tokens,
+    fit_document_text,
+    get_encoding,
+    pack_context,
+)
+from src.rag.prompts import (
+    MAP_SYSTEM_PROMPT,
+    NOT_RELEVANT,
+    REDUCE_SYSTEM_PROMPT,
+    format_system_prompt,
+    format_user_prompt,
+)
+from src.rag.retriever import Retriever, mmr_select
+from src.search.hybrid import SearchResult
+from src.search.keyword_store import KeywordMatch
+from src.search.vector_store import VectorMatch
+from src.rag.generator import GenerationResult, Generator
+from src.rag.map_reduce import RequestBudget, estimate_cost
 from src.rag.pipeline import RAGPipeline
-from typing import Any
+from src.rag.answer_cache import SemanticAnswerCache
+from src.search.result_cache import InMemorySearchCacheStore, SearchResultCache
+from typing import Any, Dict, Optional
 
 
 # ========== Citation Tests ==========
@@ -202,6 +226,121 @@ def test_build_context_multiple_chunks() -> None:
     assert context.count("---") == 2  # Separators between chunks
 
 
+def test_count_tokens_loads_encoder_once() -> None:
+    """Test the tokenizer is loaded once per model, not per call."""
+    get_encoding.cache_clear()
+    encoding = Mock()
+    encoding.encode.return_value = [1, 2, 3]
+    try:
+        with patch("src.rag.context_builder.tiktoken.encoding_for_model", return_value=encoding) as loader:
+            assert count_tokens("first") == 3
+            assert count_tokens("second") == 3
+        loader.assert_called_once_with("gpt-4o-mini")
+    finally:
+        get_encoding.cache_clear()
+
+
+def test_build_context_uses_stored_token_counts() -> None:
+    """Test chunks with a stored token_count are not re-tokenized."""
+    chunks = [
+        ChunkMatch(
+            id=uuid4(),
+            document_id=uuid4(),
+            content=f"Chunk {i} content",
+            page_numbers=[i],
+            similarity=0.9,
+            token_count=5,
+        )
+        for i in range(1, 4)
+    ]
+
+    with patch("src.rag.context_builder.count_tokens") as counter:
+        context = build_context(chunks, max_tokens=6000)
+
+    counter.assert_not_called()
+    assert context.count("---") == 2
+
+
+def test_build_context_skips_chunks_that_do_not_fit() -> None:
+    """Test a long chunk does not stop smaller later chunks from being packed."""
+    doc_id = uuid4()
+    chunks = [
+        ChunkMatch(id=uuid4(), document_id=doc_id, content="short first", page_numbers=[1],
+                   similarity=0.9, token_count=10),
+        ChunkMatch(id=uuid4(), document_id=doc_id, content="very long", page_numbers=[2],
+                   similarity=0.85, token_count=5000),
+        ChunkMatch(id=uuid4(), document_id=doc_id, content="short last", page_numbers=[3],
+                   similarity=0.8, token_count=10),
+    ]
+
+    context = build_context(chunks, max_tokens=200)
+
+    assert "short first" in context
+    assert "very long" not in context
+    assert "short last" in context
+    # Retrieval order is kept
+    assert context.index("short first") < context.index("short last")
+
+
+def test_build_context_per_document_cap() -> None:
+    """Test max_chunks_per_document keeps the most relevant chunks of each document."""
+    doc_a, doc_b = uuid4(), uuid4()
+    chunks = [
+        ChunkMatch(id=uuid4(), document_id=doc_id, content=f"{label} {i}", page_numbers=[i],
+                   similarity=0.9 - i * 0.1, token_count=10)
+        for doc_id, label in ((doc_a, "alpha"), (doc_b, "beta"))
+        for i in range(1, 4)
+    ]
+
+    context = build_context(chunks, max_tokens=6000, max_chunks_per_document=2)
+
+    assert "alpha 1" in context and "alpha 2" in context and "alpha 3" not in context
+    assert "beta 1" in context and "beta 2" in context and "beta 3" not in context
+
+
+def test_pack_context_relevance_per_token() -> None:
+    """Test packing maximises relevance within the budget."""
+    items = [
+        ContextItem(text="a", score=0.9, tokens=60),
+        ContextItem(text="b", score=0.6, tokens=30),
+        ContextItem(text="c", score=0.6, tokens=30),
+        ContextItem(text="d", score=0.1, tokens=30),
+    ]
+
+    # b + c (1.2) beats a alone (0.9) and a + b (1.5) does not fit in 70
+    assert pack_context(items, max_tokens=70) == [1, 2]
+    # A single item worth more than the greedy pick wins
+    assert pack_context(
+        [ContextItem(text="x", score=0.9, tokens=100), ContextItem(text="y", score=0.1, tokens=1)],
+        max_tokens=100,
+    ) == [0]
+    assert pack_context([ContextItem(text="z", score=1.0, tokens=500)], max_tokens=100) == []
+
+
+def test_fit_document_text_short_text_unchanged() -> None:
+    """Test text that cannot exceed the budget is returned without tokenizing."""
+    with patch("src.rag.context_builder.get_encoding") as loader:
+        assert fit_document_text("Base rent is $5,000.", max_tokens=100) == "Base rent is $5,000."
+    loader.assert_not_called()
+
+
+def test_fit_document_text_keeps_relevant_paragraphs() -> None:
+    """Test long text keeps the paragraphs that mention the keywords."""
+    encoding = Mock()
+    encoding.encode.side_effect = lambda text: text.split()
+    paragraphs = [
+        "Boilerplate " * 40,
+        "The Base Rent shall be $5,000 per month.",
+        "Boilerplate " * 40,
+        "The Lease End Date is June 30, 2029.",
+    ]
+
+    with patch("src.rag.context_builder.get_encoding", return_value=encoding):
+        fitted = fit_document_text("\n\n".join(paragraphs), max_tokens=30, keywords=["base_rent", "lease end date"])
+
+    assert fitted == paragraphs[1] + "\n\n" + paragraphs[3]
+
+
 # ========== Prompt Tests ==========
 
 def test_format_system_prompt() -> None:
@@ -295,6 +434,205 @@ async def test_retriever_rerank() -> None:
     assert chunks[0].similarity >= chunks[1].similarity >= chunks[2].similarity
 
 
+def _vector_match(content: str, similarity: float) -> VectorMatch:
+    return VectorMatch(
+        chunk_id=uuid4(), document_id=uuid4(), content=content, page_numbers=[1], similarity=similarity
+    )
+
+
+def _retriever_with_stores(vector_matches: Any, keyword_matches: Any = None, **options: Any) -> Retriever:
+    embeddings = AsyncMock()
+    embeddings.embed_single = AsyncMock(return_value=[0.1] * 1536)
+    vector_store = Mock()
+    vector_store.search = AsyncMock(return_value=vector_matches)
+    keyword_store = Mock()
+    if isinstance(keyword_matches, Exception):
+        keyword_store.search = AsyncMock(side_effect=keyword_matches)
+    else:
+        keyword_store.search = AsyncMock(return_value=keyword_matches or [])
+    query_cache = Mock()
+    query_cache.get_or_embed = AsyncMock(return_value=[0.1] * 1536)
+    return Retriever(
+        Mock(),
+        embeddings,
+        query_cache=query_cache,
+        vector_store=vector_store,
+        keyword_store=keyword_store,
+        tenant_id=uuid4(),
+        **options,
+    )
+
+
+def test_mmr_select_skips_near_duplicates() -> None:
+    """MMR prefers a different chunk over a restatement of the top one."""
+    contents = [
+        "Base rent is $5,000 per month payable in advance",
+        "Base rent is $5,000 per month payable in advance on the first day",
+        "Tenant may renew for one five year term at market rent",
+    ]
+
+    assert mmr_select(contents, [0.9, 0.88, 0.8], top_n=2) == [0, 2]
+    assert mmr_select(contents, [0.9, 0.88, 0.8], top_n=2, mmr_lambda=1.0) == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_retriever_mmr_diversifies_candidates() -> None:
+    """Near-duplicate amendment chunks do not fill the top-n."""
+    retriever = _retriever_with_stores([
+        _vector_match("Base rent is $5,000 per month payable in advance", 0.91),
+        _vector_match("Base rent is $5,000 per month payable in advance (as amended)", 0.90),
+        _vector_match("Security deposit equals two months of base rent", 0.80),
+    ])
+
+    chunks = await retriever.retrieve("What is the base rent?", rerank_to=2)
+
+    assert [c.similarity for c in chunks] == [0.91, 0.80]
+
+
+@pytest.mark.asyncio
+async def test_retriever_hybrid_fuses_keyword_results() -> None:
+    """Hybrid mode uses the search service's RRF; similarity is the share of the best RRF score."""
+    shared = VectorMatch(
+        chunk_id=uuid4(), document_id=uuid4(), content="Landlord shall maintain the roof", page_numbers=[1],
+        similarity=0.70, section_header="Maintenance", token_count=12,
+    )
+    keyword_only = KeywordMatch(
+        chunk_id=uuid4(), document_id=uuid4(), content="HVAC maintenance by Tenant", page_numbers=[4], score=0.5
+    )
+    retriever = _retriever_with_stores(
+        [_vector_match("Parking ratio is 4 per 1,000 SF", 0.75), shared],
+        [keyword_only, KeywordMatch(
+            chunk_id=shared.chunk_id, document_id=shared.document_id, content=shared.content,
+            page_numbers=[1], score=0.4,
+        )],
+        search_mode="hybrid",
+        mmr_lambda=None,
+        candidate_pool=10,
+    )
+
+    chunks = await retriever.retrieve("who maintains HVAC", rerank_to=3)
+
+    # Second in both rankings, so first after fusion
+    assert chunks[0].id == shared.chunk_id
+    assert chunks[0].similarity == pytest.approx(61 / 62)
+    assert chunks[0].section_header == "Maintenance"
+    assert chunks[0].token_count == 12
+    fused = {c.id: c for c in chunks}
+    # First in one of two rankings: half the best attainable RRF score
+    assert fused[keyword_only.chunk_id].similarity == pytest.approx(0.5)
+    assert fused[keyword_only.chunk_id].page_numbers == [4]
+    retriever.vector_store.search.assert_awaited_once()  # type: ignore[attr-defined]
+    retriever.query_cache.get_or_embed.assert_awaited()  # type: ignore[attr-defined]
+
+
+@pytest.mark.asyncio
+async def test_retriever_hybrid_includes_fuzzy_leg() -> None:
+    """With fuzzy_keyword, fuzzy-only chunks are fused as a third ranking."""
+    fuzzy_id, document_id = uuid4(), uuid4()
+    retriever = _retriever_with_stores(
+        [_vector_match("Parking ratio is 4 per 1,000 SF", 0.75)],
+        search_mode="hybrid",
+        fuzzy_keyword=True,
+        mmr_lambda=None,
+    )
+    retriever.client.rpc.return_value.execute.return_value = Mock(data=[{  # type: ignore[attr-defined]
+        "id": str(fuzzy_id), "document_id": str(document_id), "content": "Parkng spaces", "rank": 0.3,
+    }])
+
+    chunks = await retriever.retrieve("parkng", rerank_to=3)
+
+    assert fuzzy_id in {c.id for c in chunks}
+    assert all(c.similarity == pytest.approx(1 / 3) for c in chunks)
+    retriever.client.rpc.assert_called_once()  # type: ignore[attr-defined]
+    assert retriever.client.rpc.call_args.args[0] == "match_document_chunks_fuzzy"  # type: ignore[attr-defined]
+
+
+@pytest.mark.asyncio
+async def test_retriever_hybrid_keyword_failure_uses_vector_results() -> None:
+    """A failing keyword leg degrades to vector candidates."""
+    retriever = _retriever_with_stores(
+        [_vector_match("Parking ratio is 4 per 1,000 SF", 0.75)],
+        RuntimeError("keyword search down"),
+        search_mode="hybrid",
+    )
+
+    chunks = await retriever.retrieve("parking", rerank_to=3)
+
+    assert [c.content for c in chunks] == ["Parking ratio is 4 per 1,000 SF"]
+    assert chunks[0].similarity == pytest.approx(0.5)
+
+
+@pytest.mark.asyncio
+async def test_retriever_hybrid_embedding_failure_uses_keyword_results() -> None:
+    """A failing question embedding degrades hybrid retrieval to the keyword leg."""
+    keyword_only = KeywordMatch(
+        chunk_id=uuid4(), document_id=uuid4(), content="Parking ratio is 4 per 1,000 SF", page_numbers=[2], score=0.5
+    )
+    retriever = _retriever_with_stores([], [keyword_only], search_mode="hybrid")
+    retriever.query_cache.get_or_embed = AsyncMock(side_effect=RuntimeError("embeddings down"))  # type: ignore[method-assign]
+
+    chunks = await retriever.retrieve("parking", rerank_to=3)
+
+    assert [c.id for c in chunks] == [keyword_only.chunk_id]
+    retriever.vector_store.search.assert_not_awaited()  # type: ignore[attr-defined]
+
+
+@pytest.mark.asyncio
+async def test_retriever_grouped_embedding_failure_groups_keyword_results() -> None:
+    """Map-reduce retrieval groups keyword results when the embedding fails."""
+    doc_a, doc_b = uuid4(), uuid4()
+    keyword_matches = [
+        KeywordMatch(chunk_id=uuid4(), document_id=doc, content=f"Clause {i}", page_numbers=[i], score=1.0 - i / 10)
+        for i, doc in enumerate([doc_a, doc_a, doc_a, doc_b])
+    ]
+    retriever = _retriever_with_stores([], keyword_matches, search_mode="hybrid")
+    retriever.query_cache.get_or_embed = AsyncMock(side_effect=RuntimeError("embeddings down"))  # type: ignore[method-assign]
+    retriever.vector_store.search_grouped = AsyncMock()  # type: ignore[attr-defined]
+
+    groups = await retriever.retrieve_grouped("parking", chunks_per_document=2, max_documents=5)
+
+    assert [[c.content for c in group] for group in groups] == [["Clause 0", "Clause 1"], ["Clause 3"]]
+    retriever.vector_store.search_grouped.assert_not_awaited()  # type: ignore[attr-defined]
+
+
+@pytest.mark.asyncio
+async def test_retriever_cross_encoder_rerank() -> None:
+    """Cross-encoder scores decide the order; similarity is kept for confidence."""
+    matches = [_vector_match(f"Clause {name}", similarity) for name, similarity in
+               [("alpha", 0.9), ("bravo", 0.8), ("charlie", 0.7)]]
+    reranker = Mock()
+    reranker.is_available.return_value = True
+    reranker.top_k = 20
+
+    async def rerank_async(query: str, results: Any) -> Any:
+        # Cross-encoder prefers the weakest vector match
+        scores = {"Clause charlie": 5.0, "Clause bravo": 1.0, "Clause alpha": -2.0}
+        return sorted(
+            [SearchResult(r.chunk_id, r.document_id, r.content, r.page_numbers, scores[r.content]) for r in results],
+            key=lambda r: r.score,
+            reverse=True,
+        )
+
+    reranker.rerank_async = rerank_async
+    retriever = _retriever_with_stores(matches, reranker=reranker, mmr_lambda=None, candidate_pool=3)
+
+    chunks = await retriever.retrieve("question", rerank_to=2)
+
+    assert [c.content for c in chunks] == ["Clause charlie", "Clause bravo"]
+    assert chunks[0].similarity == 0.7
+    retriever.vector_store.search.assert_awaited_once_with(  # type: ignore[attr-defined]
+        retriever.tenant_id, [0.1] * 1536, 3, None
+    )
+
+
+def test_retriever_invalid_options() -> None:
+    """Invalid retrieval options are rejected."""
+    with pytest.raises(ValueError, match="mmr_lambda"):
+        _retriever_with_stores([], mmr_lambda=1.5)
+    with pytest.raises(ValueError, match="candidate_pool"):
+        _retriever_with_stores([], candidate_pool=0)
+
+
 # ========== Generator Tests ==========
 
 @pytest.mark.asyncio
@@ -317,6 +655,58 @@ async def test_generator_generate() -> None:
         mock_client.chat.completions.create.assert_called_once()
 
 
+def test_streaming_citation_validator_split_citation() -> None:
+    """Test citations split across deltas are checked once complete."""
+    doc_id = uuid4()
+    chunks = [
+        ChunkMatch(
+            id=uuid4(),
+            document_id=doc_id,
+            content="Rent",
+            page_numbers=[3],
+            similarity=0.9,
+        )
+    ]
+    validator = StreamingCitationValidator(chunks)
+
+    assert validator.feed("Rent is $5000 [DOC:") == []
+    assert validator.feed(f"{doc_id}:PAGE:") == []
+    assert validator.feed("3]. Also [DOC:") == [(str(doc_id), 3, True)]
+    assert validator.feed(f"{doc_id}:PAGE:12]") == [(str(doc_id), 12, False)]
+    assert validator.answer.endswith(f"[DOC:{doc_id}:PAGE:12]")
+
+
+@pytest.mark.asyncio
+async def test_generator_generate_stream() -> None:
+    """Test generator forwards streamed deltas and closes the stream."""
+    deltas = ["The rent", None, " is $5000", " [DOC:abc:PAGE:1]"]
+    chunks = [Mock(choices=[Mock(delta=Mock(content=delta))]) for delta in deltas]
+
+    class FakeStream:
+        def __init__(self) -> None:
+            self.close = AsyncMock()
+
+        def __aiter__(self) -> Any:
+            return self._iterate()
+
+        async def _iterate(self) -> Any:
+            for chunk in chunks:
+                yield chunk
+
+    stream = FakeStream()
+    with patch("src.rag.generator.AsyncOpenAI") as mock_openai:
+        mock_client = AsyncMock()
+        mock_client.chat.completions.create = AsyncMock(return_value=stream)
+        mock_openai.return_value = mock_client
+
+        generator = Generator(api_key="test-key")
+        received = [delta async for delta in generator.generate_stream("What is the rent?", "Context")]
+
+    assert received == ["The rent", " is $5000", " [DOC:abc:PAGE:1]"]
+    assert mock_client.chat.completions.create.call_args.kwargs["stream"] is True
+    stream.close.assert_awaited_once()
+
+
 # ========== Pipeline Integration Tests ==========
 
 @pytest.mark.asyncio
@@ -434,3 +824,369 @@ async def test_pipeline_ask_invalid_citations() -> None:
     # Should return no-context response due to validation failure
     assert "don't have enough information" in response.answer
     assert response.confidence == 0.0
+
+
+def _streaming_pipeline(doc_id: Any, deltas: list) -> Any:
+    """Pipeline with one retrieved chunk (page 3) and a generator streaming deltas."""
+    mock_supabase = Mock()
+    mock_supabase.rpc.return_value.execute.return_value.data = [
+        {
+            "id": str(uuid4()),
+            "document_id": str(doc_id),
+            "content": "Monthly rent is $5000",
+            "page_numbers": [3],
+            "similarity": 0.95,
+            "section_header": None,
+        }
+    ]
+    mock_supabase.table.return_value.select.return_value.in_.return_value.execute.return_value.data = [
+        {"id": str(doc_id), "original_filename": "Lease.pdf"}
+    ]
+
+    mock_embeddings = AsyncMock()
+    mock_embeddings.embed_single = AsyncMock(return_value=[0.1] * 1536)
+
+    generated: list = []
+
+    async def generate_stream(question: str, context: str) -> Any:
+        for delta in deltas:
+            generated.append(delta)
+            yield delta
+
+    mock_generator = Mock()
+    mock_generator.generate_stream = generate_stream
+
+    pipeline = RAGPipeline(mock_supabase, mock_embeddings, mock_generator)
+    return pipeline, generated
+
+
+@pytest.mark.asyncio
+async def test_pipeline_ask_stream_success() -> None:
+    """Test streamed answer emits tokens, validated citations and a final response."""
+    doc_id = uuid4()
+    deltas = ["The monthly rent", " is $5000 [DOC:", f"{doc_id}:PAGE:3]."]
+    pipeline, _ = _streaming_pipeline(doc_id, deltas)
+
+    with patch("src.rag.pipeline.build_context", return_value="context"):
+        events = [event async for event in pipeline.ask_stream(AskRequest(question="What is the rent?"))]
+
+    assert [data["text"] for name, data in events if name == "token"] == deltas
+    assert ("citation", {"document_id": str(doc_id), "page": 3, "valid": True}) in events
+    name, final = events[-1]
+    assert name == "done"
+    response = AskResponse(**final)
+    assert response.answer == "".join(deltas)
+    assert response.citations[0].document_name == "Lease.pdf"
+    assert response.chunks_used == 1
+
+
+@pytest.mark.asyncio
+async def test_pipeline_ask_stream_stops_on_invalid_citation() -> None:
+    """Test generation stops at the first invalid citation."""
+    doc_id = uuid4()
+    deltas = [f"Rent [DOC:{uuid4()}:PAGE:99]", " and more text", " that is never generated"]
+    pipeline, generated = _streaming_pipeline(doc_id, deltas)
+
+    with patch("src.rag.pipeline.build_context", return_value="context"):
+        events = [event async for event in pipeline.ask_stream(AskRequest(question="Test?"))]
+
+    assert generated == deltas[:1]
+    assert [name for name, _ in events] == ["token", "citation", "done"]
+    assert events[1][1]["valid"] is False
+    assert "don't have enough information" in events[-1][1]["answer"]
+    assert events[-1][1]["confidence"] == 0.0
+
+
+# ========== Answer Cache Tests ==========
+
+def _answer(doc_id: Any, text: str = "Renewal: two 5-year options") -> AskResponse:
+    return AskResponse(
+        answer=f"{text} [DOC:{doc_id}:PAGE:4]",
+        citations=[],
+        confidence=0.9,
+        chunks_used=3,
+        suggestion=None,
+    )
+
+
+class _DictVersionStore(InMemorySearchCacheStore):
+    """In-memory store whose corpus versions come from a dict (stands in for the chunk triggers)."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.versions: Dict[UUID, int] = {}
+
+    async def get_version(self, tenant_id: UUID) -> Optional[int]:
+        return self.versions.get(tenant_id, 0)
+
+
+@pytest.mark.asyncio
+async def test_answer_cache_hits_similar_question() -> None:
+    """Test a near-identical question embedding returns the cached answer."""
+    cache = SemanticAnswerCache(threshold=0.95, version_source=SearchResultCache(_DictVersionStore()))
+    tenant_id, doc_id = uuid4(), uuid4()
+    version = await cache.get_version(tenant_id)
+    assert version == 0
+
+    cache.set(tenant_id, version, "What's the renewal option on Suite 200?", [1.0, 0.0, 0.1], _answer(doc_id))
+    hit = cache.get(tenant_id, version, "what is the renewal option for suite 200", [1.0, 0.02, 0.1])
+
+    assert hit is not None
+    assert hit.cached is True
+    assert str(doc_id) in hit.answer
+    # Far embedding, other tenant, and other filter/max_chunks all miss
+    assert cache.get(tenant_id, version, "Who is the guarantor?", [0.0, 1.0, 0.0]) is None
+    assert cache.get(uuid4(), version, "What's the renewal option on Suite 200?", [1.0, 0.0, 0.1]) is None
+    assert cache.get(
+        tenant_id, version, "What's the renewal option on Suite 200?", [1.0, 0.0, 0.1], document_ids=[doc_id]
+    ) is None
+    assert cache.get(tenant_id, version, "What's the renewal option on Suite 200?", [1.0, 0.0, 0.1], max_chunks=10) is None
+    assert cache.stats() == {"buckets": 1, "hits": 1, "misses": 4}
+
+
+@pytest.mark.asyncio
+async def test_answer_cache_requires_same_numbers() -> None:
+    """Test questions that differ only in a number never share an answer."""
+    cache = SemanticAnswerCache(version_source=SearchResultCache(_DictVersionStore()))
+    tenant_id = uuid4()
+
+    cache.set(tenant_id, 0, "Renewal option on Suite 200?", [1.0, 0.0], _answer(uuid4()))
+
+    assert cache.get(tenant_id, 0, "Renewal option on Suite 300?", [1.0, 0.0]) is None
+    assert cache.get(tenant_id, 0, "Renewal option on suite 200", [1.0, 0.0]) is not None
+
+
+@pytest.mark.asyncio
+async def test_answer_cache_invalidated_by_corpus_version() -> None:
+    """Test answers are unreachable once the tenant's corpus version is bumped."""
+    versions = _DictVersionStore()
+    cache = SemanticAnswerCache(version_source=SearchResultCache(versions, version_ttl=0))
+    tenant_id = uuid4()
+
+    cache.set(tenant_id, await cache.get_version(tenant_id), "Base rent?", [0.5, 0.5], _answer(uuid4()))
+    versions.versions[tenant_id] = 1  # chunk write
+
+    assert cache.get(tenant_id, await cache.get_version(tenant_id), "Base rent?", [0.5, 0.5]) is None
+
+
+@pytest.mark.asyncio
+async def test_answer_cache_skipped_without_corpus_version() -> None:
+    """Test nothing is cached when the corpus version cannot be read."""
+    cache = SemanticAnswerCache(version_source=SearchResultCache())
+
+    assert await cache.get_version(uuid4()) is None
+
+
+def test_answer_cache_invalid_threshold() -> None:
+    """Test threshold validation."""
+    with pytest.raises(ValueError, match="threshold"):
+        SemanticAnswerCache(threshold=0.0, version_source=SearchResultCache())
+
+
+def _cached_pipeline() -> Any:
+    """Pipeline with one retrieved chunk, a fixed embedding and an answer cache."""
+    doc_id = uuid4()
+    mock_supabase = Mock()
+    mock_supabase.rpc.return_value.execute.return_value.data = [
+        {
+            "id": str(uuid4()),
+            "document_id": str(doc_id),
+            "content": "Two 5-year renewal options",
+            "page_numbers": [4],
+            "similarity": 0.9,
+            "section_header": None,
+        }
+    ]
+    mock_supabase.table.return_value.select.return_value.in_.return_value.execute.return_value.data = [
+        {"id": str(doc_id), "original_filename": "Lease.pdf"}
+    ]
+
+    mock_embeddings = AsyncMock()
+    mock_embeddings.embed_single = AsyncMock(return_value=[0.1] * 1536)
+    mock_generator = AsyncMock()
+    mock_generator.generate = AsyncMock(return_value=f"Two 5-year options [DOC:{doc_id}:PAGE:4].")
+
+    pipeline = RAGPipeline(
+        mock_supabase,
+        mock_embeddings,
+        mock_generator,
+        tenant_id=uuid4(),
+        answer_cache=SemanticAnswerCache(version_source=SearchResultCache(_DictVersionStore())),
+    )
+    pipeline.retriever.query_cache = Mock(get_or_embed=AsyncMock(return_value=[0.1] * 1536))
+    return pipeline, mock_generator
+
+
+@pytest.mark.asyncio
+async def test_pipeline_ask_serves_cached_answer() -> None:
+    """Test a repeated question skips retrieval and generation."""
+    pipeline, mock_generator = _cached_pipeline()
+
+    with patch("src.rag.pipeline.build_context", return_value="context"):
+        first = await pipeline.ask(AskRequest(question="What is the renewal option?"))
+        second = await pipeline.ask(AskRequest(question="what is the renewal option"))
+
+    assert first.cached is False
+    assert second.cached is True
+    assert second.answer == first.answer
+    assert second.citations == first.citations
+    mock_generator.generate.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_pipeline_ask_bypass_cache() -> None:
+    """Test bypass_cache always generates (and refreshes the cached answer)."""
+    pipeline, mock_generator = _cached_pipeline()
+
+    with patch("src.rag.pipeline.build_context", return_value="context"):
+        await pipeline.ask(AskRequest(question="What is the renewal option?"))
+        fresh = await pipeline.ask(AskRequest(question="What is the renewal option?", bypass_cache=True))
+
+    assert fresh.cached is False
+    assert mock_generator.generate.await_count == 2
+
+
+# ========== Map-Reduce Tests ==========
+
+def test_request_budget_reserve_and_settle() -> None:
+    """Test reservations hold budget until settled to the reported usage."""
+    budget = RequestBudget(max_tokens=1000, max_cost_usd=1.0, model="gpt-4o-mini")
+
+    assert budget.reserve(400, 200)
+    assert not budget.reserve(300, 200)  # 600 reserved + 500 > 1000
+
+    budget.settle((400, 200), 300, 50)
+    assert budget.reserve(300, 200)
+    assert (budget.prompt_tokens, budget.completion_tokens) == (300, 50)
+    assert budget.cost_usd == pytest.approx(estimate_cost("gpt-4o-mini", 300, 50))
+
+    budget.release(300, 200)
+    assert not RequestBudget(10_000, 0.0001, "gpt-4o").reserve(1000, 100)
+
+
+def _map_reduce_pipeline(documents: list, answers: dict) -> Any:
+    """
+    Pipeline over one chunk (page 1) per document; the generator answers each
+    document from `answers` (keyed by document id) and reduces to "Combined".
+    """
+    matches = [
+        VectorMatch(
+            chunk_id=uuid4(),
+            document_id=doc_id,
+            content=f"Co-tenancy clause of {name}",
+            page_numbers=[1],
+            similarity=0.9 - i * 0.1,
+            token_count=10,
+        )
+        for i, (doc_id, name) in enumerate(documents)
+    ]
+    vector_store = Mock()
+    vector_store.search_grouped = AsyncMock(return_value=matches)
+
+    mock_supabase = Mock()
+    mock_supabase.table.return_value.select.return_value.in_.return_value.execute.return_value.data = [
+        {"id": str(doc_id), "original_filename": name} for doc_id, name in documents
+    ]
+    mock_embeddings = AsyncMock()
+    mock_embeddings.embed_single = AsyncMock(return_value=[0.1] * 1536)
+
+    async def generate_with_usage(
+        question: str, context: str, system_template: str = "", max_tokens: Any = None
+    ) -> GenerationResult:
+        if system_template == REDUCE_SYSTEM_PROMPT:
+            cited = " ".join(f"[DOC:{doc_id}:PAGE:1]" for doc_id in answers if answers[doc_id] != NOT_RELEVANT)
+            return GenerationResult(f"Combined {cited}", 100, 20)
+        doc_id = next(doc_id for doc_id in answers if str(doc_id) in context)
+        return GenerationResult(answers[doc_id], 100, 20)
+
+    mock_generator = Mock()
+    mock_generator.model = "gpt-4o-mini"
+    mock_generator.generate_with_usage = AsyncMock(side_effect=generate_with_usage)
+
+    pipeline = RAGPipeline(
+        mock_supabase, mock_embeddings, mock_generator, vector_store=vector_store, tenant_id=uuid4()
+    )
+    return pipeline, mock_generator
+
+
+@pytest.mark.asyncio
+async def test_pipeline_map_reduce_streams_documents() -> None:
+    """Test each document is answered separately and the answers are combined."""
+    doc_a, doc_b, doc_c = uuid4(), uuid4(), uuid4()
+    documents = [(doc_a, "A.pdf"), (doc_b, "B.pdf"), (doc_c, "C.pdf")]
+    answers = {
+        doc_a: f"Co-tenancy applies [DOC:{doc_a}:PAGE:1]",
+        doc_b: NOT_RELEVANT,
+        doc_c: f"Co-tenancy applies [DOC:{doc_c}:PAGE:1]",
+    }
+    pipeline, mock_generator = _map_reduce_pipeline(documents, answers)
+    request = AskRequest(question="Which leases have co-tenancy?", mode="map_reduce")
+
+    with patch("src.rag.pipeline.build_context", side_effect=lambda chunks, max_tokens: str(chunks[0].document_id)):
+        events = [event async for event in pipeline.ask_stream(request)]
+
+    partials = {data["document_id"]: data for name, data in events if name == "document"}
+    assert set(partials) == {str(doc_a), str(doc_b), str(doc_c)}
+    assert partials[str(doc_b)]["relevant"] is False
+    assert partials[str(doc_a)]["document_name"] == "A.pdf"
+
+    name, final = events[-1]
+    assert name == "done"
+    response = AskResponse(**final)
+    assert response.answer.startswith("Combined")
+    assert {c.document_name for c in response.citations} == {"A.pdf", "C.pdf"}
+    assert response.chunks_used == 2
+    assert response.usage is not None
+    assert response.usage.documents_answered == 2
+    assert response.usage.prompt_tokens == 400  # three map calls and the reduce
+    templates = [call.kwargs["system_template"] for call in mock_generator.generate_with_usage.await_args_list]
+    assert templates.count(MAP_SYSTEM_PROMPT) == 3
+    assert templates[-1] == REDUCE_SYSTEM_PROMPT
+
+
+@pytest.mark.asyncio
+async def test_pipeline_map_reduce_budget_skips_documents() -> None:
+    """Test documents beyond the token budget are skipped and reported."""
+    documents = [(uuid4(), f"{i}.pdf") for i in range(3)]
+    answers = {doc_id: f"Yes [DOC:{doc_id}:PAGE:1]" for doc_id, _ in documents}
+    pipeline, mock_generator = _map_reduce_pipeline(documents, answers)
+    # Reduce reservation (250 + 3*300, 800) plus one map call (~260, 300)
+    request = AskRequest(question="Which leases have co-tenancy?", mode="map_reduce", token_budget=2600)
+
+    with patch("src.rag.pipeline.build_context", side_effect=lambda chunks, max_tokens: str(chunks[0].document_id)):
+        response = await pipeline.ask(request)
+
+    assert response.usage is not None
+    assert response.usage.documents_skipped == 2
+    assert response.usage.documents_answered == 1
+    # A single finding is returned as-is, without a reduce call
+    assert mock_generator.generate_with_usage.await_count == 1
+    assert response.answer == answers[documents[0][0]]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_map_reduce_falls_back_when_reduce_fails() -> None:
+    """Test a failed reduce call lists the cited per-document answers."""
+    documents = [(uuid4(), "A.pdf"), (uuid4(), "B.pdf")]
+    answers = {doc_id: f"Yes [DOC:{doc_id}:PAGE:1]" for doc_id, _ in documents}
+    pipeline, mock_generator = _map_reduce_pipeline(documents, answers)
+    map_side_effect = mock_generator.generate_with_usage.side_effect
+
+    async def failing_reduce(question: str, context: str, **kwargs: Any) -> GenerationResult:
+        if kwargs["system_template"] == REDUCE_SYSTEM_PROMPT:
+            raise RuntimeError("LLM unavailable")
+        result: GenerationResult = await map_side_effect(question, context, **kwargs)
+        return result
+
+    mock_generator.generate_with_usage.side_effect = failing_reduce
+
+    with patch("src.rag.pipeline.build_context", side_effect=lambda chunks, max_tokens: str(chunks[0].document_id)):
+        response = await pipeline.ask(AskRequest(question="Co-tenancy?", mode="map_reduce"))
+
+    assert response.answer.splitlines() == [
+        f"- A.pdf: {answers[documents[0][0]]}",
+        f"- B.pdf: {answers[documents[1][0]]}",
+    ]
+    assert len(response.citations) == 2
+    assert response.usage is not None
+    assert response.usage.prompt_tokens == 200
@@ -0,0 +1,84 @@
+"""Tests for the columnar rent analytics engine."""
+import numpy as np
+import pytest
+from typing import Any, Dict
+
+from src.services.rent_analytics import (
+    NO_GROUP,
+    RentColumns,
+    herfindahl_index,
+    percentiles,
+    portfolio_shares,
+    property_totals,
+    rent_per_sf_annual,
+    tenant_totals,
+    top_n_share,
+)
+
+
+def _fact(tenant_name: str, effective_monthly_rent: float, **columns: Any) -> Dict[str, Any]:
+    """rent_facts row with the columns read by RentColumns."""
+    return {"tenant_name": tenant_name, "effective_monthly_rent": effective_monthly_rent, **columns}
+
+
+@pytest.fixture
+def columns() -> RentColumns:
+    """Four leases: Acme holds two, one lease has no property or square footage."""
+    return RentColumns.from_facts([
+        _fact("Acme", 2000, property_name="Plaza", square_footage=1000,
+              field_confidence_sum=1.8, field_confidence_count=2),
+        _fact("Beta", 5000, property_name="Tower", square_footage=2500),
+        _fact("Acme", 2000, property_name="Tower", square_footage=500,
+              field_confidence_sum=0.7, field_confidence_count=1),
+        _fact("Gamma", 1000),
+    ])
+
+
+def test_columns_are_ordered_by_rent(columns: RentColumns) -> None:
+    """Rows are highest rent first; ties keep input order."""
+    assert columns.effective_monthly_rent.tolist() == [5000.0, 2000.0, 2000.0, 1000.0]
+    assert columns.square_footage.tolist() == [2500.0, 1000.0, 500.0, 0.0]
+    assert [columns.tenant_names[code] for code in columns.tenant_codes] == ["Beta", "Acme", "Acme", "Gamma"]
+    assert columns.property_names == ["Plaza", "Tower"]
+    assert columns.property_codes.tolist() == [1, 0, 1, NO_GROUP]
+    assert columns.average_confidence == pytest.approx(2.5 / 3)
+
+
+def test_group_totals(columns: RentColumns) -> None:
+    """Group-bys pool leases per property and per tenant name."""
+    properties = property_totals(columns)
+    assert properties.lease_count.tolist() == [1, 2]
+    assert properties.monthly_rent.tolist() == [2000.0, 7000.0]
+    assert properties.square_footage.tolist() == [1000.0, 3000.0]
+
+    tenants = tenant_totals(columns)
+    assert tenants.monthly_rent.tolist() == [4000.0, 5000.0, 1000.0]
+
+
+def test_concentration(columns: RentColumns) -> None:
+    """Top-N shares are per lease, HHI is per tenant name."""
+    shares, cumulative = portfolio_shares(columns)
+    assert shares.tolist() == pytest.approx([50.0, 20.0, 20.0, 10.0])
+    assert cumulative[-1] == pytest.approx(100.0)
+    assert top_n_share(columns, 1) == pytest.approx(50.0)
+    assert top_n_share(columns, 10) == pytest.approx(100.0)
+    assert herfindahl_index(columns) == pytest.approx(50.0 ** 2 + 40.0 ** 2 + 10.0 ** 2)
+
+
+def test_rent_per_sf_distribution(columns: RentColumns) -> None:
+    """Leases without square footage are left out of the distribution."""
+    rows, per_sf = rent_per_sf_annual(columns)
+    assert rows.tolist() == [0, 1, 2]
+    assert per_sf.tolist() == pytest.approx([24.0, 24.0, 48.0])
+    assert percentiles(per_sf)["p50"] == pytest.approx(24.0)
+    assert percentiles(np.array([])) == {}
+
+
+def test_empty_portfolio() -> None:
+    """An empty portfolio has no rent and no concentration."""
+    columns = RentColumns.from_facts([])
+
+    assert len(columns) == 0
+    assert top_n_share(columns, 5) == 0.0
+    assert herfindahl_index(columns) == 0.0
+    assert columns.average_confidence == 0.0
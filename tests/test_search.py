@@ -4,15 +4,20 @@ Tests for hybrid search functionality.
 Tests RRF algorithm, search modes, highlighting, and API endpoint.
 """
 
-from typing import Any, Generator
+import asyncio
+import time
+from typing import Any, Dict, Generator, List
 import pytest
-from unittest.mock import Mock, AsyncMock
+from unittest.mock import Mock, AsyncMock, patch
 from uuid import uuid4, UUID
 from pydantic import ValidationError
 
+from src.search.embedding_cache import QueryEmbeddingCache
 from src.search.hybrid import HybridSearchService, SearchResult
-from src.search.highlighter import SearchHighlighter
-from src.search.reranker import SearchReranker
+from src.search.highlighter import SearchHighlighter, compile_query
+from src.search.reranker import SearchReranker, get_search_reranker
+from src.search.result_cache import InMemorySearchCacheStore, SearchResultCache
+from src.search.pagination import SearchPaginator, decode_cursor, encode_cursor, SearchCursor
 from supabase import Client
 
 
@@ -112,6 +117,42 @@ class TestSearchHighlighter:
         assert "rent" in terms
 
 
+    def test_highlight_matches_word_forms(self, highlighter: Any) -> None:
+        """Test that terms match by stem, like the Postgres english config."""
+        content = "The leases were leased under the lease agreement."
+        query = "lease"
+
+        highlights = highlighter.highlight(content, query)
+
+        assert "<mark>leases</mark>" in highlights[0]
+        assert "<mark>leased</mark>" in highlights[0]
+        assert "<mark>lease</mark>" in highlights[0]
+
+    def test_highlight_stem_mode_skips_longer_words(self, highlighter: Any) -> None:
+        """Test that stem mode does not highlight words with a different stem."""
+        highlights = highlighter.highlight("Rental income and base rent.", "rent")
+
+        assert "<mark>rent</mark>" in highlights[0]
+        assert "<mark>Rental</mark>" not in highlights[0]
+
+    def test_highlight_prefix_mode(self) -> None:
+        """Test that prefix mode highlights words starting with the term stem."""
+        highlighter = SearchHighlighter(match_mode="prefix")
+
+        highlights = highlighter.highlight("Rental income and base rent.", "rent")
+
+        assert "<mark>Rental</mark>" in highlights[0]
+        assert "<mark>rent</mark>" in highlights[0]
+
+    def test_compile_query_is_reused(self) -> None:
+        """Test that one pattern is compiled per query and reused."""
+        matcher = compile_query("base rent escalation")
+
+        assert matcher is compile_query("base rent escalation")
+        assert matcher is not None
+        assert len(matcher.find_matches("Base rent escalation applies to rent.")) == 4
+        assert compile_query("the and of") is None
+
 class TestHybridSearchService:
     """Unit tests for HybridSearchService."""
 
@@ -237,12 +278,10 @@ class TestHybridSearchService:
         ]
 
         # Configure mock to return different results for different functions
+        # (separate builders, since both legs execute concurrently)
         def mock_rpc_side_effect(function_name: str, *args: Any, **kwargs: Any) -> Any:
-            if function_name == "match_document_chunks":
-                mock_supabase_client.execute.return_value.data = vector_results
-            elif function_name == "match_document_chunks_keyword":
-                mock_supabase_client.execute.return_value.data = keyword_results
-            return mock_supabase_client
+            data = vector_results if function_name == "match_document_chunks" else keyword_results
+            return Mock(execute=Mock(return_value=Mock(data=data)))
 
         mock_supabase_client.rpc.side_effect = mock_rpc_side_effect
 
@@ -258,6 +297,169 @@ class TestHybridSearchService:
         # The result that appears in both lists should have highest RRF score
         assert results[0].chunk_id == UUID(both_result_id)
 
+    @pytest.mark.asyncio
+    async def test_hybrid_legs_run_concurrently(
+        self, mock_supabase_client: Any, mock_embedding_service: Any
+    ) -> None:
+        """Test hybrid latency approaches the slower leg, not the sum of both."""
+        def slow_rpc(function_name: str, *args: Any, **kwargs: Any) -> Any:
+            def execute() -> Any:
+                time.sleep(0.2)
+                return Mock(data=[])
+            return Mock(execute=Mock(side_effect=execute))
+
+        mock_supabase_client.rpc.side_effect = slow_rpc
+        service = HybridSearchService(
+            supabase_client=mock_supabase_client,
+            embedding_service=mock_embedding_service,
+        )
+
+        start = time.perf_counter()
+        await service.search(query="test query", mode="hybrid", limit=10)
+        elapsed = time.perf_counter() - start
+
+        assert mock_supabase_client.rpc.call_count == 2
+        assert elapsed < 0.35
+
+    @pytest.mark.asyncio
+    async def test_hybrid_degrades_to_keyword_on_semantic_timeout(
+        self, mock_supabase_client: Any, mock_embedding_service: Any
+    ) -> None:
+        """Test that a slow semantic leg falls back to keyword-only results."""
+        keyword_id = uuid4()
+
+        async def slow_embed(text: str) -> list[float]:
+            await asyncio.sleep(1.0)
+            return [0.1] * 1536
+
+        mock_embedding_service.embed_single = AsyncMock(side_effect=slow_embed)
+        mock_supabase_client.rpc.side_effect = lambda name, *a, **kw: Mock(
+            execute=Mock(return_value=Mock(data=[
+                {
+                    "id": str(keyword_id),
+                    "document_id": str(uuid4()),
+                    "content": "Keyword result",
+                    "page_numbers": [1],
+                    "rank": 0.5,
+                }
+            ]))
+        )
+        service = HybridSearchService(
+            supabase_client=mock_supabase_client,
+            embedding_service=mock_embedding_service,
+            vector_timeout=0.05,
+        )
+
+        results = await service.search(query="test query", mode="hybrid", limit=10)
+
+        assert [r.chunk_id for r in results] == [keyword_id]
+        assert results[0].score == pytest.approx(1.0 / 61)
+        called = [c[0][0] for c in mock_supabase_client.rpc.call_args_list]
+        assert called == ["match_document_chunks_keyword"]
+
+    @pytest.mark.asyncio
+    async def test_hybrid_raises_when_both_legs_fail(
+        self, mock_supabase_client: Any, mock_embedding_service: Any
+    ) -> None:
+        """Test that hybrid search raises if neither leg returns results."""
+        mock_embedding_service.embed_single = AsyncMock(side_effect=RuntimeError("embed failed"))
+        mock_supabase_client.rpc.side_effect = RuntimeError("rpc failed")
+        service = HybridSearchService(
+            supabase_client=mock_supabase_client,
+            embedding_service=mock_embedding_service,
+        )
+
+        with pytest.raises(RuntimeError, match="rpc failed"):
+            await service.search(query="test query", mode="hybrid", limit=10)
+
+    @pytest.mark.asyncio
+    async def test_hybrid_database_fusion_single_rpc(
+        self, mock_supabase_client: Any, mock_embedding_service: Any
+    ) -> None:
+        """Test database fusion issues one RPC and returns fused scores."""
+        chunk_id = uuid4()
+        mock_supabase_client.rpc.return_value.execute.return_value.data = [
+            {
+                "id": str(chunk_id),
+                "document_id": str(uuid4()),
+                "content": "Fused content",
+                "page_numbers": [4],
+                "score": 0.0328,
+            }
+        ]
+        service = HybridSearchService(
+            supabase_client=mock_supabase_client,
+            embedding_service=mock_embedding_service,
+            hybrid_fusion="database",
+        )
+
+        results = await service.search(query="base rent", mode="hybrid", limit=5)
+
+        assert [r.chunk_id for r in results] == [chunk_id]
+        assert results[0].score == pytest.approx(0.0328)
+        mock_supabase_client.rpc.assert_called_once()
+        function_name, params = mock_supabase_client.rpc.call_args[0]
+        assert function_name == "match_document_chunks_hybrid"
+        assert params["query_text"] == "base rent"
+        assert params["match_count"] == 5
+        assert params["candidate_count"] == 10
+        assert params["rrf_k"] == 60
+
+    @pytest.mark.asyncio
+    async def test_hybrid_database_fusion_passes_vector_settings(
+        self, mock_supabase_client: Any, mock_embedding_service: Any
+    ) -> None:
+        """Test database fusion forwards ef_search and the exact-path threshold."""
+        mock_supabase_client.rpc.return_value.execute.return_value.data = []
+        service = HybridSearchService(
+            supabase_client=mock_supabase_client,
+            embedding_service=mock_embedding_service,
+            hybrid_fusion="database",
+            ef_search=200,
+            exact_search_max_chunks=500,
+        )
+
+        await service.search(query="base rent", mode="hybrid", limit=5, filter_document_ids=[uuid4()])
+
+        function_name, params = mock_supabase_client.rpc.call_args[0]
+        assert function_name == "match_document_chunks_hybrid"
+        assert params["ef_search"] == 200
+        assert params["exact_max_chunks"] == 500
+
+    @pytest.mark.asyncio
+    async def test_hybrid_database_fusion_compact_index_fuses_in_application(
+        self, mock_supabase_client: Any, mock_embedding_service: Any
+    ) -> None:
+        """Test the compact index keeps its re-scoring (no database fusion)."""
+        mock_supabase_client.rpc.return_value.execute.return_value.data = []
+        service = HybridSearchService(
+            supabase_client=mock_supabase_client,
+            embedding_service=mock_embedding_service,
+            hybrid_fusion="database",
+            vector_index="compact",
+        )
+
+        await service.search(query="base rent", mode="hybrid", limit=5)
+
+        called = sorted(c[0][0] for c in mock_supabase_client.rpc.call_args_list)
+        assert called == ["match_document_chunks_compact", "match_document_chunks_keyword"]
+
+    @pytest.mark.asyncio
+    async def test_hybrid_database_fusion_degrades_without_embedding(
+        self, mock_supabase_client: Any, mock_embedding_service: Any
+    ) -> None:
+        """Test database fusion falls back to keyword-only if embedding fails."""
+        mock_embedding_service.embed_single = AsyncMock(side_effect=RuntimeError("embed failed"))
+        service = HybridSearchService(
+            supabase_client=mock_supabase_client,
+            embedding_service=mock_embedding_service,
+            hybrid_fusion="database",
+        )
+
+        await service.search(query="base rent", mode="hybrid", limit=5)
+
+        assert mock_supabase_client.rpc.call_args[0][0] == "match_document_chunks_keyword"
+
     @pytest.mark.asyncio
     async def test_search_with_document_filter(self, hybrid_service: Any, mock_supabase_client: Any) -> None:
         """Test search with document ID filter."""
@@ -285,6 +487,314 @@ class TestHybridSearchService:
         call_args = mock_supabase_client.rpc.call_args
         assert call_args[0][1]["filter_document_ids"] == [str(doc_id)]
 
+    @pytest.mark.asyncio
+    async def test_search_compact_index_rescores(
+        self, mock_supabase_client: Any, mock_embedding_service: Any
+    ) -> None:
+        """Test compact vector index uses the halfvec RPC with a re-score pool."""
+        service = HybridSearchService(
+            supabase_client=mock_supabase_client,
+            embedding_service=mock_embedding_service,
+            vector_index="compact",
+            rescore_factor=4,
+        )
+        mock_supabase_client.rpc.return_value.execute.return_value.data = [
+            {
+                "id": str(uuid4()),
+                "document_id": str(uuid4()),
+                "content": "Compact content",
+                "page_numbers": [1],
+                "similarity": 0.91,
+            }
+        ]
+
+        results = await service.search(query="test query", mode="semantic", limit=10)
+
+        assert len(results) == 1
+        call_args = mock_supabase_client.rpc.call_args
+        assert call_args[0][0] == "match_document_chunks_compact"
+        assert call_args[0][1]["rescore_count"] == 40
+
+    @pytest.mark.asyncio
+    async def test_search_compact_index_without_rescore(
+        self, mock_supabase_client: Any, mock_embedding_service: Any
+    ) -> None:
+        """Test rescore_factor of 1 disables full-precision re-scoring."""
+        service = HybridSearchService(
+            supabase_client=mock_supabase_client,
+            embedding_service=mock_embedding_service,
+            vector_index="compact",
+            rescore_factor=1,
+        )
+
+        await service.search(query="test query", mode="semantic", limit=10)
+
+        assert mock_supabase_client.rpc.call_args[0][1]["rescore_count"] == 0
+
+    @pytest.mark.asyncio
+    async def test_search_passes_ef_search(
+        self, mock_supabase_client: Any, mock_embedding_service: Any
+    ) -> None:
+        """Test ef_search is sent with unfiltered vector searches."""
+        service = HybridSearchService(
+            supabase_client=mock_supabase_client,
+            embedding_service=mock_embedding_service,
+            ef_search=200,
+        )
+
+        await service.search(query="test query", mode="semantic", limit=10)
+
+        params = mock_supabase_client.rpc.call_args[0][1]
+        assert params["ef_search"] == 200
+        assert "exact_max_chunks" not in params
+
+    @pytest.mark.asyncio
+    async def test_filtered_search_sends_exact_threshold(
+        self, mock_supabase_client: Any, mock_embedding_service: Any
+    ) -> None:
+        """Test filtered vector searches carry the exact-search threshold."""
+        service = HybridSearchService(
+            supabase_client=mock_supabase_client,
+            embedding_service=mock_embedding_service,
+            exact_search_max_chunks=250,
+        )
+
+        await service.search(query="test query", mode="semantic", limit=10, filter_document_ids=[uuid4()])
+
+        params = mock_supabase_client.rpc.call_args[0][1]
+        assert params["exact_max_chunks"] == 250
+        assert "ef_search" not in params
+
+    @pytest.mark.asyncio
+    async def test_compact_index_ignores_tuning_knobs(
+        self, mock_supabase_client: Any, mock_embedding_service: Any
+    ) -> None:
+        """Test the compact RPC is not sent full-index tuning parameters."""
+        service = HybridSearchService(
+            supabase_client=mock_supabase_client,
+            embedding_service=mock_embedding_service,
+            vector_index="compact",
+            ef_search=200,
+        )
+
+        await service.search(query="test query", mode="semantic", limit=10, filter_document_ids=[uuid4()])
+
+        params = mock_supabase_client.rpc.call_args[0][1]
+        assert "ef_search" not in params
+        assert "exact_max_chunks" not in params
+
+    def test_invalid_ef_search(self, mock_supabase_client: Any, mock_embedding_service: Any) -> None:
+        """Test that ef_search outside pgvector's range raises ValueError."""
+        with pytest.raises(ValueError, match="ef_search"):
+            HybridSearchService(
+                supabase_client=mock_supabase_client,
+                embedding_service=mock_embedding_service,
+                ef_search=5000,
+            )
+
+    def test_invalid_vector_index(self, mock_supabase_client: Any, mock_embedding_service: Any) -> None:
+        """Test that an unknown vector index raises ValueError."""
+        with pytest.raises(ValueError, match="Invalid vector index"):
+            HybridSearchService(
+                supabase_client=mock_supabase_client,
+                embedding_service=mock_embedding_service,
+                vector_index="binary",  # type: ignore[arg-type]
+            )
+
+    @pytest.mark.asyncio
+    async def test_search_fuzzy_mode(self, mock_supabase_client: Any, mock_embedding_service: Any) -> None:
+        """Test fuzzy mode calls the trigram/prefix function with the threshold."""
+        mock_supabase_client.rpc.return_value.execute.return_value.data = [
+            {
+                "id": str(uuid4()),
+                "document_id": str(uuid4()),
+                "content": "Tenant: Starbucks Corporation",
+                "page_numbers": [1],
+                "rank": 0.83,
+            }
+        ]
+        service = HybridSearchService(
+            supabase_client=mock_supabase_client,
+            embedding_service=mock_embedding_service,
+            fuzzy_threshold=0.4,
+        )
+
+        results = await service.search(query="Starb", mode="fuzzy", limit=5)
+
+        assert results[0].score == 0.83
+        name, params = mock_supabase_client.rpc.call_args[0]
+        assert name == "match_document_chunks_fuzzy"
+        assert params["similarity_threshold"] == 0.4
+        assert params["match_count"] == 5
+
+    @pytest.mark.asyncio
+    async def test_hybrid_fuses_fuzzy_leg(
+        self, mock_supabase_client: Any, mock_embedding_service: Any
+    ) -> None:
+        """Test that the fuzzy leg is fused as a third ranking."""
+        fuzzy_only = str(uuid4())
+        shared = str(uuid4())
+
+        def rows(*ids: str) -> List[dict]:
+            return [
+                {"id": i, "document_id": str(uuid4()), "content": "c", "page_numbers": [1],
+                 "similarity": 0.5, "rank": 0.5}
+                for i in ids
+            ]
+
+        data = {
+            "match_document_chunks": rows(str(uuid4()), shared),
+            "match_document_chunks_keyword": rows(),
+            "match_document_chunks_fuzzy": rows(shared, fuzzy_only),
+        }
+        mock_supabase_client.rpc.side_effect = lambda name, *a, **kw: Mock(
+            execute=Mock(return_value=Mock(data=data[name]))
+        )
+        service = HybridSearchService(
+            supabase_client=mock_supabase_client,
+            embedding_service=mock_embedding_service,
+            hybrid_fusion="database",
+            fuzzy_keyword=True,
+        )
+
+        results = await service.search(query="Starb", mode="hybrid", limit=10)
+
+        # Application fusion (the database function fuses two legs only)
+        called = sorted(c[0][0] for c in mock_supabase_client.rpc.call_args_list)
+        assert called == [
+            "match_document_chunks",
+            "match_document_chunks_fuzzy",
+            "match_document_chunks_keyword",
+        ]
+        assert results[0].chunk_id == UUID(shared)
+        assert UUID(fuzzy_only) in [r.chunk_id for r in results]
+
+    @pytest.mark.asyncio
+    async def test_hybrid_fuzzy_leg_failure_degrades(
+        self, mock_supabase_client: Any, mock_embedding_service: Any
+    ) -> None:
+        """Test that a failing fuzzy leg leaves the other two legs' results."""
+        keyword_id = uuid4()
+
+        def rpc(name: str, *args: Any, **kwargs: Any) -> Any:
+            if name == "match_document_chunks_fuzzy":
+                raise RuntimeError("pg_trgm missing")
+            data = [] if name == "match_document_chunks" else [
+                {"id": str(keyword_id), "document_id": str(uuid4()), "content": "c",
+                 "page_numbers": [1], "rank": 0.5}
+            ]
+            return Mock(execute=Mock(return_value=Mock(data=data)))
+
+        mock_supabase_client.rpc.side_effect = rpc
+        service = HybridSearchService(
+            supabase_client=mock_supabase_client,
+            embedding_service=mock_embedding_service,
+            fuzzy_keyword=True,
+        )
+
+        results = await service.search(query="rent", mode="hybrid", limit=10)
+
+        assert [r.chunk_id for r in results] == [keyword_id]
+
+    @pytest.mark.asyncio
+    async def test_search_many_embeds_once(
+        self, mock_supabase_client: Any, mock_embedding_service: Any
+    ) -> None:
+        """Test that a batch embeds all queries in one call and returns per-query results."""
+        mock_embedding_service.embed = AsyncMock(side_effect=lambda texts: [[0.1] * 1536 for _ in texts])
+
+        def rpc(name: str, params: dict, *args: Any, **kwargs: Any) -> Any:
+            content = params.get("query_text", "vector")
+            return Mock(execute=Mock(return_value=Mock(data=[
+                {"id": str(uuid4()), "document_id": str(uuid4()), "content": content,
+                 "page_numbers": [1], "similarity": 0.9, "rank": 0.5}
+            ])))
+
+        mock_supabase_client.rpc.side_effect = rpc
+        service = HybridSearchService(
+            supabase_client=mock_supabase_client,
+            embedding_service=mock_embedding_service,
+            query_cache=QueryEmbeddingCache(),
+        )
+
+        outcomes = await service.search_many(["base rent", "cam cap", "base rent"], mode="hybrid", limit=5)
+
+        mock_embedding_service.embed.assert_called_once_with(["base rent", "cam cap"])
+        mock_embedding_service.embed_single.assert_not_called()
+        assert [o.query for o in outcomes] == ["base rent", "cam cap", "base rent"]
+        assert all(o.error is None and len(o.results) == 2 for o in outcomes)
+        assert {r.content for r in outcomes[1].results} == {"vector", "cam cap"}
+        # Duplicate queries are searched once (2 legs x 2 distinct queries)
+        assert mock_supabase_client.rpc.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_search_many_shared_deadline(
+        self, mock_supabase_client: Any, mock_embedding_service: Any
+    ) -> None:
+        """Test that queries missing the batch deadline report an error."""
+
+        def rpc(name: str, params: dict, *args: Any, **kwargs: Any) -> Any:
+            if params["query_text"] == "slow":
+                time.sleep(0.3)
+            return Mock(execute=Mock(return_value=Mock(data=[])))
+
+        mock_supabase_client.rpc.side_effect = rpc
+        service = HybridSearchService(
+            supabase_client=mock_supabase_client,
+            embedding_service=mock_embedding_service,
+        )
+
+        outcomes = await service.search_many(["fast", "slow"], mode="keyword", timeout=0.1)
+
+        assert outcomes[0].error is None
+        assert outcomes[1].error == "Search timed out"
+        mock_embedding_service.embed.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_search_many_embedding_failure_degrades(
+        self, mock_supabase_client: Any, mock_embedding_service: Any
+    ) -> None:
+        """Test that hybrid batches fall back to keyword-only when embedding fails."""
+        mock_embedding_service.embed = AsyncMock(side_effect=RuntimeError("api down"))
+        keyword_id = uuid4()
+        mock_supabase_client.rpc.side_effect = lambda name, *a, **kw: Mock(
+            execute=Mock(return_value=Mock(data=[
+                {"id": str(keyword_id), "document_id": str(uuid4()), "content": "c",
+                 "page_numbers": [1], "rank": 0.5}
+            ]))
+        )
+        service = HybridSearchService(
+            supabase_client=mock_supabase_client,
+            embedding_service=mock_embedding_service,
+            query_cache=QueryEmbeddingCache(),
+        )
+
+        hybrid = await service.search_many(["rent", "cam"], mode="hybrid")
+        semantic = await service.search_many(["rent"], mode="semantic")
+
+        assert [o.results[0].chunk_id for o in hybrid] == [keyword_id, keyword_id]
+        assert {c[0][0] for c in mock_supabase_client.rpc.call_args_list} == {"match_document_chunks_keyword"}
+        mock_embedding_service.embed_single.assert_not_called()
+        assert semantic[0].error == "Search failed"
+
+    @pytest.mark.asyncio
+    async def test_search_many_rejects_empty_batch(self, hybrid_service: Any) -> None:
+        """Test that empty batches and blank queries raise ValueError."""
+        with pytest.raises(ValueError, match="non-empty list"):
+            await hybrid_service.search_many([])
+
+        with pytest.raises(ValueError, match="non-empty string"):
+            await hybrid_service.search_many(["rent", " "])
+
+    def test_invalid_fuzzy_threshold(self, mock_supabase_client: Any, mock_embedding_service: Any) -> None:
+        """Test that a similarity threshold outside 0-1 raises ValueError."""
+        with pytest.raises(ValueError, match="Invalid fuzzy threshold"):
+            HybridSearchService(
+                supabase_client=mock_supabase_client,
+                embedding_service=mock_embedding_service,
+                fuzzy_threshold=1.5,
+            )
+
     @pytest.mark.asyncio
     async def test_search_invalid_query(self, hybrid_service: Any) -> None:
         """Test that empty query raises ValueError."""
@@ -370,6 +880,310 @@ class TestHybridSearchService:
         assert len(result) == 1
 
 
+class TestSearchResultCache:
+    """Unit tests for the tenant-versioned search result cache."""
+
+    @pytest.fixture
+    def mock_supabase_client(self) -> Any:
+        """Create a mock Supabase client returning one keyword result."""
+        client = Mock(spec=Client)
+        chunk_id = str(uuid4())
+        client.rpc = Mock(
+            side_effect=lambda name, *a, **kw: Mock(
+                execute=Mock(return_value=Mock(data=[
+                    {
+                        "id": chunk_id,
+                        "document_id": str(uuid4()),
+                        "content": "Base rent escalates annually",
+                        "page_numbers": [1],
+                        "rank": 0.5,
+                    }
+                ]))
+            )
+        )
+        return client
+
+    @staticmethod
+    def _cache(versions: Dict[str, int], version_ttl: float = 0) -> SearchResultCache:
+        """Create an in-memory cache reading corpus versions from `versions` (search_corpus_versions rows)."""
+        client = Mock()
+
+        def eq(column: str, tenant_id: str) -> Mock:
+            data = [{"version": versions[tenant_id]}] if tenant_id in versions else []
+            return Mock(limit=Mock(return_value=Mock(execute=Mock(return_value=Mock(data=data)))))
+
+        client.table.return_value.select.return_value.eq.side_effect = eq
+        return SearchResultCache(InMemorySearchCacheStore(client), version_ttl=version_ttl)
+
+    def _service(self, client: Any, tenant_id: UUID, cache: SearchResultCache) -> HybridSearchService:
+        """Create HybridSearchService with a result cache."""
+        embedding_service = AsyncMock()
+        embedding_service.embed_single = AsyncMock(return_value=[0.1] * 1536)
+        return HybridSearchService(
+            supabase_client=client,
+            embedding_service=embedding_service,
+            tenant_id=tenant_id,
+            result_cache=cache,
+        )
+
+    @pytest.mark.asyncio
+    async def test_repeat_search_served_from_cache(self, mock_supabase_client: Any) -> None:
+        """Test that a repeated search does not hit the database."""
+        cache = self._cache({})
+        service = self._service(mock_supabase_client, uuid4(), cache)
+
+        first = await service.search(query="base rent", mode="keyword", limit=5)
+        second = await service.search(query="Base  Rent", mode="keyword", limit=5)
+
+        assert second == first
+        assert mock_supabase_client.rpc.call_count == 1
+        assert cache.stats() == {"hits": 1, "misses": 1}
+
+    @pytest.mark.asyncio
+    async def test_key_includes_mode_limit_and_filters(self, mock_supabase_client: Any) -> None:
+        """Test that different search parameters do not share entries."""
+        service = self._service(mock_supabase_client, uuid4(), self._cache({}))
+
+        await service.search(query="base rent", mode="keyword", limit=5)
+        await service.search(query="base rent", mode="keyword", limit=10)
+        await service.search(query="base rent", mode="keyword", limit=5, filter_document_ids=[uuid4()])
+
+        assert mock_supabase_client.rpc.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_tenants_do_not_share_entries(self, mock_supabase_client: Any) -> None:
+        """Test that cache entries are scoped to the tenant."""
+        cache = self._cache({})
+
+        await self._service(mock_supabase_client, uuid4(), cache).search(query="rent", mode="keyword")
+        await self._service(mock_supabase_client, uuid4(), cache).search(query="rent", mode="keyword")
+
+        assert mock_supabase_client.rpc.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_corpus_version_bump_invalidates_tenant(self, mock_supabase_client: Any) -> None:
+        """Test that a bumped corpus version (chunk write trigger) invalidates the tenant."""
+        tenant_id = uuid4()
+        versions = {str(tenant_id): 3}
+        service = self._service(mock_supabase_client, tenant_id, self._cache(versions))
+        await service.search(query="rent", mode="keyword")
+        await service.search(query="rent", mode="keyword")
+
+        versions[str(tenant_id)] = 4
+        await service.search(query="rent", mode="keyword")
+
+        assert mock_supabase_client.rpc.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_no_version_client_disables_caching(self, mock_supabase_client: Any) -> None:
+        """Test that nothing is cached when corpus versions cannot be read."""
+        cache = SearchResultCache()
+        service = self._service(mock_supabase_client, uuid4(), cache)
+
+        await service.search(query="rent", mode="keyword")
+        await service.search(query="rent", mode="keyword")
+
+        assert mock_supabase_client.rpc.call_count == 2
+        assert cache.stats() == {"hits": 0, "misses": 0}
+
+    @pytest.mark.asyncio
+    async def test_corpus_version_reused_within_ttl(self) -> None:
+        """Test that cache hits within the version TTL do not re-read the version."""
+        tenant_id = uuid4()
+        versions = {str(tenant_id): 3}
+        cache = self._cache(versions, version_ttl=60)
+        assert await cache.get_version(tenant_id) == 3
+
+        versions[str(tenant_id)] = 4
+        assert await cache.get_version(tenant_id) == 3
+        assert cache.store.client.table.return_value.select.return_value.eq.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_results_computed_before_write_are_not_served(self) -> None:
+        """Test that results stored under an old version stay unreachable."""
+        tenant_id = uuid4()
+        versions: Dict[str, int] = {}
+        cache = self._cache(versions)
+        version = await cache.get_version(tenant_id)
+        assert version == 0
+
+        versions[str(tenant_id)] = 1  # chunk written while searching
+        await cache.set(tenant_id, version, "rent", "hybrid", 20, [])
+
+        current = await cache.get_version(tenant_id)
+        assert current is not None
+        assert await cache.get(tenant_id, current, "rent", "hybrid", 20) is None
+
+    @pytest.mark.asyncio
+    async def test_degraded_results_not_cached(self, mock_supabase_client: Any) -> None:
+        """Test that single-leg hybrid results are not cached."""
+        service = self._service(mock_supabase_client, uuid4(), self._cache({}))
+        service.embedding_service.embed_single = AsyncMock(side_effect=RuntimeError("embed failed"))
+
+        await service.search(query="rent", mode="hybrid")
+        await service.search(query="rent", mode="hybrid")
+
+        called = [c[0][0] for c in mock_supabase_client.rpc.call_args_list]
+        assert called == ["match_document_chunks_keyword", "match_document_chunks_keyword"]
+
+
+class TestSearchPagination:
+    """Unit tests for cursor pagination over ranking snapshots."""
+
+    @pytest.fixture
+    def ranked_results(self) -> List[SearchResult]:
+        """Create 30 results in descending score order."""
+        return [
+            SearchResult(
+                chunk_id=uuid4(),
+                document_id=uuid4(),
+                content=f"Result {i}",
+                page_numbers=[1],
+                score=1.0 - i * 0.01,
+            )
+            for i in range(30)
+        ]
+
+    @pytest.fixture
+    def service(self, ranked_results: List[SearchResult]) -> Any:
+        """Create a mock search service over ranked_results."""
+        service = Mock()
+        service.search = AsyncMock(
+            side_effect=lambda query, mode, limit, filter_document_ids: ranked_results[:limit]
+        )
+        service.fuzzy_keyword = False
+        return service
+
+    @pytest.mark.asyncio
+    async def test_pages_served_from_snapshot(self, service: Any, ranked_results: List[SearchResult]) -> None:
+        """Test that later pages slice the first page's snapshot."""
+        paginator = SearchPaginator(snapshot_pages=5)
+        tenant_id = uuid4()
+
+        first = await paginator.search_page(service, tenant_id, "rent", limit=10)
+        second = await paginator.search_page(service, tenant_id, "rent", limit=10, cursor=first.next_cursor)
+        third = await paginator.search_page(service, tenant_id, "rent", limit=10, cursor=second.next_cursor)
+
+        assert first.results + second.results + third.results == ranked_results
+        assert third.next_cursor is None
+        service.search.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_short_snapshot_is_extended(self, service: Any, ranked_results: List[SearchResult]) -> None:
+        """Test that paging past the snapshot re-runs the search once."""
+        paginator = SearchPaginator(snapshot_pages=1)
+        tenant_id = uuid4()
+
+        first = await paginator.search_page(service, tenant_id, "rent", limit=10)
+        second = await paginator.search_page(service, tenant_id, "rent", limit=10, cursor=first.next_cursor)
+
+        assert second.results == ranked_results[10:20]
+        assert service.search.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_first_page_fetches_one_extra_result(self, service: Any) -> None:
+        """Test that the first page only fetches limit + 1 results and deep pages re-search rarely."""
+        paginator = SearchPaginator()
+        tenant_id = uuid4()
+
+        page = await paginator.search_page(service, tenant_id, "rent", limit=3)
+        assert service.search.call_args.kwargs["limit"] == 4
+
+        pages = 1
+        while page.next_cursor is not None:
+            page = await paginator.search_page(service, tenant_id, "rent", limit=3, cursor=page.next_cursor)
+            pages += 1
+
+        assert pages == 10
+        assert [call.kwargs["limit"] for call in service.search.call_args_list] == [4, 7, 13, 25, 49]
+
+    @pytest.mark.asyncio
+    async def test_expired_snapshot_seeks_past_cursor_key(
+        self, service: Any, ranked_results: List[SearchResult]
+    ) -> None:
+        """Test that a cursor still works when its snapshot is gone."""
+        tenant_id = uuid4()
+        first = await SearchPaginator().search_page(service, tenant_id, "rent", limit=10)
+
+        # New paginator: snapshot not found (expired or another process)
+        second = await SearchPaginator().search_page(
+            service, tenant_id, "rent", limit=10, cursor=first.next_cursor
+        )
+
+        assert second.results == ranked_results[10:20]
+
+    @pytest.mark.asyncio
+    async def test_cursor_bound_to_search(self, service: Any) -> None:
+        """Test that a cursor cannot be reused for a different query."""
+        paginator = SearchPaginator()
+        tenant_id = uuid4()
+        first = await paginator.search_page(service, tenant_id, "rent", limit=10)
+
+        with pytest.raises(ValueError, match="does not match"):
+            await paginator.search_page(service, tenant_id, "deposit", limit=10, cursor=first.next_cursor)
+
+    @pytest.mark.asyncio
+    async def test_cursor_bound_to_page_size_and_ranking(self, service: Any) -> None:
+        """Test that a cursor cannot be reused with a different limit, fuzzy or rerank setting."""
+        paginator = SearchPaginator()
+        tenant_id = uuid4()
+        first = await paginator.search_page(service, tenant_id, "rent", limit=10)
+
+        with pytest.raises(ValueError, match="does not match"):
+            await paginator.search_page(service, tenant_id, "rent", limit=5, cursor=first.next_cursor)
+        with pytest.raises(ValueError, match="does not match"):
+            await paginator.search_page(service, tenant_id, "rent", limit=10, cursor=first.next_cursor, rerank=True)
+
+        service.fuzzy_keyword = True
+        with pytest.raises(ValueError, match="does not match"):
+            await paginator.search_page(service, tenant_id, "rent", limit=10, cursor=first.next_cursor)
+
+    def test_cursor_round_trip(self) -> None:
+        """Test cursor encoding and rejection of malformed tokens."""
+        cursor = SearchCursor(
+            snapshot_id="abc",
+            offset=20,
+            request_hash="f00d",
+            last_score=0.5,
+            last_chunk_id=str(uuid4()),
+        )
+
+        assert decode_cursor(encode_cursor(cursor)) == cursor
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+
+class TestSearchStreaming:
+    """Unit tests for NDJSON search streaming."""
+
+    @pytest.mark.asyncio
+    async def test_stream_emits_results_rerank_and_done(self) -> None:
+        """Test that results stream before the reranked order and final line."""
+        import json
+        from src.api.routes.search import SearchRequest, _stream_results
+
+        results = [
+            SearchResult(chunk_id=uuid4(), document_id=uuid4(), content=f"Base rent {i}", page_numbers=[1], score=0.5)
+            for i in range(3)
+        ]
+        reranker = Mock()
+        reranker.is_available.return_value = True
+        reranker.rerank_async = AsyncMock(return_value=list(reversed(results)))
+        request = SearchRequest(query="base rent", enable_reranking=True, stream=True)
+
+        with patch("src.api.routes.search.get_search_reranker", return_value=reranker):
+            lines = [
+                json.loads(line)
+                async for line in _stream_results(request, results, {}, SearchHighlighter(), "next")
+            ]
+
+        assert [line["type"] for line in lines] == ["result", "result", "result", "reranked", "done"]
+        assert lines[0]["result"]["chunk_id"] == str(results[0].chunk_id)
+        assert lines[3]["results"][0]["chunk_id"] == str(results[2].chunk_id)
+        assert lines[4]["next_cursor"] == "next"
+        assert "<mark>" in lines[0]["result"]["highlights"][0]
+
+
 class TestSearchReranker:
     """Unit tests for SearchReranker."""
 
@@ -416,6 +1230,104 @@ class TestSearchReranker:
         assert len(reranked) == 0
 
 
+    @pytest.fixture
+    def scored_reranker(self) -> SearchReranker:
+        """Create a reranker with a fake cross-encoder scoring by content length."""
+        reranker = SearchReranker(max_latency_ms=10)
+        reranker.model = Mock()
+        reranker.model.predict = Mock(
+            side_effect=lambda pairs, batch_size: [float(len(doc)) for _, doc in pairs]
+        )
+        return reranker
+
+    def _results(self, *contents: str) -> List[SearchResult]:
+        """Build search results with the given contents."""
+        return [
+            SearchResult(
+                chunk_id=uuid4(),
+                document_id=uuid4(),
+                content=content,
+                page_numbers=[1],
+                score=0.5,
+            )
+            for content in contents
+        ]
+
+    @pytest.mark.asyncio
+    async def test_rerank_async_sorts_by_model_score(self, scored_reranker: SearchReranker) -> None:
+        """Test that async reranking orders results by cross-encoder score."""
+        results = self._results("a", "abc", "ab")
+
+        reranked = await scored_reranker.rerank_async("query", results)
+
+        assert [r.content for r in reranked] == ["abc", "ab", "a"]
+        assert reranked[0].score == 3.0
+        scored_reranker.close()
+
+    @pytest.mark.asyncio
+    async def test_rerank_async_batches_concurrent_requests(self, scored_reranker: SearchReranker) -> None:
+        """Test that concurrent requests are scored in one model call."""
+        await asyncio.gather(
+            scored_reranker.rerank_async("first", self._results("a", "ab")),
+            scored_reranker.rerank_async("second", self._results("abc", "abcd", "abcde")),
+        )
+
+        scored_reranker.model.predict.assert_called_once()
+        pairs = scored_reranker.model.predict.call_args.args[0]
+        assert len(pairs) == 5
+        scored_reranker.close()
+
+    @pytest.mark.asyncio
+    async def test_rerank_async_flushes_full_batch(self, scored_reranker: SearchReranker) -> None:
+        """Test that a full batch is scored without waiting for max latency."""
+        scored_reranker.max_batch_size = 2
+        scored_reranker.max_latency_ms = 10_000
+
+        reranked = await asyncio.wait_for(
+            scored_reranker.rerank_async("query", self._results("a", "ab")),
+            timeout=1.0,
+        )
+
+        assert len(reranked) == 2
+        scored_reranker.close()
+
+    @pytest.mark.asyncio
+    async def test_rerank_async_uses_score_cache(self, scored_reranker: SearchReranker) -> None:
+        """Test that (query, chunk_id) scores are reused across requests."""
+        results = self._results("a", "ab")
+
+        await scored_reranker.rerank_async("query", results)
+        await scored_reranker.rerank_async("query", results)
+        await scored_reranker.rerank_async("other query", results)
+
+        assert scored_reranker.model.predict.call_count == 2
+        scored_reranker.close()
+
+    @pytest.mark.asyncio
+    async def test_rerank_async_failure_returns_original(self, scored_reranker: SearchReranker) -> None:
+        """Test that scoring failures fall back to the original order."""
+        scored_reranker.model.predict.side_effect = RuntimeError("model crashed")
+        results = self._results("a", "ab")
+
+        reranked = await scored_reranker.rerank_async("query", results)
+
+        assert reranked == results
+        scored_reranker.close()
+
+    def test_warmup(self, scored_reranker: SearchReranker) -> None:
+        """Test that warmup runs one prediction when the model is loaded."""
+        assert scored_reranker.warmup() is True
+        scored_reranker.model.predict.assert_called_once()
+
+        scored_reranker.model = None
+        assert scored_reranker.warmup() is False
+
+    def test_get_search_reranker_is_singleton(self) -> None:
+        """Test that the process-wide reranker is constructed once."""
+        with patch("src.search.reranker._reranker", None):
+            assert get_search_reranker() is get_search_reranker()
+
+
 class TestSearchAPI:
     """Integration tests for search API endpoint."""
 
@@ -457,6 +1369,22 @@ class TestSearchAPI:
         with pytest.raises(ValidationError):
             SearchRequest(query="test", mode="hybrid", limit=0)
 
+    def test_batch_search_request_validation(self) -> None:
+        """Test that batch requests bound the number and length of queries."""
+        from src.api.routes.search import BatchSearchRequest
+
+        request = BatchSearchRequest(queries=["base rent", "cam cap"], mode="keyword")
+        assert request.limit == 10
+
+        with pytest.raises(ValidationError):
+            BatchSearchRequest(queries=[])
+
+        with pytest.raises(ValidationError):
+            BatchSearchRequest(queries=["rent"] * 51)
+
+        with pytest.raises(ValidationError):
+            BatchSearchRequest(queries=["rent", ""])
+
 
 class TestSearchPropertyBased:
     """
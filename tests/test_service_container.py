@@ -0,0 +1,131 @@
+"""Tests for the application-lifespan service container."""
+from typing import Any, Iterator
+from unittest.mock import AsyncMock, Mock, patch
+from uuid import uuid4
+
+import pytest
+
+from src.dependencies import get_services
+from src.services import service_container
+from src.services.service_container import (
+    ServiceContainer,
+    get_service_container,
+    shutdown_service_container,
+)
+from src.workers.extraction_worker import ExtractionWorker
+
+
+@pytest.fixture
+def openai_clients() -> Iterator[Mock]:
+    """Patch every AsyncOpenAI constructor; one mock client per call."""
+    factory = Mock(side_effect=lambda **kwargs: Mock(close=AsyncMock()))
+    with patch("src.search.embeddings.AsyncOpenAI", factory), \
+         patch("src.rag.generator.AsyncOpenAI", factory), \
+         patch("src.extraction.extractor.AsyncOpenAI", factory), \
+         patch("src.search.embeddings.OPENAI_API_KEY", "sk-test"), \
+         patch("src.rag.generator.OPENAI_API_KEY", "sk-test"), \
+         patch("src.extraction.extractor.OPENAI_API_KEY", "sk-test"):
+        yield factory
+
+
+@pytest.fixture(autouse=True)
+def reset_container() -> Iterator[None]:
+    service_container._container = None
+    yield
+    service_container._container = None
+
+
+class TestServiceContainer:
+    """Shared OpenAI clients and their lifecycle."""
+
+    def test_services_are_built_once(self, openai_clients: Mock) -> None:
+        services = ServiceContainer()
+
+        assert services.embedding_service is services.embedding_service
+        assert services.generator is services.generator
+        assert services.field_extractor is services.field_extractor
+        assert openai_clients.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_aclose_closes_clients(self, openai_clients: Mock) -> None:
+        services = ServiceContainer()
+        client: Any = services.generator.client
+
+        with patch("src.services.service_container.shutdown_search_reranker") as shutdown_reranker:
+            await services.aclose()
+            await services.aclose()
+
+        client.close.assert_awaited_once()
+        # Shared with the rest of the process; only shutdown_service_container stops it
+        shutdown_reranker.assert_not_called()
+        with pytest.raises(RuntimeError, match="closed"):
+            services.generator
+
+    @pytest.mark.asyncio
+    async def test_warmup_tolerates_missing_api_key(self) -> None:
+        services = ServiceContainer()
+        reranker = Mock()
+
+        with patch("src.search.embeddings.OPENAI_API_KEY", None), \
+             patch("src.rag.generator.OPENAI_API_KEY", None), \
+             patch("src.extraction.extractor.OPENAI_API_KEY", None), \
+             patch("src.services.service_container.get_encoding") as get_encoding, \
+             patch("src.services.service_container.get_search_reranker", return_value=reranker):
+            await services.warmup()
+
+            # Built on first use instead
+            with pytest.raises(ValueError, match="OpenAI API key"):
+                services.embedding_service
+
+        get_encoding.assert_called_once()
+        reranker.warmup.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_warmup_selected_services(self, openai_clients: Mock) -> None:
+        services = ServiceContainer()
+
+        with patch("src.services.service_container.get_encoding") as get_encoding, \
+             patch("src.services.service_container.get_search_reranker") as get_reranker:
+            await services.warmup(["field_extractor"])
+
+            with pytest.raises(ValueError, match="Unknown warmup services: model"):
+                await services.warmup(["model"])
+
+        assert openai_clients.call_count == 1
+        get_encoding.assert_not_called()
+        get_reranker.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_dependency_returns_shared_container(self, openai_clients: Mock) -> None:
+        services = get_services()
+
+        assert get_services() is services is get_service_container()
+
+        with patch("src.services.service_container.shutdown_search_reranker") as shutdown_reranker:
+            await shutdown_service_container()
+
+        shutdown_reranker.assert_called_once()
+        assert get_services() is not services
+
+
+class TestWorkerServices:
+    """The extraction worker reuses one field extractor."""
+
+    @pytest.mark.asyncio
+    async def test_worker_passes_shared_extractor(self, openai_clients: Mock) -> None:
+        services = ServiceContainer()
+        worker = ExtractionWorker(services=services)
+        worker.supabase = Mock()
+        item: Any = {"id": str(uuid4()), "document_id": str(uuid4()), "attempts": 0}
+
+        with patch("src.workers.extraction_worker.ensure_idempotent_processing",
+                   new_callable=AsyncMock, return_value=(True, None)), \
+             patch("src.workers.extraction_worker.process_document", new_callable=AsyncMock,
+                   return_value={"status": "ready"}) as process, \
+             patch.object(worker, "_update_queue_status", new_callable=AsyncMock):
+            await worker._process_queue_item(item)
+            await worker._process_queue_item({**item, "id": str(uuid4())})
+
+        extractors = [call.kwargs["extractor"] for call in process.await_args_list]
+        assert extractors[0] is extractors[1] is services.field_extractor
+        assert openai_clients.call_count == 1
@@ -4,12 +4,27 @@ Tests for vector search functionality.
 Tests embedding generation, document chunk storage, and semantic search.
 """
 
+import asyncio
 import pytest
-from typing import Any, Generator
+from pathlib import Path
+from typing import Any, Generator, List
 from unittest.mock import Mock, AsyncMock, patch
-from uuid import uuid4
+from uuid import UUID, uuid4
 
+import numpy as np
+
+from src.search.embedding_cache import QueryEmbeddingCache, normalize_query
 from src.search.embeddings import EmbeddingService
+from src.search.hybrid import HybridSearchService
+from src.search.local_vector_store import (
+    HNSWLIB_AVAILABLE,
+    HNSWVectorStore,
+    NumpyVectorStore,
+    TenantVectorCache,
+    get_tenant_vector_store,
+    write_tenant_segment,
+)
+from src.rag.retriever import Retriever
 from supabase import Client
 
 
@@ -101,6 +116,33 @@ class TestEmbeddingService:
             # This will fail at validation, not API call
             asyncio.run(embedding_service.embed(["valid text", "", "another text"]))
     
+    @pytest.mark.asyncio
+    async def test_embed_passes_dimensions(self, mock_openai_client: Any) -> None:
+        """Test that reduced dimensions are forwarded to the API."""
+        with patch('src.search.embeddings.AsyncOpenAI', return_value=mock_openai_client):
+            service = EmbeddingService(api_key="test-key", dimensions=512)
+
+        await service.embed(["First document", "Second document"])
+
+        assert service.embedding_dimension == 512
+        assert mock_openai_client.embeddings.create.call_args.kwargs["dimensions"] == 512
+
+    @pytest.mark.asyncio
+    async def test_embed_omits_dimensions_by_default(
+        self, embedding_service: Any, mock_openai_client: Any
+    ) -> None:
+        """Test that full-size embeddings do not send a dimensions parameter."""
+        await embedding_service.embed(["First document", "Second document"])
+
+        assert "dimensions" not in mock_openai_client.embeddings.create.call_args.kwargs
+
+    def test_init_invalid_dimensions(self) -> None:
+        """Test that out-of-range dimensions raise ValueError."""
+        with pytest.raises(ValueError, match="dimensions"):
+            EmbeddingService(api_key="test-key", dimensions=4096)
+        with pytest.raises(ValueError, match="dimensions"):
+            EmbeddingService(api_key="test-key", dimensions=0)
+
     def test_init_missing_api_key(self) -> None:
         """Test that missing API key raises ValueError."""
         with patch.dict('os.environ', {}, clear=True):
@@ -108,6 +150,287 @@ class TestEmbeddingService:
                 EmbeddingService()
 
 
+class TestQueryEmbeddingCache:
+    """Unit tests for QueryEmbeddingCache."""
+
+    @pytest.fixture
+    def embedding_service(self) -> Any:
+        """Create a mock embedding service with a slow embed_single."""
+        service = Mock()
+        service.model = "text-embedding-3-small"
+        service.embedding_dimension = 1536
+
+        async def embed_single(text: str) -> list[float]:
+            await asyncio.sleep(0.01)
+            return [float(len(text))] * 1536
+
+        service.embed_single = AsyncMock(side_effect=embed_single)
+        return service
+
+    def test_normalize_query(self) -> None:
+        """Test whitespace and case normalization."""
+        assert normalize_query("  Base   RENT\tescalation ") == "base rent escalation"
+
+    @pytest.mark.asyncio
+    async def test_repeat_query_hits_cache(self, embedding_service: Any) -> None:
+        """Test that repeated (normalized) queries embed once."""
+        cache = QueryEmbeddingCache()
+
+        first = await cache.get_or_embed(embedding_service, "base rent")
+        second = await cache.get_or_embed(embedding_service, "Base  Rent")
+
+        assert first == second
+        embedding_service.embed_single.assert_called_once()
+        assert cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_single_flight(self, embedding_service: Any) -> None:
+        """Test that concurrent identical queries share one in-flight call."""
+        cache = QueryEmbeddingCache()
+
+        results = await asyncio.gather(
+            *[cache.get_or_embed(embedding_service, "base rent") for _ in range(5)]
+        )
+
+        assert all(r == results[0] for r in results)
+        embedding_service.embed_single.assert_called_once()
+        assert cache.stats()["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_load(self, embedding_service: Any) -> None:
+        """Test that a caller hitting its deadline still lets the load finish."""
+        cache = QueryEmbeddingCache()
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(cache.get_or_embed(embedding_service, "base rent"), timeout=0.001)
+        await asyncio.sleep(0.02)
+
+        await cache.get_or_embed(embedding_service, "base rent")
+        embedding_service.embed_single.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self, embedding_service: Any) -> None:
+        """Test that a failed embedding call is retried on the next request."""
+        cache = QueryEmbeddingCache()
+        embedding_service.embed_single = AsyncMock(side_effect=[RuntimeError("api down"), [0.1] * 1536])
+
+        with pytest.raises(RuntimeError, match="api down"):
+            await cache.get_or_embed(embedding_service, "base rent")
+
+        assert await cache.get_or_embed(embedding_service, "base rent") == [0.1] * 1536
+        assert embedding_service.embed_single.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_keyed_by_model(self, embedding_service: Any) -> None:
+        """Test that different embedding models do not share entries."""
+        cache = QueryEmbeddingCache()
+        other_service = Mock(model="text-embedding-3-large", embedding_dimension=3072)
+        other_service.embed_single = AsyncMock(return_value=[0.2] * 3072)
+
+        await cache.get_or_embed(embedding_service, "base rent")
+        other = await cache.get_or_embed(other_service, "base rent")
+
+        assert len(other) == 3072
+        other_service.embed_single.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_embed_many_uses_one_call_for_misses(self, embedding_service: Any) -> None:
+        """Test that batch lookups embed only distinct uncached queries, together."""
+        cache = QueryEmbeddingCache()
+        embedding_service.embed = AsyncMock(side_effect=lambda texts: [[float(len(t))] * 1536 for t in texts])
+        await cache.get_or_embed(embedding_service, "base rent")
+
+        results = await cache.get_or_embed_many(
+            embedding_service, ["Base Rent", "cam charges", "CAM  charges", "renewal option"]
+        )
+
+        embedding_service.embed.assert_called_once_with(["cam charges", "renewal option"])
+        assert results[0] == [9.0] * 1536
+        assert results[1] == results[2] == [11.0] * 1536
+        assert cache.stats()["hits"] == 1
+        # Later single lookups are served from the cache
+        await cache.get_or_embed(embedding_service, "renewal option")
+        embedding_service.embed_single.assert_called_once()
+
+
+class TestLocalVectorStores:
+    """Tests for the in-process vector store backends."""
+
+    DIMENSION = 8
+
+    @pytest.fixture
+    def tenant_id(self) -> UUID:
+        return uuid4()
+
+    @pytest.fixture
+    def segment(self, tmp_path: Path, tenant_id: UUID) -> Any:
+        """Two documents with four chunks each; chunk i points along axis i."""
+        document_ids = [uuid4(), uuid4()]
+        chunks = [
+            {
+                "id": uuid4(),
+                "document_id": document_ids[i // 4],
+                "content": f"chunk {i}",
+                "page_numbers": [i + 1],
+            }
+            for i in range(8)
+        ]
+        embeddings = np.eye(8, self.DIMENSION, dtype=np.float32) * 3.0  # normalized on write
+        write_tenant_segment(tmp_path, tenant_id, chunks, embeddings, corpus_version=3)
+        return {"root": tmp_path, "chunks": chunks, "document_ids": document_ids}
+
+    def _query(self, *weights: float) -> List[float]:
+        query = [0.0] * self.DIMENSION
+        for axis, weight in enumerate(weights):
+            query[axis] = weight
+        return query
+
+    @pytest.mark.asyncio
+    async def test_numpy_store_ranks_by_cosine(self, segment: Any, tenant_id: UUID) -> None:
+        """Test brute-force search returns exact cosine order."""
+        store = NumpyVectorStore(segment["root"])
+
+        matches = await store.search(tenant_id, self._query(0.2, 1.0, 0.5), 3)
+
+        assert [m.content for m in matches] == ["chunk 1", "chunk 2", "chunk 0"]
+        assert matches[0].similarity == pytest.approx(1.0 / np.sqrt(1.29), abs=1e-3)
+        assert matches[0].page_numbers == [2]
+
+    @pytest.mark.asyncio
+    async def test_numpy_store_document_filter(self, segment: Any, tenant_id: UUID) -> None:
+        """Test document filters restrict matches to those documents."""
+        store = NumpyVectorStore(segment["root"])
+
+        matches = await store.search(
+            tenant_id,
+            self._query(1.0, 0.0, 0.0, 0.0, 0.5),
+            10,
+            [segment["document_ids"][1]],
+        )
+
+        assert len(matches) == 4
+        assert matches[0].content == "chunk 4"
+        assert {m.document_id for m in matches} == {segment["document_ids"][1]}
+
+    @pytest.mark.asyncio
+    async def test_numpy_store_requires_tenant(self, segment: Any) -> None:
+        """Test local stores refuse searches without a tenant."""
+        store = NumpyVectorStore(segment["root"])
+
+        with pytest.raises(ValueError, match="tenant_id"):
+            await store.search(None, self._query(1.0), 3)
+
+    @pytest.mark.asyncio
+    async def test_tenant_without_segment_has_no_local_store(self, segment: Any, tenant_id: UUID) -> None:
+        """Test tenants are only routed locally when a segment exists."""
+        store = NumpyVectorStore(segment["root"])
+        versions = Mock(get_version=AsyncMock(return_value=3))
+
+        with patch("src.search.local_vector_store.get_local_vector_store", return_value=store), \
+                patch("src.search.result_cache.get_search_result_cache", return_value=versions):
+            assert await get_tenant_vector_store(tenant_id) is store
+            assert await get_tenant_vector_store(uuid4()) is None
+
+    @pytest.mark.asyncio
+    async def test_stale_segment_not_served(self, segment: Any, tenant_id: UUID) -> None:
+        """Test a segment is not served after a chunk write, and served again once re-exported."""
+        store = NumpyVectorStore(segment["root"])
+        versions = Mock(get_version=AsyncMock(return_value=4))
+
+        with patch("src.search.local_vector_store.get_local_vector_store", return_value=store), \
+                patch("src.search.result_cache.get_search_result_cache", return_value=versions):
+            assert await get_tenant_vector_store(tenant_id) is None
+
+            embeddings = np.eye(8, self.DIMENSION, dtype=np.float32)
+            write_tenant_segment(segment["root"], tenant_id, segment["chunks"], embeddings, corpus_version=4)
+            assert await get_tenant_vector_store(tenant_id) is store
+
+            versions.get_version.return_value = None
+            assert await get_tenant_vector_store(tenant_id) is None
+
+    def test_cache_evicts_least_recently_used(self) -> None:
+        """Test the tenant cache evicts by size, least recently used first."""
+        cache = TenantVectorCache(max_bytes=250)
+        first, second, third = uuid4(), uuid4(), uuid4()
+
+        cache.get_or_load(first, lambda: ("a", 100))
+        cache.get_or_load(second, lambda: ("b", 100))
+        cache.get_or_load(first, lambda: ("unused", 100))  # first is now most recent
+        cache.get_or_load(third, lambda: ("c", 100))
+
+        loader = Mock(return_value=("b2", 100))
+        assert cache.get_or_load(first, lambda: ("unused", 100)) == "a"
+        assert cache.get_or_load(second, loader) == "b2"
+        loader.assert_called_once()
+        assert cache.stats()["evictions"] == 2
+        assert cache.current_bytes <= 250
+
+    @pytest.mark.asyncio
+    async def test_hybrid_service_uses_vector_store(self, segment: Any, tenant_id: UUID) -> None:
+        """Test semantic search goes to the injected store, not the RPC."""
+        client = Mock(spec=Client)
+        embedding_service = Mock()
+        embedding_service.embed_single = AsyncMock(return_value=self._query(0.0, 0.0, 1.0))
+        service = HybridSearchService(
+            supabase_client=client,
+            embedding_service=embedding_service,
+            query_cache=QueryEmbeddingCache(),
+            tenant_id=tenant_id,
+            vector_store=NumpyVectorStore(segment["root"]),
+        )
+
+        results = await service.search(query="escalation", mode="semantic", limit=2)
+
+        assert results[0].content == "chunk 2"
+        client.rpc.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_retriever_uses_vector_store(self, segment: Any, tenant_id: UUID) -> None:
+        """Test the RAG retriever reads from the injected store."""
+        client = Mock(spec=Client)
+        embedding_service = Mock()
+        embedding_service.embed_single = AsyncMock(return_value=self._query(0.0, 0.0, 0.0, 1.0))
+        retriever = Retriever(
+            client,
+            embedding_service,
+            query_cache=QueryEmbeddingCache(),
+            vector_store=NumpyVectorStore(segment["root"]),
+            tenant_id=tenant_id,
+        )
+
+        chunks = await retriever.retrieve("base rent", top_k=5, rerank_to=1)
+
+        assert [c.content for c in chunks] == ["chunk 3"]
+        assert 0.0 <= chunks[0].similarity <= 1.0
+        client.rpc.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_search_grouped_caps_chunks_per_document(self, segment: Any, tenant_id: UUID) -> None:
+        """Test grouped search keeps the best chunks of the best documents."""
+        store = NumpyVectorStore(segment["root"])
+        query = self._query(0.1, 0.2, 0.3, 0.0, 1.0, 0.9, 0.8)
+
+        matches = await store.search_grouped(tenant_id, query, 2, 10)
+
+        assert [m.content for m in matches] == ["chunk 4", "chunk 5", "chunk 2", "chunk 1"]
+        assert [m.document_id for m in matches[:2]] == [segment["document_ids"][1]] * 2
+
+        first_only = await store.search_grouped(tenant_id, query, 2, 1)
+        assert [m.content for m in first_only] == ["chunk 4", "chunk 5"]
+
+    @pytest.mark.skipif(not HNSWLIB_AVAILABLE, reason="hnswlib not installed")
+    @pytest.mark.asyncio
+    async def test_hnsw_store_matches_exact(self, segment: Any, tenant_id: UUID) -> None:
+        """Test the HNSW backend agrees with brute force on a small segment."""
+        store = HNSWVectorStore(segment["root"], exact_search_max_chunks=0)
+        query = self._query(0.2, 1.0, 0.5)
+
+        approximate = await store.search(tenant_id, query, 3)
+        exact = await NumpyVectorStore(segment["root"]).search(tenant_id, query, 3)
+
+        assert [m.chunk_id for m in approximate] == [m.chunk_id for m in exact]
+
+
 class TestVectorSearch:
     """Integration tests for vector search functionality."""
     
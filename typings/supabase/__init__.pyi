@@ -16,6 +16,7 @@ class TableQuery(Protocol):
     def maybe_single(self) -> "TableQuery": ...
     def insert(self, *args: Any, **kwargs: Any) -> "TableQuery": ...
     def update(self, *args: Any, **kwargs: Any) -> "TableQuery": ...
+    def upsert(self, *args: Any, **kwargs: Any) -> "TableQuery": ...
     def delete(self) -> "TableQuery": ...
     def execute(self) -> QueryResult: ...
 